@@ -1,13 +1,19 @@
 from fastapi import APIRouter
 
 from app.api.routes.health import health_router
+from app.api.routes.profiling import profiling_router
 from app.api.routes.projects import projects_router
 from app.api.routes.recomendations import recomendations_router
+from app.api.routes.subscriptions import subscriptions_router
+from app.api.routes.telemetry import telemetry_router
 
 server_router: APIRouter = APIRouter(
     prefix="/evergreen/pro",
 )
 
 server_router.include_router(health_router)
+server_router.include_router(profiling_router)
 server_router.include_router(projects_router)
 server_router.include_router(recomendations_router)
+server_router.include_router(telemetry_router)
+server_router.include_router(subscriptions_router)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
+from typing import Dict
 
 from app.models.server import ServerHealth, SERVER_STATUS_OK
+from app.core.metrics import metrics
 
 health_router: APIRouter = APIRouter(
     prefix="/server",
@@ -13,12 +15,14 @@ health_router: APIRouter = APIRouter(
     description="Health check endpoint for the server",
     response_model=ServerHealth,
 )
-def verify_server_status() -> ServerHealth:
+async def verify_server_status() -> ServerHealth:
     """
     Health check endpoint for the server.
 
     This endpoint is used to verify that the server is running and operational.
     It returns a simple health status response indicating the server's current state.
+    The handler runs on the event loop, so it answers even while every threadpool and
+    LLM executor thread is busy.
 
     Returns:
         ServerHealth: A response object containing:
@@ -30,3 +34,21 @@ def verify_server_status() -> ServerHealth:
     return ServerHealth(
         status=SERVER_STATUS_OK, message="Server is running and ready to be used"
     )
+
+
+@health_router.get(
+    path="/metrics",
+    description="In-process counters and timings of the current worker",
+)
+async def get_server_metrics() -> Dict[str, Dict]:
+    """
+    Metrics endpoint for the server.
+
+    This endpoint exposes the counters (e.g. cache hits and misses per namespace and
+    tier) and timing summaries collected by the worker that serves the request.
+
+    Returns:
+        Dict[str, Dict]: A dictionary with the "counters" and "timings" of the worker.
+    """
+
+    return metrics.snapshot()
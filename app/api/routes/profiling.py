@@ -0,0 +1,165 @@
+import hmac
+import random
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path
+from fastapi.responses import PlainTextResponse
+from typing import List
+
+from app.config.conf import config
+from app.core.profiling import RequestProfiler
+from app.models.profiling import ProfileSummary, RequestProfile
+from app.services.profile_store import profile_store
+
+
+def profile_token_matches(token: str | None) -> bool:
+    """
+    Check a profiling token against `PROFILING_ADMIN_TOKEN` in constant time.
+
+    Args:
+        token (str | None): The token sent by the client.
+
+    Returns:
+        bool: True if profiling is configured and the token is the admin token.
+    """
+
+    if config.PROFILING_ADMIN_TOKEN is None or token is None:
+        return False
+
+    return hmac.compare_digest(
+        token.encode(), config.PROFILING_ADMIN_TOKEN.get_secret_value().encode()
+    )
+
+
+def select_profiler(parcel_id: str, token: str | None) -> RequestProfiler | None:
+    """
+    Decide whether a recommendation request is profiled.
+
+    Args:
+        parcel_id (str): The parcel of the request.
+        token (str | None): The `X-Profile-Token` header of the request.
+
+    Returns:
+        RequestProfiler | None: The profiler of the request, None if not profiled.
+
+    Raises:
+        HTTPException: 403 if a token is sent and it is not the admin token.
+    """
+
+    if config.PROFILING_ADMIN_TOKEN is None:
+        return None
+
+    trigger: str | None = None
+
+    if token is not None:
+        if not profile_token_matches(token):
+            raise HTTPException(status_code=403, detail="Invalid profiling token")
+        trigger = "header"
+
+    elif random.random() < config.PROFILING_SAMPLE_RATE:
+        trigger = "sampled"
+
+    if trigger is None:
+        return None
+
+    return RequestProfiler(
+        parcel_id=parcel_id,
+        trigger=trigger,
+        sample_interval_ms=config.PROFILING_SAMPLE_INTERVAL_MS,
+        max_stacks=config.PROFILING_MAX_STACKS,
+    )
+
+
+def require_profile_token(
+    token: str | None = Header(
+        None, alias="X-Profile-Token", description="The profiling admin token"
+    ),
+) -> None:
+    if config.PROFILING_ADMIN_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+    if not profile_token_matches(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+profiling_router: APIRouter = APIRouter(
+    prefix="/server/profiles",
+    tags=["Server"],
+    dependencies=[Depends(require_profile_token)],
+)
+
+
+@profiling_router.get(
+    path="/",
+    description="List the request profiles recorded by this worker",
+    response_model=List[ProfileSummary],
+)
+async def list_profiles() -> List[ProfileSummary]:
+    """
+    List the recommendation requests profiled by the worker serving the request.
+
+    Returns:
+        List[ProfileSummary]: The profiles, newest first.
+    """
+
+    return profile_store.recent()
+
+
+def _get_profile(profile_id: str) -> RequestProfile:
+    profile: RequestProfile | None = profile_store.get(profile_id)
+
+    if profile is None:
+        raise HTTPException(
+            status_code=404, detail=f"Profile {profile_id} not found or expired"
+        )
+
+    return profile
+
+
+@profiling_router.get(
+    path="/{profile_id}",
+    description="Download a request profile: stage breakdown and sampled stacks",
+    response_model=RequestProfile,
+)
+def get_profile(
+    profile_id: str = Path(..., description="The X-Profile-Id of the request"),
+) -> RequestProfile:
+    """
+    Retrieve the profile of a recommendation request.
+
+    Args:
+        profile_id (str): The ID returned in the `X-Profile-Id` header.
+
+    Returns:
+        RequestProfile: The stage timings and sampled stacks.
+
+    Raises:
+        HTTPException: 404 if the profile is unknown or expired.
+    """
+
+    return _get_profile(profile_id)
+
+
+@profiling_router.get(
+    path="/{profile_id}/collapsed",
+    description="Download the sampled stacks of a request in flame graph format",
+    response_class=PlainTextResponse,
+)
+def get_profile_stacks(
+    profile_id: str = Path(..., description="The X-Profile-Id of the request"),
+) -> PlainTextResponse:
+    """
+    Retrieve the CPU samples of a request as collapsed stacks.
+
+    The output is read by flamegraph.pl and speedscope.
+
+    Args:
+        profile_id (str): The ID returned in the `X-Profile-Id` header.
+
+    Returns:
+        PlainTextResponse: One "frame;frame;frame count" line per sampled stack.
+
+    Raises:
+        HTTPException: 404 if the profile is unknown or expired.
+    """
+
+    return PlainTextResponse(_get_profile(profile_id).collapsed_stacks())
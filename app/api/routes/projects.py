@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Path
+from fastapi import APIRouter, HTTPException, Path, Query
+import datetime as dt
 from typing import List
 
-from app.models.project import ProjectDetails
+from app.models.project import NearbyProject, ProjectDetails, ProjectSearchResult
 from app.domain.projects import ProjectDomain
+from app.domain.prefetch import context_prefetcher
 
 
 projects_router: APIRouter = APIRouter(
@@ -24,7 +26,10 @@ def get_projects() -> List[ProjectDetails]:
 
     This endpoint returns a comprehensive list of all agricultural projects stored in the system.
     Each project in the list contains detailed information about the agricultural initiative.
-    Results can be filtered and paginated using query parameters.
+    Results can be filtered and paginated using query parameters. The other handlers of
+    this router are in-memory lookups and run directly on the event loop; this one
+    serializes the whole catalogue (up to millions of parcels), so it runs on the
+    threadpool instead.
 
     Args:
         status (Optional[str]): Filter projects by their status (e.g., 'active', 'completed', 'planned').
@@ -40,12 +45,109 @@ def get_projects() -> List[ProjectDetails]:
     return projects_domain.get_projects()
 
 
+@projects_router.get(
+    path="/search",
+    description="Search agricultural projects by crop, phase, location and planting date",
+    response_model=ProjectSearchResult,
+)
+async def search_projects(
+    crop_type: str | None = Query(None, description="Crop type, e.g. cotton"),
+    variety: str | None = Query(None, description="Crop variety, e.g. upland"),
+    current_phase: str | None = Query(None, description="Growth phase, e.g. flowering"),
+    location: str | None = Query(
+        None, description="Location components, e.g. 'Antioquia' or 'Jardín, Antioquia'"
+    ),
+    planted_from: dt.date | None = Query(
+        None, description="Earliest planting date (inclusive)"
+    ),
+    planted_to: dt.date | None = Query(
+        None, description="Latest planting date (inclusive)"
+    ),
+    cursor: str | None = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum projects per page"),
+    facets: bool = Query(False, description="Count matches per crop type and phase"),
+) -> ProjectSearchResult:
+    """
+    Search agricultural projects using the secondary indexes of the catalogue.
+
+    Every filter is optional and filters are combined with AND; text filters are
+    case-insensitive. Results come in catalogue order with the total number of matches
+    and a cursor to request the next page. The route is declared before
+    `/{project_id}` so "search" is not taken as a project ID.
+
+    Args:
+        crop_type (str | None): Filter by crop type.
+        variety (str | None): Filter by crop variety.
+        current_phase (str | None): Filter by growth phase.
+        location (str | None): Filter by location components.
+        planted_from (date | None): Filter by earliest planting date.
+        planted_to (date | None): Filter by latest planting date.
+        cursor (str | None): The cursor of the page to return.
+        limit (int): The maximum number of projects to return.
+        facets (bool): Whether to include match counts per crop type and phase.
+
+    Returns:
+        ProjectSearchResult: The page of projects, total count and next cursor.
+    """
+
+    try:
+        return projects_domain.search_projects(
+            crop_type=crop_type,
+            variety=variety,
+            current_phase=current_phase,
+            location=location,
+            planted_from=planted_from,
+            planted_to=planted_to,
+            cursor=cursor,
+            limit=limit,
+            facets=facets,
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@projects_router.get(
+    path="/nearest",
+    description="Get the agricultural projects closest to a location",
+    response_model=List[NearbyProject],
+)
+def get_nearest_projects(
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude in degrees"),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude in degrees"),
+    k: int = Query(10, ge=1, le=1000, description="Maximum number of projects"),
+    radius_km: float | None = Query(
+        None, gt=0, description="Maximum distance in kilometres"
+    ),
+) -> List[NearbyProject]:
+    """
+    Retrieve the projects closest to a location using the catalogue's spatial grid.
+
+    Only projects with coordinates are considered. Like `/search`, the route is
+    declared before `/{project_id}`. A query far from every project can fall back to
+    computing the distance to all of them, so this handler runs on the threadpool.
+
+    Args:
+        latitude (float): The latitude of the location.
+        longitude (float): The longitude of the location.
+        k (int): The maximum number of projects to return.
+        radius_km (float | None): The maximum distance of the projects.
+
+    Returns:
+        List[NearbyProject]: The closest projects with their distances, nearest first.
+    """
+
+    return projects_domain.nearest_projects(
+        latitude=latitude, longitude=longitude, k=k, radius_km=radius_km
+    )
+
+
 @projects_router.get(
     path="/{project_id}",
     description="Get a specific agricultural project by ID",
     response_model=ProjectDetails | None,
 )
-def get_project_by_id(
+async def get_project_by_id(
     project_id: str = Path(
         ...,
         description="The unique identifier of the agricultural project to retrieve.",
@@ -73,7 +175,7 @@ def get_project_by_id(
     description="Get a specific agricultural project by parcel ID",
     response_model=ProjectDetails | None,
 )
-def get_project_by_parcel_id(
+async def get_project_by_parcel_id(
     parcel_id: str = Path(
         ...,
         description="The unique identifier of the parcel to retrieve.",
@@ -85,6 +187,10 @@ def get_project_by_parcel_id(
     This endpoint returns comprehensive details about a particular agricultural project
     identified by its unique parcel ID. If the project is not found, returns None.
 
+    Viewing a parcel usually precedes a recommendation request, so when
+    `PREFETCH_ENABLED` is set the parcel's recommendation context starts being
+    gathered in the background; the response does not wait for it.
+
     Args:
         parcel_id (str): The unique identifier of the parcel to retrieve.
 
@@ -93,4 +199,54 @@ def get_project_by_parcel_id(
             agricultural project, or None if the project is not found.
     """
 
-    return projects_domain.get_project_by_parcel_id(parcel_id)
+    project: ProjectDetails | None = projects_domain.get_project_by_parcel_id(parcel_id)
+
+    if project is not None:
+        context_prefetcher.prefetch(parcel_id)
+
+    return project
+
+
+@projects_router.get(
+    path="/parcel/{parcel_id}/nearby",
+    description="Get the agricultural projects closest to a parcel",
+    response_model=List[NearbyProject],
+)
+def get_nearby_projects(
+    parcel_id: str = Path(..., description="The unique identifier of the parcel."),
+    k: int = Query(10, ge=1, le=1000, description="Maximum number of projects"),
+    radius_km: float | None = Query(
+        None, gt=0, description="Maximum distance in kilometres"
+    ),
+) -> List[NearbyProject]:
+    """
+    Retrieve the projects closest to a parcel, excluding the parcel itself.
+
+    Like `/nearest`, the handler runs on the threadpool.
+
+    Args:
+        parcel_id (str): The unique identifier of the parcel.
+        k (int): The maximum number of projects to return.
+        radius_km (float | None): The maximum distance of the projects.
+
+    Returns:
+        List[NearbyProject]: The closest projects with their distances, nearest first.
+
+    Raises:
+        HTTPException: 404 if the parcel does not exist, 400 if it has no coordinates.
+    """
+
+    try:
+        neighbours: List[NearbyProject] | None = projects_domain.nearby_projects(
+            parcel_id=parcel_id, k=k, radius_km=radius_km
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if neighbours is None:
+        raise HTTPException(
+            status_code=404, detail=f"Project not found for parcel ID {parcel_id}"
+        )
+
+    return neighbours
@@ -1,7 +1,42 @@
-from fastapi import APIRouter, Body, HTTPException
+import datetime as dt
+import hmac
+from contextlib import AbstractContextManager, nullcontext
+from typing import Tuple
 
-from app.models.recommendations import RecommendationRequest, RecommendationResponse
-from app.domain.recommendations import RecommendationDomain
+from fastapi import (
+    APIRouter,
+    Body,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from pydantic import SecretStr
+from starlette.concurrency import run_in_threadpool
+
+from app.models.recommendations import (
+    ContextFingerprint,
+    RecommendationRequest,
+    RecommendationResponse,
+    PregenerationStats,
+    RecommendationHistoryEntry,
+    RecommendationHistoryPage,
+)
+from app.models.scheduling import ClientContext, QueueTicket, RequestPriority
+from app.domain.recommendations import RecommendationDomain, too_many_requests
+from app.domain.pregeneration import RecommendationPregenerator
+from app.services.precomputed_recommendations import precomputed_store
+from app.services.recommendation_history import recommendation_history
+from app.core.single_flight import SingleFlight
+from app.core.fair_scheduler import RateLimitExceeded, fair_scheduler
+from app.core.profiling import RequestProfiler, profiling
+from app.api.routes.profiling import select_profiler
+from app.models.profiling import RequestProfile
+from app.services.profile_store import profile_store
+from app.services.traffic_capture import traffic_recorder
+from app.config.conf import config
 
 recomendations_router: APIRouter = APIRouter(
     prefix="/recomendations",
@@ -10,17 +45,278 @@ recomendations_router: APIRouter = APIRouter(
 
 recommendation_domain: RecommendationDomain = RecommendationDomain()
 
+recommendation_flights: SingleFlight = SingleFlight(name="recommendations")
+
+recommendation_pregenerator: RecommendationPregenerator = RecommendationPregenerator(
+    domain=recommendation_domain
+)
+
+
+def _lowest(requested: RequestPriority, allowed: RequestPriority) -> RequestPriority:
+    if RequestPriority.BATCH in (requested, allowed):
+        return RequestPriority.BATCH
+
+    return RequestPriority.INTERACTIVE
+
+
+def resolve_client(
+    client_id: str | None,
+    client_key: str | None,
+    priority: RequestPriority,
+    remote_address: str | None,
+) -> ClientContext:
+    """
+    Resolve the client a recommendation request is scheduled for.
+
+    A request is a tenant's when `X-Client-Key` matches the key configured for its
+    `X-Client-Id` in `FAIR_SHARE_CLIENT_KEYS` (compared in constant time); the tenant's
+    weight comes from `FAIR_SHARE_CLIENT_WEIGHTS`. Any other request, including one
+    with an unknown or unauthenticated client ID, is an anonymous caller identified by
+    its remote address, so rotating `X-Client-Id` neither resets a rate limit nor buys
+    another share of the queue. Anonymous callers are only rate limited with
+    `FAIR_SHARE_LIMIT_ANONYMOUS`. `X-Request-Priority` can lower the priority allowed
+    by the server (`FAIR_SHARE_CLIENT_PRIORITIES` or `FAIR_SHARE_ANONYMOUS_PRIORITY`),
+    never raise it.
+
+    Args:
+        client_id (str | None): The `X-Client-Id` header.
+        client_key (str | None): The `X-Client-Key` header.
+        priority (RequestPriority): The `X-Request-Priority` header.
+        remote_address (str | None): The address of the caller.
+
+    Returns:
+        ClientContext: The client, its weight, priority and whether it is rate limited.
+    """
+
+    expected: SecretStr | None = (
+        config.FAIR_SHARE_CLIENT_KEYS.get(client_id) if client_id else None
+    )
+
+    if (
+        expected is not None
+        and client_key is not None
+        and hmac.compare_digest(
+            client_key.encode(), expected.get_secret_value().encode()
+        )
+    ):
+        return ClientContext(
+            client_id=client_id,
+            priority=_lowest(
+                priority,
+                RequestPriority(
+                    config.FAIR_SHARE_CLIENT_PRIORITIES.get(
+                        client_id, RequestPriority.INTERACTIVE.value
+                    )
+                ),
+            ),
+            weight=config.FAIR_SHARE_CLIENT_WEIGHTS.get(client_id, 1.0),
+        )
+
+    return ClientContext(
+        client_id=f"{config.FAIR_SHARE_DEFAULT_CLIENT}:{remote_address or 'unknown'}",
+        priority=_lowest(
+            priority, RequestPriority(config.FAIR_SHARE_ANONYMOUS_PRIORITY)
+        ),
+        rate_limited=config.FAIR_SHARE_LIMIT_ANONYMOUS,
+    )
+
+
+def _as_utc(moment: dt.datetime | None) -> dt.datetime | None:
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=dt.timezone.utc)
+
+    return moment
+
+
+@recomendations_router.get(
+    path="/precomputed/stats",
+    description="Coverage and staleness of the background-generated recommendations",
+    response_model=PregenerationStats,
+)
+def get_pregeneration_stats() -> PregenerationStats:
+    """
+    Report how many active parcels have a fresh precomputed default recommendation.
+
+    Workers that do not run the scheduler report the statistics last published by the
+    worker that does.
+
+    Returns:
+        PregenerationStats: The coverage, staleness and generation counters.
+    """
+
+    active_parcels: int = len(recommendation_domain.projects_service.get_projects())
+
+    if not recommendation_pregenerator.running:
+        published: PregenerationStats | None = precomputed_store.get_published_stats()
+
+        if published is not None:
+            return published.model_copy(update={"running": False})
+
+    return recommendation_pregenerator.stats(active_parcels=active_parcels)
+
+
+@recomendations_router.get(
+    path="/history",
+    description="List generated recommendations by parcel, project and time range",
+    response_model=RecommendationHistoryPage,
+)
+def get_recommendation_history(
+    parcel_id: str | None = Query(None, description="Only this parcel"),
+    project_id: str | None = Query(None, description="Only this project"),
+    since: dt.datetime | None = Query(
+        None, description="Generated at or after this time (ISO 8601)"
+    ),
+    until: dt.datetime | None = Query(
+        None, description="Generated before this time (ISO 8601)"
+    ),
+    cursor: str | None = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum entries per page"),
+) -> RecommendationHistoryPage:
+    """
+    List the recommendations stored in the history, newest first.
+
+    Every generated recommendation (interactive, pre-generated or bulk) is appended to
+    the history by a background writer, so a recommendation shows up shortly after it
+    is served. Filters are combined with AND; times without a timezone are UTC.
+
+    Args:
+        parcel_id (str | None): Filter by parcel.
+        project_id (str | None): Filter by project.
+        since (datetime | None): Filter by earliest generation time.
+        until (datetime | None): Filter by latest generation time (exclusive).
+        cursor (str | None): The cursor of the page to return.
+        limit (int): The maximum number of entries to return.
+
+    Returns:
+        RecommendationHistoryPage: The page of entries and the next cursor.
+    """
+
+    try:
+        return recommendation_history.query(
+            parcel_id=parcel_id,
+            project_id=project_id,
+            since=_as_utc(since),
+            until=_as_utc(until),
+            cursor=cursor,
+            limit=limit,
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@recomendations_router.get(
+    path="/history/parcel/{parcel_id}/latest",
+    description="Get the last recommendation generated for a parcel",
+    response_model=RecommendationHistoryEntry,
+)
+def get_latest_recommendation(
+    parcel_id: str = Path(..., description="The unique identifier of the parcel"),
+) -> RecommendationHistoryEntry:
+    """
+    Retrieve the last recommendation generated for a parcel without calling the LLM.
+
+    Args:
+        parcel_id (str): The unique identifier of the parcel.
+
+    Returns:
+        RecommendationHistoryEntry: The latest entry of the parcel's history.
+
+    Raises:
+        HTTPException: 404 if no recommendation was generated for the parcel.
+    """
+
+    entry: RecommendationHistoryEntry | None = recommendation_history.latest(parcel_id)
+
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No recommendation history for parcel ID {parcel_id}",
+        )
+
+    return entry
+
+
+async def _generate(
+    request: RecommendationRequest, client: ClientContext
+) -> Tuple[RecommendationResponse, QueueTicket, ContextFingerprint | None]:
+    # The work shared by coalesced requests: its queue ticket and resolved context are
+    # reported to each.
+    ticket: QueueTicket = QueueTicket()
+
+    with traffic_recorder.resolving() as resolution:
+        recommendation: RecommendationResponse = (
+            await recommendation_domain.aget_recommendations(
+                request, client=client, ticket=ticket
+            )
+        )
+
+    return recommendation, ticket, resolution.fingerprint
+
+
+async def _coalesced(
+    request: RecommendationRequest, client: ClientContext
+) -> Tuple[RecommendationResponse, QueueTicket, ContextFingerprint | None]:
+    key: Tuple = (request.model, request.parcel_id, request.normalized_question())
+
+    while True:
+        joined: bool = recommendation_flights.joining(key)
+
+        try:
+            recommendation, ticket, fingerprint = await recommendation_flights.do(
+                key=key, function=lambda: _generate(request, client)
+            )
+
+        except HTTPException as e:
+            # The leader's client was rate limited, not necessarily this one.
+            if joined and e.status_code == 429:
+                continue
+            raise
+
+        break
+
+    # Followers are charged once the leader has been, for generations only.
+    if joined and recommendation.regenerated and config.FAIR_SHARE_ENABLED:
+        try:
+            fair_scheduler.charge(client)
+        except RateLimitExceeded as e:
+            raise too_many_requests(e)
+
+    return recommendation, ticket, fingerprint
+
 
 @recomendations_router.post(
     path="/",
     description="Get recommendations for a process based on a parcel id and a user query",
     response_model=RecommendationResponse,
 )
-def get_recomendations(
+async def get_recomendations(
+    http_request: Request,
+    response: Response,
     request: RecommendationRequest = Body(
         ...,
         description="The request object containing the parcel id and user query",
     ),
+    client_id: str | None = Header(
+        None,
+        alias="X-Client-Id",
+        description="The client (e.g. cooperative) the LLM capacity is shared with",
+    ),
+    client_key: str | None = Header(
+        None,
+        alias="X-Client-Key",
+        description="The key of the client, as configured in FAIR_SHARE_CLIENT_KEYS",
+    ),
+    priority: RequestPriority = Header(
+        RequestPriority.INTERACTIVE,
+        alias="X-Request-Priority",
+        description="'interactive' requests are served before 'batch' ones",
+    ),
+    profile_token: str | None = Header(
+        None,
+        alias="X-Profile-Token",
+        description="The profiling admin token, to profile this request",
+    ),
 ) -> RecommendationResponse:
     """
     Generate process recommendations based on a parcel ID and user query.
@@ -29,10 +325,44 @@ def get_recomendations(
     relevant process recommendations. It uses the recommendation domain to process the
     request and return appropriate recommendations.
 
+    Identical requests that arrive while one is already being processed (same model,
+    parcel and normalized question, whoever sends them) share its result and its queue
+    ticket instead of triggering another LLM call. A client that disconnects does not
+    cancel the shared work.
+
+    A recommendation generated earlier for the same parcel, model and question is
+    reused until it expires or a context signal moves outside its tolerance band;
+    `regenerated` and `regeneration_reason` report the decision, and `served_from` is
+    "precomputed" when the reused recommendation came from background pre-generation.
+
+    Generations share the LLM capacity fairly between clients: tenants authenticated
+    by `X-Client-Id` and `X-Client-Key`, and anonymous callers by remote address (see
+    `resolve_client`). Tenants are rate limited (429 with `Retry-After`) and every
+    client waits in a weighted fair queue where interactive requests go first. A
+    request that joined an identical one in flight is charged to its own client's rate
+    limit when it shares a fresh generation, so coalescing never lets a client exceed
+    it, and it runs on its own if the request it joined was the one rate limited.
+    `X-Queue-Position`, `X-Estimated-Wait-Ms` and `X-Queue-Wait-Ms` report the queue
+    position and estimated and actual waits of the request that did the work.
+
+    Requests sent with `X-Profile-Token` set to `PROFILING_ADMIN_TOKEN`, and a
+    `PROFILING_SAMPLE_RATE` share of all requests, are profiled: the stage breakdown
+    and sampled CPU stacks are stored for download from `/server/profiles`, and
+    requests profiled on demand get `X-Profile-Id` and `Server-Timing` headers.
+    Profiled requests are not coalesced with identical ones, so they measure their
+    own work. With `TRAFFIC_CAPTURE_ENABLED`, requests are also recorded, sanitized,
+    for replay by `app.cli.replay_traffic`.
+
     Args:
+        http_request (Request): The HTTP request, for the caller's address.
+        response (Response): The response whose queue headers are set.
         request (RecommendationRequest): The request object containing:
             - parcel_id: The unique identifier of the parcel
             - query: The user's query for which recommendations are needed
+        client_id (str | None): The client identifier.
+        client_key (str | None): The key authenticating the client.
+        priority (RequestPriority): The requested priority.
+        profile_token (str | None): The profiling admin token.
 
     Returns:
         RecommendationResponse: A response object containing:
@@ -41,11 +371,60 @@ def get_recomendations(
             - metadata: Additional information about the recommendations
     """
 
+    client: ClientContext = resolve_client(
+        client_id=client_id,
+        client_key=client_key,
+        priority=priority,
+        remote_address=http_request.client.host if http_request.client else None,
+    )
+    ticket: QueueTicket = QueueTicket()
+    profiler: RequestProfiler | None = select_profiler(request.parcel_id, profile_token)
+    scope: AbstractContextManager = profiling(profiler) if profiler else nullcontext()
+
     try:
-        return recommendation_domain.get_recommendations(request)
+        recommendation: RecommendationResponse
+
+        with scope, traffic_recorder.capture(request, client, ticket) as capture:
+            if profiler is None:
+                shared: QueueTicket
+                fingerprint: ContextFingerprint | None
+                recommendation, shared, fingerprint = await _coalesced(
+                    request, client
+                )
+
+                if fingerprint is not None:
+                    traffic_recorder.resolved(fingerprint)
+
+                ticket.position = shared.position
+                ticket.estimated_wait_ms = shared.estimated_wait_ms
+                ticket.waited_ms = shared.waited_ms
+            else:
+                recommendation = await recommendation_domain.aget_recommendations(
+                    request, client=client, ticket=ticket
+                )
+
+            if capture is not None:
+                capture.served = recommendation
+
+        response.headers["X-Queue-Position"] = str(ticket.position)
+        response.headers["X-Estimated-Wait-Ms"] = f"{ticket.estimated_wait_ms:.0f}"
+        response.headers["X-Queue-Wait-Ms"] = f"{ticket.waited_ms:.0f}"
+
+        return recommendation.model_copy(
+            update={"user_question": request.user_question}
+        )
 
     except HTTPException as e:
         raise e
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    finally:
+        if profiler is not None:
+            profile: RequestProfile = profiler.result()
+            await run_in_threadpool(profile_store.save, profile)
+
+            if profiler.trigger == "header":
+                response.headers["X-Profile-Id"] = profile.profile_id
+                response.headers["Server-Timing"] = profile.server_timing()
@@ -0,0 +1,238 @@
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Set
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+
+from app.config.conf import config
+from app.core.event_bus import BusFull, Message, Subscription
+from app.models.subscriptions import SubscriptionState, SubscriptionUpdate
+from app.services.parcel_events import parcel_events
+from app.services.project_catalogue import project_catalogue
+
+subscriptions_router: APIRouter = APIRouter(
+    prefix="/subscriptions",
+    tags=["Parcel Subscriptions"],
+)
+
+
+def _follow(subscription: Subscription, parcel_ids: Iterable[str]) -> Dict[str, str]:
+    rejected: Dict[str, str] = {}
+
+    for parcel_id in dict.fromkeys(parcel_ids):
+        if parcel_id in subscription.keys:
+            continue
+
+        if len(subscription.keys) >= config.SUBSCRIPTION_MAX_PARCELS:
+            rejected[parcel_id] = (
+                f"Subscription limit of {config.SUBSCRIPTION_MAX_PARCELS} parcels reached"
+            )
+        elif project_catalogue.get_project_by_parcel_id(parcel_id) is None:
+            rejected[parcel_id] = "Project not found for this parcel ID"
+        else:
+            parcel_events.bus.follow(subscription, [parcel_id])
+
+    return rejected
+
+
+def _state(subscription: Subscription, rejected: Dict[str, str]) -> SubscriptionState:
+    return SubscriptionState(
+        parcel_ids=sorted(subscription.keys),
+        rejected=rejected,
+        dropped=subscription.dropped,
+    )
+
+
+async def _receive_updates(websocket: WebSocket, subscription: Subscription) -> None:
+    # Subscription changes are acknowledged through the subscription itself, so the
+    # sender task is the only one writing to the socket.
+    while True:
+        state: SubscriptionState
+
+        try:
+            update: SubscriptionUpdate = SubscriptionUpdate.model_validate_json(
+                await websocket.receive_text()
+            )
+        except ValidationError as e:
+            state = _state(subscription, {}).model_copy(
+                update={"error": f"Invalid subscription update: {e}"}
+            )
+        else:
+            parcel_events.bus.unfollow(subscription, update.unsubscribe)
+            state = _state(subscription, _follow(subscription, update.subscribe))
+
+        subscription.deliver(("subscriptions", state.model_dump_json()))
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        for _, encoded in await subscription.next():
+            await websocket.send_text(encoded)
+
+
+@subscriptions_router.websocket("/ws")
+async def subscribe_websocket(
+    websocket: WebSocket,
+    parcel_id: List[str] = Query(
+        [], description="Parcels to follow from the start (repeat the parameter)"
+    ),
+) -> None:
+    """
+    Push the new recommendations, sensor alerts and context changes of parcels.
+
+    Replaces polling: the client follows a set of parcels and receives a JSON
+    `ParcelEvent` whenever a recommendation is generated for one of them, the anomaly
+    detector raises a new alert, or a context signal moves outside its tolerance band.
+    Parcels are given with `parcel_id` query parameters and changed at any time by
+    sending `{"subscribe": [...], "unsubscribe": [...]}`; every change is acknowledged
+    with a `SubscriptionState` message (`"type": "subscriptions"`).
+
+    An idle connection costs a subscription entry and two suspended tasks. A client
+    that reads too slowly loses the oldest events beyond `SUBSCRIPTION_QUEUE_SIZE`
+    (counted in `dropped`). Events are produced per worker: a client receives the
+    events of the worker it is connected to.
+
+    Args:
+        websocket (WebSocket): The client connection.
+        parcel_id (List[str]): The parcels to follow from the start.
+    """
+
+    if not config.SUBSCRIPTIONS_ENABLED:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    try:
+        subscription: Subscription = parcel_events.bus.open()
+    except BusFull:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    try:
+        await websocket.accept()
+        rejected: Dict[str, str] = _follow(subscription, parcel_id)
+        subscription.deliver(
+            ("subscriptions", _state(subscription, rejected).model_dump_json())
+        )
+
+        tasks: Set[asyncio.Task] = {
+            asyncio.ensure_future(_receive_updates(websocket, subscription)),
+            asyncio.ensure_future(_send_events(websocket, subscription)),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for task in done:
+            # The client went away (disconnect or failed send): nothing to report.
+            if isinstance(
+                task.exception(), (WebSocketDisconnect, OSError, RuntimeError)
+            ):
+                continue
+            task.result()
+
+    finally:
+        parcel_events.bus.close(subscription)
+
+
+async def _stream(subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        yield (
+            f"event: subscriptions\n"
+            f"data: {_state(subscription, {}).model_dump_json()}\n\n"
+        )
+
+        while True:
+            messages: List[Message] = await subscription.next(
+                timeout=config.SUBSCRIPTION_HEARTBEAT_SECONDS
+            )
+
+            if not messages:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield "".join(
+                f"event: {event_type}\ndata: {encoded}\n\n"
+                for event_type, encoded in messages
+            )
+
+    finally:
+        parcel_events.bus.close(subscription)
+
+
+@subscriptions_router.get(
+    path="/events",
+    description="Server-Sent Events stream of the changes of a set of parcels",
+    response_class=StreamingResponse,
+)
+async def subscribe_events(
+    parcel_id: List[str] = Query(
+        ..., description="Parcels to follow (repeat the parameter)"
+    ),
+) -> StreamingResponse:
+    """
+    Stream the new recommendations, sensor alerts and context changes of parcels.
+
+    The Server-Sent Events variant of `/subscriptions/ws`, for clients behind proxies
+    or without WebSocket support (e.g. `EventSource` in browsers). Each event is named
+    after its type (`recommendation`, `alert`, `context_change`) and carries a JSON
+    `ParcelEvent`; a comment is sent every `SUBSCRIPTION_HEARTBEAT_SECONDS` so idle
+    connections stay open. To change the parcels, open a new stream.
+
+    Args:
+        parcel_id (List[str]): The parcels to follow.
+
+    Returns:
+        StreamingResponse: The `text/event-stream` response.
+
+    Raises:
+        HTTPException: 400 if too many parcels are requested, 404 if a parcel is
+            unknown, 503 if the worker has its maximum of subscriptions.
+    """
+
+    if not config.SUBSCRIPTIONS_ENABLED:
+        raise HTTPException(status_code=503, detail="Subscriptions are disabled")
+
+    parcel_ids: List[str] = list(dict.fromkeys(parcel_id))
+
+    if len(parcel_ids) > config.SUBSCRIPTION_MAX_PARCELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.SUBSCRIPTION_MAX_PARCELS} parcels per subscription",
+        )
+
+    for parcel in parcel_ids:
+        if project_catalogue.get_project_by_parcel_id(parcel) is None:
+            raise HTTPException(
+                status_code=404, detail=f"Project not found for parcel ID {parcel}"
+            )
+
+    try:
+        subscription: Subscription = parcel_events.bus.open()
+    except BusFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": f"{config.SUBSCRIPTION_HEARTBEAT_SECONDS:.0f}"},
+        )
+
+    parcel_events.bus.follow(subscription, parcel_ids)
+
+    # Closing is idempotent: the background task covers a client that disconnects
+    # before the stream starts, when the generator's cleanup never runs.
+    return StreamingResponse(
+        _stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(parcel_events.bus.close, subscription),
+    )
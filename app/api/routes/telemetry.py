@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Body, HTTPException, Path, Query
+from typing import List
+
+from app.models.process import ProcessInformation
+from app.models.telemetry import ParcelAlerts, TelemetryAlert
+from app.services.project_catalogue import project_catalogue
+from app.services.telemetry_monitor import telemetry_monitor
+
+telemetry_router: APIRouter = APIRouter(
+    prefix="/telemetry",
+    tags=["Parcel Telemetry"],
+)
+
+
+@telemetry_router.post(
+    path="/readings",
+    description="Ingest sensor readings and run the streaming anomaly detector on them",
+    response_model=List[TelemetryAlert],
+)
+async def ingest_readings(
+    readings: List[ProcessInformation] = Body(
+        ..., description="Sensor readings, oldest first"
+    ),
+) -> List[TelemetryAlert]:
+    """
+    Feed sensor readings pushed by the field gateways to the anomaly detector.
+
+    Each reading updates the O(1) statistics of its parcel, so the handler runs on the
+    event loop. Readings not newer than the last one of their parcel are ignored.
+
+    Args:
+        readings (List[ProcessInformation]): The readings, oldest first.
+
+    Returns:
+        List[TelemetryAlert]: The alerts raised or refreshed by the readings.
+
+    Raises:
+        HTTPException: 404 if a reading belongs to an unknown parcel.
+    """
+
+    for parcel_id in {reading.parcel_id for reading in readings}:
+        if project_catalogue.get_project_by_parcel_id(parcel_id) is None:
+            raise HTTPException(
+                status_code=404, detail=f"Project not found for parcel ID {parcel_id}"
+            )
+
+    return [alert for reading in readings for alert in telemetry_monitor.observe(reading)]
+
+
+@telemetry_router.get(
+    path="/alerts",
+    description="Get the parcels with active sensor alerts, most urgent first",
+    response_model=List[ParcelAlerts],
+)
+async def get_urgent_parcels(
+    min_urgency: float = Query(
+        0.0, ge=0.0, le=1.0, description="Only parcels at least this urgent"
+    ),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of parcels"),
+) -> List[ParcelAlerts]:
+    """
+    Rank the parcels with active sensor alerts by urgency.
+
+    Args:
+        min_urgency (float): The minimum urgency of the returned parcels.
+        limit (int): The maximum number of parcels to return.
+
+    Returns:
+        List[ParcelAlerts]: The parcels and their active alerts, most urgent first.
+    """
+
+    return telemetry_monitor.most_urgent(min_urgency=min_urgency, limit=limit)
+
+
+@telemetry_router.get(
+    path="/parcel/{parcel_id}/alerts",
+    description="Get the active sensor alerts of a parcel",
+    response_model=ParcelAlerts,
+)
+async def get_parcel_alerts(
+    parcel_id: str = Path(..., description="The unique identifier of the parcel."),
+) -> ParcelAlerts:
+    """
+    Retrieve the active sensor alerts of a parcel and its urgency score.
+
+    Args:
+        parcel_id (str): The unique identifier of the parcel.
+
+    Returns:
+        ParcelAlerts: The active alerts, most urgent first (empty if none).
+    """
+
+    return telemetry_monitor.alerts(parcel_id)
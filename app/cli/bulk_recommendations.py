@@ -0,0 +1,364 @@
+"""
+Generate recommendations for many parcels offline, with checkpointed resume.
+
+Reads recommendation requests from a CSV file (columns `parcel_id` and optionally
+`user_question` and `model`) or a JSONL file (one RecommendationRequest per line, e.g.
+the projects.jsonl of app.cli.generate_fleet), runs
+`RecommendationDomain` directly with a pool of threads and streams one JSON line per
+request to the output file as soon as it completes:
+
+    {"index": 12, "parcel_id": "P0000012", "status": "ok", "response": {...}}
+    {"index": 13, "parcel_id": "P0000013", "status": "error", "error": "..."}
+
+The output file is the checkpoint: rerunning the same command skips every request
+already written with status "ok" and retries the failed ones, so an interrupted run
+resumes where it stopped. Lines are written in completion order; use `index` (the
+position of the request in the input) to restore the input order. A small
+`<output>.checkpoint.json` file records the input it belongs to and the progress.
+Usage:
+
+    python -m app.cli.bulk_recommendations parcels.csv recommendations.jsonl --workers 8
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Set, TextIO, Tuple
+
+from fastapi import HTTPException
+
+from app.config.conf import config
+from app.domain.recommendations import RecommendationDomain
+from app.models.llms import ImplementedModels
+from app.models.recommendations import RecommendationRequest, RecommendationResponse
+from app.services.recommendation_history import recommendation_history
+
+REPORT_EVERY_SECONDS: float = 1.0
+CHECKPOINT_EVERY_SECONDS: float = 5.0
+
+
+def read_requests(
+    path: str, question: str | None, model: ImplementedModels | None
+) -> Iterator[RecommendationRequest]:
+    """
+    Read the recommendation requests of a CSV or JSONL file lazily.
+
+    Args:
+        path (str): The path of a `.csv` or `.jsonl` file.
+        question (str | None): The question of rows without one (None for the default).
+        model (ImplementedModels | None): The model of rows without one.
+
+    Yields:
+        RecommendationRequest: The requests, in file order.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+
+    defaults: Dict[str, object] = {}
+    if question:
+        defaults["user_question"] = question
+    if model:
+        defaults["model"] = model
+
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(file):
+                yield RecommendationRequest(
+                    **{**defaults, **{key: value for key, value in row.items() if value}}
+                )
+
+        elif path.endswith(".jsonl"):
+            for line in file:
+                if line.strip():
+                    yield RecommendationRequest(**{**defaults, **json.loads(line)})
+
+        else:
+            raise ValueError(f"Unsupported request file: {path}")
+
+
+def input_fingerprint(path: str) -> Dict[str, object]:
+    stat: os.stat_result = os.stat(path)
+    return {"input": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def completed_indexes(output: str) -> Tuple[Set[int], int]:
+    """
+    Collect the requests already completed in an output file.
+
+    A last line cut by an interruption is removed from the file.
+
+    Args:
+        output (str): The path of the output file.
+
+    Returns:
+        Tuple[Set[int], int]: The indexes written with status "ok" and the number of
+            lines read.
+    """
+
+    done: Set[int] = set()
+    lines: int = 0
+
+    if not os.path.exists(output):
+        return done, lines
+
+    valid_bytes: int = 0
+
+    with open(output, "rb") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+
+            try:
+                record: Dict = json.loads(line)
+            except json.JSONDecodeError:
+                break
+
+            valid_bytes += len(line)
+            lines += 1
+            if record.get("status") == "ok":
+                done.add(record["index"])
+
+    if valid_bytes < os.path.getsize(output):
+        with open(output, "r+b") as file:
+            file.truncate(valid_bytes)
+
+    return done, lines
+
+
+def write_checkpoint(path: str, state: Dict[str, object]) -> None:
+    temporary: str = f"{path}.tmp"
+
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=2)
+
+    os.replace(temporary, path)
+
+
+def process(
+    domain: RecommendationDomain, index: int, request: RecommendationRequest
+) -> Dict[str, object]:
+    started_at: float = time.perf_counter()
+    record: Dict[str, object] = {
+        "index": index,
+        "parcel_id": request.parcel_id,
+        "user_question": request.user_question,
+        "model": request.model.value,
+    }
+
+    try:
+        response: RecommendationResponse = domain.get_recommendations(
+            request, origin="bulk"
+        )
+        record.update(status="ok", response=response.model_dump(mode="json"))
+
+    except HTTPException as e:
+        record.update(status="error", error=f"{e.status_code}: {e.detail}")
+
+    except Exception as e:
+        record.update(status="error", error=str(e))
+
+    record["elapsed_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+
+    return record
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+
+def run(
+    input_path: str,
+    output: str,
+    workers: int,
+    question: str | None = None,
+    model: ImplementedModels | None = None,
+    restart: bool = False,
+) -> int:
+    """
+    Generate the recommendations of every request of the input not yet completed.
+
+    Args:
+        input_path (str): The CSV or JSONL file of requests.
+        output (str): The JSONL file results are appended to.
+        workers (int): The number of requests processed in parallel.
+        question (str | None): The question of rows without one.
+        model (ImplementedModels | None): The model of rows without one.
+        restart (bool): Discard the previous output and start over.
+
+    Returns:
+        int: The number of requests that failed or were not processed.
+    """
+
+    checkpoint_path: str = f"{output}.checkpoint.json"
+    fingerprint: Dict[str, object] = input_fingerprint(input_path)
+
+    if restart:
+        for path in [output, checkpoint_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding="utf-8") as file:
+            previous: Dict = json.load(file)
+
+        if any(previous.get(key) != value for key, value in fingerprint.items()):
+            raise SystemExit(
+                f"{output} belongs to another input ({previous.get('input')}); "
+                "use --restart to discard it"
+            )
+
+    done, _ = completed_indexes(output)
+    total: int = sum(1 for _ in read_requests(input_path, question, model))
+    pending: int = total - len(done)
+    print(
+        f"{total} requests, {len(done)} already completed, {pending} to process "
+        f"with {workers} workers",
+        file=sys.stderr,
+    )
+
+    domain: RecommendationDomain = RecommendationDomain()
+    completed: int = 0
+    failed: int = 0
+    started_at: float = time.perf_counter()
+    reported_at: float = started_at
+    checkpointed_at: float = started_at
+
+    def report(final: bool = False) -> None:
+        elapsed: float = max(time.perf_counter() - started_at, 1e-9)
+        rate: float = (completed + failed) / elapsed
+        remaining: int = pending - completed - failed
+        eta: str = format_duration(remaining / rate) if rate > 0 else "--:--:--"
+        print(
+            f"\r{len(done) + completed}/{total} done, {failed} failed, "
+            f"{rate:.2f} requests/s, ETA {eta}".ljust(72),
+            end="\n" if final else "",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    def checkpoint() -> None:
+        write_checkpoint(
+            checkpoint_path,
+            {
+                **fingerprint,
+                "total": total,
+                "completed": len(done) + completed,
+                "failed_in_last_run": failed,
+                "updated_at": time.time(),
+            },
+        )
+
+    def write(finished: Set[Future], file: TextIO) -> None:
+        nonlocal completed, failed
+
+        for future in finished:
+            if future.cancelled():
+                continue
+
+            record: Dict[str, object] = future.result()
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            if record["status"] == "ok":
+                completed += 1
+            else:
+                failed += 1
+
+        file.flush()
+
+    # The domain prints every prompt; keep stdout quiet during the run.
+    with (
+        open(output, "a", encoding="utf-8") as file,
+        ThreadPoolExecutor(max_workers=workers) as executor,
+        open(os.devnull, "w") as devnull,
+        contextlib.redirect_stdout(devnull),
+    ):
+        in_flight: Set[Future] = set()
+        requests: Iterator[Tuple[int, RecommendationRequest]] = (
+            (index, request)
+            for index, request in enumerate(read_requests(input_path, question, model))
+            if index not in done
+        )
+
+        try:
+            while True:
+                # Only a few requests are submitted ahead, so memory stays flat.
+                while len(in_flight) < workers * 2:
+                    next_request: Tuple[int, RecommendationRequest] | None = next(
+                        requests, None
+                    )
+                    if next_request is None:
+                        break
+                    in_flight.add(executor.submit(process, domain, *next_request))
+
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(
+                    in_flight, timeout=REPORT_EVERY_SECONDS, return_when=FIRST_COMPLETED
+                )
+                write(finished, file)
+
+                if time.perf_counter() - checkpointed_at >= CHECKPOINT_EVERY_SECONDS:
+                    checkpoint()
+                    checkpointed_at = time.perf_counter()
+
+                if time.perf_counter() - reported_at >= REPORT_EVERY_SECONDS:
+                    report()
+                    reported_at = time.perf_counter()
+
+        except KeyboardInterrupt:
+            # Requests already running are finished and written, the others dropped.
+            print("\nInterrupted; finishing the running requests...", file=sys.stderr)
+            for future in in_flight:
+                future.cancel()
+            write(wait(in_flight).done, file)
+
+        finally:
+            checkpoint()
+
+    recommendation_history.flush()
+    report(final=True)
+
+    if pending > completed:
+        print("Rerun the command to resume.", file=sys.stderr)
+
+    return pending - completed
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", help="CSV or JSONL file of recommendation requests")
+    parser.add_argument("output", help="JSONL file the results are appended to")
+    parser.add_argument("--workers", type=int, default=config.LLM_MAX_CONCURRENCY)
+    parser.add_argument("--question", help="Question of the rows without one")
+    parser.add_argument(
+        "--model",
+        type=ImplementedModels,
+        choices=list(ImplementedModels),
+        help="Model of the rows without one (e.g. auto)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Discard the previous output"
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    unfinished: int = run(
+        input_path=args.input,
+        output=args.output,
+        workers=args.workers,
+        question=args.question,
+        model=args.model,
+        restart=args.restart,
+    )
+    sys.exit(1 if unfinished else 0)
@@ -0,0 +1,311 @@
+"""
+Generate a reproducible synthetic fleet of parcels for benchmarks and load tests.
+
+Writes three JSONL files into the output directory:
+
+    projects.jsonl    one ProjectDetails per parcel (load it with PROJECTS_DATA_PATH)
+    history.jsonl     past seasons per parcel (load it with HISTORY_DATA_PATHS)
+    telemetry.jsonl   recent sensor readings per parcel
+
+Every value is derived from the seed and the parcel index, so the same arguments always
+produce the same files. Telemetry is produced by the seeded simulation of
+`ProcessInformationService`, so the readings match what the API serves for those time
+slots when it runs with the same `SIMULATION_SEED`. Usage:
+
+    python -m app.cli.generate_fleet ./fleet --parcels 100000 --seed 42
+"""
+
+import argparse
+import datetime as dt
+import json
+import multiprocessing as mp
+import os
+import random as rand
+import time
+from typing import Dict, List, Tuple
+
+from app.config.conf import config
+from app.core.simulation import simulation_random, time_slot, slot_start
+from app.models.process import ProcessInformation
+from app.services.process_info import ProcessInformationService
+
+CROPS: Dict[str, Dict] = {
+    "rice": {"varieties": ["jasmine", "basmati", "arborio"], "days": 120, "yield": 6.0},
+    "cotton": {"varieties": ["upland", "pima"], "days": 160, "yield": 2.5},
+    "barley": {"varieties": ["winter", "spring", "malting"], "days": 110, "yield": 4.0},
+    "maize": {"varieties": ["dent", "flint", "sweet"], "days": 130, "yield": 7.0},
+    "potato": {"varieties": ["criolla", "pastusa"], "days": 120, "yield": 20.0},
+}
+PHASES: List[str] = ["germination", "vegetative", "flowering", "maturity"]
+# Approximate town centres; parcels are scattered up to LOCATION_RADIUS_DEGREES around them.
+LOCATIONS: Dict[str, Tuple[float, float]] = {
+    "Ciudad Bolivar, Antioquia": (5.85, -76.02),
+    "Hispania, Antioquia": (5.80, -75.91),
+    "Jardín, Antioquia": (5.60, -75.82),
+    "Andes, Antioquia": (5.66, -75.88),
+    "Rionegro, Antioquia": (6.15, -75.37),
+    "La Ceja, Antioquia": (6.03, -75.43),
+    "Espinal, Tolima": (4.15, -74.88),
+    "Ibagué, Tolima": (4.44, -75.23),
+    "Saldaña, Tolima": (3.93, -75.02),
+    "Neiva, Huila": (2.93, -75.28),
+    "Campoalegre, Huila": (2.69, -75.33),
+    "Yopal, Casanare": (5.34, -72.39),
+    "Aguazul, Casanare": (5.17, -72.55),
+    "Villavicencio, Meta": (4.14, -73.63),
+    "Granada, Meta": (3.55, -73.71),
+    "Montería, Córdoba": (8.75, -75.88),
+    "Cereté, Córdoba": (8.89, -75.79),
+    "Valledupar, Cesar": (10.46, -73.25),
+    "Aguachica, Cesar": (8.31, -73.62),
+    "Tunja, Boyacá": (5.54, -73.36),
+    "Duitama, Boyacá": (5.83, -73.03),
+    "Zipaquirá, Cundinamarca": (5.02, -74.00),
+    "Facatativá, Cundinamarca": (4.81, -74.35),
+    "Pasto, Nariño": (1.21, -77.28),
+    "Ipiales, Nariño": (0.83, -77.64),
+    "Palmira, Valle del Cauca": (3.54, -76.30),
+    "Tuluá, Valle del Cauca": (4.08, -76.20),
+    "Popayán, Cauca": (2.44, -76.61),
+    "Armenia, Quindío": (4.53, -75.68),
+    "Pereira, Risaralda": (4.81, -75.69),
+}
+LOCATION_RADIUS_DEGREES: float = 0.15
+ISSUES: List[str] = [
+    "None",
+    "None",
+    "None",
+    "Drought",
+    "Pests",
+    "Drought and pests",
+    "Flooding",
+    "Fungal disease",
+    "Nutrient deficiency",
+]
+
+_process_service: ProcessInformationService = ProcessInformationService()
+
+
+def generate_parcel(
+    index: int, reference_date: dt.date, seasons: int, readings: int
+) -> Tuple[str, List[str], List[str]]:
+    """
+    Generate the project, history and telemetry lines of one parcel.
+
+    Args:
+        index (int): The index of the parcel in the fleet.
+        reference_date (date): The "today" of the fleet.
+        seasons (int): The number of past seasons to generate.
+        readings (int): The number of sensor readings to generate, one per time slot.
+
+    Returns:
+        Tuple[str, List[str], List[str]]: The JSON lines of the project, its seasons
+            and its readings.
+    """
+
+    rng: rand.Random = simulation_random("fleet", index)
+    parcel_id: str = f"P{index:07d}"
+
+    crop_type: str = rng.choice(list(CROPS))
+    crop: Dict = CROPS[crop_type]
+    days_since_planting: int = rng.randrange(crop["days"])
+    planting_date: dt.date = reference_date - dt.timedelta(days=days_since_planting)
+    current_phase: str = PHASES[days_since_planting * len(PHASES) // crop["days"]]
+    location: str = rng.choice(list(LOCATIONS))
+    # Coordinates use their own random stream, so the other values do not depend on them.
+    coordinates_rng: rand.Random = simulation_random("fleet-coordinates", index)
+    latitude, longitude = LOCATIONS[location]
+
+    project: str = json.dumps(
+        {
+            "project_id": (
+                f"PROJ_{crop_type.upper()}_{planting_date:%Y%m%d}_{parcel_id}"
+            ),
+            "parcel_id": parcel_id,
+            "location": f"{location}, Colombia",
+            "crop_type": crop_type,
+            "variety": rng.choice(crop["varieties"]),
+            "planting_date": planting_date.isoformat(),
+            "current_phase": current_phase,
+            "latitude": round(
+                latitude
+                + coordinates_rng.uniform(
+                    -LOCATION_RADIUS_DEGREES, LOCATION_RADIUS_DEGREES
+                ),
+                5,
+            ),
+            "longitude": round(
+                longitude
+                + coordinates_rng.uniform(
+                    -LOCATION_RADIUS_DEGREES, LOCATION_RADIUS_DEGREES
+                ),
+                5,
+            ),
+        },
+        ensure_ascii=False,
+    )
+
+    history: List[str] = []
+    trend: float = rng.uniform(-0.03, 0.03)
+
+    for offset in range(seasons, 0, -1):
+        year: int = reference_date.year - offset
+        season_crop: str = rng.choice(list(CROPS))
+        issues: str = rng.choice(ISSUES)
+        penalty: float = 1.0 if issues == "None" else rng.uniform(0.6, 0.9)
+        season_yield: float = (
+            CROPS[season_crop]["yield"]
+            * (1 + trend * (seasons - offset))
+            * penalty
+            * rng.uniform(0.9, 1.1)
+        )
+
+        history.append(
+            json.dumps(
+                {
+                    "year": year,
+                    "parcel_id": parcel_id,
+                    "crop_type": season_crop,
+                    "planting_date": dt.date(
+                        year, rng.randint(1, 12), rng.randint(1, 28)
+                    ).isoformat(),
+                    "issues": issues,
+                    "notes": (
+                        "Season without incidents."
+                        if issues == "None"
+                        else f"Yield affected by {issues.lower()}."
+                    ),
+                    "yield_t_ha": round(season_yield, 2),
+                }
+            )
+        )
+
+    telemetry: List[str] = []
+    last_slot: int = time_slot(
+        dt.datetime.combine(reference_date, dt.time()) - dt.timedelta(seconds=1)
+    )
+
+    for slot in range(last_slot - readings + 1, last_slot + 1):
+        reading: ProcessInformation | None = (
+            _process_service.simulate_process_information(
+                parcel_id=parcel_id, at=slot_start(slot)
+            )
+        )
+
+        if reading is not None:
+            telemetry.append(reading.model_dump_json())
+
+    return project, history, telemetry
+
+
+def generate_chunk(
+    arguments: Tuple[int, int, dt.date, int, int],
+) -> Tuple[List[str], List[str], List[str]]:
+    start, stop, reference_date, seasons, readings = arguments
+    projects: List[str] = []
+    history: List[str] = []
+    telemetry: List[str] = []
+
+    for index in range(start, stop):
+        project, parcel_history, parcel_telemetry = generate_parcel(
+            index, reference_date, seasons, readings
+        )
+        projects.append(project)
+        history.extend(parcel_history)
+        telemetry.extend(parcel_telemetry)
+
+    return projects, history, telemetry
+
+
+def set_seed(seed: int) -> None:
+    config.SIMULATION_SEED = seed
+
+
+def generate(
+    output: str,
+    parcels: int,
+    seed: int,
+    reference_date: dt.date,
+    seasons: int,
+    readings: int,
+    workers: int,
+    chunk_size: int = 5000,
+) -> None:
+    started_at: float = time.perf_counter()
+    os.makedirs(output, exist_ok=True)
+    set_seed(seed)
+
+    chunks: List[Tuple[int, int, dt.date, int, int]] = [
+        (start, min(start + chunk_size, parcels), reference_date, seasons, readings)
+        for start in range(0, parcels, chunk_size)
+    ]
+    counts: Dict[str, int] = {"projects": 0, "history": 0, "telemetry": 0}
+
+    with (
+        open(os.path.join(output, "projects.jsonl"), "w", encoding="utf-8") as projects,
+        open(os.path.join(output, "history.jsonl"), "w", encoding="utf-8") as history,
+        open(os.path.join(output, "telemetry.jsonl"), "w", encoding="utf-8") as telemetry,
+        mp.Pool(processes=workers, initializer=set_seed, initargs=(seed,)) as pool,
+    ):
+        # imap keeps the chunk order, so the files do not depend on the worker count.
+        for done, (chunk_projects, chunk_history, chunk_telemetry) in enumerate(
+            pool.imap(generate_chunk, chunks), start=1
+        ):
+            for file, lines, name in [
+                (projects, chunk_projects, "projects"),
+                (history, chunk_history, "history"),
+                (telemetry, chunk_telemetry, "telemetry"),
+            ]:
+                if lines:
+                    file.write("\n".join(lines) + "\n")
+                counts[name] += len(lines)
+
+            elapsed: float = time.perf_counter() - started_at
+            print(
+                f"\r{counts['projects']}/{parcels} parcels "
+                f"({counts['projects'] / elapsed:.0f} parcels/s)",
+                end="",
+                flush=True,
+            )
+
+    print(
+        f"\nGenerated {counts['projects']} projects, {counts['history']} seasons and "
+        f"{counts['telemetry']} sensor readings in "
+        f"{time.perf_counter() - started_at:.1f} s (seed {seed}, "
+        f"reference date {reference_date})"
+    )
+    print(
+        "Serve it with:\n"
+        f"  PROJECTS_DATA_PATH={os.path.join(output, 'projects.jsonl')}\n"
+        f"  HISTORY_DATA_PATHS='[\"{os.path.join(output, 'history.jsonl')}\"]'\n"
+        f"  SIMULATION_SEED={seed}"
+    )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("output", help="Directory where the JSONL files are written")
+    parser.add_argument("--parcels", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reference-date",
+        type=dt.date.fromisoformat,
+        default=dt.date.today(),
+        help="The 'today' of the fleet (YYYY-MM-DD); fix it to reproduce a fleet",
+    )
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--readings", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args: argparse.Namespace = parser.parse_args()
+
+    generate(
+        output=args.output,
+        parcels=args.parcels,
+        seed=args.seed,
+        reference_date=args.reference_date,
+        seasons=args.seasons,
+        readings=args.readings,
+        workers=args.workers,
+    )
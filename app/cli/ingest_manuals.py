@@ -0,0 +1,350 @@
+"""
+Ingest agronomic manuals (PDF, Markdown or plain text) into the retrieval index.
+
+Manuals are chunked with langchain-text-splitters, embedded in parallel across a process
+pool and upserted into the chromadb index used by `RetrievalInfoService`. The crop type
+and phase a manual applies to are taken from its location in the corpus:
+
+    <corpus>/<crop_type>/<current_phase>/<manual>   applies to one crop and phase
+    <corpus>/<crop_type>/<manual>                   applies to every phase of a crop
+    <corpus>/<manual>                               applies to every crop
+
+Re-indexing is incremental: files whose content hash did not change are skipped, only
+chunks missing from the index are embedded, and chunks no longer produced by any manual
+are deleted. When the chunking settings change (or the manifest is missing), every
+manual is re-chunked and every indexed chunk this run did not produce is deleted, so
+chunks of two geometries never coexist. Usage:
+
+    python -m app.cli.ingest_manuals ./manuals --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Set
+
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+
+from app.config.conf import config
+from app.models.knowledge import KnowledgeChunk
+from app.services.embedding_cache import (
+    EmbeddingCache,
+    content_hash,
+    get_embedding_cache,
+)
+from app.services.embeddings import compute_embeddings, embedding_model_id
+from app.services.knowledge_index import MANIFEST_FILE, WILDCARD, knowledge_index
+
+SUPPORTED_EXTENSIONS: Set[str] = {".md", ".markdown", ".txt", ".pdf"}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def read_manual(path: str) -> str:
+    """
+    Extract the text of a manual.
+
+    Args:
+        path (str): The path of a PDF, Markdown or plain text file.
+
+    Returns:
+        str: The text of the manual.
+    """
+
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        return "\n\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+
+    with open(path, encoding="utf-8", errors="replace") as file:
+        return file.read()
+
+
+def manual_scope(relative_path: str) -> tuple[str, str]:
+    """
+    Derive the crop type and phase a manual applies to from its corpus location.
+
+    Args:
+        relative_path (str): The path of the manual relative to the corpus root.
+
+    Returns:
+        tuple[str, str]: The crop type and phase, "*" when not specified.
+    """
+
+    directories: List[str] = relative_path.replace(os.sep, "/").split("/")[:-1]
+    crop_type: str = directories[0].lower() if len(directories) >= 1 else WILDCARD
+    current_phase: str = directories[1].lower() if len(directories) >= 2 else WILDCARD
+
+    return crop_type, current_phase
+
+
+def chunk_manual(
+    root: str, relative_path: str, splitter: RecursiveCharacterTextSplitter
+) -> List[KnowledgeChunk]:
+    """
+    Split a manual into chunks identified by the hash of their content and scope.
+
+    Args:
+        root (str): The corpus root directory.
+        relative_path (str): The path of the manual relative to the corpus root.
+        splitter (RecursiveCharacterTextSplitter): The splitter used for the manual.
+
+    Returns:
+        List[KnowledgeChunk]: The unique chunks of the manual.
+    """
+
+    crop_type, current_phase = manual_scope(relative_path)
+    chunks: Dict[str, KnowledgeChunk] = {}
+
+    for text in splitter.split_text(read_manual(os.path.join(root, relative_path))):
+        text = text.strip()
+        if not text:
+            continue
+
+        chunk_id: str = hashlib.sha256(
+            f"{crop_type}\0{current_phase}\0{text}".encode()
+        ).hexdigest()
+
+        chunks[chunk_id] = KnowledgeChunk(
+            chunk_id=chunk_id,
+            source=relative_path,
+            crop_type=crop_type,
+            current_phase=current_phase,
+            text=text,
+        )
+
+    return list(chunks.values())
+
+
+def discover_manuals(root: str) -> List[str]:
+    manuals: List[str] = []
+
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                manuals.append(os.path.relpath(os.path.join(directory, name), root))
+
+    return sorted(manuals)
+
+
+def load_manifest(path: str, settings: Dict) -> Dict[str, Dict] | None:
+    """
+    Load the per-file hashes and chunk ids recorded by the previous run.
+
+    The manifest is discarded when the embedding model or chunking settings changed,
+    which forces a full re-index.
+
+    Args:
+        path (str): The path of the manifest file.
+        settings (Dict): The embedding model and chunking settings of this run.
+
+    Returns:
+        Dict[str, Dict] | None: The recorded entry of every manual, keyed by relative
+            path, or None when there is no manifest for these settings.
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding="utf-8") as file:
+        manifest: Dict = json.load(file)
+
+    if manifest.get("settings") != settings:
+        return None
+
+    return manifest.get("files", {})
+
+
+def save_manifest(path: str, settings: Dict, files: Dict[str, Dict]) -> None:
+    temporary_path: str = f"{path}.tmp"
+
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump({"settings": settings, "files": files}, file)
+
+    os.replace(temporary_path, path)
+
+
+def ingest(
+    root: str, workers: int, chunk_size: int, chunk_overlap: int, batch_size: int
+) -> None:
+    started_at: float = time.perf_counter()
+
+    settings: Dict = {
+        "embedding_model": embedding_model_id(),
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+    }
+    manifest_path: str = os.path.join(config.KNOWLEDGE_INDEX_DIR, MANIFEST_FILE)
+    manifest: Dict[str, Dict] | None = load_manifest(manifest_path, settings)
+    previous_files: Dict[str, Dict] = manifest if manifest is not None else {}
+    current_files: Dict[str, Dict] = {}
+
+    splitters: Dict[str, RecursiveCharacterTextSplitter] = {
+        "markdown": RecursiveCharacterTextSplitter.from_language(
+            Language.MARKDOWN, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ),
+        "text": RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ),
+    }
+
+    changed_chunks: List[KnowledgeChunk] = []
+    unchanged_files: int = 0
+
+    for relative_path in discover_manuals(root):
+        sha256: str = file_sha256(os.path.join(root, relative_path))
+        previous: Dict | None = previous_files.get(relative_path)
+
+        if previous is not None and previous["sha256"] == sha256:
+            current_files[relative_path] = previous
+            unchanged_files += 1
+            continue
+
+        splitter: RecursiveCharacterTextSplitter = splitters[
+            "markdown"
+            if relative_path.lower().endswith((".md", ".markdown"))
+            else "text"
+        ]
+        chunks: List[KnowledgeChunk] = chunk_manual(root, relative_path, splitter)
+
+        changed_chunks.extend(chunks)
+        current_files[relative_path] = {
+            "sha256": sha256,
+            "chunk_ids": [chunk.chunk_id for chunk in chunks],
+        }
+
+    # Chunks of edited manuals that are already indexed (e.g. unchanged sections or
+    # passages shared with other manuals) are not embedded again.
+    unique_chunks: Dict[str, KnowledgeChunk] = {
+        chunk.chunk_id: chunk for chunk in changed_chunks
+    }
+    chunk_ids: List[str] = list(unique_chunks)
+    indexed_ids: Set[str] = set()
+
+    for start in range(0, len(chunk_ids), 1000):
+        indexed_ids |= knowledge_index.existing_ids(chunk_ids[start : start + 1000])
+
+    pending_chunks: List[KnowledgeChunk] = [
+        chunk for chunk_id, chunk in unique_chunks.items() if chunk_id not in indexed_ids
+    ]
+    # Embeddings of passages seen before (e.g. in a deleted or renamed manual) are
+    # taken from the persistent embedding cache instead of being recomputed.
+    embedding_cache: EmbeddingCache = get_embedding_cache(embedding_model_id())
+    digests: List[bytes] = [content_hash(chunk.text) for chunk in pending_chunks]
+    cached: List = embedding_cache.get_many(digests)
+
+    cached_chunks: List[KnowledgeChunk] = [
+        chunk
+        for chunk, embedding in zip(pending_chunks, cached)
+        if embedding is not None
+    ]
+    knowledge_index.upsert(
+        cached_chunks,
+        [embedding.tolist() for embedding in cached if embedding is not None],
+    )
+
+    uncached_chunks: List[KnowledgeChunk] = [
+        chunk for chunk, embedding in zip(pending_chunks, cached) if embedding is None
+    ]
+    batches: List[List[KnowledgeChunk]] = [
+        uncached_chunks[start : start + batch_size]
+        for start in range(0, len(uncached_chunks), batch_size)
+    ]
+
+    embedding_started_at: float = time.perf_counter()
+
+    if batches:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    compute_embeddings, [chunk.text for chunk in batch]
+                ): batch
+                for batch in batches
+            }
+
+            for future in as_completed(futures):
+                batch: List[KnowledgeChunk] = futures[future]
+                embeddings: List[List[float]] = future.result()
+
+                embedding_cache.put_many(
+                    [content_hash(chunk.text) for chunk in batch], embeddings
+                )
+                knowledge_index.upsert(batch, embeddings)
+
+    embedding_seconds: float = time.perf_counter() - embedding_started_at
+
+    live_ids: Set[str] = {
+        chunk_id for entry in current_files.values() for chunk_id in entry["chunk_ids"]
+    }
+    stale_ids: List[str]
+
+    if manifest is None:
+        # A full re-index: chunks left by a run with other settings are not listed in
+        # any manifest, so the index itself is the list of candidates.
+        stale_ids = list(knowledge_index.ids() - live_ids)
+    else:
+        stale_ids = list(
+            {
+                chunk_id
+                for entry in previous_files.values()
+                for chunk_id in entry["chunk_ids"]
+                if chunk_id not in live_ids
+            }
+        )
+
+    for start in range(0, len(stale_ids), 1000):
+        knowledge_index.delete(stale_ids[start : start + 1000])
+
+    save_manifest(manifest_path, settings, current_files)
+
+    total_seconds: float = time.perf_counter() - started_at
+    chunks_per_second: float = (
+        len(uncached_chunks) / embedding_seconds if embedding_seconds > 0 else 0.0
+    )
+
+    print(
+        f"Manuals: {len(current_files)} ({unchanged_files} unchanged, "
+        f"{len(current_files) - unchanged_files} new or modified, "
+        f"{len(set(previous_files) - set(current_files))} removed)"
+    )
+    print(
+        f"Chunks: {len(uncached_chunks)} embedded, "
+        f"{len(cached_chunks)} from the embedding cache, "
+        f"{len(unique_chunks) - len(pending_chunks)} already indexed, "
+        f"{len(stale_ids)} deleted, {knowledge_index.count()} in index"
+    )
+    print(
+        f"Throughput: {chunks_per_second:.1f} chunks/s with {workers} workers "
+        f"({total_seconds:.2f} s total)"
+    )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("corpus", help="Directory containing the manuals")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=150)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args: argparse.Namespace = parser.parse_args()
+
+    ingest(
+        root=args.corpus,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+    )
@@ -0,0 +1,495 @@
+"""
+Replay captured recommendation traffic at 1x to 50x speed for capacity planning.
+
+Reads the JSONL files written with `TRAFFIC_CAPTURE_ENABLED` (one CapturedRequest per
+line; pass files or the capture directory), reorders them by arrival and sends every
+request to the application, in-process behind an ASGI transport, at its captured
+arrival offset divided by `--speed`. Requests are sent on schedule whether or not the
+previous ones have completed (an open-loop load), with their captured client and
+priority, so queueing and fair sharing behave as under the captured load (each
+anonymous caller, pseudonymized by address, is replayed from an address of its own).
+
+The replay always runs on the simulated LLM backend (`LLM_SIMULATED_LATENCY_SECONDS`)
+and the simulated context services, with every other setting taken from the
+environment, and starts from cold caches and an empty history in a temporary
+directory. Parcels unknown to the local catalogue are generated with the crop,
+variety and phase of their captured context, except for requests captured as 404,
+which are replayed against a missing parcel as they were served. At the end it reports
+the latency, queueing and cache behaviour under the replayed load next to the captured
+latencies, and the requests whose status differs from the captured one:
+
+    python -m app.cli.replay_traffic .cache/evergreen/traffic --speed 20
+"""
+
+import os
+import tempfile
+
+os.environ["LLM_BACKEND"] = "simulated"
+os.environ["TRAFFIC_CAPTURE_ENABLED"] = "false"
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="evergreen-replay-")
+os.environ["RECOMMENDATION_HISTORY_PATH"] = ""
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import contextlib  # noqa: E402
+import datetime as dt  # noqa: E402
+import hashlib  # noqa: E402
+import heapq  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from collections import Counter  # noqa: E402
+from typing import Dict, Iterator, List, Set, Tuple  # noqa: E402
+
+import httpx  # noqa: E402
+from pydantic import SecretStr  # noqa: E402
+
+from app.cli.generate_fleet import generate_parcel  # noqa: E402
+from app.config.conf import config  # noqa: E402
+from app.core.executors import LLM_QUEUED_GAUGE  # noqa: E402
+from app.core.fair_scheduler import SCHEDULER_QUEUED_GAUGE  # noqa: E402
+from app.core.metrics import metrics  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.project import ProjectDetails  # noqa: E402
+from app.models.traffic import CapturedRequest  # noqa: E402
+from app.services.llms import LLM_IN_FLIGHT_GAUGE  # noqa: E402
+from app.services.project_catalogue import project_catalogue  # noqa: E402
+
+MIN_SPEED: float = 1.0
+MAX_SPEED: float = 50.0
+# Lines are written when requests complete, so they can trail later arrivals by up to
+# the slowest request; a record is only replayed once the window has passed it.
+REORDER_WINDOW: dt.timedelta = dt.timedelta(minutes=10)
+QUEUE_SAMPLE_SECONDS: float = 0.1
+REPORT_EVERY_SECONDS: float = 5.0
+REPLAY_KEY: str = "replay"
+
+
+def capture_files(paths: List[str]) -> List[str]:
+    files: List[str] = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith(".jsonl")
+            )
+        else:
+            files.append(path)
+
+    return files
+
+
+def read_capture(path: str) -> Iterator[CapturedRequest]:
+    """
+    Read a capture file lazily, in arrival order.
+
+    Args:
+        path (str): The path of a capture file.
+
+    Yields:
+        CapturedRequest: The captured requests, reordered within `REORDER_WINDOW`.
+    """
+
+    pending: List[Tuple[dt.datetime, int, CapturedRequest]] = []
+
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file):
+            if not line.strip():
+                continue
+
+            captured: CapturedRequest = CapturedRequest.model_validate_json(line)
+            heapq.heappush(pending, (captured.arrived_at, line_number, captured))
+
+            while pending and pending[0][0] < captured.arrived_at - REORDER_WINDOW:
+                yield heapq.heappop(pending)[2]
+
+    while pending:
+        yield heapq.heappop(pending)[2]
+
+
+def read_captures(paths: List[str]) -> Iterator[CapturedRequest]:
+    """
+    Merge capture files (e.g. one per worker and day) into one stream by arrival.
+
+    Args:
+        paths (List[str]): Capture files or directories of capture files.
+
+    Returns:
+        Iterator[CapturedRequest]: The captured requests, in arrival order.
+    """
+
+    return heapq.merge(
+        *(read_capture(path) for path in capture_files(paths)),
+        key=lambda captured: captured.arrived_at,
+    )
+
+
+def replay_project(captured: CapturedRequest) -> ProjectDetails:
+    """
+    Generate a project for a captured parcel unknown to the local catalogue.
+
+    Args:
+        captured (CapturedRequest): The captured request of the parcel.
+
+    Returns:
+        ProjectDetails: A generated project with the parcel ID and, when the context
+            was captured, the crop, variety and phase of the captured one.
+    """
+
+    digest: bytes = hashlib.sha256(captured.request.parcel_id.encode()).digest()
+    project: Dict = json.loads(
+        generate_parcel(
+            int.from_bytes(digest[:4], "little"),
+            dt.date.today(),
+            seasons=0,
+            readings=0,
+        )[0]
+    )
+    project["parcel_id"] = captured.request.parcel_id
+    project["project_id"] = f"REPLAY_{captured.request.parcel_id}"
+
+    if captured.fingerprint is not None:
+        project["crop_type"] = captured.fingerprint.crop_type
+        project["variety"] = captured.fingerprint.variety
+        project["current_phase"] = captured.fingerprint.current_phase
+
+    return ProjectDetails.model_validate(project)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 0.50), 1),
+        "p95": round(percentile(values, 0.95), 1),
+        "p99": round(percentile(values, 0.99), 1),
+        "max": round(max(values, default=0.0), 1),
+    }
+
+
+class Replay:
+    """
+    Drives captured requests against the application and collects what it observed.
+
+    Attributes:
+        speed (float): The speed-up of the captured arrival times.
+        limit (int | None): The maximum number of requests replayed.
+    """
+
+    def __init__(self, speed: float, limit: int | None) -> None:
+        self.speed: float = speed
+        self.limit: int | None = limit
+        self.sent: int = 0
+        self.completed: int = 0
+        self.statuses: Counter = Counter()
+        self.captured_statuses: Counter = Counter()
+        self.status_mismatches: Counter = Counter()
+        self.served_from: Counter = Counter()
+        self.latencies: List[float] = []
+        self.queue_waits: List[float] = []
+        self.schedule_lags: List[float] = []
+        self.captured_latencies: List[float] = []
+        self.captured_span_seconds: float = 0.0
+        self.elapsed_seconds: float = 0.0
+        self.queue_depths: Dict[str, List[float]] = {
+            LLM_QUEUED_GAUGE: [],
+            SCHEDULER_QUEUED_GAUGE: [],
+            LLM_IN_FLIGHT_GAUGE: [],
+        }
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def headers(self, captured: CapturedRequest) -> Dict[str, str]:
+        headers: Dict[str, str] = {
+            "Content-Type": "application/json",
+            "X-Request-Priority": captured.priority.value,
+        }
+
+        # Captured tenants are replayed as tenants, under a key made up for the replay;
+        # anonymous callers are told apart by address (see `client_for`).
+        if not captured.client_id.startswith(config.FAIR_SHARE_DEFAULT_CLIENT):
+            config.FAIR_SHARE_CLIENT_KEYS[captured.client_id] = SecretStr(REPLAY_KEY)
+            headers["X-Client-Id"] = captured.client_id
+            headers["X-Client-Key"] = REPLAY_KEY
+
+        return headers
+
+    async def client_for(
+        self, captured: CapturedRequest, clients: contextlib.AsyncExitStack
+    ) -> httpx.AsyncClient:
+        """
+        Return the HTTP client replaying a captured client's requests.
+
+        Each captured client gets its own client with an address derived from its
+        pseudonym, so anonymous callers stay distinct clients of the fair-share
+        scheduler, which identifies them by address.
+
+        Args:
+            captured (CapturedRequest): The captured request.
+            clients (contextlib.AsyncExitStack): Closes the clients after the replay.
+
+        Returns:
+            httpx.AsyncClient: The client.
+        """
+
+        client: httpx.AsyncClient | None = self._clients.get(captured.client_id)
+
+        if client is None:
+            digest: bytes = hashlib.sha256(captured.client_id.encode()).digest()
+            address: str = f"10.{digest[0]}.{digest[1]}.{digest[2]}"
+            client = await clients.enter_async_context(
+                httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app, client=(address, 0)),
+                    base_url="http://replay",
+                )
+            )
+            self._clients[captured.client_id] = client
+
+        return client
+
+    async def send(self, client: httpx.AsyncClient, captured: CapturedRequest) -> None:
+        started_at: float = time.perf_counter()
+
+        try:
+            response: httpx.Response = await client.post(
+                "/evergreen/pro/recomendations/",
+                content=captured.request.model_dump_json(),
+                headers=self.headers(captured),
+                timeout=None,
+            )
+            status_code: int = response.status_code
+
+        except httpx.HTTPError:
+            status_code = 0
+
+        self.latencies.append((time.perf_counter() - started_at) * 1000)
+        self.statuses[status_code] += 1
+        self.captured_statuses[captured.status_code] += 1
+        if status_code != captured.status_code:
+            self.status_mismatches[f"{captured.status_code}->{status_code}"] += 1
+        self.completed += 1
+
+        if status_code == 200:
+            self.queue_waits.append(float(response.headers["X-Queue-Wait-Ms"]))
+            self.served_from[response.json()["served_from"]] += 1
+
+    async def sample_queues(self) -> None:
+        while True:
+            gauges: Dict[str, float] = metrics.snapshot()["gauges"]
+
+            for name, depths in self.queue_depths.items():
+                depths.append(gauges.get(name, 0.0))
+
+            await asyncio.sleep(QUEUE_SAMPLE_SECONDS)
+
+    async def run(self, captures: Iterator[CapturedRequest]) -> None:
+        """
+        Send every captured request at its scaled arrival offset.
+
+        Args:
+            captures (Iterator[CapturedRequest]): The captured requests, by arrival.
+        """
+
+        in_flight: Set[asyncio.Task] = set()
+        first_arrival: dt.datetime | None = None
+        started_at: float = time.perf_counter()
+        reported_at: float = started_at
+        sampler: asyncio.Task = asyncio.create_task(self.sample_queues())
+
+        async with (
+            app.router.lifespan_context(app),
+            contextlib.AsyncExitStack() as clients,
+        ):
+            for captured in captures:
+                if self.limit is not None and self.sent >= self.limit:
+                    break
+
+                # A parcel that was not found when captured stays unknown, so the
+                # request is replayed as the error it was rather than as a generation.
+                if (
+                    captured.status_code != 404
+                    and project_catalogue.get_project_by_parcel_id(
+                        captured.request.parcel_id
+                    )
+                    is None
+                ):
+                    project_catalogue.add_many([replay_project(captured)])
+
+                first_arrival = first_arrival or captured.arrived_at
+                offset: float = (captured.arrived_at - first_arrival).total_seconds()
+                due: float = started_at + offset / self.speed
+                delay: float = due - time.perf_counter()
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                self.schedule_lags.append(max(0.0, time.perf_counter() - due) * 1000)
+                self.captured_span_seconds = offset
+                if captured.status_code == 200:
+                    self.captured_latencies.append(captured.latency_ms)
+
+                task: asyncio.Task = asyncio.create_task(
+                    self.send(await self.client_for(captured, clients), captured)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                self.sent += 1
+
+                if time.perf_counter() - reported_at >= REPORT_EVERY_SECONDS:
+                    self.progress()
+                    reported_at = time.perf_counter()
+
+            if in_flight:
+                await asyncio.wait(in_flight)
+
+        sampler.cancel()
+        self.elapsed_seconds = time.perf_counter() - started_at
+        self.progress(final=True)
+
+    def progress(self, final: bool = False) -> None:
+        print(
+            f"\r{self.sent} sent, {self.completed} completed, "
+            f"{self.sent - self.completed} in flight".ljust(72),
+            end="\n" if final else "",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    def report(self) -> Dict[str, object]:
+        """
+        Summarize the replay.
+
+        Returns:
+            Dict[str, object]: The load, latency, queueing and cache figures.
+        """
+
+        counters: Dict[str, float] = metrics.snapshot()["counters"]
+        caches: Dict[str, Dict[str, float]] = {}
+
+        for name, value in counters.items():
+            if name.startswith("cache.") and name.count(".") == 2:
+                _, namespace, counter = name.split(".")
+                caches.setdefault(namespace, {})[counter] = value
+
+        for counts in caches.values():
+            hits: float = counts.get("memory_hits", 0) + counts.get("shared_hits", 0)
+            counts["hit_rate"] = round(hits / max(1, hits + counts.get("misses", 0)), 3)
+
+        return {
+            "speed": self.speed,
+            "requests": self.sent,
+            "captured_span_seconds": round(self.captured_span_seconds, 1),
+            "elapsed_seconds": round(self.elapsed_seconds, 1),
+            "offered_rps": round(
+                self.sent * self.speed / max(self.captured_span_seconds, 1e-9), 2
+            ),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "captured_statuses": {
+                str(status): count for status, count in self.captured_statuses.items()
+            },
+            "status_mismatches": dict(self.status_mismatches),
+            "served_from": dict(self.served_from),
+            "latency_ms": distribution(self.latencies),
+            "captured_latency_ms": distribution(self.captured_latencies),
+            "queue_wait_ms": distribution(self.queue_waits),
+            "schedule_lag_ms": distribution(self.schedule_lags),
+            "queue_depth": {
+                name: {
+                    "avg": round(sum(depths) / max(1, len(depths)), 2),
+                    "max": max(depths, default=0.0),
+                }
+                for name, depths in self.queue_depths.items()
+            },
+            "recommendations": {
+                "regenerated": counters.get("recommendations.regenerated", 0),
+                "reused": counters.get("recommendations.reused", 0),
+                "coalesced": counters.get("single_flight.recommendations.coalesced", 0),
+                "rate_limited": counters.get("fair_scheduler.rate_limited", 0),
+            },
+            "caches": caches,
+        }
+
+
+def print_report(report: Dict) -> None:
+    def line(label: str, values: Dict[str, float]) -> str:
+        return f"{label:<22}" + "  ".join(
+            f"{key} {value:>8.1f}" for key, value in values.items()
+        )
+
+    print(
+        f"{report['requests']} requests spanning {report['captured_span_seconds']} s "
+        f"replayed at {report['speed']:g}x in {report['elapsed_seconds']} s "
+        f"({report['offered_rps']} requests/s offered)"
+    )
+    print(f"statuses: {report['statuses']}, served from: {report['served_from']}")
+    print(
+        f"captured statuses: {report['captured_statuses']}, "
+        f"mismatches (captured->replayed): {report['status_mismatches']}"
+    )
+    print(line("latency (ms)", report["latency_ms"]))
+    print(line("captured latency (ms)", report["captured_latency_ms"]))
+    print(line("queue wait (ms)", report["queue_wait_ms"]))
+    print(line("schedule lag (ms)", report["schedule_lag_ms"]))
+
+    for name, depth in report["queue_depth"].items():
+        print(f"{name:<30} avg {depth['avg']:>6.2f}  max {depth['max']:>4.0f}")
+
+    print(f"recommendations: {report['recommendations']}")
+
+    for namespace, counts in sorted(report["caches"].items()):
+        print(
+            f"cache {namespace:<24} hit rate {counts['hit_rate']:.1%} "
+            f"({counts.get('misses', 0):.0f} misses)"
+        )
+
+
+def speed(value: str) -> float:
+    parsed: float = float(value)
+
+    if not MIN_SPEED <= parsed <= MAX_SPEED:
+        raise argparse.ArgumentTypeError(
+            f"speed must be between {MIN_SPEED:g} and {MAX_SPEED:g}"
+        )
+
+    return parsed
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "captures", nargs="+", help="Capture files or directories of capture files"
+    )
+    parser.add_argument(
+        "--speed", type=speed, default=1.0, help="Speed-up of the arrivals (1 to 50)"
+    )
+    parser.add_argument("--limit", type=int, help="Replay only the first requests")
+    parser.add_argument("--report", help="Also write the report to this JSON file")
+    args: argparse.Namespace = parser.parse_args()
+
+    print(
+        f"Replaying at {args.speed:g}x with the simulated LLM "
+        f"({config.LLM_SIMULATED_LATENCY_SECONDS:g} s, "
+        f"{config.LLM_MAX_CONCURRENCY} concurrent)",
+        file=sys.stderr,
+    )
+    replay: Replay = Replay(speed=args.speed, limit=args.limit)
+
+    # The domain prints every prompt; keep stdout for the report.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        asyncio.run(replay.run(read_captures(args.captures)))
+
+    report: Dict[str, object] = replay.report()
+    print_report(report)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import SecretStr
+from typing import Dict, List
 
 
 class Config(BaseSettings):
@@ -9,5 +10,203 @@ class Config(BaseSettings):
 
     HF_TOKEN: SecretStr
 
+    # Maximum number of concurrent LLM calls the inference backend is sized for; it also
+    # sizes the dedicated executor running the LLM calls of interactive requests.
+    # LLM_BACKEND is "huggingface" or "simulated", a local stand-in that sleeps for
+    # LLM_SIMULATED_LATENCY_SECONDS (used by benchmarks and load tests).
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_BACKEND: str = "huggingface"
+    LLM_SIMULATED_LATENCY_SECONDS: float = 2.0
+    # Classify questions (yes/no, fact, diagnosis, plan) to pick the token budget, stop
+    # sequences and temperature of each generation; False keeps a fixed 250-token budget.
+    GENERATION_PROFILES_ENABLED: bool = True
+    # model="auto" routing: requests without latency_slo_ms get ROUTER_DEFAULT_SLO_MS;
+    # per-model latency and error rates are EWMAs (ROUTER_EWMA_ALPHA) and models above
+    # ROUTER_MAX_ERROR_RATE are avoided. Decisions and outcomes are appended as JSONL to
+    # ROUTER_DECISION_LOG_PATH for offline evaluation (unset to disable the log).
+    ROUTER_DEFAULT_SLO_MS: float = 10_000
+    ROUTER_EWMA_ALPHA: float = 0.2
+    ROUTER_MAX_ERROR_RATE: float = 0.5
+    ROUTER_DECISION_LOG_PATH: str | None = ".cache/evergreen/routing_decisions.jsonl"
+
+    # Fair share of the LLM capacity between clients: each client has a token bucket of
+    # FAIR_SHARE_BURST generations refilled at FAIR_SHARE_RATE_PER_SECOND, and waiting
+    # generations are served by weighted fair queuing (FAIR_SHARE_CLIENT_WEIGHTS,
+    # default 1), interactive before batch. Tenants are the clients of
+    # FAIR_SHARE_CLIENT_KEYS, identified by X-Client-Id and X-Client-Key; any other
+    # request is queued per remote address as FAIR_SHARE_DEFAULT_CLIENT and is only rate
+    # limited with FAIR_SHARE_LIMIT_ANONYMOUS. X-Request-Priority can only lower the
+    # priority allowed by FAIR_SHARE_CLIENT_PRIORITIES (tenants, default "interactive")
+    # or FAIR_SHARE_ANONYMOUS_PRIORITY.
+    FAIR_SHARE_ENABLED: bool = True
+    FAIR_SHARE_RATE_PER_SECOND: float = 2.0
+    FAIR_SHARE_BURST: int = 20
+    FAIR_SHARE_CLIENT_KEYS: Dict[str, SecretStr] = {}
+    FAIR_SHARE_CLIENT_WEIGHTS: Dict[str, float] = {}
+    FAIR_SHARE_CLIENT_PRIORITIES: Dict[str, str] = {}
+    FAIR_SHARE_DEFAULT_CLIENT: str = "anonymous"
+    FAIR_SHARE_LIMIT_ANONYMOUS: bool = False
+    FAIR_SHARE_ANONYMOUS_PRIORITY: str = "interactive"
+
+    # Cache layer: "memory" keeps a per-worker LRU only, "tiered" backs it with a
+    # SQLite store on disk that is shared by every worker on the host.
+    CACHE_BACKEND: str = "tiered"
+    CACHE_DIR: str = ".cache/evergreen"
+    CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    CACHE_MEMORY_ENTRIES: int = 2048
+
+    WEATHER_CACHE_TTL_SECONDS: int = 30 * 60
+    SATELLITE_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    RESPONSE_CACHE_TTL_SECONDS: int = 60 * 60
+
+    # CSV/JSONL project catalogue replacing the bundled one (see app/cli/generate_fleet.py).
+    PROJECTS_DATA_PATH: str | None = None
+
+    # Parcels with coordinates share weather forecasts per grid cell and satellite images
+    # per tile (sides in degrees, 0.1° is about 11 km); the spatial index answering
+    # nearest-neighbour queries uses cells of SPATIAL_INDEX_CELL_DEGREES.
+    WEATHER_GRID_CELL_DEGREES: float = 0.1
+    SATELLITE_TILE_DEGREES: float = 0.05
+    SPATIAL_INDEX_CELL_DEGREES: float = 0.05
+
+    # Simulated upstream services (weather, sensors, satellite, moon). With a seed, every
+    # value is a deterministic function of the seed, the parcel (or location) and its
+    # time slot; without one, values are drawn from an unseeded generator. Availability
+    # is the probability that a service returns data.
+    SIMULATION_SEED: int | None = None
+    SIMULATION_TIME_SLOT_SECONDS: int = 15 * 60
+    SIMULATION_WEATHER_AVAILABILITY: float = 0.7
+    SIMULATION_PROCESS_AVAILABILITY: float = 0.7
+    SIMULATION_SATELLITE_AVAILABILITY: float = 0.7
+    SIMULATION_LUNAR_AVAILABILITY: float = 0.7
+
+    # CSV/JSONL files with historical seasons loaded into the history store at startup.
+    HISTORY_DATA_PATHS: List[str] = []
+    HISTORY_PROMPT_MAX_SEASONS: int = 3
+
+    # Versioned best-practices pack; defaults to the one bundled in app/data.
+    KNOWLEDGE_PACK_PATH: str | None = None
+    KNOWLEDGE_PACK_RELOAD_INTERVAL_SECONDS: float = 5.0
+
+    # Retrieval index of agronomic manual chunks (see app/cli/ingest_manuals.py).
+    # EMBEDDING_BACKEND is "onnx-minilm" (chromadb's bundled model) or "hashing".
+    EMBEDDING_BACKEND: str = "onnx-minilm"
+    EMBEDDING_DIMENSION: int = 384
+    KNOWLEDGE_INDEX_DIR: str = ".index/agronomic_knowledge"
+    KNOWLEDGE_SEARCH_MAX_CHUNKS: int = 4
+    KNOWLEDGE_SEARCH_CANDIDATES: int = 50
+
+    # Persistent embeddings of corpus chunks keyed by content hash, plus an in-memory
+    # LRU of query embeddings.
+    EMBEDDING_CACHE_DIR: str = ".cache/embeddings"
+    EMBEDDING_QUERY_CACHE_ENTRIES: int = 4096
+
+    # Background pre-generation of the default recommendation of every parcel. Missing
+    # or stale recommendations are generated during the off-peak hours [START, END);
+    # recommendations whose context changed are refreshed at any time, always using
+    # only LLM capacity left spare by interactive traffic.
+    PREGENERATION_ENABLED: bool = False
+    PREGENERATION_OFF_PEAK_START_HOUR: int = 0
+    PREGENERATION_OFF_PEAK_END_HOUR: int = 5
+    PREGENERATION_INTERVAL_SECONDS: float = 60.0
+    PREGENERATION_BATCH_SIZE: int = 200
+    PREGENERATION_MAX_CONCURRENCY: int = 2
+    PREGENERATION_RESERVED_LLM_SLOTS: int = 2
+
+    # Streaming anomaly detection over sensor readings. Per parcel and signal, each
+    # reading is compared with a forecast from an EWMA level and trend (weights
+    # ANOMALY_EWMA_ALPHA and ANOMALY_TREND_BETA): readings beyond ANOMALY_Z_THRESHOLD
+    # standard deviations are spikes, and a two-sided CUSUM of the z-scores (allowance
+    # ANOMALY_CUSUM_DRIFT, threshold ANOMALY_CUSUM_THRESHOLD) flags level shifts, after
+    # ANOMALY_WARMUP_READINGS readings. Alerts expire ANOMALY_ALERT_TTL_SECONDS after
+    # their last detection.
+    ANOMALY_DETECTION_ENABLED: bool = True
+    ANOMALY_EWMA_ALPHA: float = 0.2
+    ANOMALY_TREND_BETA: float = 0.1
+    ANOMALY_WARMUP_READINGS: int = 12
+    ANOMALY_Z_THRESHOLD: float = 4.0
+    ANOMALY_CUSUM_DRIFT: float = 1.0
+    ANOMALY_CUSUM_THRESHOLD: float = 10.0
+    ANOMALY_ALERT_TTL_SECONDS: int = 24 * 60 * 60
+    ANOMALY_MAX_ALERTS_PER_PARCEL: int = 16
+
+    # Speculative prefetch: viewing a parcel (GET /projects/parcel/{id}) gathers its
+    # recommendation context in the background on PREFETCH_MAX_CONCURRENCY threads (at
+    # most PREFETCH_MAX_IN_FLIGHT queued or running), and the next recommendation for
+    # the parcel within PREFETCH_TTL_SECONDS reuses it. At most PREFETCH_MAX_ENTRIES
+    # contexts are kept per worker.
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_MAX_CONCURRENCY: int = 8
+    PREFETCH_MAX_IN_FLIGHT: int = 32
+    PREFETCH_TTL_SECONDS: float = 30.0
+    PREFETCH_MAX_ENTRIES: int = 1_000
+
+    # On-demand profiling of recommendation requests. A request carrying the header
+    # "X-Profile-Token: <PROFILING_ADMIN_TOKEN>", and a PROFILING_SAMPLE_RATE fraction of
+    # all requests, records per-stage timings and process-wide memory block deltas
+    # plus a sampling CPU profile (one sample every PROFILING_SAMPLE_INTERVAL_MS).
+    # Profiles are kept for PROFILING_RETENTION_SECONDS and downloaded from
+    # /server/profiles with the same header; without a token, profiling is off.
+    PROFILING_ADMIN_TOKEN: SecretStr | None = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILING_RETENTION_SECONDS: int = 24 * 60 * 60
+    PROFILING_MAX_STACKS: int = 500
+
+    # Push subscriptions (WebSocket and Server-Sent Events) to the new recommendations,
+    # sensor alerts and context changes of parcels. A connection follows at most
+    # SUBSCRIPTION_MAX_PARCELS parcels and keeps at most SUBSCRIPTION_QUEUE_SIZE unsent
+    # events (the oldest are dropped); SSE streams send a comment every
+    # SUBSCRIPTION_HEARTBEAT_SECONDS so proxies keep idle connections open.
+    SUBSCRIPTIONS_ENABLED: bool = True
+    SUBSCRIPTION_MAX_CONNECTIONS: int = 10_000
+    SUBSCRIPTION_MAX_PARCELS: int = 1_000
+    SUBSCRIPTION_QUEUE_SIZE: int = 32
+    SUBSCRIPTION_HEARTBEAT_SECONDS: float = 25.0
+
+    # PROMPT_LAYOUT "classic" interleaves parcel context and volatile data; with
+    # "prefix_stable" prompts start with the fixed instructions and the parcel context
+    # that changes rarely, then volatile data, the answer format and the question, so a
+    # prefix-caching inference server reuses the KV state of the shared prefix. The
+    # prefix hash is sent in X-Prompt-Prefix-Hash and returned in prompt_prefix_hash.
+    PROMPT_LAYOUT: str = "classic"
+
+    # Rendered prompt fragments of static and slowly changing context (project details,
+    # best practices, parcel history and the weather forecast of a grid cell), keyed by
+    # content and template version.
+    PROMPT_FRAGMENT_CACHE_ENABLED: bool = True
+    PROMPT_FRAGMENT_CACHE_SIZE: int = 10_000
+
+    # Opt-in capture of recommendation traffic for capacity planning: a
+    # TRAFFIC_CAPTURE_SAMPLE_RATE share of requests is appended, sanitized, with its
+    # arrival time and resolved context to one JSONL file per worker and day in
+    # TRAFFIC_CAPTURE_DIR (defaults to CACHE_DIR/traffic). Replay the files with
+    # app.cli.replay_traffic. Records beyond the queue size are dropped.
+    TRAFFIC_CAPTURE_ENABLED: bool = False
+    TRAFFIC_CAPTURE_DIR: str | None = None
+    TRAFFIC_CAPTURE_SAMPLE_RATE: float = 1.0
+    TRAFFIC_CAPTURE_QUEUE_SIZE: int = 10_000
+
+    # Append-only history of generated recommendations: a SQLite database in WAL mode
+    # (defaults to CACHE_DIR/recommendation_history.sqlite3) with compressed bodies,
+    # written by a background thread in batches. Rows beyond the queue size are dropped.
+    RECOMMENDATION_HISTORY_ENABLED: bool = True
+    RECOMMENDATION_HISTORY_PATH: str | None = None
+    RECOMMENDATION_HISTORY_QUEUE_SIZE: int = 10_000
+    RECOMMENDATION_HISTORY_BATCH_SIZE: int = 500
+
+    # Reuse of stored recommendations. A recommendation is reused for the same parcel,
+    # model and question until it is older than RECOMMENDATION_MAX_AGE_SECONDS or a
+    # context signal moves outside its tolerance band (moisture and coverage in
+    # percentage points, rain probability as a fraction) or the satellite status changes.
+    # Workers re-read stored recommendations from the shared cache tier after
+    # PRECOMPUTED_MEMORY_TTL_SECONDS, so they see the refreshes of other workers.
+    RECOMMENDATION_REUSE_ENABLED: bool = True
+    RECOMMENDATION_MAX_AGE_SECONDS: int = 24 * 60 * 60
+    PRECOMPUTED_MEMORY_TTL_SECONDS: float = 5.0
+    MATERIALITY_SOIL_MOISTURE_TOLERANCE: float = 3.0
+    MATERIALITY_RAIN_PROBABILITY_TOLERANCE: float = 0.10
+    MATERIALITY_SATELLITE_COVERAGE_TOLERANCE: float = 10.0
+
 
 config = Config()
@@ -0,0 +1,120 @@
+import math
+from typing import Tuple
+
+
+class StreamState:
+    """
+    The running statistics of one signal stream: a few floats, whatever its length.
+
+    Attributes:
+        count (int): The number of values seen.
+        level (float): The smoothed level of the values (an EWMA).
+        trend (float): The smoothed change of the level per value.
+        variance (float): The exponentially weighted moving variance of the residuals.
+        cusum_high (float): The upward CUSUM statistic, in standard deviations.
+        cusum_low (float): The downward CUSUM statistic, in standard deviations.
+    """
+
+    __slots__ = ("count", "level", "trend", "variance", "cusum_high", "cusum_low")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.level: float = 0.0
+        self.trend: float = 0.0
+        self.variance: float = 0.0
+        self.cusum_high: float = 0.0
+        self.cusum_low: float = 0.0
+
+
+class StreamingDetector:
+    """
+    Online detection of spikes and level shifts, in O(1) time and memory per value.
+
+    Each value is compared with the forecast of the values before it, an EWMA level
+    plus an EWMA trend (Holt's linear smoothing), in units of the EWMA standard
+    deviation of the forecast residuals. That z-score flags spikes, and a two-sided
+    CUSUM of the z-scores flags sustained shifts that are too small to be spikes.
+    Following the trend keeps the slow daily and weekly cycles of sensor signals from
+    accumulating in the CUSUM as false shifts. The z-score fed to the CUSUM and to the
+    updates is clipped at `z_threshold`, so a single outlier can neither trigger a
+    shift on its own nor inflate the variance and mask the next outliers. Nothing is
+    flagged until `warmup` values have been seen.
+
+    Attributes:
+        alpha (float): The weight of the newest residual in the level and variance.
+        beta (float): The weight of the newest residual in the trend, relative to alpha.
+        warmup (int): The number of values needed before flagging anything.
+        z_threshold (float): The |z-score| from which a value is a spike.
+        cusum_drift (float): The allowance subtracted from every z-score in the CUSUM.
+        cusum_threshold (float): The CUSUM value from which the level has shifted.
+    """
+
+    def __init__(
+        self,
+        alpha: float,
+        beta: float,
+        warmup: int,
+        z_threshold: float,
+        cusum_drift: float,
+        cusum_threshold: float,
+    ) -> None:
+        self.alpha: float = alpha
+        self.beta: float = beta
+        self.warmup: int = warmup
+        self.z_threshold: float = z_threshold
+        self.cusum_drift: float = cusum_drift
+        self.cusum_threshold: float = cusum_threshold
+
+    def forecast(self, state: StreamState) -> float:
+        return state.level + state.trend
+
+    def update(
+        self, state: StreamState, value: float, min_std: float
+    ) -> Tuple[float | None, int]:
+        """
+        Fold a value into a stream and check it against the values before it.
+
+        Args:
+            state (StreamState): The statistics of the stream, updated in place.
+            value (float): The new value.
+            min_std (float): The smallest standard deviation assumed (sensor noise).
+
+        Returns:
+            Tuple[float | None, int]: The z-score of the value (None during warm-up)
+                and the detected shift: 1 upwards, -1 downwards, 0 none.
+        """
+
+        if state.count == 0:
+            state.count = 1
+            state.level = value
+            return None, 0
+
+        forecast: float = self.forecast(state)
+        std: float = max(math.sqrt(state.variance), min_std)
+        z_score: float = (value - forecast) / std
+        clipped: float = max(-self.z_threshold, min(self.z_threshold, z_score))
+        warmed_up: bool = state.count >= self.warmup
+        shift: int = 0
+
+        if warmed_up:
+            state.cusum_high = max(0.0, state.cusum_high + clipped - self.cusum_drift)
+            state.cusum_low = max(0.0, state.cusum_low - clipped - self.cusum_drift)
+
+            if state.cusum_high > self.cusum_threshold:
+                shift = 1
+            elif state.cusum_low > self.cusum_threshold:
+                shift = -1
+
+            if shift:
+                state.cusum_high = state.cusum_low = 0.0
+
+        # Error-correction form of Holt's smoothing, and the EWMA of squared residuals.
+        residual: float = clipped * std
+        state.level = forecast + self.alpha * residual
+        state.trend += self.alpha * self.beta * residual
+        state.variance = (1 - self.alpha) * (
+            state.variance + self.alpha * residual * residual
+        )
+        state.count += 1
+
+        return (z_score if warmed_up else None), shift
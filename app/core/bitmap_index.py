@@ -0,0 +1,210 @@
+import threading
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+_WORD_BITS: int = 64
+
+
+def bitmap_count(words: np.ndarray) -> int:
+    """
+    Count the positions set in a bitmap.
+
+    Args:
+        words (np.ndarray): The uint64 words of the bitmap.
+
+    Returns:
+        int: The number of set positions.
+    """
+
+    return int(np.bitwise_count(words).sum())
+
+
+def bitmap_page(words: np.ndarray, start: int, limit: int) -> Tuple[np.ndarray, bool]:
+    """
+    Return the first set positions of a bitmap at or after a start position.
+
+    Only the words holding the page are unpacked, so the cost depends on the page size
+    and the density of the bitmap rather than on its length.
+
+    Args:
+        words (np.ndarray): The uint64 words of the bitmap.
+        start (int): The first position to consider.
+        limit (int): The maximum number of positions to return.
+
+    Returns:
+        Tuple[np.ndarray, bool]: The positions in ascending order and whether more set
+            positions follow them.
+    """
+
+    first_word: int = start // _WORD_BITS
+
+    if limit <= 0 or first_word >= len(words):
+        return np.empty(0, dtype=np.int64), False
+
+    tail: np.ndarray = words[first_word:].copy()
+    tail[0] &= ~np.uint64((1 << (start % _WORD_BITS)) - 1)
+
+    cumulative: np.ndarray = np.cumsum(np.bitwise_count(tail))
+    if len(cumulative) == 0 or cumulative[-1] == 0:
+        return np.empty(0, dtype=np.int64), False
+
+    last_word: int = min(
+        int(np.searchsorted(cumulative, limit)), len(cumulative) - 1
+    )
+    bits: np.ndarray = np.unpackbits(
+        tail[: last_word + 1].view(np.uint8), bitorder="little"
+    )
+    positions: np.ndarray = np.flatnonzero(bits)[:limit] + first_word * _WORD_BITS
+
+    return positions, bool(cumulative[-1] > limit)
+
+
+class BitmapIndex:
+    """
+    A secondary index mapping keys to bitmaps of catalogue positions.
+
+    Every key (e.g. ("crop_type", "cotton")) owns a uint64 bitmap with one bit per
+    position; filters combine bitmaps with word-wise AND/OR, so a query costs a few
+    vectorized passes over N / 64 words whatever the number of matching entries. All
+    bitmaps share the same capacity, which doubles when a position beyond it is added.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.RLock = threading.RLock()
+        self._words: int = 1
+        self._size: int = 0
+        self._bitmaps: Dict[Hashable, np.ndarray] = {}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int) -> None:
+        words: int = (size + _WORD_BITS - 1) // _WORD_BITS
+
+        if words <= self._words:
+            return
+
+        capacity: int = max(words, self._words * 2)
+
+        for key, bitmap in self._bitmaps.items():
+            grown: np.ndarray = np.zeros(capacity, dtype=np.uint64)
+            grown[: len(bitmap)] = bitmap
+            self._bitmaps[key] = grown
+
+        self._words = capacity
+
+    def add(self, key: Hashable, positions: Iterable[int]) -> None:
+        """
+        Set positions in the bitmap of a key, creating the bitmap when needed.
+
+        Args:
+            key (Hashable): The indexed key.
+            positions (Iterable[int]): The positions holding the key.
+        """
+
+        array: np.ndarray = np.fromiter(positions, dtype=np.int64)
+        if len(array) == 0:
+            return
+
+        with self._lock:
+            self._size = max(self._size, int(array.max()) + 1)
+            self._reserve(self._size)
+
+            bitmap: np.ndarray | None = self._bitmaps.get(key)
+            if bitmap is None:
+                bitmap = np.zeros(self._words, dtype=np.uint64)
+                self._bitmaps[key] = bitmap
+
+            np.bitwise_or.at(
+                bitmap,
+                array // _WORD_BITS,
+                np.left_shift(np.uint64(1), (array % _WORD_BITS).astype(np.uint64)),
+            )
+
+    def discard(self, key: Hashable, position: int) -> None:
+        with self._lock:
+            bitmap: np.ndarray | None = self._bitmaps.get(key)
+
+            if bitmap is not None and position // _WORD_BITS < len(bitmap):
+                bitmap[position // _WORD_BITS] &= ~np.uint64(
+                    1 << (position % _WORD_BITS)
+                )
+
+    def all(self) -> np.ndarray:
+        """
+        Return a bitmap with every position below the index size set.
+
+        Returns:
+            np.ndarray: The bitmap of every indexed position.
+        """
+
+        with self._lock:
+            words: np.ndarray = np.zeros(self._words, dtype=np.uint64)
+            full_words: int = self._size // _WORD_BITS
+
+            words[:full_words] = np.uint64(0xFFFFFFFFFFFFFFFF)
+            if self._size % _WORD_BITS:
+                words[full_words] = np.uint64((1 << (self._size % _WORD_BITS)) - 1)
+
+            return words
+
+    def intersect(self, words: np.ndarray, keys: List[Hashable]) -> np.ndarray:
+        """
+        Keep only the positions of a bitmap that hold every key.
+
+        Args:
+            words (np.ndarray): The bitmap to filter, modified in place.
+            keys (List[Hashable]): The required keys.
+
+        Returns:
+            np.ndarray: The filtered bitmap.
+        """
+
+        with self._lock:
+            for key in keys:
+                bitmap: np.ndarray | None = self._bitmaps.get(key)
+
+                if bitmap is None:
+                    words[:] = 0
+                    break
+
+                np.bitwise_and(words, bitmap[: len(words)], out=words)
+
+        return words
+
+    def union(self, keys: Iterable[Hashable]) -> np.ndarray:
+        """
+        Return the positions holding at least one of the keys.
+
+        Args:
+            keys (Iterable[Hashable]): The accepted keys; missing keys are ignored.
+
+        Returns:
+            np.ndarray: The bitmap of the union.
+        """
+
+        with self._lock:
+            words: np.ndarray = np.zeros(self._words, dtype=np.uint64)
+
+            for key in keys:
+                bitmap: np.ndarray | None = self._bitmaps.get(key)
+
+                if bitmap is not None:
+                    np.bitwise_or(words, bitmap, out=words)
+
+            return words
+
+    def count(self, words: np.ndarray, key: Hashable) -> int:
+        with self._lock:
+            bitmap: np.ndarray | None = self._bitmaps.get(key)
+
+            if bitmap is None:
+                return 0
+
+            return bitmap_count(words & bitmap[: len(words)])
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._bitmaps)
@@ -0,0 +1,491 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from app.config.conf import config
+from app.core.metrics import metrics
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded, in-process least-recently-used cache.
+
+    Entries may carry an expiration time. Expired entries are dropped lazily when they
+    are read and the least recently used entry is evicted when the cache is full.
+
+    Attributes:
+        max_entries (int): The maximum number of entries kept in memory.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries: int = max_entries
+        self._lock: threading.Lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[Any, float | None]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Retrieve a value from the cache.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Any | None: The cached value, or None if the key is missing or expired.
+        """
+
+        with self._lock:
+            entry: Tuple[Any, float | None] | None = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires_at: float | None = None) -> None:
+        """
+        Store a value in the cache, evicting the least recently used entry if needed.
+
+        Args:
+            key (str): The key of the entry.
+            value (Any): The value to store.
+            expires_at (float | None): The epoch time when the entry expires, or None
+                if it never expires.
+        """
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry from the cache if present.
+
+        Args:
+            key (str): The key of the entry.
+        """
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedDiskCache:
+    """
+    A cross-process cache stored in a SQLite database on the local disk.
+
+    Every uvicorn worker on the host opens the same database file, so an entry written
+    by one worker is visible to the rest. Each write is a single SQLite transaction,
+    which makes it atomic for concurrent readers and writers, and the total size of the
+    stored values is kept below `max_bytes` by evicting the least recently used rows.
+
+    Attributes:
+        path (str): The path of the SQLite database file.
+        max_bytes (int): The maximum total size in bytes of the stored values.
+    """
+
+    _TOUCH_INTERVAL_SECONDS: float = 30.0
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path: str = path
+        self.max_bytes: int = max_bytes
+        self._local: threading.local = threading.local()
+
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+                CREATE TABLE IF NOT EXISTS usage (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    total_bytes INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO usage (id, total_bytes) VALUES (0, 0);
+                CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+                BEGIN
+                    UPDATE usage SET total_bytes = total_bytes + NEW.size WHERE id = 0;
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+                BEGIN
+                    UPDATE usage SET total_bytes = total_bytes - OLD.size WHERE id = 0;
+                END;
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return the SQLite connection of the current thread, opening it when needed.
+
+        Connections are never shared across threads or forked processes.
+
+        Returns:
+            sqlite3.Connection: A connection configured for concurrent access (WAL).
+        """
+
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    def get(self, key: str) -> Tuple[Any, float | None] | None:
+        """
+        Retrieve a value and its expiration time from the shared store.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Tuple[Any, float | None] | None: The unpickled value and its expiration
+                time, or None if the key is missing or expired.
+        """
+
+        connection: sqlite3.Connection = self._connection()
+        now: float = time.time()
+
+        row: Tuple[bytes, float | None, float] | None = connection.execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        value, expires_at, accessed_at = row
+
+        if expires_at is not None and expires_at <= now:
+            with connection:
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+
+        # Refreshing the access time is a write, so it is throttled to keep reads cheap.
+        if now - accessed_at > self._TOUCH_INTERVAL_SECONDS:
+            with connection:
+                connection.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+
+        return pickle.loads(value), expires_at
+
+    def set(self, key: str, value: Any, expires_at: float | None = None) -> None:
+        """
+        Atomically store a value in the shared store and enforce the size bound.
+
+        Args:
+            key (str): The key of the entry.
+            value (Any): A picklable value to store.
+            expires_at (float | None): The epoch time when the entry expires, or None
+                if it never expires.
+        """
+
+        payload: bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if len(payload) > self.max_bytes:
+            return
+
+        connection: sqlite3.Connection = self._connection()
+
+        with connection:
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute(
+                "INSERT INTO entries (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), expires_at, time.time()),
+            )
+            self._evict(connection)
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry from the shared store if present.
+
+        Args:
+            key (str): The key of the entry.
+        """
+
+        connection: sqlite3.Connection = self._connection()
+
+        with connection:
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def total_bytes(self) -> int:
+        """
+        Return the total size in bytes of the values currently stored.
+
+        Returns:
+            int: The total size of the stored values.
+        """
+
+        return self._connection().execute(
+            "SELECT total_bytes FROM usage WHERE id = 0"
+        ).fetchone()[0]
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Delete expired rows and then least recently used rows until the store fits.
+
+        Runs inside the caller's transaction, so eviction is atomic with the write.
+
+        Args:
+            connection (sqlite3.Connection): The connection holding the transaction.
+        """
+
+        total_bytes: int = connection.execute(
+            "SELECT total_bytes FROM usage WHERE id = 0"
+        ).fetchone()[0]
+
+        if total_bytes <= self.max_bytes:
+            return
+
+        connection.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+
+        while total_bytes > self.max_bytes:
+            deleted: int = connection.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at LIMIT 64)"
+            ).rowcount
+
+            total_bytes = connection.execute(
+                "SELECT total_bytes FROM usage WHERE id = 0"
+            ).fetchone()[0]
+
+            if deleted == 0:
+                break
+
+            metrics.increment("cache.disk.evictions", deleted)
+
+
+class TieredCache:
+    """
+    A namespaced cache with an in-process LRU tier backed by an optional shared tier.
+
+    Reads check the local LRU first, then the shared disk store; a shared hit is
+    promoted into the local tier. Writes go to both tiers. Hits and misses are reported
+    per namespace and tier through the metrics registry.
+
+    Entries rewritten by other processes are only seen once the local copy expires, so
+    namespaces whose entries are replaced in place cap their life in the local tier
+    with `memory_ttl_seconds`.
+
+    Attributes:
+        namespace (str): The prefix applied to every key of this cache.
+        ttl_seconds (float | None): The default time to live of the entries.
+        memory_ttl_seconds (float | None): The maximum time an entry is served from the
+            local tier before the shared tier is read again, None for no limit.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        memory: LRUCache,
+        shared: SharedDiskCache | None,
+        ttl_seconds: float | None = None,
+        memory_ttl_seconds: float | None = None,
+    ) -> None:
+        self.namespace: str = namespace
+        self.ttl_seconds: float | None = ttl_seconds
+        self.memory_ttl_seconds: float | None = memory_ttl_seconds
+        self._memory: LRUCache = memory
+        self._shared: SharedDiskCache | None = shared
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _memory_expiry(self, expires_at: float | None) -> float | None:
+        if self.memory_ttl_seconds is None or self._shared is None:
+            return expires_at
+
+        local_expiry: float = time.time() + self.memory_ttl_seconds
+
+        return local_expiry if expires_at is None else min(expires_at, local_expiry)
+
+    def get(self, key: str) -> Any | None:
+        """
+        Retrieve a value from the closest tier that holds it.
+
+        Args:
+            key (str): The key of the entry within the namespace.
+
+        Returns:
+            Any | None: The cached value, or None if no tier holds a live entry.
+        """
+
+        full_key: str = self._key(key)
+
+        value: Any | None = self._memory.get(full_key)
+        if value is not None:
+            metrics.increment(f"cache.{self.namespace}.memory_hits")
+            return value
+
+        if self._shared is not None:
+            try:
+                entry: Tuple[Any, float | None] | None = self._shared.get(full_key)
+            except sqlite3.Error:
+                metrics.increment(f"cache.{self.namespace}.shared_errors")
+                entry = None
+
+            if entry is not None:
+                value, expires_at = entry
+                self._memory.set(full_key, value, self._memory_expiry(expires_at))
+                metrics.increment(f"cache.{self.namespace}.shared_hits")
+                return value
+
+        metrics.increment(f"cache.{self.namespace}.misses")
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        """
+        Store a value in every tier.
+
+        Args:
+            key (str): The key of the entry within the namespace.
+            value (Any): The value to store. It must be picklable for the shared tier.
+            ttl_seconds (float | None): The time to live of the entry. Defaults to the
+                cache's own `ttl_seconds`.
+        """
+
+        ttl: float | None = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at: float | None = time.time() + ttl if ttl is not None else None
+        full_key: str = self._key(key)
+
+        self._memory.set(full_key, value, self._memory_expiry(expires_at))
+
+        if self._shared is not None:
+            try:
+                self._shared.set(full_key, value, expires_at)
+            except sqlite3.Error:
+                metrics.increment(f"cache.{self.namespace}.shared_errors")
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry from every tier.
+
+        Args:
+            key (str): The key of the entry within the namespace.
+        """
+
+        full_key: str = self._key(key)
+        self._memory.delete(full_key)
+
+        if self._shared is not None:
+            try:
+                self._shared.delete(full_key)
+            except sqlite3.Error:
+                metrics.increment(f"cache.{self.namespace}.shared_errors")
+
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any | None],
+        ttl_seconds: float | None = None,
+    ) -> Any | None:
+        """
+        Return the cached value for a key, computing and storing it on a miss.
+
+        A loader returning None is not cached, so transient unavailability of an
+        upstream service is retried on the next call.
+
+        Args:
+            key (str): The key of the entry within the namespace.
+            loader (Callable[[], Any | None]): The function that produces the value.
+            ttl_seconds (float | None): The time to live of the entry.
+
+        Returns:
+            Any | None: The cached or freshly loaded value.
+        """
+
+        value: Any | None = self.get(key)
+        if value is not None:
+            return value
+
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl_seconds)
+
+        return value
+
+
+_memory_tier: LRUCache = LRUCache(max_entries=config.CACHE_MEMORY_ENTRIES)
+_shared_tier: SharedDiskCache | None = None
+_caches: Dict[str, TieredCache] = {}
+_caches_lock: threading.Lock = threading.Lock()
+
+
+def get_cache(
+    namespace: str,
+    ttl_seconds: float | None = None,
+    memory_ttl_seconds: float | None = None,
+    local_only: bool = False,
+) -> TieredCache:
+    """
+    Return the process-wide cache for a namespace, creating it on first use.
+
+    Every namespace shares the same in-process LRU tier and, when `CACHE_BACKEND` is
+    "tiered", the same on-disk store under `CACHE_DIR`.
+
+    Args:
+        namespace (str): The namespace of the cache (e.g. "weather").
+        ttl_seconds (float | None): The default time to live of its entries.
+        memory_ttl_seconds (float | None): The maximum life of its entries in the
+            in-process tier (see `TieredCache`).
+        local_only (bool): Whether the namespace skips the shared tier, for entries
+            cheap to rebuild that other processes would not reuse.
+
+    Returns:
+        TieredCache: The cache for the namespace.
+    """
+
+    global _shared_tier
+
+    with _caches_lock:
+        cache: TieredCache | None = _caches.get(namespace)
+
+        if cache is None:
+            if config.CACHE_BACKEND == "tiered" and _shared_tier is None:
+                _shared_tier = SharedDiskCache(
+                    path=os.path.join(config.CACHE_DIR, "shared_cache.sqlite3"),
+                    max_bytes=config.CACHE_MAX_BYTES,
+                )
+
+            cache = TieredCache(
+                namespace=namespace,
+                memory=_memory_tier,
+                shared=None if local_only else _shared_tier,
+                ttl_seconds=ttl_seconds,
+                memory_ttl_seconds=memory_ttl_seconds,
+            )
+            _caches[namespace] = cache
+
+        return cache
@@ -0,0 +1,231 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Set, Tuple
+
+from app.core.metrics import metrics
+
+# (event type, JSON-encoded event), shared by every subscription it is delivered to.
+Message = Tuple[str, str]
+
+
+class BusFull(Exception):
+    """
+    Raised when a subscription is opened while the bus has its maximum of subscriptions.
+    """
+
+
+class Subscription:
+    """
+    The keys a client follows and the messages waiting to be sent to it.
+
+    A subscription is a handful of objects whatever the number of messages published:
+    a bounded deque that drops the oldest message when the client falls behind, and an
+    event that wakes the single task sending to the client.
+
+    Attributes:
+        keys (Set[str]): The keys (parcel IDs) the subscription follows.
+        dropped (int): The number of messages dropped because the client was too slow.
+    """
+
+    __slots__ = ("keys", "dropped", "_pending", "_ready")
+
+    def __init__(self, queue_size: int) -> None:
+        self.keys: Set[str] = set()
+        self.dropped: int = 0
+        self._pending: Deque[Message] = deque(maxlen=queue_size)
+        self._ready: asyncio.Event = asyncio.Event()
+
+    def deliver(self, message: Message) -> bool:
+        """
+        Queue a message for the client. Must be called on the event loop.
+
+        Args:
+            message (Message): The event type and the encoded event.
+
+        Returns:
+            bool: True if the oldest pending message was dropped to make room.
+        """
+
+        dropped: bool = len(self._pending) == self._pending.maxlen
+
+        if dropped:
+            self.dropped += 1
+
+        self._pending.append(message)
+        self._ready.set()
+
+        return dropped
+
+    async def next(self, timeout: float | None = None) -> List[Message]:
+        """
+        Wait for the messages published since the last call.
+
+        Args:
+            timeout (float | None): Seconds to wait before returning nothing (e.g. to
+                send a heartbeat); None waits forever.
+
+        Returns:
+            List[Message]: The pending messages, oldest first, empty on timeout.
+        """
+
+        if not self._pending:
+            # asyncio.timeout, unlike wait_for, waits without an extra task.
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._ready.wait()
+            except TimeoutError:
+                return []
+
+        messages: List[Message] = list(self._pending)
+        self._pending.clear()
+        self._ready.clear()
+
+        return messages
+
+
+class EventBus:
+    """
+    In-process publish/subscribe by key, from any thread to the clients of one event loop.
+
+    Subscriptions live on the event loop serving the connections and are indexed by
+    key, so a publication only touches the subscriptions following its key. Publishers
+    (request handlers, the LLM executor, background threads) encode each event once on
+    their own thread and hand it to the loop with `call_soon_threadsafe`; the loop then
+    appends the same encoded message to every matching subscription. Publishing to a
+    key nobody follows costs a dictionary lookup.
+
+    The bus is local to the worker process: clients only receive the events produced by
+    the worker they are connected to.
+
+    Attributes:
+        name (str): The name used to report the bus in the metrics.
+        queue_size (int): The messages kept per subscription before dropping the oldest.
+        max_subscriptions (int): The maximum number of open subscriptions.
+    """
+
+    def __init__(self, name: str, queue_size: int, max_subscriptions: int) -> None:
+        self.name: str = name
+        self.queue_size: int = queue_size
+        self.max_subscriptions: int = max_subscriptions
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscriptions: Set[Subscription] = set()
+        self._by_key: Dict[str, Set[Subscription]] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def open(self) -> Subscription:
+        """
+        Open a subscription following no key. Must be called on the event loop.
+
+        Returns:
+            Subscription: The new subscription.
+
+        Raises:
+            BusFull: If `max_subscriptions` subscriptions are already open.
+        """
+
+        if len(self._subscriptions) >= self.max_subscriptions:
+            metrics.increment(f"event_bus.{self.name}.rejected")
+            raise BusFull(
+                f"Too many open subscriptions (maximum {self.max_subscriptions})"
+            )
+
+        self._loop = asyncio.get_running_loop()
+        subscription: Subscription = Subscription(self.queue_size)
+        self._subscriptions.add(subscription)
+        metrics.adjust_gauge(f"event_bus.{self.name}.subscriptions", 1)
+
+        return subscription
+
+    def close(self, subscription: Subscription) -> None:
+        """
+        Close a subscription and stop following its keys. Must be called on the loop.
+
+        Args:
+            subscription (Subscription): The subscription to close.
+        """
+
+        if subscription not in self._subscriptions:
+            return
+
+        self.unfollow(subscription, list(subscription.keys))
+        self._subscriptions.discard(subscription)
+        metrics.adjust_gauge(f"event_bus.{self.name}.subscriptions", -1)
+
+    def follow(self, subscription: Subscription, keys: Iterable[str]) -> None:
+        """
+        Add keys to a subscription. Must be called on the event loop.
+
+        Args:
+            subscription (Subscription): The subscription.
+            keys (Iterable[str]): The keys to follow.
+        """
+
+        for key in keys:
+            subscription.keys.add(key)
+            self._by_key.setdefault(key, set()).add(subscription)
+
+    def unfollow(self, subscription: Subscription, keys: Iterable[str]) -> None:
+        """
+        Remove keys from a subscription. Must be called on the event loop.
+
+        Args:
+            subscription (Subscription): The subscription.
+            keys (Iterable[str]): The keys to stop following.
+        """
+
+        for key in keys:
+            subscription.keys.discard(key)
+            followers: Set[Subscription] | None = self._by_key.get(key)
+
+            if followers is not None:
+                followers.discard(subscription)
+                if not followers:
+                    del self._by_key[key]
+
+    def has_followers(self, key: str) -> bool:
+        """
+        Check whether any subscription follows a key. Safe to call from any thread.
+
+        Publishers use it to skip building events nobody would receive.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            bool: True if at least one subscription follows the key.
+        """
+
+        return key in self._by_key
+
+    def publish(self, key: str, event_type: str, encoded: str) -> None:
+        """
+        Deliver an encoded event to the subscriptions following a key, from any thread.
+
+        Args:
+            key (str): The key of the event.
+            event_type (str): The type of the event (the SSE event name).
+            encoded (str): The event, encoded once for every subscription.
+        """
+
+        loop: asyncio.AbstractEventLoop | None = self._loop
+
+        if loop is None or key not in self._by_key:
+            return
+
+        metrics.increment(f"event_bus.{self.name}.published")
+
+        try:
+            loop.call_soon_threadsafe(self._fan_out, key, (event_type, encoded))
+        except RuntimeError:
+            # The loop was closed (shutdown); nobody is listening anymore.
+            pass
+
+    def _fan_out(self, key: str, message: Message) -> None:
+        followers: Set[Subscription] = self._by_key.get(key, set())
+        dropped: int = sum(subscription.deliver(message) for subscription in followers)
+
+        metrics.increment(f"event_bus.{self.name}.delivered", len(followers))
+        if dropped:
+            metrics.increment(f"event_bus.{self.name}.dropped", dropped)
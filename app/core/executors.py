@@ -0,0 +1,61 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config.conf import config
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+LLM_QUEUED_GAUGE: str = "llm_executor.queued"
+
+llm_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=config.LLM_MAX_CONCURRENCY, thread_name_prefix="llm"
+)
+
+
+async def run_in_llm_executor(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function that calls the LLM on the dedicated LLM executor.
+
+    LLM calls last seconds, so they are kept off Starlette's shared threadpool: a burst
+    of recommendation requests then waits for one of the `LLM_MAX_CONCURRENCY` LLM
+    threads instead of exhausting the threads that sync endpoints depend on. The
+    number of calls waiting for a thread is tracked in the `llm_executor.queued` gauge.
+    Like `run_in_threadpool`, the function runs in a copy of the caller's context, so
+    context variables (e.g. the request profiler) follow the call.
+
+    Args:
+        function (Callable[..., T]): The blocking function.
+        *args (Any): Positional arguments of the function.
+        **kwargs (Any): Keyword arguments of the function.
+
+    Returns:
+        T: The result of the function.
+    """
+
+    metrics.adjust_gauge(LLM_QUEUED_GAUGE, 1)
+    lock: threading.Lock = threading.Lock()
+    queued: bool = True
+    context: contextvars.Context = contextvars.copy_context()
+
+    def dequeue() -> None:
+        nonlocal queued
+
+        with lock:
+            if queued:
+                queued = False
+                metrics.adjust_gauge(LLM_QUEUED_GAUGE, -1)
+
+    def run() -> T:
+        dequeue()
+        return context.run(function, *args, **kwargs)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(llm_executor, run)
+
+    finally:
+        # Covers calls cancelled before a thread picked them up.
+        dequeue()
@@ -0,0 +1,273 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.models.scheduling import ClientContext, QueueTicket, RequestPriority
+
+SCHEDULER_QUEUED_GAUGE: str = "fair_scheduler.queued"
+
+_PRIORITY_RANK: Dict[RequestPriority, int] = {
+    RequestPriority.INTERACTIVE: 0,
+    RequestPriority.BATCH: 1,
+}
+# Buckets of idle clients are dropped beyond this many clients.
+_MAX_TRACKED_CLIENTS: int = 10_000
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a client has no token left in its bucket.
+
+    Attributes:
+        client_id (str): The rate-limited client.
+        retry_after_seconds (float): When the next token becomes available.
+    """
+
+    def __init__(self, client_id: str, retry_after_seconds: float) -> None:
+        super().__init__(
+            f"Rate limit exceeded for client {client_id}; "
+            f"retry in {retry_after_seconds:.1f} s"
+        )
+        self.client_id: str = client_id
+        self.retry_after_seconds: float = retry_after_seconds
+
+
+class TokenBucket:
+    """
+    A token bucket allowing bursts of `burst` requests and `rate` requests per second.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self._tokens: float = float(burst)
+        self._updated_at: float = time.monotonic()
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.burst
+
+    def try_take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+        """
+
+        self._refill()
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self.rate if self.rate > 0 else math.inf
+
+
+class _Waiter:
+    def __init__(self, client: ClientContext, future: asyncio.Future) -> None:
+        self.client: ClientContext = client
+        self.future: asyncio.Future = future
+
+
+class FairShareScheduler:
+    """
+    Shares a fixed number of LLM slots between clients.
+
+    Every rate-limited client first goes through its token bucket, so a scripted client
+    cannot exceed its sustained rate. When every slot is busy, requests wait in a start-time
+    fair queue: each client's requests get virtual start tags spaced by 1 / weight, and
+    the waiting request with the smallest tag is served next, so backlogged clients
+    share the slots in proportion to their weights however many requests each one
+    queues. Interactive requests are always served before batch ones.
+
+    The scheduler is bound to the event loop of the worker; slots are held across the
+    LLM call, which runs on the LLM executor.
+
+    Attributes:
+        capacity (int): The number of requests served at once.
+        rate (float): The sustained requests per second allowed per client.
+        burst (int): The burst allowed per client.
+    """
+
+    def __init__(self, capacity: int, rate: float, burst: int) -> None:
+        self.capacity: int = capacity
+        self.rate: float = rate
+        self.burst: int = burst
+        self._available: int = capacity
+        self._virtual_time: float = 0.0
+        self._last_start: Dict[str, float] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiting: List[Tuple[int, float, int, _Waiter]] = []
+        self._sequence: itertools.count = itertools.count()
+        self._service_ms: float = 1000.0
+
+    def waiting(self) -> int:
+        return sum(1 for *_, waiter in self._waiting if not waiter.future.done())
+
+    def _take_token(self, client_id: str) -> None:
+        bucket: TokenBucket | None = self._buckets.get(client_id)
+
+        if bucket is None:
+            if len(self._buckets) >= _MAX_TRACKED_CLIENTS:
+                for idle in [key for key, b in self._buckets.items() if b.is_full()]:
+                    del self._buckets[idle]
+                    self._last_start.pop(idle, None)
+
+            bucket = TokenBucket(rate=self.rate, burst=self.burst)
+            self._buckets[client_id] = bucket
+
+        retry_after: float = bucket.try_take()
+
+        if retry_after > 0:
+            metrics.increment("fair_scheduler.rate_limited")
+            raise RateLimitExceeded(client_id, retry_after)
+
+    def charge(self, client: ClientContext) -> None:
+        """
+        Take a token for a request that shares another request's slot.
+
+        A request coalesced with an identical one in flight never asks for a slot, but
+        still counts towards its own client's rate limit.
+
+        Args:
+            client (ClientContext): The client of the request.
+
+        Raises:
+            RateLimitExceeded: If the client has exhausted its token bucket.
+        """
+
+        if client.rate_limited:
+            self._take_token(client.client_id)
+
+    def _start_tag(self, client: ClientContext) -> float:
+        start: float = max(
+            self._virtual_time, self._last_start.get(client.client_id, -math.inf)
+        )
+        self._last_start[client.client_id] = start + 1 / max(client.weight, 1e-6)
+
+        return start
+
+    def _grant_next(self) -> None:
+        while self._waiting:
+            _, start, _, waiter = heapq.heappop(self._waiting)
+
+            if waiter.future.done():
+                continue
+
+            self._virtual_time = max(self._virtual_time, start)
+            waiter.future.set_result(None)
+            metrics.adjust_gauge(SCHEDULER_QUEUED_GAUGE, -1)
+            return
+
+        self._available += 1
+
+    async def acquire(self, client: ClientContext, ticket: QueueTicket) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            client (ClientContext): The client of the request.
+            ticket (QueueTicket): Filled with the queue position and waits.
+
+        Raises:
+            RateLimitExceeded: If the client has exhausted its token bucket.
+        """
+
+        self.charge(client)
+
+        if self._available > 0 and not self.waiting():
+            self._available -= 1
+            self._start_tag(client)
+            return
+
+        started_at: float = time.perf_counter()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        key: Tuple[int, float, int] = (
+            _PRIORITY_RANK[client.priority],
+            self._start_tag(client),
+            next(self._sequence),
+        )
+        heapq.heappush(self._waiting, (*key, _Waiter(client, future)))
+        metrics.adjust_gauge(SCHEDULER_QUEUED_GAUGE, 1)
+
+        ticket.position = 1 + sum(
+            1
+            for *other, waiter in self._waiting
+            if tuple(other) < key and not waiter.future.done()
+        )
+        ticket.estimated_wait_ms = (
+            math.ceil(ticket.position / self.capacity) * self._service_ms
+        )
+
+        try:
+            await future
+
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before the cancellation: pass it on.
+                self._grant_next()
+            else:
+                future.cancel()
+                metrics.adjust_gauge(SCHEDULER_QUEUED_GAUGE, -1)
+            raise
+
+        ticket.waited_ms = (time.perf_counter() - started_at) * 1000
+        metrics.observe("fair_scheduler.wait_ms", ticket.waited_ms)
+        metrics.observe(
+            f"fair_scheduler.{client.priority.value}.wait_ms", ticket.waited_ms
+        )
+
+    def release(self, service_ms: float) -> None:
+        """
+        Free a slot and hand it to the next waiting request.
+
+        Args:
+            service_ms (float): How long the slot was held, used to estimate waits.
+        """
+
+        self._service_ms = 0.8 * self._service_ms + 0.2 * service_ms
+        self._grant_next()
+
+    @asynccontextmanager
+    async def slot(
+        self, client: ClientContext, ticket: QueueTicket
+    ) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block.
+
+        Args:
+            client (ClientContext): The client of the request.
+            ticket (QueueTicket): Filled with the queue position and waits.
+
+        Raises:
+            RateLimitExceeded: If the client has exhausted its token bucket.
+        """
+
+        await self.acquire(client, ticket)
+        started_at: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.release((time.perf_counter() - started_at) * 1000)
+
+
+fair_scheduler: FairShareScheduler = FairShareScheduler(
+    capacity=config.LLM_MAX_CONCURRENCY,
+    rate=config.FAIR_SHARE_RATE_PER_SECOND,
+    burst=config.FAIR_SHARE_BURST,
+)
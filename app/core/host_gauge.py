@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from app.core.metrics import metrics
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+class HostGauge:
+    """
+    A gauge summed across the worker processes of a host.
+
+    Each process keeps its own value in a row of a SQLite database on the local disk,
+    so any process can read the host-wide total and the number of processes
+    contributing to it. Adjustments only change the value in memory; a background
+    thread writes it at most every `flush_interval_seconds`, and only when it changed,
+    so callers never wait for the database. Rows of processes that are no longer
+    running are dropped when the gauge is read, so a crashed worker does not hold its
+    value forever. Storage errors are counted in `host_gauge.errors` and otherwise
+    ignored: the gauge is advisory.
+
+    Attributes:
+        path (str): The path of the SQLite database file.
+        name (str): The name of the gauge.
+        flush_interval_seconds (float): How often this process's value is written.
+    """
+
+    def __init__(
+        self, path: str, name: str, flush_interval_seconds: float = 0.25
+    ) -> None:
+        self.path: str = path
+        self.name: str = name
+        self.flush_interval_seconds: float = flush_interval_seconds
+        self._lock: threading.Lock = threading.Lock()
+        self._local: threading.local = threading.local()
+        self._value: float = 0.0
+        self._written: float | None = None
+        self._flusher: threading.Thread | None = None
+        self._flusher_pid: int | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            directory: str = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS gauges (
+                    name TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (name, pid)
+                )
+                """
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    def adjust(self, delta: float) -> None:
+        """
+        Move this process's value of the gauge by a delta.
+
+        Args:
+            delta (float): The amount to add (negative to decrease it).
+        """
+
+        with self._lock:
+            self._value += delta
+
+            # A forked worker inherits the gauge but not the thread.
+            if self._flusher is None or self._flusher_pid != os.getpid():
+                self._written = None
+                self._flusher_pid = os.getpid()
+                self._flusher = threading.Thread(
+                    target=self._run, name=f"host-gauge-{self.name}", daemon=True
+                )
+                self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            self.flush()
+            time.sleep(self.flush_interval_seconds)
+
+    def flush(self) -> None:
+        """
+        Write this process's value of the gauge, if it changed since the last write.
+        """
+
+        with self._lock:
+            value: float = self._value
+
+            if value == self._written:
+                return
+
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO gauges (name, pid, value) VALUES (?, ?, ?)",
+                    (self.name, os.getpid(), value),
+                )
+        except sqlite3.Error:
+            metrics.increment("host_gauge.errors")
+            return
+
+        with self._lock:
+            self._written = value
+
+    def read(self) -> Tuple[float, int]:
+        """
+        Return the host-wide value of the gauge.
+
+        Returns:
+            Tuple[float, int]: The sum of the values of the running processes and the
+                number of those processes, this one included. Other processes' values
+                lag by up to their `flush_interval_seconds`.
+        """
+
+        try:
+            with self._connection() as connection:
+                rows: List[Tuple[int, float]] = connection.execute(
+                    "SELECT pid, value FROM gauges WHERE name = ?", (self.name,)
+                ).fetchall()
+
+                dead: List[int] = [pid for pid, _ in rows if not _is_alive(pid)]
+                if dead:
+                    connection.executemany(
+                        "DELETE FROM gauges WHERE name = ? AND pid = ?",
+                        [(self.name, pid) for pid in dead],
+                    )
+
+        except sqlite3.Error:
+            metrics.increment("host_gauge.errors")
+            return self._value, 1
+
+        values: Dict[int, float] = {
+            pid: value for pid, value in rows if pid not in dead
+        }
+        values[os.getpid()] = self._value
+
+        return sum(values.values()), len(values)
@@ -0,0 +1,103 @@
+import threading
+from typing import Dict
+
+
+class Metrics:
+    """
+    A thread-safe registry of in-process counters and timing summaries.
+
+    Counters are monotonically increasing values (e.g. cache hits), while timings keep
+    a running count, sum, minimum and maximum for a named operation. The registry is
+    local to the worker process; every uvicorn worker reports its own values.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Increase a counter by the given value, creating it when needed.
+
+        Args:
+            name (str): The name of the counter.
+            value (float): The amount to add to the counter. Defaults to 1.
+        """
+
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def adjust_gauge(self, name: str, delta: float) -> None:
+        """
+        Move a gauge (a value that goes up and down, e.g. in-flight calls) by a delta.
+
+        Args:
+            name (str): The name of the gauge.
+            delta (float): The amount to add to the gauge (negative to decrease it).
+        """
+
+        with self._lock:
+            self._gauges[name] = self._gauges.get(name, 0) + delta
+
+    def gauge(self, name: str) -> float:
+        """
+        Return the current value of a gauge.
+
+        Args:
+            name (str): The name of the gauge.
+
+        Returns:
+            float: The value of the gauge, 0 if it was never adjusted.
+        """
+
+        return self._gauges.get(name, 0)
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Record a single observation (usually a duration in milliseconds) for a timing.
+
+        Args:
+            name (str): The name of the timing.
+            value (float): The observed value.
+        """
+
+        with self._lock:
+            timing: Dict[str, float] | None = self._timings.get(name)
+
+            if timing is None:
+                self._timings[name] = {
+                    "count": 1,
+                    "sum": value,
+                    "min": value,
+                    "max": value,
+                }
+                return
+
+            timing["count"] += 1
+            timing["sum"] += value
+            timing["min"] = min(timing["min"], value)
+            timing["max"] = max(timing["max"], value)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Return a copy of every counter and timing currently registered.
+
+        Returns:
+            Dict[str, Dict]: A dictionary with a "counters", a "gauges" and a "timings"
+                section. Each timing includes its derived average.
+        """
+
+        with self._lock:
+            counters: Dict[str, float] = dict(self._counters)
+            gauges: Dict[str, float] = dict(self._gauges)
+            timings: Dict[str, Dict[str, float]] = {
+                name: {**timing, "avg": timing["sum"] / timing["count"]}
+                for name, timing in self._timings.items()
+            }
+
+        return {"counters": counters, "gauges": gauges, "timings": timings}
+
+
+metrics: Metrics = Metrics()
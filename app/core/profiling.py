@@ -0,0 +1,280 @@
+import asyncio
+import contextvars
+import datetime as dt
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Set, TypeVar
+
+from app.models.profiling import RequestProfile, StackSample, StageTiming
+
+T = TypeVar("T")
+
+MAX_STACK_DEPTH: int = 128
+
+_current: contextvars.ContextVar["RequestProfiler | None"] = contextvars.ContextVar(
+    "request_profiler", default=None
+)
+_NOT_PROFILED: AbstractContextManager = nullcontext()
+
+
+def stage(name: str) -> AbstractContextManager:
+    """
+    Time a stage of the request being handled, if it is being profiled.
+
+    Outside a profiled request this returns a shared no-op context manager, so stages
+    cost a context variable lookup when profiling is off.
+
+    Args:
+        name (str): The stage, dotted by pipeline step (e.g. "context.weather").
+
+    Returns:
+        AbstractContextManager: The context manager timing the stage.
+    """
+
+    profiler: RequestProfiler | None = _current.get()
+
+    if profiler is None:
+        return _NOT_PROFILED
+
+    return profiler.stage(name)
+
+
+def staged(name: str, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call a function as a stage of the request being handled (see `stage`).
+
+    Args:
+        name (str): The stage.
+        function (Callable[..., T]): The function.
+        *args (Any): Positional arguments of the function.
+        **kwargs (Any): Keyword arguments of the function.
+
+    Returns:
+        T: The result of the function.
+    """
+
+    with stage(name):
+        return function(*args, **kwargs)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+
+    return True
+
+
+def _collapse(frame: Any) -> str:
+    frames: List[str] = []
+
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        frames.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+
+    return ";".join(reversed(frames))
+
+
+class _StageStats:
+    __slots__ = ("calls", "wall_ms", "cpu_ms", "process_blocks_delta")
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.wall_ms: float = 0.0
+        self.cpu_ms: float | None = 0.0
+        self.process_blocks_delta: int = 0
+
+
+class RequestProfiler:
+    """
+    Collects the stage timings and CPU samples of one request across its threads.
+
+    A request runs on the event loop, Starlette's threadpool and the LLM executor, all
+    of which inherit the context variable that `profiling` sets. Stages running off the
+    event loop register their thread while they run, and the shared sampler thread
+    records the stacks of the registered threads every `sample_interval_ms`, so the
+    CPU profile only contains the work of the profiled request.
+
+    Attributes:
+        profile_id (str): The ID of the profile.
+        parcel_id (str): The parcel of the profiled request.
+        trigger (str): "header" or "sampled".
+        sample_interval_ms (float): The period of the sampling profiler.
+        max_stacks (int): The maximum number of distinct stacks kept in the result.
+    """
+
+    def __init__(
+        self,
+        parcel_id: str,
+        trigger: str,
+        sample_interval_ms: float,
+        max_stacks: int,
+    ) -> None:
+        self.profile_id: str = uuid.uuid4().hex
+        self.parcel_id: str = parcel_id
+        self.trigger: str = trigger
+        self.sample_interval_ms: float = sample_interval_ms
+        self.max_stacks: int = max_stacks
+        self._lock: threading.Lock = threading.Lock()
+        self._started_at: dt.datetime = dt.datetime.now(dt.timezone.utc)
+        self._started: float = time.perf_counter()
+        self._stages: Dict[str, _StageStats] = {}
+        # Thread ident -> number of stages the thread is currently running.
+        self._threads: Dict[int, int] = {}
+        self._stacks: Counter = Counter()
+        self._samples: int = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        on_loop: bool = _on_event_loop()
+        ident: int = threading.get_ident()
+
+        if not on_loop:
+            with self._lock:
+                self._threads[ident] = self._threads.get(ident, 0) + 1
+
+        blocks: int = sys.getallocatedblocks()
+        cpu: float = time.thread_time()
+        wall: float = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            wall_ms: float = (time.perf_counter() - wall) * 1000
+            cpu_ms: float = (time.thread_time() - cpu) * 1000
+            # Process-wide: other threads allocate and free meanwhile (see StageTiming).
+            blocks_delta: int = sys.getallocatedblocks() - blocks
+
+            with self._lock:
+                stats: _StageStats = self._stages.setdefault(name, _StageStats())
+                stats.calls += 1
+                stats.wall_ms += wall_ms
+                stats.process_blocks_delta += blocks_delta
+
+                if on_loop or stats.cpu_ms is None:
+                    stats.cpu_ms = None
+                else:
+                    stats.cpu_ms += cpu_ms
+
+                if not on_loop:
+                    self._threads[ident] -= 1
+                    if not self._threads[ident]:
+                        del self._threads[ident]
+
+    def _sample(self, frames: Dict[int, Any]) -> None:
+        with self._lock:
+            sampled: bool = False
+
+            for ident in self._threads:
+                frame: Any | None = frames.get(ident)
+
+                if frame is not None:
+                    self._stacks[_collapse(frame)] += 1
+                    sampled = True
+
+            self._samples += sampled
+
+    def result(self) -> RequestProfile:
+        """
+        Build the profile of the request from what was collected so far.
+
+        Returns:
+            RequestProfile: The profile.
+        """
+
+        with self._lock:
+            return RequestProfile(
+                profile_id=self.profile_id,
+                parcel_id=self.parcel_id,
+                trigger=self.trigger,
+                started_at=self._started_at,
+                wall_ms=round((time.perf_counter() - self._started) * 1000, 2),
+                stages=[
+                    StageTiming(
+                        name=name,
+                        calls=stats.calls,
+                        wall_ms=round(stats.wall_ms, 2),
+                        cpu_ms=None if stats.cpu_ms is None else round(stats.cpu_ms, 2),
+                        process_blocks_delta=stats.process_blocks_delta,
+                    )
+                    for name, stats in self._stages.items()
+                ],
+                sample_interval_ms=self.sample_interval_ms,
+                samples=self._samples,
+                stacks=[
+                    StackSample(stack=stack, count=count)
+                    for stack, count in self._stacks.most_common(self.max_stacks)
+                ],
+            )
+
+
+class _Sampler:
+    # One daemon thread samples every active profile; it exits when none is left.
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._profilers: Set[RequestProfiler] = set()
+        self._thread: threading.Thread | None = None
+
+    def add(self, profiler: RequestProfiler) -> None:
+        with self._lock:
+            self._profilers.add(profiler)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def remove(self, profiler: RequestProfiler) -> None:
+        with self._lock:
+            self._profilers.discard(profiler)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._profilers:
+                    self._thread = None
+                    return
+
+                profilers: List[RequestProfiler] = list(self._profilers)
+
+            frames: Dict[int, Any] = sys._current_frames()
+
+            for profiler in profilers:
+                profiler._sample(frames)
+
+            del frames
+            time.sleep(min(p.sample_interval_ms for p in profilers) / 1000)
+
+
+_sampler: _Sampler = _Sampler()
+
+
+@contextmanager
+def profiling(profiler: RequestProfiler) -> Iterator[RequestProfiler]:
+    """
+    Profile the code run in this block, including the threads it hands work to.
+
+    Args:
+        profiler (RequestProfiler): The profiler collecting the request's profile.
+
+    Yields:
+        RequestProfiler: The profiler, whose `result` is complete once the block exits.
+    """
+
+    token: contextvars.Token = _current.set(profiler)
+    _sampler.add(profiler)
+
+    try:
+        yield profiler
+
+    finally:
+        _sampler.remove(profiler)
+        _current.reset(token)
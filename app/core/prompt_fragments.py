@@ -0,0 +1,132 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Protocol, Tuple
+
+from app.config.conf import config
+
+ContentKey = Tuple[str, int, bytes]
+
+
+class PromptSource(Protocol):
+    PROMPT_TEMPLATE_VERSION: int
+
+    def to_prompt_string(self) -> str: ...
+
+    def model_dump_json(self) -> str: ...
+
+
+class _Fragment:
+    __slots__ = ("source", "fields", "text")
+
+    def __init__(self, source: Any, fields: Tuple, text: str) -> None:
+        self.source: Any = source
+        self.fields: Tuple = fields
+        self.text: str = text
+
+
+def content_key(source: PromptSource) -> ContentKey:
+    """
+    Return the key of the rendering of a source object.
+
+    Args:
+        source (PromptSource): A model rendered into prompts.
+
+    Returns:
+        ContentKey: The model class, its template version and a hash of its content.
+    """
+
+    return (
+        type(source).__qualname__,
+        source.PROMPT_TEMPLATE_VERSION,
+        hashlib.blake2b(source.model_dump_json().encode(), digest_size=16).digest(),
+    )
+
+
+class PromptFragmentCache:
+    """
+    A cache of the prompt fragments of static and slowly changing context.
+
+    Project details, best practices and parcel history come from long-lived in-process
+    stores (the catalogue, the knowledge pack and the history store), and weather
+    forecasts are cached per grid cell and time slot, so requests keep rendering the
+    same objects into the same text. Fragments are keyed by the content of
+    their source and the `PROMPT_TEMPLATE_VERSION` of its class, so equal objects
+    share a fragment and a fragment rendered by an older `to_prompt_string` is never
+    reused: bump a model's `PROMPT_TEMPLATE_VERSION` whenever its rendering changes.
+
+    Hashing the content costs more than most renderings, so it is done once per source
+    object: later lookups of the same object only check that none of its fields was
+    reassigned. Entries hold their source, so an object ID is never reused while its
+    entry lives. Sources are treated as immutable values (fields are replaced, never
+    mutated in place), as everywhere else in the context pipeline.
+
+    Attributes:
+        max_entries (int): The maximum number of fragments kept, least recently used
+            first out.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries: int = max_entries
+        self._lock: threading.Lock = threading.Lock()
+        self._by_source: OrderedDict[int, _Fragment] = OrderedDict()
+        self._by_content: OrderedDict[ContentKey, str] = OrderedDict()
+
+    def render(self, source: PromptSource) -> str:
+        """
+        Return the prompt fragment of a source object, rendering it if needed.
+
+        Args:
+            source (PromptSource): A model rendered into prompts.
+
+        Returns:
+            str: The output of `source.to_prompt_string()`.
+        """
+
+        if not config.PROMPT_FRAGMENT_CACHE_ENABLED:
+            return source.to_prompt_string()
+
+        fields: Tuple = tuple(source.__dict__.values())
+
+        with self._lock:
+            fragment: _Fragment | None = self._by_source.get(id(source))
+
+            if (
+                fragment is not None
+                and fragment.source is source
+                and fragment.fields == fields
+            ):
+                self._by_source.move_to_end(id(source))
+                return fragment.text
+
+        key: ContentKey = content_key(source)
+
+        with self._lock:
+            text: str | None = self._by_content.get(key)
+
+        if text is None:
+            text = source.to_prompt_string()
+
+        with self._lock:
+            self._by_content[key] = text
+            self._by_content.move_to_end(key)
+            self._by_source[id(source)] = _Fragment(source, fields, text)
+            self._by_source.move_to_end(id(source))
+
+            while len(self._by_content) > self.max_entries:
+                self._by_content.popitem(last=False)
+
+            while len(self._by_source) > self.max_entries:
+                self._by_source.popitem(last=False)
+
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_source.clear()
+            self._by_content.clear()
+
+
+prompt_fragments: PromptFragmentCache = PromptFragmentCache(
+    max_entries=config.PROMPT_FRAGMENT_CACHE_SIZE
+)
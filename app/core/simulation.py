@@ -0,0 +1,89 @@
+import datetime as dt
+import hashlib
+import math
+import random as rand
+
+from app.config.conf import config
+
+
+def is_seeded() -> bool:
+    return config.SIMULATION_SEED is not None
+
+
+def time_slot(at: dt.datetime, slot_seconds: int | None = None) -> int:
+    """
+    Return the index of the simulation time slot a time falls in.
+
+    Args:
+        at (datetime): The time.
+        slot_seconds (int | None): The length of a slot. Defaults to
+            `SIMULATION_TIME_SLOT_SECONDS`.
+
+    Returns:
+        int: The number of whole slots since the epoch.
+    """
+
+    return int(at.timestamp()) // (slot_seconds or config.SIMULATION_TIME_SLOT_SECONDS)
+
+
+def slot_start(slot: int, slot_seconds: int | None = None) -> dt.datetime:
+    seconds: int = slot_seconds or config.SIMULATION_TIME_SLOT_SECONDS
+
+    return dt.datetime.fromtimestamp(slot * seconds)
+
+
+def simulation_random(*parts: object) -> rand.Random:
+    """
+    Return the random generator of a simulated value.
+
+    With `SIMULATION_SEED` set, the generator is seeded from the seed and the parts
+    identifying the value (e.g. service, parcel and time slot), so the same value is
+    produced by every process and every run. Without a seed it is freshly seeded from
+    the operating system, like the global `random` module.
+
+    Args:
+        *parts (object): The parts identifying the simulated value.
+
+    Returns:
+        rand.Random: The generator.
+    """
+
+    if not is_seeded():
+        return rand.Random()
+
+    key: str = ":".join(str(part) for part in (config.SIMULATION_SEED, *parts))
+    digest: bytes = hashlib.sha256(key.encode()).digest()
+
+    return rand.Random(int.from_bytes(digest[:8], "little"))
+
+
+def cyclic_value(
+    low: float,
+    high: float,
+    at: dt.datetime,
+    period_seconds: float,
+    phase: float,
+    noise: float = 0.0,
+) -> float:
+    """
+    Return a value oscillating smoothly within [low, high] over a period.
+
+    Seeded simulations use it so consecutive readings of a parcel drift gradually
+    instead of jumping across the whole range on every poll.
+
+    Args:
+        low (float): The lower bound of the value.
+        high (float): The upper bound of the value.
+        at (datetime): The time of the value.
+        period_seconds (float): The period of the oscillation.
+        phase (float): The offset of the oscillation, as a fraction of the period.
+        noise (float): Extra offset as a fraction of the range (e.g. a small random draw).
+
+    Returns:
+        float: The value.
+    """
+
+    position: float = at.timestamp() / period_seconds + phase
+    wave: float = 0.5 + 0.4 * math.sin(2 * math.pi * position) + noise
+
+    return low + (high - low) * min(1.0, max(0.0, wave))
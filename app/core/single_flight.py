@@ -0,0 +1,82 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single execution.
+
+    The first caller for a key starts the work as an asyncio task; every caller that
+    arrives while it is still running awaits the same task. Callers await the task
+    through `asyncio.shield`, so a cancelled caller (e.g. a client that disconnected)
+    stops waiting without cancelling the shared work for the others. The key is
+    released as soon as the work finishes, so later calls start a fresh execution.
+
+    Attributes:
+        name (str): The name used to report leader and coalesced calls in the metrics.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        """
+        Return the number of keys whose work is currently running.
+
+        Returns:
+            int: The number of in-flight executions.
+        """
+
+        return len(self._calls)
+
+    def joining(self, key: Hashable) -> bool:
+        """
+        Return whether a call with the key would join an execution already running.
+
+        Args:
+            key (Hashable): The key identifying equivalent calls.
+
+        Returns:
+            bool: True if the work for the key is running.
+        """
+
+        return key in self._calls
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run the function for a key, or join the execution already running for it.
+
+        Args:
+            key (Hashable): The key identifying equivalent calls.
+            function (Callable[[], Awaitable[T]]): Produces the awaitable doing the work.
+                It is only invoked by the first caller.
+
+        Returns:
+            T: The result of the shared execution. Its exception, if any, is raised to
+                every caller.
+        """
+
+        task: asyncio.Task | None = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            metrics.increment(f"single_flight.{self.name}.executions")
+        else:
+            metrics.increment(f"single_flight.{self.name}.coalesced")
+
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # Mark the exception as retrieved in case every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,274 @@
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM: float = 6371.0088
+KM_PER_DEGREE: float = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(
+    latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the great-circle distances from a point to many points.
+
+    Args:
+        latitude (float): The latitude of the origin, in degrees.
+        longitude (float): The longitude of the origin, in degrees.
+        latitudes (np.ndarray): The latitudes of the targets, in degrees.
+        longitudes (np.ndarray): The longitudes of the targets, in degrees.
+
+    Returns:
+        np.ndarray: The distances in kilometres.
+    """
+
+    lat1: float = math.radians(latitude)
+    lat2: np.ndarray = np.radians(latitudes)
+    half_dlat: np.ndarray = (lat2 - lat1) / 2
+    half_dlon: np.ndarray = np.radians(longitudes - longitude) / 2
+    a: np.ndarray = (
+        np.sin(half_dlat) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(half_dlon) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def grid_cell(latitude: float, longitude: float, cell_degrees: float) -> Tuple[int, int]:
+    """
+    Return the grid cell containing a point.
+
+    Args:
+        latitude (float): The latitude, in degrees.
+        longitude (float): The longitude, in degrees.
+        cell_degrees (float): The side of a cell, in degrees.
+
+    Returns:
+        Tuple[int, int]: The row and column of the cell.
+    """
+
+    return math.floor(latitude / cell_degrees), math.floor(longitude / cell_degrees)
+
+
+def cell_center(cell: Tuple[int, int], cell_degrees: float) -> Tuple[float, float]:
+    return (cell[0] + 0.5) * cell_degrees, (cell[1] + 0.5) * cell_degrees
+
+
+class SpatialGrid:
+    """
+    A uniform latitude/longitude grid of positions answering nearest-neighbour queries.
+
+    Each cell keeps the positions of the points inside it, and the coordinates of every
+    point are kept in contiguous arrays. A query scans rings of cells around the origin,
+    computing exact distances for the candidates of each ring, and stops as soon as the
+    next ring cannot hold anything closer than the current k-th neighbour, so its cost
+    depends on the local density rather than on the number of points. Scanning starts
+    at the first ring that reaches the populated cells, and once a ring has more cells
+    than the grid has populated cells (e.g. for an origin far from every point) the
+    query falls back to computing the distance to every point at once, so no query
+    costs more than a vectorized full scan. Columns do not wrap around the
+    antimeridian, so a query whose search reaches ±180° longitude also falls back to
+    the full scan, whose great-circle distances find the points on the other side.
+
+    Attributes:
+        cell_degrees (float): The side of a cell, in degrees.
+    """
+
+    def __init__(self, cell_degrees: float) -> None:
+        self.cell_degrees: float = cell_degrees
+        self._lock: threading.Lock = threading.Lock()
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._cell_of: Dict[int, Tuple[int, int]] = {}
+        self._latitudes: np.ndarray = np.zeros(1024)
+        self._longitudes: np.ndarray = np.zeros(1024)
+        self._bounds: List[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def cell_count(self) -> int:
+        return sum(1 for positions in self._cells.values() if positions)
+
+    def add(self, position: int, latitude: float, longitude: float) -> None:
+        """
+        Add or move a point.
+
+        Args:
+            position (int): The position identifying the point (e.g. in a catalogue).
+            latitude (float): The latitude, in degrees.
+            longitude (float): The longitude, in degrees.
+        """
+
+        cell: Tuple[int, int] = grid_cell(latitude, longitude, self.cell_degrees)
+
+        with self._lock:
+            if position >= len(self._latitudes):
+                capacity: int = max(position + 1, len(self._latitudes) * 2)
+                self._latitudes = np.resize(self._latitudes, capacity)
+                self._longitudes = np.resize(self._longitudes, capacity)
+
+            previous: Tuple[int, int] | None = self._cell_of.get(position)
+            if previous is not None:
+                self._cells[previous].remove(position)
+
+            self._cells[cell].append(position)
+            self._cell_of[position] = cell
+            self._latitudes[position] = latitude
+            self._longitudes[position] = longitude
+
+            if self._bounds is None:
+                self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+            else:
+                self._bounds[0] = min(self._bounds[0], cell[0])
+                self._bounds[1] = max(self._bounds[1], cell[0])
+                self._bounds[2] = min(self._bounds[2], cell[1])
+                self._bounds[3] = max(self._bounds[3], cell[1])
+
+    def remove(self, position: int) -> None:
+        with self._lock:
+            cell: Tuple[int, int] | None = self._cell_of.pop(position, None)
+
+            if cell is not None:
+                self._cells[cell].remove(position)
+
+    def _ring(self, center: Tuple[int, int], radius: int) -> List[int]:
+        if radius == 0:
+            return list(self._cells.get(center, ()))
+
+        row, column = center
+        positions: List[int] = []
+
+        for offset in range(-radius, radius + 1):
+            for cell in [
+                (row - radius, column + offset),
+                (row + radius, column + offset),
+            ]:
+                positions.extend(self._cells.get(cell, ()))
+
+        for offset in range(-radius + 1, radius):
+            for cell in [
+                (row + offset, column - radius),
+                (row + offset, column + radius),
+            ]:
+                positions.extend(self._cells.get(cell, ()))
+
+        return positions
+
+    def _scan_all(
+        self, latitude: float, longitude: float, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        positions: np.ndarray = np.fromiter(
+            self._cell_of, dtype=np.int64, count=len(self._cell_of)
+        )
+        distances: np.ndarray = haversine_km(
+            latitude, longitude, self._latitudes[positions], self._longitudes[positions]
+        )
+        order: np.ndarray = np.argsort(distances, kind="stable")[:k]
+
+        return positions[order], distances[order]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_distance_km: float | None = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the k points closest to a location.
+
+        Args:
+            latitude (float): The latitude of the origin, in degrees.
+            longitude (float): The longitude of the origin, in degrees.
+            k (int): The maximum number of points to return.
+            max_distance_km (float | None): Ignore points farther than this distance.
+
+        Returns:
+            List[Tuple[int, float]]: The positions and distances in kilometres of the
+                closest points, nearest first.
+        """
+
+        center: Tuple[int, int] = grid_cell(latitude, longitude, self.cell_degrees)
+        # A ring r cells away is at least (r - 1) cells away from the origin; cells are
+        # narrowest in longitude, so that side bounds the distance conservatively.
+        widest_latitude: float = min(abs(latitude) + self.cell_degrees, 89.9)
+        cell_km: float = (
+            self.cell_degrees
+            * KM_PER_DEGREE
+            * max(math.cos(math.radians(widest_latitude)), 0.01)
+        )
+
+        with self._lock:
+            if self._bounds is None or k <= 0:
+                return []
+
+            min_radius: int = max(
+                self._bounds[0] - center[0],
+                center[0] - self._bounds[1],
+                self._bounds[2] - center[1],
+                center[1] - self._bounds[3],
+                0,
+            )
+            max_radius: int = max(
+                abs(center[0] - self._bounds[0]),
+                abs(center[0] - self._bounds[1]),
+                abs(center[1] - self._bounds[2]),
+                abs(center[1] - self._bounds[3]),
+            )
+            best_positions: np.ndarray = np.empty(0, dtype=np.int64)
+            best_distances: np.ndarray = np.empty(0)
+            scanned_all: bool = False
+
+            for radius in range(min_radius, max_radius + 1):
+                ring_min_km: float = max(radius - 1, 0) * cell_km
+
+                if max_distance_km is not None and ring_min_km > max_distance_km:
+                    break
+                if len(best_distances) >= k and ring_min_km > best_distances[-1]:
+                    break
+
+                if 8 * radius > len(self._cells):
+                    best_positions, best_distances = self._scan_all(
+                        latitude, longitude, k
+                    )
+                    scanned_all = True
+                    break
+
+                candidates: List[int] = self._ring(center, radius)
+                if not candidates:
+                    continue
+
+                positions: np.ndarray = np.asarray(candidates, dtype=np.int64)
+                distances: np.ndarray = haversine_km(
+                    latitude,
+                    longitude,
+                    self._latitudes[positions],
+                    self._longitudes[positions],
+                )
+
+                best_positions = np.concatenate([best_positions, positions])
+                best_distances = np.concatenate([best_distances, distances])
+                order: np.ndarray = np.argsort(best_distances, kind="stable")[:k]
+                best_positions = best_positions[order]
+                best_distances = best_distances[order]
+
+            reach_km: float = (
+                best_distances[-1] if len(best_distances) >= k else math.inf
+            )
+            if max_distance_km is not None:
+                reach_km = min(reach_km, max_distance_km)
+
+            antimeridian_km: float = (
+                (180 - abs(longitude)) * cell_km / self.cell_degrees
+            )
+
+            if not scanned_all and reach_km > antimeridian_km:
+                best_positions, best_distances = self._scan_all(latitude, longitude, k)
+
+        return [
+            (int(position), float(distance))
+            for position, distance in zip(best_positions, best_distances)
+            if max_distance_km is None or distance <= max_distance_km
+        ]
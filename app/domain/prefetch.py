@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.domain.recommendations import RecommendationDomain
+from app.models.recommendations import RecommendationContext, RecommendationRequest
+from app.services.prefetched_contexts import prefetched_contexts
+
+
+class ContextPrefetcher:
+    """
+    Speculatively gathers the recommendation context of the parcels being viewed.
+
+    Users open a parcel and ask for a recommendation a few seconds later, so viewing a
+    parcel starts gathering its weather, sensor, satellite and retrieval context in the
+    background, for the default question. The following recommendation request takes
+    that context from `prefetched_contexts` (re-running only the knowledge search when
+    its question differs) and only pays for the LLM call.
+
+    Prefetches run on a dedicated pool of `PREFETCH_MAX_CONCURRENCY` threads, so they
+    never hold the threads of interactive requests, and at most
+    `PREFETCH_MAX_IN_FLIGHT` are queued or running; beyond that, views do not prefetch.
+
+    Attributes:
+        domain (RecommendationDomain): The domain gathering the contexts.
+    """
+
+    def __init__(self, domain: RecommendationDomain) -> None:
+        self.domain: RecommendationDomain = domain
+        self._executor: ThreadPoolExecutor | None = None
+
+    def prefetch(self, parcel_id: str) -> bool:
+        """
+        Start gathering the context of a parcel in the background, if worthwhile.
+
+        Returns immediately; nothing is started when prefetching is disabled, the
+        parcel's context is fresh or already being gathered, or the prefetch pool is
+        saturated.
+
+        Args:
+            parcel_id (str): The unique identifier of a known parcel.
+
+        Returns:
+            bool: True if a prefetch was started.
+        """
+
+        if not config.PREFETCH_ENABLED:
+            return False
+
+        request: RecommendationRequest = RecommendationRequest(parcel_id=parcel_id)
+        future: Future | None = prefetched_contexts.begin(
+            parcel_id, question=request.normalized_question()
+        )
+
+        if future is None:
+            return False
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.PREFETCH_MAX_CONCURRENCY,
+                thread_name_prefix="prefetch",
+            )
+
+        self._executor.submit(self._gather, request, future)
+
+        return True
+
+    def _gather(self, request: RecommendationRequest, future: Future) -> None:
+        if not prefetched_contexts.start(request.parcel_id, future):
+            return
+
+        started_at: float = time.perf_counter()
+        context: RecommendationContext | None = None
+
+        try:
+            context = self.domain.gather_context(
+                parcel_id=request.parcel_id, user_question=request.user_question
+            )
+
+        except Exception:
+            metrics.increment("prefetch.failures")
+
+        finally:
+            prefetched_contexts.complete(
+                request.parcel_id,
+                future,
+                context,
+                elapsed_ms=(time.perf_counter() - started_at) * 1000,
+            )
+
+
+context_prefetcher: ContextPrefetcher = ContextPrefetcher(domain=RecommendationDomain())
@@ -0,0 +1,312 @@
+import datetime as dt
+import fcntl
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.domain.recommendations import RecommendationDomain
+from app.models.project import ProjectDetails
+from app.models.recommendations import (
+    RecommendationRequest,
+    RecommendationResponse,
+    RecommendationContext,
+    ContextFingerprint,
+    PrecomputedRecommendation,
+    PregenerationStats,
+)
+from app.models.subscriptions import ParcelEventType
+from app.services.llms import LLM_IN_FLIGHT_GAUGE, llm_in_flight_on_host
+from app.services.parcel_events import parcel_events
+from app.services.precomputed_recommendations import precomputed_store
+
+
+def is_off_peak(now: dt.datetime) -> bool:
+    """
+    Check whether a time falls in the configured off-peak window.
+
+    The window [PREGENERATION_OFF_PEAK_START_HOUR, PREGENERATION_OFF_PEAK_END_HOUR) may
+    wrap around midnight (e.g. 22 to 5).
+
+    Args:
+        now (datetime): The local time to check.
+
+    Returns:
+        bool: True if the time is off-peak.
+    """
+
+    start: int = config.PREGENERATION_OFF_PEAK_START_HOUR
+    end: int = config.PREGENERATION_OFF_PEAK_END_HOUR
+
+    if start <= end:
+        return start <= now.hour < end
+
+    return now.hour >= start or now.hour < end
+
+
+def has_spare_llm_capacity() -> bool:
+    """
+    Check whether an LLM slot is free beyond the slots reserved for interactive traffic.
+
+    Only one worker of a host runs the scheduler, so the check covers the whole host:
+    the calls in flight in every worker (see `llm_in_flight_on_host`) must leave
+    `PREGENERATION_RESERVED_LLM_SLOTS` free in each of them on average, and this worker
+    must have a free slot beyond its own reserved ones. Background generations run on
+    the scheduler's own threads, not on the LLM executor, but call the same LLM
+    service, so they count in the same in-flight gauges as interactive calls.
+
+    Returns:
+        bool: True if a background generation can start now.
+    """
+
+    reserved: int = config.PREGENERATION_RESERVED_LLM_SLOTS
+    host_in_flight, workers = llm_in_flight_on_host.read()
+
+    return (
+        metrics.gauge(LLM_IN_FLIGHT_GAUGE) + reserved < config.LLM_MAX_CONCURRENCY
+        and host_in_flight + reserved * workers < config.LLM_MAX_CONCURRENCY * workers
+    )
+
+
+class RecommendationPregenerator:
+    """
+    Background scheduler pre-generating the default recommendation of every parcel.
+
+    Every `PREGENERATION_INTERVAL_SECONDS` the scheduler walks the next batch of active
+    parcels (round-robin over the catalogue) and:
+
+    - generates recommendations that are missing or older than
+      `RECOMMENDATION_MAX_AGE_SECONDS`, only during the off-peak window;
+    - regenerates recommendations whose context moved outside a tolerance band (see
+      `RecommendationDomain.material_changes`), at any time of day.
+
+    Generations only start while the LLM has spare capacity beyond
+    `PREGENERATION_RESERVED_LLM_SLOTS` across the workers of the host, and at most
+    `PREGENERATION_MAX_CONCURRENCY` run at once, so interactive requests keep priority.
+    When several workers run on a host, a file lock elects a single one to run the
+    scheduler; the others keep trying and take over if it stops.
+
+    Attributes:
+        domain (RecommendationDomain): The domain used to gather context and generate.
+    """
+
+    def __init__(self, domain: RecommendationDomain) -> None:
+        self.domain: RecommendationDomain = domain
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock_file = None
+        self._cursor: int = 0
+        self._stats_lock: threading.Lock = threading.Lock()
+        self._generated_at: Dict[str, dt.datetime] = {}
+        self._generated: int = 0
+        self._refreshed_on_change: int = 0
+        self._skipped_busy: int = 0
+        self._failures: int = 0
+        self._last_run_at: dt.datetime | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock_file is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="recommendation-pregenerator", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self._release_leadership()
+
+    def _acquire_leadership(self) -> bool:
+        if self._lock_file is not None:
+            return True
+
+        os.makedirs(config.CACHE_DIR, exist_ok=True)
+        lock_file = open(os.path.join(config.CACHE_DIR, "pregeneration.lock"), "a")
+
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        return True
+
+    def _release_leadership(self) -> None:
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._acquire_leadership():
+                try:
+                    self.run_once()
+                except Exception:
+                    metrics.increment("pregeneration.run_errors")
+
+            self._stop.wait(config.PREGENERATION_INTERVAL_SECONDS)
+
+    def _next_batch(self, projects: List[ProjectDetails]) -> List[ProjectDetails]:
+        if not projects:
+            return []
+
+        size: int = min(config.PREGENERATION_BATCH_SIZE, len(projects))
+        start: int = self._cursor % len(projects)
+        self._cursor = start + size
+
+        return [projects[(start + offset) % len(projects)] for offset in range(size)]
+
+    def run_once(self, now: dt.datetime | None = None) -> None:
+        """
+        Process the next batch of parcels.
+
+        Args:
+            now (datetime | None): The local time used for the off-peak check. Defaults
+                to the current time.
+        """
+
+        now = now or dt.datetime.now()
+        off_peak: bool = is_off_peak(now)
+        projects: List[ProjectDetails] = self.domain.projects_service.get_projects()
+
+        with ThreadPoolExecutor(
+            max_workers=config.PREGENERATION_MAX_CONCURRENCY
+        ) as executor:
+            for project in self._next_batch(projects):
+                if self._stop.is_set():
+                    break
+
+                executor.submit(self._process_parcel, project.parcel_id, off_peak)
+
+        with self._stats_lock:
+            self._last_run_at = dt.datetime.now(dt.timezone.utc)
+
+        precomputed_store.publish_stats(self.stats(active_parcels=len(projects)))
+
+    def _process_parcel(self, parcel_id: str, off_peak: bool) -> None:
+        request: RecommendationRequest = RecommendationRequest(parcel_id=parcel_id)
+        entry: PrecomputedRecommendation | None = precomputed_store.get(
+            model=request.model,
+            parcel_id=parcel_id,
+            question=request.normalized_question(),
+        )
+        utc_now: dt.datetime = dt.datetime.now(dt.timezone.utc)
+
+        if entry is not None:
+            with self._stats_lock:
+                self._generated_at[parcel_id] = entry.generated_at
+
+        stale: bool = (
+            entry is None
+            or (utc_now - entry.generated_at).total_seconds()
+            > config.RECOMMENDATION_MAX_AGE_SECONDS
+        )
+
+        if stale and not off_peak:
+            return
+
+        try:
+            context: RecommendationContext = self.domain.gather_context(
+                parcel_id=parcel_id, user_question=request.user_question
+            )
+            fingerprint: ContextFingerprint = self.domain.context_fingerprint(context)
+
+            if not stale:
+                changes: List[str] = self.domain.material_changes(
+                    entry.fingerprint, fingerprint
+                )
+
+                if not changes:
+                    return
+
+                parcel_events.publish(
+                    parcel_id, ParcelEventType.CONTEXT_CHANGE, {"changes": changes}
+                )
+
+            if not has_spare_llm_capacity():
+                with self._stats_lock:
+                    self._skipped_busy += 1
+                return
+
+            response: RecommendationResponse = self.domain.generate_recommendation(
+                request=request, context=context
+            )
+
+        except Exception:
+            with self._stats_lock:
+                self._failures += 1
+            metrics.increment("pregeneration.failures")
+            return
+
+        self.domain.store_recommendation(
+            request, response, fingerprint, origin="pregeneration"
+        )
+        self.domain.record_history(response, fingerprint, origin="pregeneration")
+        parcel_events.publish(parcel_id, ParcelEventType.RECOMMENDATION, response)
+
+        with self._stats_lock:
+            self._generated_at[parcel_id] = response.generated_at
+            self._generated += 1
+            if not stale:
+                self._refreshed_on_change += 1
+
+        metrics.increment("pregeneration.generated")
+
+    def stats(self, active_parcels: int) -> PregenerationStats:
+        """
+        Compute the coverage and staleness of the precomputed recommendations.
+
+        Coverage is based on the parcels visited by the scheduler, so it converges to
+        the real value after one full round over the catalogue.
+
+        Args:
+            active_parcels (int): The number of active parcels in the catalogue.
+
+        Returns:
+            PregenerationStats: The current statistics.
+        """
+
+        utc_now: dt.datetime = dt.datetime.now(dt.timezone.utc)
+
+        with self._stats_lock:
+            ages: List[float] = [
+                (utc_now - generated_at).total_seconds()
+                for generated_at in self._generated_at.values()
+            ]
+
+            fresh_parcels: int = sum(
+                age <= config.RECOMMENDATION_MAX_AGE_SECONDS for age in ages
+            )
+
+            return PregenerationStats(
+                enabled=config.PREGENERATION_ENABLED,
+                running=self.running,
+                active_parcels=active_parcels,
+                covered_parcels=len(ages),
+                fresh_parcels=fresh_parcels,
+                coverage_percent=(
+                    100 * fresh_parcels / active_parcels if active_parcels else 0.0
+                ),
+                oldest_age_seconds=max(ages) if ages else None,
+                average_age_seconds=sum(ages) / len(ages) if ages else None,
+                generated=self._generated,
+                refreshed_on_change=self._refreshed_on_change,
+                skipped_busy=self._skipped_busy,
+                failures=self._failures,
+                last_run_at=self._last_run_at,
+            )
@@ -1,7 +1,8 @@
 from pydantic import BaseModel
+import datetime as dt
 from typing import List
 
-from app.models.project import ProjectDetails
+from app.models.project import NearbyProject, ProjectDetails, ProjectSearchResult
 from app.services.projects_info import ProjectInfoService
 
 
@@ -58,3 +59,68 @@ class ProjectDomain(BaseModel):
         """
 
         return self.projects_info.get_project_by_parcel_id(parcel_id)
+
+    def search_projects(
+        self,
+        crop_type: str | None = None,
+        variety: str | None = None,
+        current_phase: str | None = None,
+        location: str | None = None,
+        planted_from: dt.date | None = None,
+        planted_to: dt.date | None = None,
+        cursor: str | None = None,
+        limit: int = 50,
+        facets: bool = False,
+    ) -> ProjectSearchResult:
+        """
+        Searches projects by crop, variety, phase, location and planting date range.
+
+        Returns:
+            ProjectSearchResult: The page of matching projects, the total number of
+                matches and the cursor of the next page.
+        """
+
+        return self.projects_info.search_projects(
+            crop_type=crop_type,
+            variety=variety,
+            current_phase=current_phase,
+            location=location,
+            planted_from=planted_from,
+            planted_to=planted_to,
+            cursor=cursor,
+            limit=limit,
+            facets=facets,
+        )
+
+    def nearest_projects(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 10,
+        radius_km: float | None = None,
+    ) -> List[NearbyProject]:
+        """
+        Retrieves the projects closest to a location.
+
+        Returns:
+            List[NearbyProject]: The closest projects with their distances, nearest first.
+        """
+
+        return self.projects_info.nearest_projects(
+            latitude=latitude, longitude=longitude, k=k, radius_km=radius_km
+        )
+
+    def nearby_projects(
+        self, parcel_id: str, k: int = 10, radius_km: float | None = None
+    ) -> List[NearbyProject] | None:
+        """
+        Retrieves the projects closest to a parcel.
+
+        Returns:
+            List[NearbyProject] | None: The closest projects with their distances, or
+                None if the parcel does not exist.
+        """
+
+        return self.projects_info.nearby_projects(
+            parcel_id=parcel_id, k=k, radius_km=radius_km
+        )
@@ -1,22 +1,114 @@
+import datetime as dt
+import hashlib
+import math
+import time
 from fastapi import HTTPException
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List
 from pydantic import BaseModel
 
-from app.models.project import ProjectDetails, HistoricalInformation
+from app.models.project import (
+    ProjectDetails,
+    HistoricalInformation,
+    ParcelHistorySummary,
+)
 from app.models.best_practices import BestIrrigationPractices, BestAgriculturalPractices
-from app.models.recommendations import RecommendationRequest, RecommendationResponse
+from app.models.knowledge import KnowledgeChunk
+from app.models.recommendations import (
+    RecommendationRequest,
+    RecommendationResponse,
+    RecommendationContext,
+    ContextFingerprint,
+    PrecomputedRecommendation,
+    RecommendationSections,
+)
 from app.models.process import ProcessInformation
 from app.models.lunar import LunarAnalysis
 from app.models.satellite import SatelliteImageAnalysis
 from app.models.weather import WeatherForecast
-from app.models.llms import ImplementedModels
+from app.models.telemetry import TelemetryAlert
+from app.models.subscriptions import ParcelEventType
+from app.models.llms import ImplementedModels, GenerationProfile, RoutingDecision
+from app.models.scheduling import ClientContext, QueueTicket
+from app.config.conf import config
 from app.services.projects_info import ProjectInfoService
 from app.services.process_info import ProcessInformationService
 from app.services.lunar_info import LunarInfoService
 from app.services.satellite_info import SatelliteInfoService
 from app.services.weather_info import WeatherInformationService
 from app.services.retrieval_info import RetrievalInfoService
-from app.services.llms import LLMsService
+from app.services.llms import LLMsService, estimate_tokens
+from app.services.generation_profiles import (
+    DEFAULT_MAX_NEW_TOKENS,
+    GenerationProfileService,
+)
+from app.services.model_router import MODEL_SPECS, model_router
+from app.services.precomputed_recommendations import precomputed_store
+from app.services.recommendation_history import recommendation_history
+from app.services.telemetry_monitor import telemetry_monitor
+from app.services.parcel_events import parcel_events
+from app.services.prefetched_contexts import prefetched_contexts
+from app.services.traffic_capture import traffic_recorder
+from app.core.metrics import metrics
+from app.core.profiling import stage, staged
+from app.core.prompt_fragments import prompt_fragments
+from app.core.executors import run_in_llm_executor
+from app.core.fair_scheduler import RateLimitExceeded, fair_scheduler
+
+PROMPT_LAYOUT_PREFIX_STABLE: str = "prefix_stable"
+# Ends the part of a "prefix_stable" prompt shared by every request of a parcel.
+PROMPT_PREFIX_END: str = "        **Current Conditions (may change between requests):**"
+
+RESPONSE_INSTRUCTIONS: str = """- Prioritize the most urgent or impactful actions.
+        - Be concise but clear in your recommendations and justifications.
+        - Base your justifications explicitly on the data provided (sensors, weather, images, history, manuals). Mention the source if relevant (e.g., 'according to manual', 'due to forecast').
+        - If you detect risks (pests, diseases, adverse weather), include them in the 'warnings' section.
+        - Report every sensor alert in the 'warnings' section, most urgent first, with the action it requires.
+        - If there is no sensor or image data, indicate this and base your recommendations on the rest of the information.
+        - If the question is very general (e.g., 'what to do?'), focus on the key next actions for the current crop phase and conditions.
+        - The default time horizon is the next week, unless the question specifies otherwise."""
+
+
+def prompt_prefix_hash(prompt: str) -> str | None:
+    """
+    Hash the stable prefix of a prompt built with the "prefix_stable" layout.
+
+    Prompts with the same hash start with the same instructions and parcel context, so
+    a prefix-caching inference server can reuse their KV state, and a load balancer can
+    send them to the same replica.
+
+    Args:
+        prompt (str): The prompt.
+
+    Returns:
+        str | None: The hash of everything before `PROMPT_PREFIX_END`, or None if the
+            prompt has no stable prefix (the "classic" layout).
+    """
+
+    end: int = prompt.find(PROMPT_PREFIX_END)
+
+    if end < 0:
+        return None
+
+    return hashlib.sha256(prompt[:end].encode()).hexdigest()[:16]
+
+
+def too_many_requests(error: RateLimitExceeded) -> HTTPException:
+    """
+    Build the 429 response of a request refused by the fair-share rate limit.
+
+    Args:
+        error (RateLimitExceeded): The refusal of the scheduler.
+
+    Returns:
+        HTTPException: The 429 error, with `Retry-After` in whole seconds.
+    """
+
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after_seconds))},
+    )
 
 
 class RecommendationDomain(BaseModel):
@@ -27,6 +119,7 @@ class RecommendationDomain(BaseModel):
     weather_service: WeatherInformationService = WeatherInformationService()
     retrieval_service: RetrievalInfoService = RetrievalInfoService()
     llms_service: LLMsService = LLMsService()
+    profile_service: GenerationProfileService = GenerationProfileService()
 
     def build_prompt(
         self,
@@ -39,8 +132,12 @@ class RecommendationDomain(BaseModel):
         best_irrigation_practices: BestIrrigationPractices | None,
         best_agricultural_practices: BestAgriculturalPractices | None,
         historical_information: List[HistoricalInformation] | None,
+        history_summary: ParcelHistorySummary | None = None,
+        knowledge_chunks: List[KnowledgeChunk] | None = None,
+        answer_format: str | None = None,
+        telemetry_alerts: List[TelemetryAlert] | None = None,
     ) -> str:
-        project_details_str: str = project_details.to_prompt_string()
+        project_details_str: str = prompt_fragments.render(project_details)
 
         process_info_str: str = (
             process_info.to_prompt_string() if process_info else "Not available"
@@ -53,35 +150,99 @@ class RecommendationDomain(BaseModel):
         )
 
         weather_forecast_str: str = (
-            weather_forecast.to_prompt_string() if weather_forecast else "Not available"
+            prompt_fragments.render(weather_forecast)
+            if weather_forecast
+            else "Not available"
         )
 
         best_irrigation_practices_str: str = (
-            best_irrigation_practices.to_prompt_string()
+            prompt_fragments.render(best_irrigation_practices)
             if best_irrigation_practices
             else "Not available"
         )
 
         best_agricultural_practices_str: str = (
-            best_agricultural_practices.to_prompt_string()
+            prompt_fragments.render(best_agricultural_practices)
             if best_agricultural_practices
             else "Not available"
         )
 
-        if len(historical_information) == 0:
+        if not historical_information:
             historical_information_str: str = "No historical information available"
         else:
             historical_information_str = """
             """.join(
                 [
-                    historical_information.to_prompt_string()
+                    prompt_fragments.render(historical_information)
                     for historical_information in historical_information
                 ]
             )
 
+        if not knowledge_chunks:
+            knowledge_chunks_str: str = "No manual excerpts available"
+        else:
+            knowledge_chunks_str = """
+            """.join([chunk.to_prompt_string() for chunk in knowledge_chunks])
+
+        if not telemetry_alerts:
+            telemetry_alerts_str: str = "No sensor alerts"
+        else:
+            telemetry_alerts_str = """
+        """.join([alert.to_prompt_string() for alert in telemetry_alerts])
+
+        history_summary_str: str = (
+            prompt_fragments.render(history_summary)
+            if history_summary
+            else "No history summary available"
+        )
+
         user_prompt: str = f"""User/System Request: {user_question}"""
+        answer_format = (
+            answer_format
+            or "Write 'Actions:', 'Warnings:' and 'Justifications:' sections."
+        )
+
+        if config.PROMPT_LAYOUT == PROMPT_LAYOUT_PREFIX_STABLE:
+            # Fixed instructions, then the parcel context that changes rarely, then
+            # what changes between requests, least volatile first, so the prompts of a
+            # parcel share everything up to PROMPT_PREFIX_END (see prompt_prefix_hash).
+            system_prompt: str = f"""
+        You are a virtual expert Agronomist Assistant for the Evergreen system. Your goal is to provide contextualized, proactive, and evidence-based recommendations for crop management.
+
+        Key Instructions for Your Response:
+        {RESPONSE_INSTRUCTIONS}
+
+        Use the following contextual information to generate your response:
+        1. **Crop/Project Details:**
+        {project_details_str}
+        2. **Best Practices for the Crop and Phase:**
+        {best_irrigation_practices_str}
+        {best_agricultural_practices_str}
+        3. **Parcel History Summary (all recorded seasons):**
+        {history_summary_str}
+        4. **Most Relevant Past Seasons:**
+        {historical_information_str}
+{PROMPT_PREFIX_END}
+        5. **Moon Phase (optional additional context):**
+        {lunar_analysis}
+        6. **Recent Image Analysis (if available):**
+        {satellite_analysis_str}
+        7. **Weather Forecast:**
+        {weather_forecast_str}
+        8. **Process Information (if available):**
+        {process_info_str}
+        **Sensor Alerts (streaming anomaly detection on the parcel's readings):**
+        {telemetry_alerts_str}
+        9. **Retrieved Agronomic Knowledge (manual excerpts for the request):**
+        {knowledge_chunks_str}
+
+        Answer format: {answer_format}
 
-        system_prompt: str = f"""
+        {user_prompt}
+        """
+
+        else:
+            system_prompt = f"""
         You are a virtual expert Agronomist Assistant for the Evergreen system. Your goal is to provide contextualized, proactive, and evidence-based recommendations for crop management.
 
         Use the following contextual information to generate your response:
@@ -89,6 +250,8 @@ class RecommendationDomain(BaseModel):
         {project_details_str}
         2. **Process Information (if available):**
         {process_info_str}
+        **Sensor Alerts (streaming anomaly detection on the parcel's readings):**
+        {telemetry_alerts_str}
         3. **Recent Image Analysis (if available):**
         {satellite_analysis_str}
         4. **Weather Forecast:**
@@ -98,16 +261,15 @@ class RecommendationDomain(BaseModel):
         6. **Retrieved Agronomic Knowledge (manuals, history, best practices):**
         {best_irrigation_practices_str}
         {best_agricultural_practices_str}
+        {knowledge_chunks_str}
+        7. **Parcel History Summary (all recorded seasons):**
+        {history_summary_str}
+        8. **Most Relevant Past Seasons:**
         {historical_information_str}
         
         Key Instructions for Your Response:
-        - Prioritize the most urgent or impactful actions.
-        - Be concise but clear in your recommendations and justifications.
-        - Base your justifications explicitly on the data provided (sensors, weather, images, history, manuals). Mention the source if relevant (e.g., 'according to manual', 'due to forecast').
-        - If you detect risks (pests, diseases, adverse weather), include them in the 'warnings' section.
-        - If there is no sensor or image data, indicate this and base your recommendations on the rest of the information.
-        - If the question is very general (e.g., 'what to do?'), focus on the key next actions for the current crop phase and conditions.
-        - The default time horizon is the next week, unless the question specifies otherwise.
+        {RESPONSE_INSTRUCTIONS}
+        - Answer format: {answer_format}
 
         {user_prompt}
         """
@@ -116,88 +278,601 @@ class RecommendationDomain(BaseModel):
 
         return system_prompt
 
-    def get_recommendations(
-        self, request: RecommendationRequest
-    ) -> RecommendationResponse:
-        project_details: ProjectDetails | None = (
-            self.projects_service.get_project_by_parcel_id(parcel_id=request.parcel_id)
+    def gather_context(self, parcel_id: str, user_question: str) -> RecommendationContext:
+        """
+        Gather the contextual information used to answer a question about a parcel.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+            user_question (str): The question, used to retrieve relevant manual passages.
+
+        Returns:
+            RecommendationContext: The context of the parcel.
+
+        Raises:
+            HTTPException: 404 if no project is registered for the parcel.
+        """
+
+        project_details: ProjectDetails | None = staged(
+            "context.project",
+            self.projects_service.get_project_by_parcel_id,
+            parcel_id=parcel_id,
         )
 
         if project_details is None:
             raise HTTPException(
                 status_code=404,
-                detail=f"Project not found for parcel ID {request.parcel_id}",
+                detail=f"Project not found for parcel ID {parcel_id}",
             )
 
-        process_info: ProcessInformation | None = (
-            self.process_service.get_process_information(parcel_id=request.parcel_id)
+        # Each service call is a stage of the request profile (a no-op unless profiled).
+        return RecommendationContext(
+            project_details=project_details,
+            process_info=staged(
+                "context.process",
+                self.process_service.get_process_information,
+                parcel_id=parcel_id,
+            ),
+            lunar_analysis=staged("context.lunar", self.lunar_service.get_lunar_info),
+            satellite_analysis=staged(
+                "context.satellite",
+                self.satellite_service.get_satellite_info_for_project,
+                project=project_details,
+            ),
+            weather_forecast=staged(
+                "context.weather",
+                self.weather_service.get_weather_forecast_for_project,
+                project=project_details,
+            ),
+            best_irrigation_practices=staged(
+                "context.retrieval.irrigation_practices",
+                self.retrieval_service.get_best_irrigation_practices,
+            ),
+            best_agricultural_practices=staged(
+                "context.retrieval.agricultural_practices",
+                self.retrieval_service.get_best_agricultural_practices,
+                crop_type=project_details.crop_type,
+                current_phase=project_details.current_phase,
+            ),
+            historical_information=(
+                staged(
+                    "context.retrieval.history",
+                    self.retrieval_service.get_relevant_historical_information,
+                    parcel_id=parcel_id,
+                    crop_type=project_details.crop_type,
+                    limit=config.HISTORY_PROMPT_MAX_SEASONS,
+                )
+                or []
+            ),
+            history_summary=staged(
+                "context.retrieval.history_summary",
+                self.retrieval_service.get_parcel_history_summary,
+                parcel_id=parcel_id,
+            ),
+            knowledge_chunks=staged(
+                "context.retrieval.knowledge",
+                self.retrieval_service.search_agronomic_knowledge,
+                question=user_question,
+                crop_type=project_details.crop_type,
+                current_phase=project_details.current_phase,
+                limit=config.KNOWLEDGE_SEARCH_MAX_CHUNKS,
+            ),
+            # After process_info, so the alerts include the reading just taken.
+            telemetry_alerts=staged(
+                "context.alerts", telemetry_monitor.alerts, parcel_id
+            ).alerts,
         )
 
-        lunar_analysis: LunarAnalysis | None = self.lunar_service.get_lunar_info()
+    def context_fingerprint(self, context: RecommendationContext) -> ContextFingerprint:
+        """
+        Extract the material signals of a parcel context.
 
-        satellite_analysis: SatelliteImageAnalysis | None = (
-            self.satellite_service.get_satellite_info(parcel_id=request.parcel_id)
-        )
+        Args:
+            context (RecommendationContext): The context of the parcel.
 
-        weather_forecast: WeatherForecast | None = (
-            self.weather_service.get_weather_forecast(location=project_details.location)
-        )
+        Returns:
+            ContextFingerprint: The signals compared against tolerance bands.
+        """
+
+        project: ProjectDetails = context.project_details
+        process: ProcessInformation | None = context.process_info
+        satellite: SatelliteImageAnalysis | None = context.satellite_analysis
+        weather: WeatherForecast | None = context.weather_forecast
 
-        best_irrigation_practices: BestIrrigationPractices | None = (
-            self.retrieval_service.get_best_irrigation_practices()
+        return ContextFingerprint(
+            crop_type=project.crop_type,
+            variety=project.variety,
+            current_phase=project.current_phase,
+            soil_moisture_percent=process.soil_moisture_percent if process else None,
+            rain_probability=(
+                max(day.precipitation_prob for day in weather.daily)
+                if weather and weather.daily
+                else None
+            ),
+            satellite_status=satellite.status.value if satellite else None,
+            detected_issue=(
+                satellite.detected_issue.value
+                if satellite and satellite.detected_issue
+                else None
+            ),
+            satellite_coverage_percent=satellite.coverage_percent if satellite else None,
+            active_alerts=sorted(
+                f"{alert.signal}:{alert.kind.value}:{alert.direction}"
+                for alert in context.telemetry_alerts
+            ),
         )
 
-        best_agricultural_practices: BestAgriculturalPractices | None = (
-            self.retrieval_service.get_best_agricultural_practices(
-                crop_type=project_details.crop_type,
-                current_phase=project_details.current_phase,
+    def material_changes(
+        self, previous: ContextFingerprint, current: ContextFingerprint
+    ) -> List[str]:
+        """
+        List the signals that moved outside their tolerance band.
+
+        The current context is always compared with the fingerprint the stored
+        recommendation was generated from, so slow drifts are caught once their total
+        exceeds the band. A signal that is unavailable now is not a change (the last
+        known value is assumed to hold), while a signal that became available is. A
+        sensor alert raised since the recommendation is always a change.
+
+        Args:
+            previous (ContextFingerprint): The fingerprint of the stored recommendation.
+            current (ContextFingerprint): The fingerprint of the current context.
+
+        Returns:
+            List[str]: A description of every material change, empty if none.
+        """
+
+        changes: List[str] = []
+
+        for field in ["crop_type", "variety", "current_phase"]:
+            if getattr(previous, field) != getattr(current, field):
+                changes.append(
+                    f"{field} changed from {getattr(previous, field)} "
+                    f"to {getattr(current, field)}"
+                )
+
+        bands: List[tuple[str, str, float]] = [
+            (
+                "soil_moisture_percent",
+                "soil moisture",
+                config.MATERIALITY_SOIL_MOISTURE_TOLERANCE,
+            ),
+            (
+                "rain_probability",
+                "rain probability",
+                config.MATERIALITY_RAIN_PROBABILITY_TOLERANCE,
+            ),
+            (
+                "satellite_coverage_percent",
+                "satellite coverage",
+                config.MATERIALITY_SATELLITE_COVERAGE_TOLERANCE,
+            ),
+        ]
+
+        for field, label, tolerance in bands:
+            before: float | None = getattr(previous, field)
+            after: float | None = getattr(current, field)
+
+            if after is None:
+                continue
+
+            if before is None:
+                changes.append(f"{label} became available ({after:.2f})")
+            elif abs(after - before) > tolerance:
+                changes.append(
+                    f"{label} moved from {before:.2f} to {after:.2f} "
+                    f"(tolerance ±{tolerance:g})"
+                )
+
+        if current.satellite_status is not None and (
+            current.satellite_status != previous.satellite_status
+            or current.detected_issue != previous.detected_issue
+        ):
+            changes.append(
+                f"satellite status changed from {previous.satellite_status} "
+                f"({previous.detected_issue or 'no issue'}) to "
+                f"{current.satellite_status} ({current.detected_issue or 'no issue'})"
             )
+
+        new_alerts: List[str] = sorted(
+            set(current.active_alerts) - set(previous.active_alerts)
         )
 
-        historical_information: List[HistoricalInformation] | None = (
-            self.retrieval_service.get_historical_information_by_parcel_id(
-                parcel_id=request.parcel_id,
+        if new_alerts:
+            changes.append(f"new sensor alerts: {', '.join(new_alerts)}")
+
+        return changes
+
+    def generate_recommendation(
+        self, request: RecommendationRequest, context: RecommendationContext
+    ) -> RecommendationResponse:
+        """
+        Generate a recommendation with the LLM for a request and its gathered context.
+
+        Requests for the "auto" model are routed by the model router, which picks a
+        model from the question type, the prompt size and the latency SLO of the
+        request; the response reports the chosen model and the routing reason.
+
+        Args:
+            request (RecommendationRequest): The recommendation request.
+            context (RecommendationContext): The context of the parcel.
+
+        Returns:
+            RecommendationResponse: The generated recommendation.
+
+        Raises:
+            HTTPException: 400 if the model is not implemented, 500 if the LLM call fails.
+        """
+
+        profile: GenerationProfile | None = (
+            staged(
+                "generation.profile",
+                self.profile_service.profile_for,
+                request.user_question,
             )
+            if config.GENERATION_PROFILES_ENABLED
+            else None
         )
 
-        prompt: str = self.build_prompt(
+        prompt: str = staged(
+            "generation.build_prompt",
+            self.build_prompt,
             user_question=request.user_question,
-            project_details=project_details,
-            process_info=process_info,
-            lunar_analysis=lunar_analysis,
-            satellite_analysis=satellite_analysis,
-            weather_forecast=weather_forecast,
-            best_irrigation_practices=best_irrigation_practices,
-            best_agricultural_practices=best_agricultural_practices,
-            historical_information=historical_information,
-        )
-
-        if request.model in [
-            ImplementedModels.FLAN_T5_LARGE,
-            ImplementedModels.FALCON_RW_1B,
-            ImplementedModels.GPT_NEO_1_3B,
-        ]:
+            project_details=context.project_details,
+            process_info=context.process_info,
+            lunar_analysis=context.lunar_analysis,
+            satellite_analysis=context.satellite_analysis,
+            weather_forecast=context.weather_forecast,
+            best_irrigation_practices=context.best_irrigation_practices,
+            best_agricultural_practices=context.best_agricultural_practices,
+            historical_information=context.historical_information,
+            history_summary=context.history_summary,
+            knowledge_chunks=context.knowledge_chunks,
+            answer_format=profile.instructions if profile else None,
+            telemetry_alerts=context.telemetry_alerts,
+        )
+
+        prefix_hash: str | None = prompt_prefix_hash(prompt)
+        model: ImplementedModels = request.model
+        decision: RoutingDecision | None = None
+
+        if model == ImplementedModels.AUTO:
+            decision = staged(
+                "generation.routing",
+                model_router.route,
+                question_type=(
+                    profile.question_type
+                    if profile
+                    else self.profile_service.classify_question(request.user_question)
+                ),
+                prompt_tokens=estimate_tokens(prompt),
+                max_new_tokens=(
+                    profile.max_new_tokens if profile else DEFAULT_MAX_NEW_TOKENS
+                ),
+                latency_slo_ms=request.latency_slo_ms or config.ROUTER_DEFAULT_SLO_MS,
+            )
+            model = decision.model
+
+        if model in MODEL_SPECS:
+            started_at: float = time.perf_counter()
+
             try:
-                response: str = self.llms_service.query_huggingface_model(
-                    model=request.model,
+                response: str = staged(
+                    "generation.llm",
+                    self.llms_service.query_huggingface_model,
+                    model=model,
                     prompt=prompt,
-                )
-
-                return RecommendationResponse(
-                    model=ImplementedModels.FLAN_T5_LARGE,
-                    project_id=project_details.project_id,
-                    parcel_id=request.parcel_id,
-                    user_question=request.user_question,
-                    details=response,
+                    profile=profile,
+                    prefix_hash=prefix_hash,
                 )
 
             except Exception as e:
+                if decision is not None:
+                    model_router.log_outcome(
+                        decision, (time.perf_counter() - started_at) * 1000, str(e)
+                    )
+
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error querying LLM: {e}",
                 )
 
+            latency_ms: float = (time.perf_counter() - started_at) * 1000
+
+            if decision is not None:
+                model_router.log_outcome(decision, latency_ms, None)
+
+            sections: RecommendationSections = staged(
+                "generation.parse_sections",
+                self.profile_service.parse_sections,
+                response,
+            )
+
+            return RecommendationResponse(
+                model=model,
+                project_id=context.project_details.project_id,
+                parcel_id=request.parcel_id,
+                user_question=request.user_question,
+                details=response,
+                generated_at=dt.datetime.now(dt.timezone.utc),
+                question_type=profile.question_type.value if profile else None,
+                sections=sections,
+                routing_reason=decision.reason if decision else None,
+                latency_ms=round(latency_ms, 1),
+                prompt_prefix_hash=prefix_hash,
+            )
+
         raise HTTPException(
             status_code=400,
             detail=f"Requested LLM '{request.model}' not implemented",
         )
+
+    def find_reusable_recommendation(
+        self,
+        request: RecommendationRequest,
+        fingerprint: ContextFingerprint,
+    ) -> tuple[RecommendationResponse | None, str]:
+        """
+        Look up a stored recommendation that is still valid for the current context.
+
+        Args:
+            request (RecommendationRequest): The recommendation request.
+            fingerprint (ContextFingerprint): The fingerprint of the current context.
+
+        Returns:
+            tuple[RecommendationResponse | None, str]: The reusable recommendation (None
+                if it must be regenerated) and the reason of the decision.
+        """
+
+        if not config.RECOMMENDATION_REUSE_ENABLED:
+            return None, "Reuse of stored recommendations is disabled"
+
+        entry: PrecomputedRecommendation | None = precomputed_store.get(
+            model=request.model,
+            parcel_id=request.parcel_id,
+            question=request.normalized_question(),
+        )
+
+        if entry is None:
+            return None, "No stored recommendation for this parcel and question"
+
+        age_seconds: float = (
+            dt.datetime.now(dt.timezone.utc) - entry.generated_at
+        ).total_seconds()
+
+        if age_seconds > config.RECOMMENDATION_MAX_AGE_SECONDS:
+            return None, (
+                f"Stored recommendation expired ({age_seconds:.0f} s old, "
+                f"maximum {config.RECOMMENDATION_MAX_AGE_SECONDS} s)"
+            )
+
+        changes: List[str] = self.material_changes(entry.fingerprint, fingerprint)
+
+        if changes:
+            parcel_events.publish(
+                request.parcel_id, ParcelEventType.CONTEXT_CHANGE, {"changes": changes}
+            )
+            return None, "Context changed: " + "; ".join(changes)
+
+        reason: str = (
+            f"Every context signal is within tolerance of the recommendation "
+            f"generated {age_seconds:.0f} s ago"
+        )
+        response: RecommendationResponse = entry.response.model_copy(
+            update={
+                "served_from": (
+                    "precomputed" if entry.origin == "pregeneration" else "reused"
+                ),
+                "regenerated": False,
+                "regeneration_reason": reason,
+            }
+        )
+
+        return response, reason
+
+    def store_recommendation(
+        self,
+        request: RecommendationRequest,
+        response: RecommendationResponse,
+        fingerprint: ContextFingerprint,
+        origin: str,
+    ) -> None:
+        precomputed_store.put(
+            PrecomputedRecommendation(
+                response=response,
+                fingerprint=fingerprint,
+                generated_at=response.generated_at,
+                origin=origin,
+            ),
+            question=request.normalized_question(),
+            model=request.model,
+        )
+
+    def prefetched_context(
+        self, request: RecommendationRequest
+    ) -> RecommendationContext | None:
+        """
+        Take the context prefetched for a request's parcel when the parcel was viewed.
+
+        The prefetch gathered the knowledge passages of the default question, so they
+        are searched again for any other question. Sensor alerts are always re-read, as
+        they may have been raised since.
+
+        Args:
+            request (RecommendationRequest): The recommendation request.
+
+        Returns:
+            RecommendationContext | None: The context, or None if prefetching is
+                disabled or nothing was prefetched for the parcel.
+        """
+
+        if not config.PREFETCH_ENABLED:
+            return None
+
+        prefetched: tuple[RecommendationContext, str] | None = prefetched_contexts.take(
+            request.parcel_id
+        )
+
+        if prefetched is None:
+            return None
+
+        context, question = prefetched
+        update: Dict[str, Any] = {
+            "telemetry_alerts": telemetry_monitor.alerts(request.parcel_id).alerts
+        }
+
+        if question != request.normalized_question():
+            project: ProjectDetails = context.project_details
+            update["knowledge_chunks"] = (
+                self.retrieval_service.search_agronomic_knowledge(
+                    question=request.user_question,
+                    crop_type=project.crop_type,
+                    current_phase=project.current_phase,
+                    limit=config.KNOWLEDGE_SEARCH_MAX_CHUNKS,
+                )
+            )
+
+        return context.model_copy(update=update)
+
+    def prepare_recommendation(
+        self, request: RecommendationRequest
+    ) -> tuple[
+        RecommendationContext,
+        ContextFingerprint,
+        RecommendationResponse | None,
+        str,
+    ]:
+        """
+        Gather the context of a request and check whether a stored recommendation applies.
+
+        Args:
+            request (RecommendationRequest): The recommendation request.
+
+        Returns:
+            tuple: The context, its fingerprint, the reusable recommendation (None if it
+                must be generated) and the reason of the decision.
+        """
+
+        with stage("context"):
+            context: RecommendationContext = self.prefetched_context(
+                request
+            ) or self.gather_context(
+                parcel_id=request.parcel_id, user_question=request.user_question
+            )
+
+        fingerprint: ContextFingerprint = staged(
+            "reuse.fingerprint", self.context_fingerprint, context
+        )
+        traffic_recorder.resolved(fingerprint)
+        reused, reason = staged(
+            "reuse.lookup", self.find_reusable_recommendation, request, fingerprint
+        )
+
+        if reused is not None:
+            metrics.increment("recommendations.reused")
+
+        return context, fingerprint, reused, reason
+
+    def record_history(
+        self,
+        response: RecommendationResponse,
+        fingerprint: ContextFingerprint,
+        origin: str,
+    ) -> None:
+        if config.RECOMMENDATION_HISTORY_ENABLED:
+            recommendation_history.record(response, fingerprint, origin=origin)
+
+    def finish_recommendation(
+        self,
+        request: RecommendationRequest,
+        response: RecommendationResponse,
+        fingerprint: ContextFingerprint,
+        reason: str,
+        origin: str = "live",
+    ) -> RecommendationResponse:
+        metrics.increment("recommendations.regenerated")
+
+        with stage("finish"):
+            if config.RECOMMENDATION_REUSE_ENABLED:
+                self.store_recommendation(request, response, fingerprint, origin=origin)
+
+            response = response.model_copy(update={"regeneration_reason": reason})
+            self.record_history(response, fingerprint, origin=origin)
+            parcel_events.publish(
+                response.parcel_id, ParcelEventType.RECOMMENDATION, response
+            )
+
+        return response
+
+    def get_recommendations(
+        self, request: RecommendationRequest, origin: str = "live"
+    ) -> RecommendationResponse:
+        context, fingerprint, reused, reason = self.prepare_recommendation(request)
+
+        if reused is not None:
+            return reused
+
+        response: RecommendationResponse = self.generate_recommendation(
+            request=request, context=context
+        )
+
+        return self.finish_recommendation(
+            request, response, fingerprint, reason, origin=origin
+        )
+
+    async def aget_recommendations(
+        self,
+        request: RecommendationRequest,
+        client: ClientContext | None = None,
+        ticket: QueueTicket | None = None,
+    ) -> RecommendationResponse:
+        """
+        Asynchronous variant of `get_recommendations` used by the API.
+
+        Context gathering and the store lookups are short and run on Starlette's
+        threadpool, while the LLM call runs on the dedicated LLM executor, so a burst of
+        slow generations never holds the threads other endpoints rely on. When a client
+        is given and `FAIR_SHARE_ENABLED` is set, the LLM call first waits for a slot of
+        the fair-share scheduler; reused recommendations never wait.
+
+        Args:
+            request (RecommendationRequest): The recommendation request.
+            client (ClientContext | None): The client the LLM capacity is shared with.
+            ticket (QueueTicket | None): Filled with the queue position and waits.
+
+        Returns:
+            RecommendationResponse: The reused or generated recommendation.
+
+        Raises:
+            HTTPException: 429 if the client exceeded its rate limit.
+        """
+
+        context, fingerprint, reused, reason = await run_in_threadpool(
+            self.prepare_recommendation, request
+        )
+
+        if reused is not None:
+            return reused
+
+        # Awaited on the event loop: includes the fair-share and executor queues.
+        with stage("generation"):
+            if client is None or not config.FAIR_SHARE_ENABLED:
+                response: RecommendationResponse = await run_in_llm_executor(
+                    self.generate_recommendation, request=request, context=context
+                )
+
+            else:
+                try:
+                    async with fair_scheduler.slot(client, ticket or QueueTicket()):
+                        response = await run_in_llm_executor(
+                            self.generate_recommendation,
+                            request=request,
+                            context=context,
+                        )
+
+                except RateLimitExceeded as e:
+                    raise too_many_requests(e)
+
+        return await run_in_threadpool(
+            self.finish_recommendation, request, response, fingerprint, reason
+        )
@@ -1,12 +1,32 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
 from app.api.router import server_router
+from app.api.routes.recomendations import recommendation_pregenerator
 from app.config.conf import config
+from app.services.recommendation_history import recommendation_history
+from app.services.traffic_capture import traffic_recorder
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if config.PREGENERATION_ENABLED:
+        recommendation_pregenerator.start()
+
+    yield
+
+    recommendation_pregenerator.stop()
+    recommendation_history.flush()
+    traffic_recorder.flush()
+
 
 app: FastAPI = FastAPI(
     title=config.API_NAME,
     description=config.API_DESCRIPTION,
     version=config.API_VERSION,
+    lifespan=lifespan,
 )
 
 app.include_router(server_router)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import ClassVar, List
 
 
 class BestIrrigationPractices(BaseModel):
@@ -15,6 +15,8 @@ class BestIrrigationPractices(BaseModel):
             a specific irrigation practice or recommendation.
     """
 
+    PROMPT_TEMPLATE_VERSION: ClassVar[int] = 1
+
     practices: List[str]
 
     def to_prompt_string(self) -> str:
@@ -52,6 +54,8 @@ class BestAgriculturalPractices(BaseModel):
             a specific agricultural practice or recommendation for the given crop type.
     """
 
+    PROMPT_TEMPLATE_VERSION: ClassVar[int] = 1
+
     crop_type: str
     current_phase: str
     practices: List[str]
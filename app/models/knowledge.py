@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+
+
+class KnowledgeChunk(BaseModel):
+    """
+    A data model representing a passage of an agronomic manual stored in the retrieval index.
+
+    Chunks are produced by the manuals ingestion job and retrieved by similarity to the
+    user's question, filtered by the crop type and phase they apply to.
+
+    Attributes:
+        chunk_id (str): Content hash identifying the chunk in the retrieval index
+        source (str): Path of the manual the chunk was taken from, relative to the corpus root
+        crop_type (str): Crop type the manual applies to, or "*" for every crop
+        current_phase (str): Crop phase the manual applies to, or "*" for every phase
+        text (str): The text of the chunk
+        score (float | None): Relevance score of the chunk for the current query, if retrieved
+    """
+
+    chunk_id: str
+    source: str
+    crop_type: str
+    current_phase: str
+    text: str
+    score: float | None = None
+
+    def to_prompt_string(self) -> str:
+        """Convert the knowledge chunk into a formatted string suitable for use in prompts.
+
+        This method formats the chunk into a human-readable string that can be used
+        as context in prompts or for display purposes, citing the manual it comes from.
+
+        Returns:
+            str: A formatted string containing the source of the chunk followed by its text.
+        """
+
+        return f"""
+            - Source: {self.source}
+              {self.text}
+        """
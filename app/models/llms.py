@@ -1,7 +1,122 @@
 from enum import Enum
+from pydantic import BaseModel
+from typing import List
 
 
 class ImplementedModels(Enum):
     FLAN_T5_LARGE = "google/flan-t5-large"
     FALCON_RW_1B = "tiiuae/falcon-rw-1b"
     GPT_NEO_1_3B = "EleutherAI/gpt-neo-1.3B"
+    # Let the model router choose the model of each request.
+    AUTO = "auto"
+
+
+class QuestionType(Enum):
+    YES_NO = "yes_no"
+    FACT = "fact"
+    DIAGNOSIS = "diagnosis"
+    PLAN = "plan"
+
+
+class GenerationProfile(BaseModel):
+    """
+    The generation parameters used for a type of question.
+
+    Attributes:
+        question_type (QuestionType): The type of question the profile answers
+        max_new_tokens (int): The token budget of the completion
+        temperature (float): The sampling temperature, 0 for greedy decoding
+        stop_sequences (List[str]): Sequences that end the completion early
+        instructions (str): The answer format requested in the prompt
+    """
+
+    question_type: QuestionType
+    max_new_tokens: int
+    temperature: float
+    stop_sequences: List[str]
+    instructions: str
+
+
+class GenerationResult(BaseModel):
+    """
+    A completion and what it cost to generate.
+
+    Attributes:
+        text (str): The generated text
+        generated_tokens (int): The number of generated tokens (estimated when the
+            backend does not report it)
+        latency_ms (float): The generation latency in milliseconds
+    """
+
+    text: str
+    generated_tokens: int
+    latency_ms: float
+
+
+class ModelSpec(BaseModel):
+    """
+    The static characteristics of a model used to route requests.
+
+    Attributes:
+        model (ImplementedModels): The model
+        context_window_tokens (int): The maximum number of input tokens
+        output_shares_window (bool): Whether generated tokens count against the window
+            (decoder-only models) or not (encoder-decoder models)
+        quality (int): The relative answer quality, higher is better
+        prior_ms_per_token (float): The expected generation latency per output token
+            before any observation
+    """
+
+    model: ImplementedModels
+    context_window_tokens: int
+    output_shares_window: bool
+    quality: int
+    prior_ms_per_token: float
+
+
+class RoutingCandidate(BaseModel):
+    """
+    How a model scored for a routing decision.
+
+    Attributes:
+        model (ImplementedModels): The candidate model
+        fits_context (bool): Whether the prompt and output fit in its context window
+        expected_latency_ms (float): The expected latency for the token budget
+        error_rate (float): The observed error rate (EWMA)
+        quality (int): The relative answer quality
+        observations (int): The number of generations observed
+    """
+
+    model: ImplementedModels
+    fits_context: bool
+    expected_latency_ms: float
+    error_rate: float
+    quality: int
+    observations: int
+
+
+class RoutingDecision(BaseModel):
+    """
+    The model chosen for a request and why.
+
+    Attributes:
+        decision_id (str): The identifier linking the decision to its logged outcome
+        model (ImplementedModels): The chosen model
+        reason (str): Why the model was chosen
+        question_type (QuestionType): The classified question type
+        required_quality (int): The minimum quality for the question type
+        prompt_tokens (int): The estimated prompt size
+        max_new_tokens (int): The token budget of the completion
+        latency_slo_ms (float): The latency objective of the request
+        candidates (List[RoutingCandidate]): The score of every model
+    """
+
+    decision_id: str
+    model: ImplementedModels
+    reason: str
+    question_type: QuestionType
+    required_quality: int
+    prompt_tokens: int
+    max_new_tokens: int
+    latency_slo_ms: float
+    candidates: List[RoutingCandidate]
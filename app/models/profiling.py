@@ -0,0 +1,108 @@
+import datetime as dt
+from typing import List
+
+from pydantic import BaseModel
+
+
+class StageTiming(BaseModel):
+    """
+    The time spent in a stage of a profiled request.
+
+    Attributes:
+        name (str): The stage, dotted by pipeline step (e.g. "context.weather")
+        calls (int): How many times the stage ran during the request
+        wall_ms (float): The wall-clock time spent in the stage, in milliseconds
+        cpu_ms (float | None): The CPU time of the thread running the stage, None for
+            stages awaited on the event loop (its CPU time is shared with other requests)
+        process_blocks_delta (int): The net change in the memory blocks allocated by
+            the whole process while the stage ran (`sys.getallocatedblocks`). It is an
+            approximation of the stage's allocations: the allocations and frees of any
+            other thread or request running meanwhile are counted too
+    """
+
+    name: str
+    calls: int
+    wall_ms: float
+    cpu_ms: float | None
+    process_blocks_delta: int
+
+
+class StackSample(BaseModel):
+    """
+    A call stack seen by the sampling profiler and how often it was seen.
+
+    Attributes:
+        stack (str): The frames from the outermost, as "module:function" joined by ";"
+        count (int): The number of samples with this stack
+    """
+
+    stack: str
+    count: int
+
+
+class ProfileSummary(BaseModel):
+    """
+    The headline figures of a stored request profile.
+
+    Attributes:
+        profile_id (str): The ID to download the profile with
+        parcel_id (str): The parcel of the profiled request
+        trigger (str): "header" when requested by an admin, "sampled" otherwise
+        started_at (datetime): When the request started
+        wall_ms (float): The duration of the request, in milliseconds
+    """
+
+    profile_id: str
+    parcel_id: str
+    trigger: str
+    started_at: dt.datetime
+    wall_ms: float
+
+
+class RequestProfile(ProfileSummary):
+    """
+    The profile of one recommendation request.
+
+    Attributes:
+        stages (List[StageTiming]): The stages, in the order they first started
+        sample_interval_ms (float): The period of the sampling profiler
+        samples (int): The number of stack samples taken
+        stacks (List[StackSample]): The sampled stacks, most frequent first, in the
+            "collapsed" format read by flame graph tools
+    """
+
+    stages: List[StageTiming]
+    sample_interval_ms: float
+    samples: int
+    stacks: List[StackSample]
+
+    def summary(self) -> ProfileSummary:
+        return ProfileSummary(
+            profile_id=self.profile_id,
+            parcel_id=self.parcel_id,
+            trigger=self.trigger,
+            started_at=self.started_at,
+            wall_ms=self.wall_ms,
+        )
+
+    def server_timing(self) -> str:
+        """
+        Format the stages as a `Server-Timing` header, shown by browser dev tools.
+
+        Returns:
+            str: The header value.
+        """
+
+        return ", ".join(
+            f"{stage.name};dur={stage.wall_ms:.1f}" for stage in self.stages
+        )
+
+    def collapsed_stacks(self) -> str:
+        """
+        Format the sampled stacks for flame graph tools (flamegraph.pl, speedscope).
+
+        Returns:
+            str: One "frame;frame;frame count" line per stack.
+        """
+
+        return "".join(f"{sample.stack} {sample.count}\n" for sample in self.stacks)
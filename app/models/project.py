@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import ClassVar, Dict, List
 
 
 class HistoricalInformation(BaseModel):
@@ -15,14 +16,18 @@ class HistoricalInformation(BaseModel):
         planting_date (str): Date when the crop was planted in YYYY-MM-DD format
         issues (str): Any problems or challenges encountered during the growing season
         notes (str): Additional observations or important information about the season
+        yield_t_ha (float | None): Harvested yield in tonnes per hectare, if recorded
     """
 
+    PROMPT_TEMPLATE_VERSION: ClassVar[int] = 1
+
     year: int
     parcel_id: str
     crop_type: str
     planting_date: str
     issues: str
     notes: str
+    yield_t_ha: float | None = None
 
     def to_prompt_string(self) -> str:
         """Convert the historical information into a formatted string suitable for use in prompts.
@@ -33,9 +38,14 @@ class HistoricalInformation(BaseModel):
 
         Returns:
             str: A formatted string containing all historical information, with each field on a new line.
-                 The string includes year, parcel ID, crop type, planting date, issues, and notes.
+                 The string includes year, parcel ID, crop type, planting date, issues, notes and,
+                 when recorded, the yield.
         """
 
+        yield_str: str = (
+            f"{self.yield_t_ha} t/ha" if self.yield_t_ha is not None else "Not recorded"
+        )
+
         return f"""
             - Year: {self.year}
             - Parcel ID: {self.parcel_id}
@@ -43,6 +53,75 @@ class HistoricalInformation(BaseModel):
             - Planting Date: {self.planting_date}
             - Issues: {self.issues}
             - Notes: {self.notes}
+            - Yield: {yield_str}
+        """
+
+
+class ParcelHistorySummary(BaseModel):
+    """A data model summarizing every recorded season of a specific parcel.
+
+    The summary is maintained incrementally as historical records are ingested, so it
+    condenses decades of history into a fixed-size block of prompt context.
+
+    Attributes:
+        parcel_id (str): Unique identifier for the specific plot/field
+        total_seasons (int): Number of seasons recorded for the parcel
+        first_year (int): Earliest recorded year
+        last_year (int): Most recent recorded year
+        crop_types (List[str]): Crop types cultivated in the parcel, most frequent first
+        recurring_issues (List[str]): Issues reported in more than one season, with their counts
+        yield_trend (str): Direction of the yield over the years ('improving', 'declining',
+            'stable' or 'unknown')
+        yield_slope_t_ha_per_year (float | None): Least-squares slope of the yield per year
+        best_planting_months (List[str]): Planting months with the best outcomes, best first
+    """
+
+    PROMPT_TEMPLATE_VERSION: ClassVar[int] = 1
+
+    parcel_id: str
+    total_seasons: int
+    first_year: int
+    last_year: int
+    crop_types: List[str]
+    recurring_issues: List[str]
+    yield_trend: str
+    yield_slope_t_ha_per_year: float | None
+    best_planting_months: List[str]
+
+    def to_prompt_string(self) -> str:
+        """Convert the parcel history summary into a formatted string suitable for use in prompts.
+
+        This method formats the summary into a human-readable string that can be used
+        as context in prompts or for display purposes. Each field is presented on a new line with
+        a clear label.
+
+        Returns:
+            str: A formatted string containing the history summary, with each field on a new line.
+                 The string includes the recorded period, crops, recurring issues, yield trend
+                 and best planting months.
+        """
+
+        recurring_issues_str: str = (
+            ", ".join(self.recurring_issues) if self.recurring_issues else "None"
+        )
+        best_planting_months_str: str = (
+            ", ".join(self.best_planting_months)
+            if self.best_planting_months
+            else "Not enough data"
+        )
+        yield_trend_str: str = (
+            f"{self.yield_trend} ({self.yield_slope_t_ha_per_year:+.2f} t/ha per year)"
+            if self.yield_slope_t_ha_per_year is not None
+            else self.yield_trend
+        )
+
+        return f"""
+            - Parcel ID: {self.parcel_id}
+            - Recorded Seasons: {self.total_seasons} ({self.first_year}-{self.last_year})
+            - Crop Types: {", ".join(self.crop_types)}
+            - Recurring Issues: {recurring_issues_str}
+            - Yield Trend: {yield_trend_str}
+            - Best Planting Months: {best_planting_months_str}
         """
 
 
@@ -61,8 +140,12 @@ class ProjectDetails(BaseModel):
         variety (str): Specific variety or cultivar of the crop
         planting_date (str): Date when the crop was planted (format: YYYY-MM-DD)
         current_phase (str): Current growth or development phase of the crop
+        latitude (float | None): Latitude of the parcel in decimal degrees, if known
+        longitude (float | None): Longitude of the parcel in decimal degrees, if known
     """
 
+    PROMPT_TEMPLATE_VERSION: ClassVar[int] = 1
+
     project_id: str
     parcel_id: str
     location: str
@@ -70,6 +153,8 @@ class ProjectDetails(BaseModel):
     variety: str
     planting_date: str
     current_phase: str
+    latitude: float | None = None
+    longitude: float | None = None
 
     def to_prompt_string(self) -> str:
         """Convert the project details into a formatted string suitable for use in prompts.
@@ -93,3 +178,35 @@ class ProjectDetails(BaseModel):
             - Planting Date: {self.planting_date}
             - Current Phase: {self.current_phase}
         """
+
+
+class ProjectSearchResult(BaseModel):
+    """
+    A page of projects matching a search, with the total number of matches.
+
+    Attributes:
+        total (int): Number of projects matching the filters
+        count (int): Number of projects in this page
+        next_cursor (str | None): Cursor of the next page, None on the last page
+        facets (Dict[str, Dict[str, int]]): Matches per crop type and phase, when requested
+        projects (List[ProjectDetails]): The projects of this page
+    """
+
+    total: int
+    count: int
+    next_cursor: str | None
+    facets: Dict[str, Dict[str, int]] = {}
+    projects: List[ProjectDetails]
+
+
+class NearbyProject(BaseModel):
+    """
+    A project returned by a nearest-neighbour query.
+
+    Attributes:
+        distance_km (float): Great-circle distance from the query point in kilometres
+        project (ProjectDetails): The project
+    """
+
+    distance_km: float
+    project: ProjectDetails
@@ -1,6 +1,23 @@
+import re
+import datetime as dt
 from pydantic import BaseModel
+from typing import List
 
 from app.models.llms import ImplementedModels
+from app.models.project import (
+    ProjectDetails,
+    HistoricalInformation,
+    ParcelHistorySummary,
+)
+from app.models.best_practices import BestIrrigationPractices, BestAgriculturalPractices
+from app.models.knowledge import KnowledgeChunk
+from app.models.process import ProcessInformation
+from app.models.lunar import LunarAnalysis
+from app.models.satellite import SatelliteImageAnalysis
+from app.models.weather import WeatherForecast
+from app.models.telemetry import TelemetryAlert
+
+_WHITESPACE: re.Pattern = re.compile(r"\s+")
 
 
 class RecommendationRequest(BaseModel):
@@ -15,11 +32,42 @@ class RecommendationRequest(BaseModel):
         parcel_id (str): The unique identifier of the parcel
         user_question (str): The user's question or query about agricultural actions.
                              Defaults to a standard query about next 5-7 day actions.
+        latency_slo_ms (float | None): The latency objective used when `model` is
+            "auto". Defaults to `ROUTER_DEFAULT_SLO_MS`.
     """
 
     model: ImplementedModels = ImplementedModels.FLAN_T5_LARGE
     parcel_id: str
     user_question: str = "What actions should I take on my crop over the next 5-7 days?"
+    latency_slo_ms: float | None = None
+
+    def normalized_question(self) -> str:
+        """
+        Return the user question in a canonical form used to recognize identical questions.
+
+        The question is lower-cased, its whitespace collapsed and its trailing punctuation
+        removed, so "What should I do?" and "what should  I do" are considered equal.
+
+        Returns:
+            str: The normalized question.
+        """
+
+        return _WHITESPACE.sub(" ", self.user_question).strip().lower().rstrip("?!. ")
+
+
+class RecommendationSections(BaseModel):
+    """
+    A recommendation split into structured sections.
+
+    Attributes:
+        actions (List[str]): The recommended actions, most urgent first
+        warnings (List[str]): The detected risks
+        justifications (List[str]): The evidence behind the actions
+    """
+
+    actions: List[str] = []
+    warnings: List[str] = []
+    justifications: List[str] = []
 
 
 class RecommendationResponse(BaseModel):
@@ -35,6 +83,20 @@ class RecommendationResponse(BaseModel):
         parcel_id (str): The unique identifier of the parcel for which recommendations are provided
         user_question (str): The user's question or query about agricultural actions.
         details (str): The detailed recommendations or actions suggested for the parcel
+        generated_at (datetime | None): When the recommendation was generated by the LLM
+        served_from (str): "live" when generated for this request, "reused" when an earlier
+            recommendation for the same question was still valid, "precomputed" when served
+            from the background pre-generation store
+        regenerated (bool): Whether the LLM was called for this request
+        regeneration_reason (str | None): Why the recommendation was or wasn't regenerated
+        question_type (str | None): The type of question, which chose the generation profile
+        sections (RecommendationSections | None): The details split into actions,
+            warnings and justifications
+        routing_reason (str | None): Why the model was chosen, for "auto" requests
+        latency_ms (float | None): How long the LLM call that generated the
+            recommendation took, in milliseconds
+        prompt_prefix_hash (str | None): The hash of the stable prefix of the prompt,
+            with `PROMPT_LAYOUT="prefix_stable"`
     """
 
     model: ImplementedModels
@@ -42,3 +104,165 @@ class RecommendationResponse(BaseModel):
     parcel_id: str
     user_question: str
     details: str
+    generated_at: dt.datetime | None = None
+    served_from: str = "live"
+    regenerated: bool = True
+    regeneration_reason: str | None = None
+    question_type: str | None = None
+    sections: RecommendationSections | None = None
+    routing_reason: str | None = None
+    latency_ms: float | None = None
+    prompt_prefix_hash: str | None = None
+
+
+class RecommendationContext(BaseModel):
+    """
+    The contextual information gathered for a parcel before generating a recommendation.
+
+    Attributes:
+        project_details (ProjectDetails): The project the parcel belongs to
+        process_info (ProcessInformation | None): The latest sensor readings, if available
+        lunar_analysis (LunarAnalysis | None): The current moon phase, if available
+        satellite_analysis (SatelliteImageAnalysis | None): The latest image analysis, if available
+        weather_forecast (WeatherForecast | None): The weather forecast, if available
+        best_irrigation_practices (BestIrrigationPractices | None): Irrigation practices
+        best_agricultural_practices (BestAgriculturalPractices | None): Practices for the crop and phase
+        historical_information (List[HistoricalInformation]): The most relevant past seasons
+        history_summary (ParcelHistorySummary | None): The summary of every recorded season
+        knowledge_chunks (List[KnowledgeChunk]): Manual passages relevant to the question
+        telemetry_alerts (List[TelemetryAlert]): The active sensor alerts of the parcel,
+            most urgent first
+    """
+
+    project_details: ProjectDetails
+    process_info: ProcessInformation | None
+    lunar_analysis: LunarAnalysis | None
+    satellite_analysis: SatelliteImageAnalysis | None
+    weather_forecast: WeatherForecast | None
+    best_irrigation_practices: BestIrrigationPractices | None
+    best_agricultural_practices: BestAgriculturalPractices | None
+    historical_information: List[HistoricalInformation]
+    history_summary: ParcelHistorySummary | None
+    knowledge_chunks: List[KnowledgeChunk]
+    telemetry_alerts: List[TelemetryAlert] = []
+
+
+class ContextFingerprint(BaseModel):
+    """
+    The material signals of a parcel context a recommendation was based on.
+
+    A stored recommendation stays valid while every signal of the current context is
+    within the configured tolerance band of its fingerprint. None means the signal was
+    not available (e.g. a sensor failure or cloud cover).
+
+    Attributes:
+        crop_type (str): The crop of the project
+        variety (str): The variety of the crop
+        current_phase (str): The growth phase of the crop
+        soil_moisture_percent (float | None): The soil moisture reading
+        rain_probability (float | None): The highest precipitation probability of the forecast (0.0 to 1.0)
+        satellite_status (str | None): The status of the latest satellite analysis
+        detected_issue (str | None): The issue detected by the latest satellite analysis
+        satellite_coverage_percent (float | None): The vegetation coverage of the latest satellite analysis
+        active_alerts (List[str]): The active sensor alerts, as "signal:kind:direction"
+    """
+
+    crop_type: str
+    variety: str
+    current_phase: str
+    soil_moisture_percent: float | None
+    rain_probability: float | None
+    satellite_status: str | None
+    detected_issue: str | None
+    satellite_coverage_percent: float | None
+    active_alerts: List[str] = []
+
+
+class PrecomputedRecommendation(BaseModel):
+    """
+    A stored recommendation, reused while the parcel context stays within tolerance.
+
+    Attributes:
+        response (RecommendationResponse): The generated recommendation
+        fingerprint (ContextFingerprint): The material context the recommendation was based on
+        generated_at (datetime): When the recommendation was generated
+        origin (str): "pregeneration" when generated by the background scheduler, "live"
+            when generated for an interactive request
+    """
+
+    response: RecommendationResponse
+    fingerprint: ContextFingerprint
+    generated_at: dt.datetime
+    origin: str = "pregeneration"
+
+
+class PregenerationStats(BaseModel):
+    """
+    Coverage and staleness of the precomputed default recommendations.
+
+    Attributes:
+        enabled (bool): Whether background pre-generation is enabled
+        running (bool): Whether this worker runs the scheduler (only one worker per host does)
+        active_parcels (int): Number of active parcels in the catalogue
+        covered_parcels (int): Parcels with a precomputed recommendation
+        fresh_parcels (int): Covered parcels whose recommendation is younger than the maximum age
+        coverage_percent (float): Share of active parcels with a fresh recommendation
+        oldest_age_seconds (float | None): Age of the oldest precomputed recommendation
+        average_age_seconds (float | None): Average age of the precomputed recommendations
+        generated (int): Recommendations generated since the scheduler started
+        refreshed_on_change (int): Recommendations regenerated early because the context changed
+        skipped_busy (int): Generations postponed because no spare LLM capacity was available
+        failures (int): Generations that failed
+        last_run_at (datetime | None): When the scheduler last ran
+    """
+
+    enabled: bool
+    running: bool
+    active_parcels: int
+    covered_parcels: int
+    fresh_parcels: int
+    coverage_percent: float
+    oldest_age_seconds: float | None
+    average_age_seconds: float | None
+    generated: int
+    refreshed_on_change: int
+    skipped_busy: int
+    failures: int
+    last_run_at: dt.datetime | None
+
+
+class RecommendationHistoryEntry(BaseModel):
+    """
+    A generated recommendation stored in the recommendation history.
+
+    Attributes:
+        id (int): The position of the entry in the history
+        generated_at (datetime): When the recommendation was generated
+        origin (str): "live", "pregeneration" or "bulk"
+        fingerprint_hash (str): A hash of the context fingerprint, equal for
+            recommendations generated from the same material context
+        fingerprint (ContextFingerprint): The material context of the recommendation
+        response (RecommendationResponse): The recommendation, with its model and latency
+    """
+
+    id: int
+    generated_at: dt.datetime
+    origin: str
+    fingerprint_hash: str
+    fingerprint: ContextFingerprint
+    response: RecommendationResponse
+
+
+class RecommendationHistoryPage(BaseModel):
+    """
+    A page of the recommendation history, newest first.
+
+    Attributes:
+        count (int): Number of entries in this page
+        next_cursor (str | None): Cursor of the next page, None on the last page
+        entries (List[RecommendationHistoryEntry]): The entries of this page
+    """
+
+    count: int
+    next_cursor: str | None
+    entries: List[RecommendationHistoryEntry]
@@ -71,3 +71,22 @@ class SatelliteImageAnalysis(BaseModel):
         - Detected Issue: {self.detected_issue}
         - Coverage Percent: {self.coverage_percent}%
         """
+
+
+class SatelliteTile(BaseModel):
+    """
+    A satellite image tile shared by every parcel inside it.
+
+    Attributes:
+        tile_id (str): Identifier of the tile (grid row and column)
+        captured_at (datetime): When the image was captured
+        available (bool): False when the tile is covered by clouds or missing
+        status (SatelliteImageAnalysisStatus): Status detected over the tile
+        detected_issue (Anomality | None): Issue detected over the tile, if any
+    """
+
+    tile_id: str
+    captured_at: dt.datetime
+    available: bool
+    status: SatelliteImageAnalysisStatus
+    detected_issue: Anomality | None
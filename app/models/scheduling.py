@@ -0,0 +1,40 @@
+from enum import Enum
+from pydantic import BaseModel
+
+
+class RequestPriority(Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class ClientContext(BaseModel):
+    """
+    The client a request is scheduled for.
+
+    Attributes:
+        client_id (str): The client (e.g. a cooperative) sharing the LLM capacity
+        priority (RequestPriority): Interactive requests are served before batch ones
+        weight (float): The share of the capacity the client gets when it is contended
+        rate_limited (bool): Whether the client's requests go through its token bucket
+    """
+
+    client_id: str
+    priority: RequestPriority = RequestPriority.INTERACTIVE
+    weight: float = 1.0
+    rate_limited: bool = True
+
+
+class QueueTicket(BaseModel):
+    """
+    The position of a request in the LLM queue, reported back to the client.
+
+    Attributes:
+        position (int): The number of requests served before it when it was queued,
+            plus one; 0 when it was served without queuing
+        estimated_wait_ms (float): The estimated wait when it was queued
+        waited_ms (float): The time it actually waited for an LLM slot
+    """
+
+    position: int = 0
+    estimated_wait_ms: float = 0.0
+    waited_ms: float = 0.0
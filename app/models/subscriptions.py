@@ -0,0 +1,70 @@
+import datetime as dt
+from enum import Enum
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+
+
+class ParcelEventType(Enum):
+    """
+    The kind of change pushed to the clients subscribed to a parcel.
+
+    Values:
+        RECOMMENDATION: A recommendation was generated for the parcel
+        ALERT: The anomaly detector raised a new sensor alert
+        CONTEXT_CHANGE: A context signal moved outside its tolerance band, so the
+            stored recommendation no longer applies
+    """
+
+    RECOMMENDATION = "recommendation"
+    ALERT = "alert"
+    CONTEXT_CHANGE = "context_change"
+
+
+class ParcelEvent(BaseModel):
+    """
+    A change of a parcel pushed to its subscribers.
+
+    Attributes:
+        type (ParcelEventType): The kind of change
+        parcel_id (str): The ID of the parcel
+        produced_at (datetime): When the change was produced
+        data (Dict[str, Any]): The recommendation, the alert, or the list of changes
+    """
+
+    type: ParcelEventType
+    parcel_id: str
+    produced_at: dt.datetime
+    data: Dict[str, Any]
+
+
+class SubscriptionUpdate(BaseModel):
+    """
+    A message sent by a WebSocket client to change the parcels it follows.
+
+    Attributes:
+        subscribe (List[str]): Parcel IDs to start following
+        unsubscribe (List[str]): Parcel IDs to stop following
+    """
+
+    subscribe: List[str] = []
+    unsubscribe: List[str] = []
+
+
+class SubscriptionState(BaseModel):
+    """
+    The parcels a subscription follows, sent after every subscription update.
+
+    Attributes:
+        type (str): Always "subscriptions", to tell it apart from parcel events
+        parcel_ids (List[str]): The parcels followed
+        rejected (Dict[str, str]): The parcel IDs that could not be followed, and why
+        dropped (int): The events dropped so far because the client read too slowly
+        error (str | None): Why the last update message was ignored, if it was invalid
+    """
+
+    type: str = "subscriptions"
+    parcel_ids: List[str]
+    rejected: Dict[str, str] = {}
+    dropped: int = 0
+    error: str | None = None
@@ -0,0 +1,119 @@
+import datetime as dt
+from enum import Enum
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class AlertKind(Enum):
+    """
+    The detector that raised a telemetry alert.
+
+    Values:
+        OUT_OF_RANGE: The reading is outside the agronomic range of the signal
+        SPIKE: The reading is far from the forecast of the parcel (rolling z-score)
+        SHIFT: The level of the signal moved persistently (CUSUM change point)
+    """
+
+    OUT_OF_RANGE = "out_of_range"
+    SPIKE = "spike"
+    SHIFT = "shift"
+
+
+class TelemetrySource(Enum):
+    """
+    Where a sensor reading comes from.
+
+    Values:
+        GATEWAY: Pushed by a field gateway to the readings endpoint
+        SIMULATED: Simulated by the process information service for a request
+    """
+
+    GATEWAY = "gateway"
+    SIMULATED = "simulated"
+
+
+class TelemetrySignalSpec(BaseModel):
+    """
+    A monitored sensor signal of `ProcessInformation`.
+
+    Attributes:
+        field (str): The field of ProcessInformation holding the signal
+        label (str): The name of the signal in alerts and prompts
+        unit (str): The unit of the signal
+        low (float | None): The lowest agronomically safe value, None if unbounded
+        high (float | None): The highest agronomically safe value, None if unbounded
+        resolution (float): The smallest meaningful change (sensor noise), used as the
+            minimum standard deviation so flat signals do not produce huge z-scores
+    """
+
+    field: str
+    label: str
+    unit: str
+    low: float | None
+    high: float | None
+    resolution: float
+
+
+class TelemetryAlert(BaseModel):
+    """
+    An excursion detected in the sensor readings of a parcel.
+
+    Repeated detections of the same signal, kind and direction update one alert.
+
+    Attributes:
+        parcel_id (str): The ID of the parcel
+        signal (str): The signal label (e.g. "soil moisture")
+        kind (AlertKind): The detector that raised the alert
+        direction (str): "high" or "low"
+        value (float): The reading that raised (or last refreshed) the alert
+        expected (float): The forecast of the signal, or the violated bound
+        z_score (float | None): Standard deviations from the recent level
+        urgency (float): How urgent the alert is, from 0 to 1
+        detected_at (datetime): The timestamp of the first reading that raised it
+        last_seen_at (datetime): The timestamp of the last reading that raised it
+        occurrences (int): The number of readings that raised it
+    """
+
+    parcel_id: str
+    signal: str
+    kind: AlertKind
+    direction: str
+    value: float
+    expected: float
+    z_score: float | None
+    urgency: float
+    detected_at: dt.datetime
+    last_seen_at: dt.datetime
+    occurrences: int = 1
+
+    def to_prompt_string(self) -> str:
+        descriptions: Dict[AlertKind, str] = {
+            AlertKind.OUT_OF_RANGE: f"outside the safe range (limit {self.expected:g})",
+            AlertKind.SPIKE: (
+                f"{abs(self.z_score or 0):.1f} standard deviations from the expected "
+                f"level of {self.expected:.2f}"
+            ),
+            AlertKind.SHIFT: f"persistent shift from the expected {self.expected:.2f}",
+        }
+
+        return (
+            f"- [urgency {self.urgency:.2f}] {self.signal} {self.direction}: "
+            f"{self.value:.2f}, {descriptions[self.kind]} "
+            f"(since {self.detected_at:%Y-%m-%d %H:%M}, {self.occurrences} readings)"
+        )
+
+
+class ParcelAlerts(BaseModel):
+    """
+    The active telemetry alerts of a parcel.
+
+    Attributes:
+        parcel_id (str): The ID of the parcel
+        urgency (float): The urgency of the most urgent active alert, 0 if none
+        alerts (List[TelemetryAlert]): The active alerts, most urgent first
+    """
+
+    parcel_id: str
+    urgency: float
+    alerts: List[TelemetryAlert]
@@ -0,0 +1,34 @@
+import datetime as dt
+from pydantic import BaseModel
+
+from app.models.recommendations import ContextFingerprint, RecommendationRequest
+from app.models.scheduling import RequestPriority
+
+
+class CapturedRequest(BaseModel):
+    """
+    A recommendation request as served in production, recorded for replay.
+
+    Attributes:
+        arrived_at (datetime): When the request reached the API
+        request (RecommendationRequest): The request, with contact details and numbers
+            removed from the question
+        client_id (str): The client, pseudonymized unless it is a configured client
+        priority (RequestPriority): The priority the request was sent with
+        fingerprint (ContextFingerprint | None): The context the request resolved to,
+            or the request it was coalesced with resolved to; None if it failed before
+        status_code (int): The HTTP status of the response
+        served_from (str | None): Where the recommendation came from ("live", "reused")
+        latency_ms (float): The time the API took to answer, in milliseconds
+        queue_wait_ms (float | None): The time waited for a fair-share slot
+    """
+
+    arrived_at: dt.datetime
+    request: RecommendationRequest
+    client_id: str
+    priority: RequestPriority
+    fingerprint: ContextFingerprint | None = None
+    status_code: int = 200
+    served_from: str | None = None
+    latency_ms: float
+    queue_wait_ms: float | None = None
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 import datetime as dt
-from typing import List
+from typing import ClassVar, List
 
 
 class WeatherDailyForecast(BaseModel):
@@ -58,6 +58,8 @@ class WeatherForecast(BaseModel):
         daily: List of daily weather forecasts for the location
     """
 
+    PROMPT_TEMPLATE_VERSION: ClassVar[int] = 1
+
     created_at: dt.datetime
     location: str
     daily: List[WeatherDailyForecast]
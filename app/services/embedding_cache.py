@@ -0,0 +1,238 @@
+import fcntl
+import hashlib
+import json
+import os
+import struct
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+from app.config.conf import config
+from app.core.cache import LRUCache
+from app.core.metrics import metrics
+
+_INDEX_RECORD: struct.Struct = struct.Struct("<32sQ")
+
+
+def content_hash(text: str) -> bytes:
+    """
+    Return the SHA-256 digest identifying a text in the embedding cache.
+
+    Args:
+        text (str): The embedded text.
+
+    Returns:
+        bytes: The 32-byte digest of the text.
+    """
+
+    return hashlib.sha256(text.encode()).digest()
+
+
+class EmbeddingCache:
+    """
+    A persistent, append-only cache of embeddings keyed by content hash.
+
+    Each embedding model gets its own directory holding `vectors.f32`, a float32 matrix
+    with one row per cached text that is read through a memory map, and `index.bin`, a
+    log of (content hash, row) records. Writers serialize on an exclusive file lock and
+    always append the vectors before the index records that point at them, so readers
+    in any process can use the files without locking: they only ever see complete
+    index records for rows that are already written. A restarted process reads the
+    index log once and never re-embeds cached texts.
+
+    Attributes:
+        directory (str): The directory of the embedding model's cache files.
+        model_id (str): The id of the embedding model whose vectors are cached.
+    """
+
+    def __init__(self, directory: str, model_id: str) -> None:
+        self.directory: str = directory
+        self.model_id: str = model_id
+        self._lock: threading.Lock = threading.Lock()
+        self._rows: Dict[bytes, int] = {}
+        self._index_offset: int = 0
+        self._dimension: int | None = None
+        self._matrix: np.memmap | None = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path: str = os.path.join(directory, "vectors.f32")
+        self._index_path: str = os.path.join(directory, "index.bin")
+        self._meta_path: str = os.path.join(directory, "meta.json")
+        self._lock_path: str = os.path.join(directory, "write.lock")
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_index()
+            return len(self._rows)
+
+    def _load_dimension(self) -> int | None:
+        if self._dimension is None and os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as file:
+                self._dimension = json.load(file)["dimension"]
+
+        return self._dimension
+
+    def _refresh_index(self) -> None:
+        """
+        Read the index records appended since the last refresh, by any process.
+
+        Must be called while holding the instance lock.
+        """
+
+        if not os.path.exists(self._index_path):
+            return
+
+        with open(self._index_path, "rb") as file:
+            file.seek(self._index_offset)
+            data: bytes = file.read()
+
+        complete: int = len(data) - len(data) % _INDEX_RECORD.size
+
+        for digest, row in _INDEX_RECORD.iter_unpack(data[:complete]):
+            self._rows[digest] = row
+
+        self._index_offset += complete
+
+    def _row(self, row: int) -> np.ndarray:
+        """
+        Return a copy of a cached row, remapping the vectors file if it has grown.
+
+        Must be called while holding the instance lock.
+
+        Args:
+            row (int): The row of the embedding.
+
+        Returns:
+            np.ndarray: The embedding.
+        """
+
+        if self._matrix is None or row >= self._matrix.shape[0]:
+            dimension: int = self._load_dimension()
+            rows: int = os.path.getsize(self._vectors_path) // (dimension * 4)
+            self._matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, dimension)
+            )
+
+        return np.array(self._matrix[row])
+
+    def get_many(self, digests: List[bytes]) -> List[np.ndarray | None]:
+        """
+        Look up the cached embeddings of several content hashes.
+
+        Args:
+            digests (List[bytes]): The content hashes to look up.
+
+        Returns:
+            List[np.ndarray | None]: The embedding of every hash, or None when not cached.
+        """
+
+        with self._lock:
+            if any(digest not in self._rows for digest in digests):
+                self._refresh_index()
+
+            embeddings: List[np.ndarray | None] = [
+                self._row(self._rows[digest]) if digest in self._rows else None
+                for digest in digests
+            ]
+
+        hits: int = sum(embedding is not None for embedding in embeddings)
+        metrics.increment("embedding_cache.hits", hits)
+        metrics.increment("embedding_cache.misses", len(digests) - hits)
+
+        return embeddings
+
+    def put_many(self, digests: List[bytes], embeddings: List[List[float]]) -> None:
+        """
+        Append embeddings to the cache, skipping hashes that are already cached.
+
+        Args:
+            digests (List[bytes]): The content hashes of the embedded texts.
+            embeddings (List[List[float]]): One embedding per hash, in the same order.
+        """
+
+        if not digests:
+            return
+
+        matrix: np.ndarray = np.asarray(embeddings, dtype=np.float32)
+
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            try:
+                self._refresh_index()
+
+                dimension: int | None = self._load_dimension()
+                if dimension is None:
+                    dimension = matrix.shape[1]
+                    with open(self._meta_path, "w", encoding="utf-8") as file:
+                        json.dump(
+                            {"model_id": self.model_id, "dimension": dimension}, file
+                        )
+                    self._dimension = dimension
+
+                pending: Dict[bytes, int] = {}
+                for position, digest in enumerate(digests):
+                    if digest not in self._rows:
+                        pending.setdefault(digest, position)
+
+                if not pending:
+                    return
+
+                with open(self._vectors_path, "ab") as file:
+                    # Drop a partial row left by an interrupted writer before appending.
+                    row_bytes: int = dimension * 4
+                    first_row: int = file.tell() // row_bytes
+                    file.truncate(first_row * row_bytes)
+                    file.seek(first_row * row_bytes)
+                    file.write(matrix[list(pending.values())].tobytes())
+                    file.flush()
+                    os.fsync(file.fileno())
+
+                records: bytes = b"".join(
+                    _INDEX_RECORD.pack(digest, first_row + offset)
+                    for offset, digest in enumerate(pending)
+                )
+
+                with open(self._index_path, "ab") as file:
+                    file.truncate(file.tell() - file.tell() % _INDEX_RECORD.size)
+                    file.write(records)
+                    file.flush()
+                    os.fsync(file.fileno())
+
+                self._refresh_index()
+
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_embedding_caches: Dict[str, EmbeddingCache] = {}
+_embedding_caches_lock: threading.Lock = threading.Lock()
+
+query_embedding_cache: LRUCache = LRUCache(
+    max_entries=config.EMBEDDING_QUERY_CACHE_ENTRIES
+)
+
+
+def get_embedding_cache(model_id: str) -> EmbeddingCache:
+    """
+    Return the process-wide persistent embedding cache of an embedding model.
+
+    Args:
+        model_id (str): The id of the embedding model.
+
+    Returns:
+        EmbeddingCache: The cache stored under `EMBEDDING_CACHE_DIR/<model_id>`.
+    """
+
+    with _embedding_caches_lock:
+        cache: EmbeddingCache | None = _embedding_caches.get(model_id)
+
+        if cache is None:
+            cache = EmbeddingCache(
+                directory=os.path.join(config.EMBEDDING_CACHE_DIR, model_id),
+                model_id=model_id,
+            )
+            _embedding_caches[model_id] = cache
+
+        return cache
@@ -0,0 +1,164 @@
+import hashlib
+import math
+import re
+from typing import Callable, List
+
+import numpy as np
+
+from app.config.conf import config
+from app.services.embedding_cache import (
+    EmbeddingCache,
+    content_hash,
+    get_embedding_cache,
+    query_embedding_cache,
+)
+
+EMBEDDING_BACKEND_ONNX: str = "onnx-minilm"
+EMBEDDING_BACKEND_HASHING: str = "hashing"
+
+_TOKEN_PATTERN: re.Pattern = re.compile(r"\w+")
+
+_embedding_function: Callable[[List[str]], List[List[float]]] | None = None
+
+
+def embedding_model_id() -> str:
+    """
+    Return an identifier of the configured embedding model and its dimension.
+
+    Embeddings produced by different models are not comparable, so this identifier is
+    stored alongside every index and cache that holds embeddings.
+
+    Returns:
+        str: The embedding model identifier (e.g. "all-MiniLM-L6-v2").
+    """
+
+    if config.EMBEDDING_BACKEND == EMBEDDING_BACKEND_HASHING:
+        return f"hashing-{config.EMBEDDING_DIMENSION}"
+
+    return "all-MiniLM-L6-v2"
+
+
+def hashing_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts with signed feature hashing of their lower-cased word tokens.
+
+    This backend needs no model download, which makes it useful offline and for
+    synthetic benchmarks; it only captures lexical overlap.
+
+    Args:
+        texts (List[str]): The texts to embed.
+
+    Returns:
+        List[List[float]]: One L2-normalized vector of `EMBEDDING_DIMENSION` values per text.
+    """
+
+    dimension: int = config.EMBEDDING_DIMENSION
+    embeddings: List[List[float]] = []
+
+    for text in texts:
+        vector: List[float] = [0.0] * dimension
+
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            digest: bytes = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            bucket: int = int.from_bytes(digest[:4], "little") % dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+
+        norm: float = math.sqrt(sum(value * value for value in vector)) or 1.0
+        embeddings.append([value / norm for value in vector])
+
+    return embeddings
+
+
+def compute_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts with the configured embedding backend, without caching.
+
+    The ONNX MiniLM model bundled with chromadb is loaded once per process on first use,
+    which makes this function suitable for process pool workers.
+
+    Args:
+        texts (List[str]): The texts to embed.
+
+    Returns:
+        List[List[float]]: One embedding per text, in the same order.
+    """
+
+    global _embedding_function
+
+    if not texts:
+        return []
+
+    if _embedding_function is None:
+        if config.EMBEDDING_BACKEND == EMBEDDING_BACKEND_HASHING:
+            _embedding_function = hashing_embeddings
+        else:
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+            _embedding_function = DefaultEmbeddingFunction()
+
+    return [
+        embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+        for embedding in _embedding_function(texts)
+    ]
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts, reusing embeddings stored in the persistent embedding cache.
+
+    Only texts whose content hash is not cached for the current embedding model are
+    computed, and their embeddings are appended to the cache.
+
+    Args:
+        texts (List[str]): The texts to embed.
+
+    Returns:
+        List[List[float]]: One embedding per text, in the same order.
+    """
+
+    if not texts:
+        return []
+
+    cache: EmbeddingCache = get_embedding_cache(embedding_model_id())
+    digests: List[bytes] = [content_hash(text) for text in texts]
+    cached: List[np.ndarray | None] = cache.get_many(digests)
+
+    missing: List[int] = [
+        position for position, embedding in enumerate(cached) if embedding is None
+    ]
+    computed: List[List[float]] = compute_embeddings([texts[i] for i in missing])
+    cache.put_many([digests[i] for i in missing], computed)
+
+    embeddings: List[List[float]] = [
+        embedding.tolist() if embedding is not None else None for embedding in cached
+    ]
+    for position, embedding in zip(missing, computed):
+        embeddings[position] = embedding
+
+    return embeddings
+
+
+def embed_query(text: str) -> List[float]:
+    """
+    Embed a query, reusing the embedding of a recent identical query.
+
+    Repeated questions, such as the default recommendation question, are embedded once
+    per process. Query embeddings are kept in the in-memory LRU only: the persistent
+    cache holds corpus chunks, and would otherwise grow with (and keep the text of)
+    every user question.
+
+    Args:
+        text (str): The query text.
+
+    Returns:
+        List[float]: The embedding of the query.
+    """
+
+    key: str = f"{embedding_model_id()}:{text}"
+
+    embedding: List[float] | None = query_embedding_cache.get(key)
+    if embedding is None:
+        embedding = compute_embeddings([text])[0]
+        query_embedding_cache.set(key, embedding)
+
+    return embedding
@@ -0,0 +1,213 @@
+import re
+from pydantic import BaseModel
+from typing import Dict, List, Tuple
+
+from app.models.llms import GenerationProfile, QuestionType
+from app.models.recommendations import RecommendationSections
+
+# The budget every completion used before profiles existed; savings are measured against it.
+DEFAULT_MAX_NEW_TOKENS: int = 250
+
+_STOP_SEQUENCES: List[str] = ["User/System Request:", "\n\n\n"]
+
+GENERATION_PROFILES: Dict[QuestionType, GenerationProfile] = {
+    QuestionType.YES_NO: GenerationProfile(
+        question_type=QuestionType.YES_NO,
+        max_new_tokens=60,
+        temperature=0.0,
+        stop_sequences=["\n\n", *_STOP_SEQUENCES],
+        instructions=(
+            "Start with 'Yes' or 'No', then give at most two short justifications "
+            "and any warning, in a single paragraph."
+        ),
+    ),
+    QuestionType.FACT: GenerationProfile(
+        question_type=QuestionType.FACT,
+        max_new_tokens=100,
+        temperature=0.0,
+        stop_sequences=_STOP_SEQUENCES,
+        instructions=(
+            "Answer directly in one or two sentences, then justify briefly with the "
+            "data provided."
+        ),
+    ),
+    QuestionType.DIAGNOSIS: GenerationProfile(
+        question_type=QuestionType.DIAGNOSIS,
+        max_new_tokens=180,
+        temperature=0.2,
+        stop_sequences=_STOP_SEQUENCES,
+        instructions=(
+            "Write the likely causes and their evidence under 'Justifications:', the "
+            "risks under 'Warnings:' and the corrective actions under 'Actions:', one "
+            "item per line starting with '-'."
+        ),
+    ),
+    QuestionType.PLAN: GenerationProfile(
+        question_type=QuestionType.PLAN,
+        max_new_tokens=DEFAULT_MAX_NEW_TOKENS,
+        temperature=0.3,
+        stop_sequences=_STOP_SEQUENCES,
+        instructions=(
+            "Write the actions for the time horizon under 'Actions:', the risks under "
+            "'Warnings:' and the evidence under 'Justifications:', one item per line "
+            "starting with '-'."
+        ),
+    ),
+}
+
+# Patterns are tried in order; questions matching none of them get the PLAN profile.
+_QUESTION_PATTERNS: List[Tuple[QuestionType, re.Pattern]] = [
+    (
+        QuestionType.YES_NO,
+        re.compile(
+            r"^(should|shall|can|could|is|are|do|does|did|will|would|may|must|has|"
+            r"have|debo|debería|puedo|es|está|están|hay|conviene|se puede)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        QuestionType.DIAGNOSIS,
+        re.compile(
+            r"\b(why|wrong|cause[sd]?|disease|pests?|yellow\w*|wilt\w*|spots?|"
+            r"symptoms?|diagnos\w*|por qué|plagas?|enfermedad\w*|síntomas?|"
+            r"amarill\w*|manchas?|marchit\w*)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        QuestionType.PLAN,
+        re.compile(
+            r"\b(plan|schedule|calendar|week|weeks|next \d+(-\d+)? days|actions|"
+            r"what should i do|semana|semanas|próximos \d+(-\d+)? días|acciones|"
+            r"cronograma|qué debo hacer)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        QuestionType.FACT,
+        re.compile(
+            r"^(what|which|when|where|how much|how many|how long|cuánt\w*|cuándo|"
+            r"cuál\w*|dónde|qué)\b",
+            re.IGNORECASE,
+        ),
+    ),
+]
+
+_SECTION_HEADINGS: Dict[str, str] = {
+    "actions": r"actions?|recommendations?|next steps|acciones|recomendaciones",
+    "warnings": r"warnings?|risks?|alerts?|advertencias|alertas|riesgos",
+    "justifications": r"justifications?|reasons?|evidence|justificaciones|razones",
+}
+_HEADING: re.Pattern = re.compile(
+    r"^\s*(?:#+\s*)?\**\s*(?P<name>"
+    + "|".join(f"(?P<{section}>{pattern})" for section, pattern in _SECTION_HEADINGS.items())
+    + r")\s*\**\s*:\s*\**\s*(?P<rest>.*)$",
+    re.IGNORECASE,
+)
+_BULLET: re.Pattern = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+_SENTENCE_END: re.Pattern = re.compile(r"(?<=[.!?])\s+")
+_WARNING_WORDS: re.Pattern = re.compile(
+    r"\b(risk|warning|avoid|danger|alert|pests?|disease|frost|flood\w*|drought|"
+    r"riesgo|evite|evitar|alerta|plaga|helada|sequía)\b",
+    re.IGNORECASE,
+)
+_JUSTIFICATION_WORDS: re.Pattern = re.compile(
+    r"\b(because|due to|according to|since|given|based on|debido a|según|porque)\b",
+    re.IGNORECASE,
+)
+
+
+class GenerationProfileService(BaseModel):
+    """
+    A service choosing how to generate and structure the answer to a question.
+
+    Questions are classified locally with keyword patterns (English and Spanish), so the
+    classification costs microseconds and no model call. Each question type maps to a
+    generation profile: a yes/no question gets a small token budget and stops at the
+    first blank line, while a weekly plan keeps the full budget.
+    """
+
+    def classify_question(self, question: str) -> QuestionType:
+        """
+        Classify a user question.
+
+        Args:
+            question (str): The user question.
+
+        Returns:
+            QuestionType: The type of the question, PLAN when no pattern matches.
+        """
+
+        text: str = question.strip().lstrip("¿¡").strip()
+
+        for question_type, pattern in _QUESTION_PATTERNS:
+            if pattern.search(text):
+                return question_type
+
+        return QuestionType.PLAN
+
+    def profile_for(self, question: str) -> GenerationProfile:
+        """
+        Choose the generation profile of a user question.
+
+        Args:
+            question (str): The user question.
+
+        Returns:
+            GenerationProfile: The profile of the question type.
+        """
+
+        return GENERATION_PROFILES[self.classify_question(question)]
+
+    def parse_sections(self, text: str) -> RecommendationSections:
+        """
+        Split a completion into actions, warnings and justifications.
+
+        Lines following an "Actions:", "Warnings:" or "Justifications:" heading (or
+        their Spanish equivalents, with optional markdown) belong to that section, one
+        item per bullet or line. Text outside any heading is split into sentences,
+        which are filed by keyword: risks as warnings, "because"/"due to" clauses as
+        justifications and everything else as actions.
+
+        Args:
+            text (str): The generated completion.
+
+        Returns:
+            RecommendationSections: The structured sections.
+        """
+
+        sections: Dict[str, List[str]] = {name: [] for name in _SECTION_HEADINGS}
+        unsectioned: List[str] = []
+        current: str | None = None
+
+        for line in text.splitlines():
+            heading: re.Match | None = _HEADING.match(line)
+
+            if heading is not None:
+                current = next(
+                    name for name in _SECTION_HEADINGS if heading.group(name)
+                )
+                line = heading.group("rest")
+
+            item: str = _BULLET.sub("", line).strip()
+            if not item:
+                continue
+
+            if current is None:
+                unsectioned.append(item)
+            else:
+                sections[current].append(item)
+
+        for sentence in _SENTENCE_END.split(" ".join(unsectioned)):
+            sentence = sentence.strip()
+
+            if not sentence:
+                continue
+            if _WARNING_WORDS.search(sentence):
+                sections["warnings"].append(sentence)
+            elif _JUSTIFICATION_WORDS.search(sentence):
+                sections["justifications"].append(sentence)
+            else:
+                sections["actions"].append(sentence)
+
+        return RecommendationSections(**sections)
@@ -0,0 +1,434 @@
+import bisect
+import calendar
+import csv
+import json
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from app.config.conf import config
+from app.models.project import HistoricalInformation, ParcelHistorySummary
+
+_ISSUE_SEPARATORS: re.Pattern = re.compile(r",|;|/|\band\b")
+_NO_ISSUES: set = {"", "none", "n/a", "na", "no issues"}
+_YIELD_TREND_TOLERANCE: float = 0.05
+
+
+def parse_issues(issues: str) -> List[str]:
+    """
+    Split a free-text issues field into normalized issue names.
+
+    Args:
+        issues (str): The issues reported for a season (e.g. "Drought and pests").
+
+    Returns:
+        List[str]: The lower-cased issue names, or an empty list when no issues were reported.
+    """
+
+    parsed: List[str] = [
+        issue.strip().lower() for issue in _ISSUE_SEPARATORS.split(issues)
+    ]
+
+    return [issue for issue in parsed if issue not in _NO_ISSUES]
+
+
+class ParcelHistoryAccumulator:
+    """
+    Running statistics of a parcel's seasons, updated in O(1) per ingested record.
+
+    The yield trend is a least-squares slope maintained through running sums, and the
+    planting windows are scored per calendar month, so building a summary never has to
+    walk the parcel's records.
+    """
+
+    def __init__(self, parcel_id: str) -> None:
+        self.parcel_id: str = parcel_id
+        self.total_seasons: int = 0
+        self.first_year: int | None = None
+        self.last_year: int | None = None
+        self.crop_types: Counter = Counter()
+        self.issues: Counter = Counter()
+        self.yield_n: int = 0
+        self.yield_sum_x: float = 0.0
+        self.yield_sum_y: float = 0.0
+        self.yield_sum_xy: float = 0.0
+        self.yield_sum_xx: float = 0.0
+        self.month_seasons: Counter = Counter()
+        self.month_score: Counter = Counter()
+
+    def add(self, record: HistoricalInformation) -> None:
+        """
+        Fold a historical record into the running statistics.
+
+        Args:
+            record (HistoricalInformation): The record to add.
+        """
+
+        self.total_seasons += 1
+        self.first_year = (
+            record.year if self.first_year is None else min(self.first_year, record.year)
+        )
+        self.last_year = (
+            record.year if self.last_year is None else max(self.last_year, record.year)
+        )
+        self.crop_types[record.crop_type] += 1
+
+        issues: List[str] = parse_issues(record.issues)
+        self.issues.update(set(issues))
+
+        if record.yield_t_ha is not None:
+            self.yield_n += 1
+            self.yield_sum_x += record.year
+            self.yield_sum_y += record.yield_t_ha
+            self.yield_sum_xy += record.year * record.yield_t_ha
+            self.yield_sum_xx += record.year * record.year
+
+        month: int | None = _planting_month(record.planting_date)
+        if month is not None:
+            # A season without issues scores 1, each reported issue lowers the score.
+            self.month_seasons[month] += 1
+            self.month_score[month] += 1.0 / (1 + len(issues))
+
+    def yield_slope(self) -> float | None:
+        """
+        Return the least-squares slope of the yield per year.
+
+        Returns:
+            float | None: The slope in t/ha per year, or None with fewer than two
+                distinct years of recorded yields.
+        """
+
+        if self.yield_n < 2:
+            return None
+
+        denominator: float = self.yield_n * self.yield_sum_xx - self.yield_sum_x**2
+        if denominator == 0:
+            return None
+
+        return (
+            self.yield_n * self.yield_sum_xy - self.yield_sum_x * self.yield_sum_y
+        ) / denominator
+
+    def summary(self, max_months: int = 3) -> ParcelHistorySummary:
+        """
+        Build the summary of the parcel from the running statistics.
+
+        Args:
+            max_months (int): The maximum number of planting months to report.
+
+        Returns:
+            ParcelHistorySummary: The summary of the parcel's history.
+        """
+
+        slope: float | None = self.yield_slope()
+
+        if slope is None:
+            yield_trend: str = "unknown"
+        else:
+            mean_yield: float = self.yield_sum_y / self.yield_n
+            relative_slope: float = slope / mean_yield if mean_yield else 0.0
+
+            if relative_slope > _YIELD_TREND_TOLERANCE:
+                yield_trend = "improving"
+            elif relative_slope < -_YIELD_TREND_TOLERANCE:
+                yield_trend = "declining"
+            else:
+                yield_trend = "stable"
+
+        best_months: List[int] = sorted(
+            self.month_seasons,
+            key=lambda month: (
+                -self.month_score[month] / self.month_seasons[month],
+                -self.month_seasons[month],
+            ),
+        )[:max_months]
+
+        return ParcelHistorySummary(
+            parcel_id=self.parcel_id,
+            total_seasons=self.total_seasons,
+            first_year=self.first_year,
+            last_year=self.last_year,
+            crop_types=[crop_type for crop_type, _ in self.crop_types.most_common()],
+            recurring_issues=[
+                f"{issue} ({count} seasons)"
+                for issue, count in self.issues.most_common()
+                if count > 1
+            ],
+            yield_trend=yield_trend,
+            yield_slope_t_ha_per_year=slope,
+            best_planting_months=[calendar.month_name[month] for month in best_months],
+        )
+
+
+def _most_recent_first(record: HistoricalInformation) -> int:
+    return -record.year
+
+
+def _season_key(record: HistoricalInformation) -> Tuple[str, int, str]:
+    return (record.parcel_id, record.year, record.crop_type)
+
+
+def _remove(
+    records: List[HistoricalInformation], record: HistoricalInformation
+) -> None:
+    for index, stored in enumerate(records):
+        if stored is record:
+            del records[index]
+            return
+
+
+def _planting_month(planting_date: str) -> int | None:
+    try:
+        month: int = int(planting_date[5:7])
+    except ValueError:
+        return None
+
+    return month if 1 <= month <= 12 else None
+
+
+class HistoricalRecordStore:
+    """
+    An in-memory store of historical seasons indexed by parcel and year.
+
+    Each parcel keeps its records ordered by year (most recent first), also per crop
+    type, plus an incrementally maintained summary, so lookups cost the same whether
+    the store holds one season or decades of seasons across thousands of parcels.
+    Records are inserted in order, so reads never sort, and both reads and writes hold
+    the store's lock.
+
+    A season is identified by its parcel, year and crop type, so re-ingesting a file
+    is idempotent: an identical record is skipped and a changed one replaces the
+    stored season instead of being counted twice.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._records: Dict[str, List[HistoricalInformation]] = {}
+        self._records_by_crop: Dict[str, Dict[str, List[HistoricalInformation]]] = {}
+        self._seasons: Dict[Tuple[str, int, str], HistoricalInformation] = {}
+        self._accumulators: Dict[str, ParcelHistoryAccumulator] = {}
+        self._summaries: Dict[str, ParcelHistorySummary] = {}
+
+    def add(self, record: HistoricalInformation) -> bool:
+        """
+        Add a historical record and update its parcel's summary.
+
+        A record of a season already in the store (same parcel, year and crop type)
+        replaces it, unless both are equal.
+
+        Args:
+            record (HistoricalInformation): The record to add.
+
+        Returns:
+            bool: Whether the store changed.
+        """
+
+        key: Tuple[str, int, str] = _season_key(record)
+
+        with self._lock:
+            previous: HistoricalInformation | None = self._seasons.get(key)
+            if previous == record:
+                return False
+
+            records: List[HistoricalInformation] = self._records.setdefault(
+                record.parcel_id, []
+            )
+            crop_records: List[HistoricalInformation] = (
+                self._records_by_crop.setdefault(record.parcel_id, {}).setdefault(
+                    record.crop_type, []
+                )
+            )
+
+            if previous is not None:
+                _remove(records, previous)
+                _remove(crop_records, previous)
+
+            # Seasons of the same year keep their ingestion order.
+            bisect.insort_right(records, record, key=_most_recent_first)
+            bisect.insort_right(crop_records, record, key=_most_recent_first)
+            self._seasons[key] = record
+
+            accumulator: ParcelHistoryAccumulator | None = self._accumulators.get(
+                record.parcel_id
+            )
+            if accumulator is None or previous is not None:
+                # Running sums cannot drop a season, so a replaced season rebuilds
+                # the statistics of its parcel.
+                accumulator = ParcelHistoryAccumulator(record.parcel_id)
+                for stored in records:
+                    accumulator.add(stored)
+                self._accumulators[record.parcel_id] = accumulator
+            else:
+                accumulator.add(record)
+
+            self._summaries.pop(record.parcel_id, None)
+
+        return True
+
+    def add_many(self, records: Iterable[HistoricalInformation]) -> int:
+        """
+        Add several historical records.
+
+        Args:
+            records (Iterable[HistoricalInformation]): The records to add.
+
+        Returns:
+            int: The number of records added or replaced.
+        """
+
+        total: int = 0
+        for record in records:
+            if self.add(record):
+                total += 1
+
+        return total
+
+    def ingest_file(self, path: str) -> int:
+        """
+        Ingest historical records from a CSV or JSONL file.
+
+        CSV files must have a header with the HistoricalInformation field names; an
+        empty `yield_t_ha` column is treated as not recorded.
+
+        Args:
+            path (str): The path of a `.csv` or `.jsonl` file.
+
+        Returns:
+            int: The number of records added or replaced; seasons already stored
+                unchanged are skipped.
+
+        Raises:
+            ValueError: If the file extension is not supported.
+        """
+
+        with open(path, encoding="utf-8", newline="") as file:
+            if path.endswith(".csv"):
+                return self.add_many(
+                    HistoricalInformation(
+                        **{
+                            key: value
+                            for key, value in row.items()
+                            if not (key == "yield_t_ha" and value == "")
+                        }
+                    )
+                    for row in csv.DictReader(file)
+                )
+
+            if path.endswith(".jsonl"):
+                return self.add_many(
+                    HistoricalInformation(**json.loads(line))
+                    for line in file
+                    if line.strip()
+                )
+
+        raise ValueError(f"Unsupported historical information file: {path}")
+
+    def get_records(self, parcel_id: str) -> List[HistoricalInformation]:
+        """
+        Return every record of a parcel, most recent year first.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+
+        Returns:
+            List[HistoricalInformation]: The records of the parcel.
+        """
+
+        with self._lock:
+            return list(self._records.get(parcel_id, []))
+
+    def get_relevant_records(
+        self, parcel_id: str, crop_type: str, limit: int
+    ) -> List[HistoricalInformation]:
+        """
+        Return the seasons of a parcel that are most relevant to its current crop.
+
+        Seasons of the same crop type rank first and, within each group, the most
+        recent seasons rank first.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+            crop_type (str): The crop currently cultivated in the parcel.
+            limit (int): The maximum number of seasons to return.
+
+        Returns:
+            List[HistoricalInformation]: Up to `limit` records.
+        """
+
+        with self._lock:
+            relevant: List[HistoricalInformation] = self._records_by_crop.get(
+                parcel_id, {}
+            ).get(crop_type, [])[:limit]
+
+            if len(relevant) < limit:
+                for record in self._records.get(parcel_id, []):
+                    if record.crop_type != crop_type:
+                        relevant.append(record)
+
+                        if len(relevant) == limit:
+                            break
+
+        return relevant
+
+    def get_summary(self, parcel_id: str) -> ParcelHistorySummary | None:
+        """
+        Return the summary of a parcel's history.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+
+        Returns:
+            ParcelHistorySummary | None: The summary, or None if the parcel has no history.
+        """
+
+        summary: ParcelHistorySummary | None = self._summaries.get(parcel_id)
+        if summary is not None:
+            return summary
+
+        with self._lock:
+            accumulator: ParcelHistoryAccumulator | None = self._accumulators.get(
+                parcel_id
+            )
+            if accumulator is None:
+                return None
+
+            summary = accumulator.summary()
+            self._summaries[parcel_id] = summary
+
+        return summary
+
+
+history_store: HistoricalRecordStore = HistoricalRecordStore()
+
+history_store.add_many(
+    [
+        HistoricalInformation(
+            year=2023,
+            parcel_id="P1233",
+            crop_type="cotton",
+            planting_date="2023-04-12",
+            issues="Drought and pests",
+            notes="The crop was affected by pests and drought, resulting in a lower yield.",
+        ),
+        HistoricalInformation(
+            year=2023,
+            parcel_id="P1234",
+            crop_type="rice",
+            planting_date="2023-02-23",
+            issues="None",
+            notes="Excellent growing season with optimal conditions throughout. Achieved higher than expected yield.",
+        ),
+        HistoricalInformation(
+            year=2023,
+            parcel_id="P1235",
+            crop_type="barley",
+            planting_date="2023-05-19",
+            issues="Drought and pests",
+            notes="The crop was affected by pests and drought, resulting in a lower yield.",
+        ),
+    ]
+)
+
+for history_path in config.HISTORY_DATA_PATHS:
+    history_store.ingest_file(history_path)
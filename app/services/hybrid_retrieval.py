@@ -0,0 +1,451 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.models.knowledge import KnowledgeChunk
+from app.services.embeddings import embed_query
+from app.services.knowledge_index import (
+    WILDCARD,
+    AgronomicKnowledgeIndex,
+    knowledge_index,
+)
+
+_TOKEN_PATTERN: re.Pattern = re.compile(r"\w+")
+_STOPWORDS: frozenset = frozenset(
+    "a an and are as at be by de do for from how i in is it my of on or should "
+    "the this to what when which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text into lower-cased word tokens, dropping very common words.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[str]: The tokens of the text, in order.
+    """
+
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in _STOPWORDS
+    ]
+
+
+def _metadata_value(value: str) -> str:
+    return value.strip().lower()
+
+
+class BM25Index:
+    """
+    An in-process BM25 inverted index over knowledge chunks.
+
+    Each term's posting list is a pair of numpy arrays holding the ids of the chunks
+    that contain it and their precomputed BM25 weights, so scoring a query is a few
+    vectorized additions. Chunks carry integer-coded crop type and phase metadata that
+    is used to drop postings of non-matching chunks before they are scored; metadata
+    and filter values are compared case-insensitively.
+
+    Attributes:
+        chunks (List[KnowledgeChunk]): The indexed chunks, by internal id.
+        chunk_terms (List[frozenset]): The distinct terms of each chunk, by internal id,
+            so reranking never tokenizes chunk texts again.
+    """
+
+    def __init__(
+        self, chunks: List[KnowledgeChunk], k1: float = 1.2, b: float = 0.75
+    ) -> None:
+        self.chunks: List[KnowledgeChunk] = chunks
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+        self._masks_lock: threading.Lock = threading.Lock()
+        self._crop_codes: Dict[str, int] = {}
+        self._phase_codes: Dict[str, int] = {}
+        self._crop: np.ndarray = np.array(
+            [
+                self._crop_codes.setdefault(
+                    _metadata_value(chunk.crop_type), len(self._crop_codes)
+                )
+                for chunk in chunks
+            ],
+            dtype=np.int32,
+        )
+        self._phase: np.ndarray = np.array(
+            [
+                self._phase_codes.setdefault(
+                    _metadata_value(chunk.current_phase), len(self._phase_codes)
+                )
+                for chunk in chunks
+            ],
+            dtype=np.int32,
+        )
+
+        term_frequencies: List[Counter] = [
+            Counter(tokenize(chunk.text)) for chunk in chunks
+        ]
+        self.chunk_terms: List[frozenset] = [
+            frozenset(frequencies) for frequencies in term_frequencies
+        ]
+        lengths: np.ndarray = np.array(
+            [sum(frequencies.values()) for frequencies in term_frequencies],
+            dtype=np.float32,
+        )
+        average_length: float = float(lengths.mean()) if len(chunks) else 0.0
+
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for chunk_id, frequencies in enumerate(term_frequencies):
+            normalization: float = k1 * (
+                1 - b + b * lengths[chunk_id] / (average_length or 1.0)
+            )
+
+            for term, frequency in frequencies.items():
+                ids, weights = postings.setdefault(term, ([], []))
+                ids.append(chunk_id)
+                weights.append(frequency * (k1 + 1) / (frequency + normalization))
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._idf: Dict[str, float] = {}
+
+        for term, (ids, weights) in postings.items():
+            idf: float = math.log(
+                1 + (len(chunks) - len(ids) + 0.5) / (len(ids) + 0.5)
+            )
+            self._idf[term] = idf
+            self._postings[term] = (
+                np.array(ids, dtype=np.int32),
+                np.array(weights, dtype=np.float32) * idf,
+            )
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def idf(self, term: str) -> float:
+        """
+        Return the inverse document frequency of a term (0 for unknown terms).
+
+        Args:
+            term (str): The term.
+
+        Returns:
+            float: The BM25 inverse document frequency of the term.
+        """
+
+        return self._idf.get(term, 0.0)
+
+    def filter_mask(self, crop_type: str, current_phase: str) -> np.ndarray:
+        """
+        Return a boolean mask of the chunks that apply to a crop and phase.
+
+        Args:
+            crop_type (str): The crop type the chunks must apply to.
+            current_phase (str): The phase the chunks must apply to.
+
+        Returns:
+            np.ndarray: True for every chunk whose metadata matches (or is "*").
+        """
+
+        crop_type = _metadata_value(crop_type)
+        current_phase = _metadata_value(current_phase)
+
+        mask: np.ndarray | None = self._masks.get((crop_type, current_phase))
+        if mask is not None:
+            return mask
+
+        crop_codes: List[int] = [
+            self._crop_codes[value]
+            for value in (crop_type, WILDCARD)
+            if value in self._crop_codes
+        ]
+        phase_codes: List[int] = [
+            self._phase_codes[value]
+            for value in (current_phase, WILDCARD)
+            if value in self._phase_codes
+        ]
+
+        mask = np.isin(self._crop, crop_codes) & np.isin(self._phase, phase_codes)
+
+        # Masks are cached per (crop, phase); there are only a handful of combinations.
+        with self._masks_lock:
+            if len(self._masks) < 1024:
+                self._masks[(crop_type, current_phase)] = mask
+
+        return mask
+
+    def search(
+        self, query: str, crop_type: str, current_phase: str, limit: int
+    ) -> List[Tuple[int, float]]:
+        """
+        Return the best BM25 matches of a query among chunks of a crop and phase.
+
+        Args:
+            query (str): The query text.
+            crop_type (str): The crop type the chunks must apply to.
+            current_phase (str): The phase the chunks must apply to.
+            limit (int): The maximum number of matches to return.
+
+        Returns:
+            List[Tuple[int, float]]: Internal chunk ids and scores, best first.
+        """
+
+        if not self.chunks:
+            return []
+
+        mask: np.ndarray = self.filter_mask(crop_type, current_phase)
+        scores: np.ndarray = np.zeros(len(self.chunks), dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            posting: Tuple[np.ndarray, np.ndarray] | None = self._postings.get(term)
+            if posting is None:
+                continue
+
+            ids, weights = posting
+            allowed: np.ndarray = mask[ids]
+            scores[ids[allowed]] += weights[allowed]
+
+        candidates: np.ndarray = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[
+                np.argpartition(scores[candidates], -limit)[-limit:]
+            ]
+
+        return sorted(
+            ((int(chunk_id), float(scores[chunk_id])) for chunk_id in candidates),
+            key=lambda match: match[1],
+            reverse=True,
+        )
+
+
+class HybridRetriever:
+    """
+    Combines BM25 keyword search with vector search through reciprocal rank fusion.
+
+    The chunks and their embeddings are loaded from the persistent index into memory:
+    a BM25 inverted index and a normalized float32 embedding matrix. Both searches
+    first restrict the candidates to chunks whose crop type and phase match the
+    request and only then score them. Their rankings are fused with RRF and the fused
+    candidates are reranked with two cheap signals: the share of the query's
+    informative terms (e.g. variety, pest or product names) found verbatim in the
+    chunk, and whether the chunk is specific to the crop and phase rather than
+    generic. The in-memory copy is reloaded in the background when the version of the
+    persistent index (see `AgronomicKnowledgeIndex.version`) changes.
+
+    Attributes:
+        index (AgronomicKnowledgeIndex): The persistent index holding the chunks.
+        rrf_k (int): The rank offset of reciprocal rank fusion.
+        candidates (int): The number of results taken from each search before fusion.
+        refresh_interval_seconds (float): The minimum time between checks of the
+            persistent index for changed chunks.
+    """
+
+    def __init__(
+        self,
+        index: AgronomicKnowledgeIndex,
+        rrf_k: int = 60,
+        candidates: int = 50,
+        refresh_interval_seconds: float = 30.0,
+    ) -> None:
+        self.index: AgronomicKnowledgeIndex = index
+        self.rrf_k: int = rrf_k
+        self.candidates: int = candidates
+        self.refresh_interval_seconds: float = refresh_interval_seconds
+        self._lock: threading.Lock = threading.Lock()
+        self._snapshot: Tuple[BM25Index, np.ndarray] | None = None
+        self._version: Tuple | None = None
+        self._next_refresh: float = 0.0
+        self._thread: threading.Thread | None = None
+
+    def snapshot(self) -> Tuple[BM25Index, np.ndarray]:
+        """
+        Return the BM25 index and the embedding matrix of the same version of the index.
+
+        The first call loads the chunks. Afterwards, at most once per refresh interval,
+        a background thread checks the version of the persistent index and, when it
+        changed, builds both structures and publishes them together, so searches keep
+        using the previous pair meanwhile.
+
+        Returns:
+            Tuple[BM25Index, np.ndarray]: The BM25 index over every stored chunk and
+                their normalized embeddings in the same order.
+        """
+
+        snapshot: Tuple[BM25Index, np.ndarray] | None = self._snapshot
+
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._next_refresh = (
+                        time.monotonic() + self.refresh_interval_seconds
+                    )
+                    self.refresh()
+
+                return self._snapshot
+
+        if time.monotonic() >= self._next_refresh:
+            with self._lock:
+                if time.monotonic() >= self._next_refresh and (
+                    self._thread is None or not self._thread.is_alive()
+                ):
+                    self._next_refresh = (
+                        time.monotonic() + self.refresh_interval_seconds
+                    )
+                    self._thread = threading.Thread(
+                        target=self.refresh, name="knowledge-refresh", daemon=True
+                    )
+                    self._thread.start()
+
+        return snapshot
+
+    def refresh(self) -> None:
+        """
+        Reload the chunks and embeddings if the persistent index changed.
+        """
+
+        version: Tuple = self.index.version()
+        if self._snapshot is not None and version == self._version:
+            return
+
+        chunks, embeddings = self.index.all_chunks()
+        matrix: np.ndarray = np.asarray(embeddings, dtype=np.float32)
+
+        if len(matrix):
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+        # A single assignment, so no reader pairs chunks and embeddings of two versions.
+        self._snapshot = (BM25Index(chunks), matrix)
+        self._version = version
+        metrics.increment("retrieval.knowledge_reloads")
+
+    def vector_search(
+        self,
+        bm25: BM25Index,
+        embeddings: np.ndarray,
+        query: str,
+        crop_type: str,
+        current_phase: str,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return the chunks of a crop and phase most similar to a query embedding.
+
+        Args:
+            bm25 (BM25Index): The BM25 index whose chunk order the embeddings follow.
+            embeddings (np.ndarray): The normalized embeddings of the chunks.
+            query (str): The query text.
+            crop_type (str): The crop type the chunks must apply to.
+            current_phase (str): The phase the chunks must apply to.
+
+        Returns:
+            List[Tuple[int, float]]: Internal chunk ids and cosine similarities, best first.
+        """
+
+        if len(embeddings) != len(bm25):
+            return []
+
+        allowed: np.ndarray = np.flatnonzero(
+            bm25.filter_mask(crop_type, current_phase)
+        )
+        if len(allowed) == 0:
+            return []
+
+        query_embedding: np.ndarray = np.asarray(
+            embed_query(query), dtype=np.float32
+        )
+        query_embedding /= max(float(np.linalg.norm(query_embedding)), 1e-12)
+
+        similarities: np.ndarray = embeddings[allowed] @ query_embedding
+
+        best: np.ndarray = np.arange(len(allowed))
+        if len(allowed) > self.candidates:
+            best = np.argpartition(similarities, -self.candidates)[-self.candidates :]
+
+        return sorted(
+            ((int(allowed[i]), float(similarities[i])) for i in best),
+            key=lambda match: match[1],
+            reverse=True,
+        )
+
+    def search(
+        self, query: str, crop_type: str, current_phase: str, limit: int
+    ) -> List[KnowledgeChunk]:
+        """
+        Return the chunks most relevant to a query for a crop and phase.
+
+        Args:
+            query (str): The query text (usually the user's question).
+            crop_type (str): The crop type the chunks must apply to.
+            current_phase (str): The phase the chunks must apply to.
+            limit (int): The maximum number of chunks to return.
+
+        Returns:
+            List[KnowledgeChunk]: The best chunks, scored by the reranked fused score.
+        """
+
+        started_at: float = time.perf_counter()
+
+        bm25, embeddings = self.snapshot()
+        if len(bm25) == 0:
+            return []
+
+        fused: Dict[int, float] = {}
+
+        for ranking in (
+            bm25.search(query, crop_type, current_phase, self.candidates),
+            self.vector_search(bm25, embeddings, query, crop_type, current_phase),
+        ):
+            for rank, (position, _) in enumerate(ranking):
+                fused[position] = fused.get(position, 0.0) + 1.0 / (
+                    self.rrf_k + rank + 1
+                )
+
+        query_terms: List[str] = [
+            term for term in set(tokenize(query)) if bm25.idf(term) > 1.0
+        ]
+        total_idf: float = sum(bm25.idf(term) for term in query_terms)
+
+        def rerank_score(position: int) -> float:
+            chunk: KnowledgeChunk = bm25.chunks[position]
+            score: float = fused[position]
+
+            if total_idf > 0:
+                chunk_terms: frozenset = bm25.chunk_terms[position]
+                coverage: float = (
+                    sum(bm25.idf(term) for term in query_terms if term in chunk_terms)
+                    / total_idf
+                )
+                score *= 1.0 + 0.5 * coverage
+
+            if chunk.crop_type != WILDCARD:
+                score *= 1.1
+            if chunk.current_phase != WILDCARD:
+                score *= 1.1
+
+            return score
+
+        scores: Dict[int, float] = {
+            position: rerank_score(position) for position in fused
+        }
+        best: List[int] = heapq.nlargest(limit, scores, key=scores.__getitem__)
+
+        metrics.observe(
+            "retrieval.hybrid_search_ms", (time.perf_counter() - started_at) * 1000
+        )
+
+        return [
+            bm25.chunks[position].model_copy(update={"score": scores[position]})
+            for position in best
+        ]
+
+
+hybrid_retriever: HybridRetriever = HybridRetriever(
+    index=knowledge_index,
+    candidates=config.KNOWLEDGE_SEARCH_CANDIDATES,
+)
@@ -0,0 +1,236 @@
+import os
+import threading
+from typing import Dict, List, Set, Tuple
+
+from app.config.conf import config
+from app.models.knowledge import KnowledgeChunk
+from app.services.embeddings import embedding_model_id
+
+WILDCARD: str = "*"
+MANIFEST_FILE: str = "manifest.json"
+
+
+class AgronomicKnowledgeIndex:
+    """
+    The retrieval index of agronomic manual chunks, persisted with chromadb.
+
+    Chunks are stored with their embeddings and `crop_type`, `current_phase` and
+    `source` metadata. The chromadb collection is opened lazily, so processes that
+    never search or ingest manuals do not pay for it. The collection name includes the
+    embedding model id, so switching models never mixes incompatible embeddings.
+
+    Attributes:
+        path (str): The directory where chromadb persists the index.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._lock: threading.Lock = threading.Lock()
+        self._collection = None
+
+    @property
+    def collection(self):
+        """
+        Return the chromadb collection of the index, opening it on first use.
+
+        Returns:
+            chromadb.Collection: The collection holding the chunks.
+        """
+
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    import chromadb
+                    from chromadb.config import Settings
+
+                    os.makedirs(self.path, exist_ok=True)
+                    client = chromadb.PersistentClient(
+                        path=self.path,
+                        settings=Settings(anonymized_telemetry=False),
+                    )
+                    self._collection = client.get_or_create_collection(
+                        name=f"agronomic_knowledge_{embedding_model_id()}".replace(
+                            ".", "_"
+                        ),
+                        metadata={"hnsw:space": "cosine"},
+                        embedding_function=None,
+                    )
+
+        return self._collection
+
+    def count(self) -> int:
+        """
+        Return the number of chunks in the index.
+
+        Returns:
+            int: The number of chunks, or 0 if the index has never been created.
+        """
+
+        if self._collection is None and not os.path.isdir(self.path):
+            return 0
+
+        return self.collection.count()
+
+    def version(self) -> Tuple:
+        """
+        Return a value that changes whenever the content of the index changes.
+
+        Ingestion rewrites the manifest next to the index (a new file replaces the old
+        one) after every run, including runs that replace chunks one for one, so the
+        manifest's file identity and the number of chunks identify a version.
+
+        Returns:
+            Tuple: The manifest's inode, modification time and size (None without a
+                manifest) and the number of chunks.
+        """
+
+        try:
+            manifest: os.stat_result | None = os.stat(
+                os.path.join(self.path, MANIFEST_FILE)
+            )
+        except FileNotFoundError:
+            manifest = None
+
+        return (
+            (manifest.st_ino, manifest.st_mtime_ns, manifest.st_size)
+            if manifest is not None
+            else None,
+            self.count(),
+        )
+
+    def existing_ids(self, chunk_ids: List[str]) -> Set[str]:
+        """
+        Return which of the given chunk ids are already stored in the index.
+
+        Args:
+            chunk_ids (List[str]): The chunk ids to check.
+
+        Returns:
+            Set[str]: The subset of ids present in the index.
+        """
+
+        if not chunk_ids:
+            return set()
+
+        return set(self.collection.get(ids=chunk_ids, include=[])["ids"])
+
+    def ids(self, page_size: int = 5000) -> Set[str]:
+        """
+        Return the ids of every chunk stored in the index.
+
+        Args:
+            page_size (int): The number of ids read from chromadb per request.
+
+        Returns:
+            Set[str]: The chunk ids.
+        """
+
+        chunk_ids: Set[str] = set()
+
+        if self.count() == 0:
+            return chunk_ids
+
+        offset: int = 0
+
+        while True:
+            page: List[str] = self.collection.get(
+                include=[], limit=page_size, offset=offset
+            )["ids"]
+            chunk_ids.update(page)
+
+            if len(page) < page_size:
+                return chunk_ids
+
+            offset += page_size
+
+    def upsert(
+        self, chunks: List[KnowledgeChunk], embeddings: List[List[float]]
+    ) -> None:
+        """
+        Insert or replace chunks and their embeddings.
+
+        Args:
+            chunks (List[KnowledgeChunk]): The chunks to store.
+            embeddings (List[List[float]]): One embedding per chunk, in the same order.
+        """
+
+        if not chunks:
+            return
+
+        self.collection.upsert(
+            ids=[chunk.chunk_id for chunk in chunks],
+            documents=[chunk.text for chunk in chunks],
+            embeddings=embeddings,
+            metadatas=[
+                {
+                    "source": chunk.source,
+                    "crop_type": chunk.crop_type,
+                    "current_phase": chunk.current_phase,
+                }
+                for chunk in chunks
+            ],
+        )
+
+    def all_chunks(
+        self, page_size: int = 5000
+    ) -> Tuple[List[KnowledgeChunk], List[List[float]]]:
+        """
+        Return every chunk stored in the index together with its embedding.
+
+        Args:
+            page_size (int): The number of chunks read from chromadb per request.
+
+        Returns:
+            Tuple[List[KnowledgeChunk], List[List[float]]]: The stored chunks, without
+                scores, and their embeddings in the same order.
+        """
+
+        chunks: List[KnowledgeChunk] = []
+        embeddings: List[List[float]] = []
+
+        if self.count() == 0:
+            return chunks, embeddings
+
+        offset: int = 0
+
+        while True:
+            page: Dict = self.collection.get(
+                include=["documents", "metadatas", "embeddings"],
+                limit=page_size,
+                offset=offset,
+            )
+
+            chunks.extend(
+                KnowledgeChunk(
+                    chunk_id=chunk_id,
+                    source=metadata["source"],
+                    crop_type=metadata["crop_type"],
+                    current_phase=metadata["current_phase"],
+                    text=document,
+                )
+                for chunk_id, document, metadata in zip(
+                    page["ids"], page["documents"], page["metadatas"]
+                )
+            )
+            embeddings.extend(page["embeddings"])
+
+            if len(page["ids"]) < page_size:
+                return chunks, embeddings
+
+            offset += page_size
+
+    def delete(self, chunk_ids: List[str]) -> None:
+        """
+        Remove chunks from the index.
+
+        Args:
+            chunk_ids (List[str]): The ids of the chunks to remove.
+        """
+
+        if chunk_ids:
+            self.collection.delete(ids=chunk_ids)
+
+
+knowledge_index: AgronomicKnowledgeIndex = AgronomicKnowledgeIndex(
+    path=config.KNOWLEDGE_INDEX_DIR
+)
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List
+
+from app.config.conf import config
+from app.models.best_practices import BestIrrigationPractices, BestAgriculturalPractices
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+WILDCARD: str = "*"
+
+DEFAULT_KNOWLEDGE_PACK_PATH: str = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "knowledge_pack.json"
+)
+
+
+class KnowledgePack:
+    """
+    An immutable, fully indexed snapshot of a versioned knowledge pack file.
+
+    Agricultural practices are indexed by crop type and then by phase, with the "*"
+    wildcard marking crop-level (any phase) and generic (any crop) entries. Every
+    BestAgriculturalPractices object is built once when the pack is loaded, so a
+    lookup is a couple of dictionary reads and allocates nothing.
+
+    Attributes:
+        version (str): The version declared by the pack file.
+        irrigation_practices (BestIrrigationPractices): The irrigation practices.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        irrigation_practices: List[str],
+        agricultural_practices: List[Dict],
+    ) -> None:
+        self.version: str = version
+        self.irrigation_practices: BestIrrigationPractices = BestIrrigationPractices(
+            practices=irrigation_practices
+        )
+        self._index: Dict[str, Dict[str, BestAgriculturalPractices]] = {}
+
+        for entry in agricultural_practices:
+            crop_type: str = entry.get("crop_type") or WILDCARD
+            current_phase: str = entry.get("current_phase") or WILDCARD
+
+            self._index.setdefault(crop_type, {})[current_phase] = (
+                BestAgriculturalPractices(
+                    crop_type="all crops" if crop_type == WILDCARD else crop_type,
+                    current_phase="all phases"
+                    if current_phase == WILDCARD
+                    else current_phase,
+                    practices=entry["practices"],
+                )
+            )
+
+        self._generic: BestAgriculturalPractices | None = self._index.get(
+            WILDCARD, {}
+        ).get(WILDCARD)
+
+    @classmethod
+    def from_file(cls, path: str) -> "KnowledgePack":
+        """
+        Load and index a knowledge pack file.
+
+        Args:
+            path (str): The path of the JSON knowledge pack.
+
+        Returns:
+            KnowledgePack: The indexed pack.
+        """
+
+        with open(path, encoding="utf-8") as file:
+            data: Dict = json.load(file)
+
+        return cls(
+            version=str(data["version"]),
+            irrigation_practices=data.get("irrigation_practices", []),
+            agricultural_practices=data.get("agricultural_practices", []),
+        )
+
+    def get_agricultural_practices(
+        self, crop_type: str, current_phase: str
+    ) -> BestAgriculturalPractices | None:
+        """
+        Look up the most specific practices for a crop and phase.
+
+        The lookup falls back from (crop, phase) to (crop, any phase) and then to the
+        generic practices.
+
+        Args:
+            crop_type (str): The type of crop.
+            current_phase (str): The current growth phase of the crop.
+
+        Returns:
+            BestAgriculturalPractices | None: The practices, or None if the pack has no
+                matching or generic entry.
+        """
+
+        phases: Dict[str, BestAgriculturalPractices] | None = self._index.get(crop_type)
+
+        if phases is not None:
+            practices: BestAgriculturalPractices | None = phases.get(current_phase)
+            if practices is not None:
+                return practices
+
+            practices = phases.get(WILDCARD)
+            if practices is not None:
+                return practices
+
+        return self._generic
+
+
+class KnowledgePackLoader:
+    """
+    Holds the current knowledge pack and hot-reloads it when its file changes.
+
+    The file's modification time is checked at most once per reload interval, on a
+    background thread, so requests never wait for a pack to be parsed and indexed. A
+    new pack is fully loaded and indexed before it replaces the current one in a single
+    reference assignment, so readers always see either the old or the new pack. A
+    file that fails to load, for any reason, is logged and the current pack is kept.
+
+    Attributes:
+        path (str): The path of the knowledge pack file.
+        reload_interval_seconds (float): The minimum time between modification checks.
+    """
+
+    def __init__(self, path: str, reload_interval_seconds: float) -> None:
+        self.path: str = path
+        self.reload_interval_seconds: float = reload_interval_seconds
+        self._lock: threading.Lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._mtime: float = os.stat(path).st_mtime
+        self._pack: KnowledgePack = KnowledgePack.from_file(path)
+        self._next_check: float = time.monotonic() + reload_interval_seconds
+
+    @property
+    def pack(self) -> KnowledgePack:
+        """
+        Return the current pack, starting a background reload if one is due.
+
+        Returns:
+            KnowledgePack: The current knowledge pack.
+        """
+
+        if time.monotonic() >= self._next_check:
+            with self._lock:
+                if time.monotonic() >= self._next_check and (
+                    self._thread is None or not self._thread.is_alive()
+                ):
+                    self._next_check = time.monotonic() + self.reload_interval_seconds
+                    self._thread = threading.Thread(
+                        target=self.reload_if_changed,
+                        name="knowledge-pack-reload",
+                        daemon=True,
+                    )
+                    self._thread.start()
+
+        return self._pack
+
+    def reload_if_changed(self) -> None:
+        """
+        Reload the pack if its file changed, keeping the current pack on any failure.
+        """
+
+        try:
+            mtime: float = os.stat(self.path).st_mtime
+
+            if mtime == self._mtime:
+                return
+
+            pack: KnowledgePack = KnowledgePack.from_file(self.path)
+            self._pack = pack
+            self._mtime = mtime
+            logger.info("Loaded knowledge pack version %s", pack.version)
+
+        except Exception as e:
+            logger.exception("Keeping knowledge pack %s: %s", self._pack.version, e)
+
+
+knowledge_pack_loader: KnowledgePackLoader = KnowledgePackLoader(
+    path=config.KNOWLEDGE_PACK_PATH or DEFAULT_KNOWLEDGE_PACK_PATH,
+    reload_interval_seconds=config.KNOWLEDGE_PACK_RELOAD_INTERVAL_SECONDS,
+)
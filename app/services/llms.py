@@ -1,18 +1,269 @@
+import hashlib
+import os
+import time
 from pydantic import BaseModel
+from typing import List
 from huggingface_hub import InferenceClient
 
-from app.models.llms import ImplementedModels
+from app.models.llms import ImplementedModels, GenerationProfile, GenerationResult
 from app.config.conf import config
+from app.core.cache import TieredCache, get_cache
+from app.core.host_gauge import HostGauge
+from app.core.metrics import metrics
+from app.services.generation_profiles import DEFAULT_MAX_NEW_TOKENS
+from app.services.model_router import model_router
+
+LLM_IN_FLIGHT_GAUGE: str = "llm.in_flight"
+
+llm_in_flight_on_host: HostGauge = HostGauge(
+    path=os.path.join(config.CACHE_DIR, "host_gauges.sqlite3"), name=LLM_IN_FLIGHT_GAUGE
+)
+
+response_cache: TieredCache = get_cache(
+    namespace="responses", ttl_seconds=config.RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text (about 3 tokens per 4 words).
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated number of tokens, at least 1.
+    """
+
+    return max(1, round(len(text.split()) * 4 / 3))
+
+
+def apply_stop_sequences(text: str, stop_sequences: List[str]) -> str:
+    """
+    Cut a text at the first occurrence of any stop sequence.
+
+    Args:
+        text (str): The text.
+        stop_sequences (List[str]): The stop sequences.
+
+    Returns:
+        str: The text before the earliest stop sequence.
+    """
+
+    end: int = len(text)
+
+    for stop in stop_sequences:
+        position: int = text.find(stop)
+        if position != -1:
+            end = min(end, position)
+
+    return text[:end]
 
 
 class LLMsService(BaseModel):
-    def query_huggingface_model(self, model: ImplementedModels, prompt: str) -> str:
-        client: InferenceClient = InferenceClient(
-            model=model.value,
-            token=config.HF_TOKEN.get_secret_value(),
+    def query_huggingface_model(
+        self,
+        model: ImplementedModels,
+        prompt: str,
+        profile: GenerationProfile | None = None,
+        prefix_hash: str | None = None,
+    ) -> str:
+        """
+        Generate a completion for a prompt, reusing a cached completion when available.
+
+        Completions are cached by model, generation parameters and prompt content, so
+        an identical prompt sent to any worker within the cache TTL does not trigger a
+        new inference call.
+
+        Args:
+            model (ImplementedModels): The model used to generate the completion.
+            prompt (str): The prompt sent to the model.
+            profile (GenerationProfile | None): The token budget, temperature and stop
+                sequences. Defaults to 250 tokens with greedy decoding and no stop.
+            prefix_hash (str | None): The hash of the prompt's stable prefix, sent to
+                the inference backend (see `generate_text`).
+
+        Returns:
+            str: The generated completion.
+        """
+
+        parameters: str = (
+            profile.model_dump_json(exclude={"instructions"}) if profile else ""
+        )
+        key: str = hashlib.sha256(
+            f"{model.value}\n{parameters}\n{prompt}".encode()
+        ).hexdigest()
+
+        return response_cache.get_or_set(
+            key=key,
+            loader=lambda: self.generate_text(
+                model=model, prompt=prompt, profile=profile, prefix_hash=prefix_hash
+            ).text,
+        )
+
+    def generate_text(
+        self,
+        model: ImplementedModels,
+        prompt: str,
+        profile: GenerationProfile | None = None,
+        prefix_hash: str | None = None,
+    ) -> GenerationResult:
+        """
+        Generate a completion with the configured LLM backend.
+
+        With `LLM_BACKEND="simulated"` no inference call is made: the call returns a
+        structured completion derived from the prompt and sleeps for
+        `LLM_SIMULATED_LATENCY_SECONDS`, scaled down when the token budget or a stop
+        sequence cuts the completion, which lets benchmarks saturate the service
+        without an inference API.
+
+        The number of calls in flight is tracked in the `llm.in_flight` gauge, per
+        process and summed across the workers of the host (`llm_in_flight_on_host`),
+        which background jobs use to only consume spare LLM capacity, and every
+        outcome feeds the latency and error rates of the model router. Generated
+        tokens and latency are recorded per question type, and the token budget saved
+        against the former fixed budget of 250 tokens in `llm.token_budget_saved`.
+
+        The hash of the prompt's stable prefix, if any, is sent in the
+        `X-Prompt-Prefix-Hash` header, so a prefix-aware load balancer in front of the
+        inference servers can route prompts sharing a prefix to the replica holding
+        its KV cache.
+
+        Args:
+            model (ImplementedModels): The model used to generate the completion.
+            prompt (str): The prompt sent to the model.
+            profile (GenerationProfile | None): The generation parameters.
+            prefix_hash (str | None): The hash of the prompt's stable prefix.
+
+        Returns:
+            GenerationResult: The completion, its token count and latency.
+        """
+
+        max_new_tokens: int = profile.max_new_tokens if profile else DEFAULT_MAX_NEW_TOKENS
+        stop_sequences: List[str] = profile.stop_sequences if profile else []
+        temperature: float = profile.temperature if profile else 0.0
+        question_type: str = profile.question_type.value if profile else "unprofiled"
+
+        metrics.adjust_gauge(LLM_IN_FLIGHT_GAUGE, 1)
+        llm_in_flight_on_host.adjust(1)
+        started_at: float = time.perf_counter()
+        failed: bool = True
+
+        try:
+            if config.LLM_BACKEND == "simulated":
+                text: str = self.simulate_text(
+                    model=model,
+                    prompt=prompt,
+                    max_new_tokens=max_new_tokens,
+                    stop_sequences=stop_sequences,
+                )
+                generated_tokens: int = estimate_tokens(text)
+
+            else:
+                client: InferenceClient = InferenceClient(
+                    model=model.value,
+                    token=config.HF_TOKEN.get_secret_value(),
+                    headers=(
+                        {"X-Prompt-Prefix-Hash": prefix_hash} if prefix_hash else None
+                    ),
+                )
+
+                output = client.text_generation(
+                    prompt=prompt,
+                    details=True,
+                    max_new_tokens=max_new_tokens,
+                    stop=stop_sequences or None,
+                    do_sample=temperature > 0,
+                    temperature=temperature if temperature > 0 else None,
+                )
+                # Some backends include the matched stop sequence in the text.
+                text = apply_stop_sequences(output.generated_text, stop_sequences)
+                generated_tokens = (
+                    output.details.generated_tokens
+                    if output.details is not None
+                    else estimate_tokens(text)
+                )
+
+            failed = False
+
+        finally:
+            metrics.adjust_gauge(LLM_IN_FLIGHT_GAUGE, -1)
+            llm_in_flight_on_host.adjust(-1)
+            latency_ms: float = (time.perf_counter() - started_at) * 1000
+            metrics.observe(f"llm.{model.value}.latency_ms", latency_ms)
+            model_router.record(
+                model=model,
+                latency_ms=latency_ms,
+                generated_tokens=0 if failed else generated_tokens,
+                error=failed,
+            )
+
+        metrics.observe(f"llm.{question_type}.latency_ms", latency_ms)
+        metrics.observe("llm.generated_tokens", generated_tokens)
+        metrics.observe(f"llm.{question_type}.generated_tokens", generated_tokens)
+        metrics.increment("llm.token_budget_saved", DEFAULT_MAX_NEW_TOKENS - max_new_tokens)
+
+        return GenerationResult(
+            text=text, generated_tokens=generated_tokens, latency_ms=latency_ms
         )
 
-        return client.text_generation(
-            prompt=prompt,
-            max_new_tokens=250,
+    def simulate_text(
+        self,
+        model: ImplementedModels,
+        prompt: str,
+        max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS,
+        stop_sequences: List[str] | None = None,
+    ) -> str:
+        """
+        Generate the completion of the simulated LLM backend.
+
+        The completion is deterministic for a model and prompt: an "Actions",
+        "Warnings" and "Justifications" answer (preceded by a yes/no answer when the
+        prompt asks for one) tagged with a hash of the prompt. Like a real model, it is
+        cut at the first stop sequence and at `max_new_tokens`, and the call sleeps for
+        `LLM_SIMULATED_LATENCY_SECONDS` scaled by the share of the full completion
+        that was generated.
+
+        Args:
+            model (ImplementedModels): The model being simulated.
+            prompt (str): The prompt sent to the model.
+            max_new_tokens (int): The maximum number of tokens to generate.
+            stop_sequences (List[str] | None): The sequences that end the completion.
+
+        Returns:
+            str: The simulated completion.
+        """
+
+        digest: str = hashlib.sha256(f"{model.value}\n{prompt}".encode()).hexdigest()
+        answer: str = (
+            "Yes, act within the next two days.\n\n" if "'Yes' or 'No'" in prompt else ""
         )
+        # Like an unconstrained model, the simulated one writes until about 250 tokens.
+        text: str = answer + (
+            "Actions:\n"
+            + "".join(
+                f"- Day {day}: check soil moisture in the morning, irrigate only if it "
+                f"is below the target range for the current phase and record it.\n"
+                for day in range(1, 8)
+            )
+            + "Warnings:\n"
+            "- Rain in the forecast may delay field work and raise fungal risk.\n"
+            "- Scout for pests twice this week; act at the first signs of damage.\n"
+            "Justifications:\n"
+            "- Based on the sensor readings, weather forecast and parcel history.\n"
+            f"- [simulated {model.value}] (prompt {digest[:12]})\n"
+        )
+        full_tokens: int = estimate_tokens(text)
+        text = apply_stop_sequences(text, stop_sequences or []).strip()
+
+        words: List[str] = text.split(" ")
+        while len(words) > 1 and estimate_tokens(" ".join(words)) > max_new_tokens:
+            words.pop()
+        text = " ".join(words)
+
+        time.sleep(
+            config.LLM_SIMULATED_LATENCY_SECONDS
+            * min(1.0, estimate_tokens(text) / full_tokens)
+        )
+
+        return text
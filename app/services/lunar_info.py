@@ -1,9 +1,16 @@
 from pydantic import BaseModel
 import datetime as dt
+import math
 import random as rand
 
+from app.config.conf import config
+from app.core.simulation import is_seeded, simulation_random, slot_start, time_slot
 from app.models.lunar import LunarAnalysis, LunarPhase
 
+DAY_SECONDS: int = 24 * 60 * 60
+SYNODIC_MONTH_DAYS: float = 29.530588
+REFERENCE_NEW_MOON: dt.datetime = dt.datetime(2000, 1, 6, 18, 14)
+
 
 class LunarInfoService(BaseModel):
     """
@@ -21,9 +28,10 @@ class LunarInfoService(BaseModel):
         """
         Retrieves lunar analysis information for a specific agricultural parcel.
 
-        This method simulates retrieving lunar data with a random chance of failure.
-        When successful, it returns a LunarAnalysis object containing the current moon phase
-        and illumination percentage.
+        This method simulates retrieving lunar data with a random chance of failure
+        (`1 - SIMULATION_LUNAR_AVAILABILITY`, 30% by default). When successful, it returns
+        a LunarAnalysis object containing the current moon phase and illumination
+        percentage.
 
         Args:
             None
@@ -31,23 +39,49 @@ class LunarInfoService(BaseModel):
         Returns:
             LunarAnalysis | None: A LunarAnalysis object containing:
                 - timestamp: Current datetime
-                - phase: Current moon phase (currently hardcoded to NEW)
-                - illumination_percent: Random illumination percentage between 0 and 100
-            Returns None with a 30% probability to simulate service unreliability.
+                - phase: Current moon phase
+                - illumination_percent: Illumination percentage between 0 and 100
+            Returns None to simulate service unreliability.
 
         Note:
-            This is a simulation implementation that returns random data. In a production
-            environment, this would connect to a real lunar data service or database.
+            This is a simulation implementation. Without `SIMULATION_SEED` the phase is
+            hardcoded to NEW and the illumination is random; with a seed both are
+            computed from the date and the mean synodic month, so they are reproducible.
         """
-        if rand.randint(0, 9) >= 7:
+
+        return self.simulate_lunar_info(at=dt.datetime.now())
+
+    def simulate_lunar_info(self, at: dt.datetime) -> LunarAnalysis | None:
+        slot: int = time_slot(at)
+        rng: rand.Random = simulation_random("lunar", slot)
+
+        if rng.random() >= config.SIMULATION_LUNAR_AVAILABILITY:
             return None
 
-        timestamp: dt.datetime = dt.datetime.now()
-        phase: LunarPhase = LunarPhase.NEW
-        illumination_percent: float = rand.uniform(0.0, 100.0)
+        if not is_seeded():
+            return LunarAnalysis(
+                timestamp=at,
+                phase=LunarPhase.NEW,
+                illumination_percent=rng.uniform(0.0, 100.0),
+            )
+
+        timestamp: dt.datetime = slot_start(slot)
+        age: float = (
+            (timestamp - REFERENCE_NEW_MOON).total_seconds() / DAY_SECONDS
+        ) % SYNODIC_MONTH_DAYS
+        cycle: float = age / SYNODIC_MONTH_DAYS
+
+        if cycle < 0.0625 or cycle >= 0.9375:
+            phase: LunarPhase = LunarPhase.NEW
+        elif cycle < 0.4375:
+            phase = LunarPhase.CRESCENT
+        elif cycle < 0.5625:
+            phase = LunarPhase.FULL
+        else:
+            phase = LunarPhase.WANING
 
         return LunarAnalysis(
             timestamp=timestamp,
             phase=phase,
-            illumination_percent=illumination_percent,
+            illumination_percent=50 * (1 - math.cos(2 * math.pi * cycle)),
         )
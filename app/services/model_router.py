@@ -0,0 +1,331 @@
+import datetime as dt
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.models.llms import (
+    ImplementedModels,
+    ModelSpec,
+    QuestionType,
+    RoutingCandidate,
+    RoutingDecision,
+)
+
+# T5's relative position encoding has no fixed input limit (512 is only the tokenizer's
+# default truncation) and Flan-T5 was instruction-tuned on 2048-token inputs, so the
+# encoder reads prompts of that size; the decoder-only models share 2048 positions
+# between the prompt and the completion.
+MODEL_SPECS: Dict[ImplementedModels, ModelSpec] = {
+    ImplementedModels.FLAN_T5_LARGE: ModelSpec(
+        model=ImplementedModels.FLAN_T5_LARGE,
+        context_window_tokens=2048,
+        output_shares_window=False,
+        quality=2,
+        prior_ms_per_token=20.0,
+    ),
+    ImplementedModels.FALCON_RW_1B: ModelSpec(
+        model=ImplementedModels.FALCON_RW_1B,
+        context_window_tokens=2048,
+        output_shares_window=True,
+        quality=1,
+        prior_ms_per_token=25.0,
+    ),
+    ImplementedModels.GPT_NEO_1_3B: ModelSpec(
+        model=ImplementedModels.GPT_NEO_1_3B,
+        context_window_tokens=2048,
+        output_shares_window=True,
+        quality=1,
+        prior_ms_per_token=30.0,
+    ),
+}
+
+# Short answers are fine from any model; diagnoses and plans need the best one.
+REQUIRED_QUALITY: Dict[QuestionType, int] = {
+    QuestionType.YES_NO: 1,
+    QuestionType.FACT: 1,
+    QuestionType.DIAGNOSIS: 2,
+    QuestionType.PLAN: 2,
+}
+
+# Errors are forgotten over time, so a model that failed gets traffic again.
+ERROR_HALF_LIFE_SECONDS: float = 300.0
+# Decision log records waiting to be written; beyond this they are dropped.
+LOG_QUEUE_SIZE: int = 10_000
+
+
+class _ModelHealth:
+    def __init__(self, spec: ModelSpec) -> None:
+        self.ms_per_token: float = spec.prior_ms_per_token
+        self.error_rate: float = 0.0
+        self.error_updated_at: float = time.monotonic()
+        self.observations: int = 0
+
+    def current_error_rate(self) -> float:
+        elapsed: float = time.monotonic() - self.error_updated_at
+        return self.error_rate * 0.5 ** (elapsed / ERROR_HALF_LIFE_SECONDS)
+
+
+class ModelRouter:
+    """
+    Routes `model="auto"` requests to the fastest model likely to answer them well.
+
+    For every request the router checks, per model, whether the prompt and the token
+    budget fit in its context window, the expected latency (observed milliseconds per
+    output token times the budget) and the observed error rate. Among the models that
+    fit, stay under `ROUTER_MAX_ERROR_RATE` and meet the latency SLO, it picks the
+    fastest one whose quality suits the question type; when none does, it degrades
+    first on quality, then on the SLO. Latency and errors are tracked as EWMAs fed by
+    every real generation of the worker.
+
+    Every decision, and later its outcome, is appended to `ROUTER_DECISION_LOG_PATH`
+    so routing policies can be evaluated offline. Like the recommendation history,
+    records are queued and appended by a background thread, never on the request path,
+    and dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._log_thread: threading.Thread | None = None
+        self._log_thread_lock: threading.Lock = threading.Lock()
+        self._health: Dict[ImplementedModels, _ModelHealth] = {
+            model: _ModelHealth(spec) for model, spec in MODEL_SPECS.items()
+        }
+
+    def record(
+        self,
+        model: ImplementedModels,
+        latency_ms: float,
+        generated_tokens: int,
+        error: bool,
+    ) -> None:
+        """
+        Feed the outcome of a generation into the latency and error EWMAs.
+
+        Args:
+            model (ImplementedModels): The model that generated.
+            latency_ms (float): The generation latency.
+            generated_tokens (int): The number of generated tokens.
+            error (bool): Whether the generation failed.
+        """
+
+        health: _ModelHealth | None = self._health.get(model)
+        if health is None:
+            return
+
+        alpha: float = config.ROUTER_EWMA_ALPHA
+
+        with self._lock:
+            health.error_rate = (1 - alpha) * health.current_error_rate() + alpha * error
+            health.error_updated_at = time.monotonic()
+            health.observations += 1
+
+            if not error and generated_tokens > 0:
+                health.ms_per_token = (1 - alpha) * health.ms_per_token + alpha * (
+                    latency_ms / generated_tokens
+                )
+
+    def candidates(
+        self, prompt_tokens: int, max_new_tokens: int
+    ) -> List[RoutingCandidate]:
+        candidates: List[RoutingCandidate] = []
+
+        with self._lock:
+            for model, spec in MODEL_SPECS.items():
+                health: _ModelHealth = self._health[model]
+                window_tokens: int = prompt_tokens + (
+                    max_new_tokens if spec.output_shares_window else 0
+                )
+                candidates.append(
+                    RoutingCandidate(
+                        model=model,
+                        fits_context=window_tokens <= spec.context_window_tokens,
+                        expected_latency_ms=health.ms_per_token * max_new_tokens,
+                        error_rate=health.current_error_rate(),
+                        quality=spec.quality,
+                        observations=health.observations,
+                    )
+                )
+
+        return candidates
+
+    def route(
+        self,
+        question_type: QuestionType,
+        prompt_tokens: int,
+        max_new_tokens: int,
+        latency_slo_ms: float,
+    ) -> RoutingDecision:
+        """
+        Choose the model of a request.
+
+        Args:
+            question_type (QuestionType): The classified question.
+            prompt_tokens (int): The estimated size of the prompt.
+            max_new_tokens (int): The token budget of the completion.
+            latency_slo_ms (float): The latency objective of the request.
+
+        Returns:
+            RoutingDecision: The chosen model, the reason and every candidate's score.
+        """
+
+        required_quality: int = REQUIRED_QUALITY[question_type]
+        candidates: List[RoutingCandidate] = self.candidates(
+            prompt_tokens, max_new_tokens
+        )
+
+        fitting: List[RoutingCandidate] = [
+            candidate
+            for candidate in candidates
+            if candidate.fits_context
+            and candidate.error_rate <= config.ROUTER_MAX_ERROR_RATE
+        ]
+        within_slo: List[RoutingCandidate] = [
+            candidate
+            for candidate in fitting
+            if candidate.expected_latency_ms <= latency_slo_ms
+        ]
+        good: List[RoutingCandidate] = [
+            candidate
+            for candidate in within_slo
+            if candidate.quality >= required_quality
+        ]
+
+        if good:
+            chosen: RoutingCandidate = min(
+                good, key=lambda c: c.expected_latency_ms * (1 + c.error_rate)
+            )
+            reason: str = (
+                f"Fastest model of quality >= {required_quality} for a "
+                f"{question_type.value} question within the {latency_slo_ms:.0f} ms SLO"
+            )
+        elif within_slo:
+            chosen = max(
+                within_slo, key=lambda c: (c.quality, -c.expected_latency_ms)
+            )
+            reason = (
+                f"No model of quality >= {required_quality} fits the prompt within the "
+                f"{latency_slo_ms:.0f} ms SLO; best available quality chosen"
+            )
+        elif fitting:
+            chosen = min(fitting, key=lambda c: c.expected_latency_ms)
+            reason = (
+                f"No model meets the {latency_slo_ms:.0f} ms SLO; fastest fitting "
+                f"model chosen"
+            )
+            metrics.increment("router.slo_unmet")
+        else:
+            # Nothing fits or every model is failing: the prompt will be truncated.
+            chosen = max(
+                candidates,
+                key=lambda c: (
+                    c.error_rate <= config.ROUTER_MAX_ERROR_RATE,
+                    MODEL_SPECS[c.model].context_window_tokens,
+                ),
+            )
+            reason = (
+                f"No healthy model fits a {prompt_tokens}-token prompt; largest context "
+                f"window chosen"
+            )
+            metrics.increment("router.no_fitting_model")
+
+        metrics.increment(f"router.routed.{chosen.model.value}")
+
+        decision: RoutingDecision = RoutingDecision(
+            decision_id=uuid.uuid4().hex,
+            model=chosen.model,
+            reason=reason,
+            question_type=question_type,
+            required_quality=required_quality,
+            prompt_tokens=prompt_tokens,
+            max_new_tokens=max_new_tokens,
+            latency_slo_ms=latency_slo_ms,
+            candidates=candidates,
+        )
+        self._log({"event": "decision", **decision.model_dump(mode="json")})
+
+        return decision
+
+    def log_outcome(
+        self, decision: RoutingDecision, latency_ms: float, error: str | None
+    ) -> None:
+        """
+        Log the outcome of a routed request next to its decision.
+
+        Args:
+            decision (RoutingDecision): The decision of the request.
+            latency_ms (float): The latency of the LLM call (including cache hits).
+            error (str | None): The error of the call, if it failed.
+        """
+
+        self._log(
+            {
+                "event": "outcome",
+                "decision_id": decision.decision_id,
+                "model": decision.model.value,
+                "latency_ms": latency_ms,
+                "slo_met": error is None and latency_ms <= decision.latency_slo_ms,
+                "error": error,
+            }
+        )
+
+    def _log(self, record: Dict) -> None:
+        path: str | None = config.ROUTER_DECISION_LOG_PATH
+        if not path:
+            return
+
+        try:
+            self._log_queue.put_nowait(
+                (path, {"at": dt.datetime.now(dt.timezone.utc).isoformat(), **record})
+            )
+        except queue.Full:
+            metrics.increment("router.log_dropped")
+            return
+
+        with self._log_thread_lock:
+            if self._log_thread is None or not self._log_thread.is_alive():
+                self._log_thread = threading.Thread(
+                    target=self._write_log, name="router-log-writer", daemon=True
+                )
+                self._log_thread.start()
+
+    def _write_log(self) -> None:
+        while True:
+            batch: List[Tuple[str, Dict]] = [self._log_queue.get()]
+
+            while True:
+                try:
+                    batch.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                for path in dict.fromkeys(path for path, _ in batch):
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                    with open(path, "a", encoding="utf-8") as file:
+                        file.writelines(
+                            json.dumps(record) + "\n"
+                            for record_path, record in batch
+                            if record_path == path
+                        )
+            except OSError:
+                metrics.increment("router.log_errors")
+            finally:
+                for _ in batch:
+                    self._log_queue.task_done()
+
+    def flush(self) -> None:
+        """
+        Block until every queued decision log record is written.
+        """
+
+        self._log_queue.join()
+
+
+model_router: ModelRouter = ModelRouter()
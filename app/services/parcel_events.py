@@ -0,0 +1,63 @@
+import datetime as dt
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+from app.config.conf import config
+from app.core.event_bus import EventBus
+from app.models.subscriptions import ParcelEvent, ParcelEventType
+
+
+class ParcelEventService:
+    """
+    Publishes the changes of a parcel to the clients subscribed to it.
+
+    Events are only built and encoded when some client of this worker follows the
+    parcel, so producers can call `publish` on every change at no cost when nobody is
+    subscribed. Safe to call from any thread.
+
+    Attributes:
+        bus (EventBus): The bus the events are fanned out on.
+    """
+
+    def __init__(self) -> None:
+        self.bus: EventBus = EventBus(
+            name="parcel_events",
+            queue_size=config.SUBSCRIPTION_QUEUE_SIZE,
+            max_subscriptions=config.SUBSCRIPTION_MAX_CONNECTIONS,
+        )
+
+    def publish(
+        self,
+        parcel_id: str,
+        event_type: ParcelEventType,
+        payload: BaseModel | Dict[str, Any],
+    ) -> None:
+        """
+        Push a change of a parcel to its subscribers.
+
+        Args:
+            parcel_id (str): The ID of the parcel.
+            event_type (ParcelEventType): The kind of change.
+            payload (BaseModel | Dict[str, Any]): The payload of the event, a model or
+                a JSON-serializable dictionary.
+        """
+
+        if not config.SUBSCRIPTIONS_ENABLED or not self.bus.has_followers(parcel_id):
+            return
+
+        event: ParcelEvent = ParcelEvent(
+            type=event_type,
+            parcel_id=parcel_id,
+            produced_at=dt.datetime.now(dt.timezone.utc),
+            data=(
+                payload.model_dump(mode="json")
+                if isinstance(payload, BaseModel)
+                else payload
+            ),
+        )
+
+        self.bus.publish(parcel_id, event_type.value, event.model_dump_json())
+
+
+parcel_events: ParcelEventService = ParcelEventService()
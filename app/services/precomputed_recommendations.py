@@ -0,0 +1,88 @@
+import hashlib
+from typing import Any
+
+from app.config.conf import config
+from app.core.cache import TieredCache, get_cache
+from app.models.llms import ImplementedModels
+from app.models.recommendations import PrecomputedRecommendation
+
+_STATS_KEY: str = "__stats__"
+
+
+class PrecomputedRecommendationStore:
+    """
+    The store of generated recommendations, keyed by model, parcel and question.
+
+    Entries live in the "precomputed" namespace of the tiered cache, so a recommendation
+    generated by one worker (interactively or by the pre-generation scheduler) is reused
+    by every worker of the host and survives restarts. Entries never expire on their
+    own; their age and context fingerprint are checked when they are reused. Entries
+    are replaced in place (e.g. by a pre-generated refresh), so workers only keep them
+    in memory for `PRECOMPUTED_MEMORY_TTL_SECONDS` before reading the shared copy again.
+
+    Attributes:
+        cache (TieredCache): The cache holding the precomputed recommendations.
+    """
+
+    def __init__(self, cache: TieredCache) -> None:
+        self.cache: TieredCache = cache
+
+    def _key(self, model: ImplementedModels, parcel_id: str, question: str) -> str:
+        question_hash: str = hashlib.sha256(question.encode()).hexdigest()[:16]
+
+        return f"{model.value}:{parcel_id}:{question_hash}"
+
+    def get(
+        self, model: ImplementedModels, parcel_id: str, question: str
+    ) -> PrecomputedRecommendation | None:
+        """
+        Retrieve the stored recommendation of a parcel for a question.
+
+        Args:
+            model (ImplementedModels): The model that generated the recommendation.
+            parcel_id (str): The unique identifier of the parcel.
+            question (str): The normalized question.
+
+        Returns:
+            PrecomputedRecommendation | None: The stored recommendation, if any.
+        """
+
+        return self.cache.get(self._key(model, parcel_id, question))
+
+    def put(
+        self,
+        entry: PrecomputedRecommendation,
+        question: str,
+        model: ImplementedModels | None = None,
+    ) -> None:
+        """
+        Store a recommendation, replacing the previous one for the parcel and question.
+
+        Args:
+            entry (PrecomputedRecommendation): The recommendation to store.
+            question (str): The normalized question it answers.
+            model (ImplementedModels | None): The model requested for it, when it
+                differs from the model that generated it (e.g. "auto"). Defaults to the
+                generating model.
+        """
+
+        self.cache.set(
+            self._key(
+                model or entry.response.model, entry.response.parcel_id, question
+            ),
+            entry,
+        )
+
+    def get_published_stats(self) -> Any | None:
+        return self.cache.get(_STATS_KEY)
+
+    def publish_stats(self, stats: Any) -> None:
+        self.cache.set(_STATS_KEY, stats)
+
+
+precomputed_store: PrecomputedRecommendationStore = PrecomputedRecommendationStore(
+    cache=get_cache(
+        namespace="precomputed",
+        memory_ttl_seconds=config.PRECOMPUTED_MEMORY_TTL_SECONDS,
+    )
+)
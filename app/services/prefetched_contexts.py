@@ -0,0 +1,221 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.models.recommendations import RecommendationContext
+
+
+class _Prefetch:
+    __slots__ = ("future", "question", "started_at", "expires_at", "elapsed_ms", "hits")
+
+    def __init__(self, question: str) -> None:
+        # Pending while queued, running while gathered, then finished.
+        self.future: Future = Future()
+        self.question: str = question
+        self.started_at: float = time.monotonic()
+        # Set when the context is ready; entries expire PREFETCH_TTL_SECONDS later.
+        self.expires_at: float | None = None
+        self.elapsed_ms: float = 0.0
+        self.hits: int = 0
+
+
+class PrefetchedContextStore:
+    """
+    Short-lived, in-process store of recommendation contexts gathered ahead of requests.
+
+    A prefetch is registered before it starts, so a recommendation request arriving
+    while the context is being gathered waits for it instead of gathering it a second
+    time. Ready contexts are served for `PREFETCH_TTL_SECONDS`, so the sensor
+    reading, weather and satellite data they carry are at most that old.
+
+    The store reports in the metrics:
+
+    - `prefetch.started`, and `prefetch.skipped` when a prefetch was not needed (fresh
+      or running) or `PREFETCH_MAX_IN_FLIGHT` prefetches were already running;
+    - `prefetch.hits` (ready context), `prefetch.joined` (context still being gathered)
+      and `prefetch.misses`, whose ratio is the prefetch hit rate, and
+      `prefetch.cancelled`, the prefetches still queued when their request arrived,
+      which gathers the context itself rather than waiting;
+    - `prefetch.wasted`, the prefetches that expired or were evicted without serving any
+      request, and `prefetch.wasted_ms`, the gathering time they cost.
+
+    The store is local to the worker process: with several workers, a request only
+    finds the contexts prefetched by the worker that serves it.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._prefetches: Dict[str, _Prefetch] = {}
+
+    def __len__(self) -> int:
+        return len(self._prefetches)
+
+    def begin(self, parcel_id: str, question: str) -> Future | None:
+        """
+        Register a prefetch of a parcel's context, unless it is not needed.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+            question (str): The normalized question the context is gathered for.
+
+        Returns:
+            Future | None: The future to complete with the gathered context, or None if
+                the context is fresh, already being gathered, or too many prefetches
+                are running.
+        """
+
+        now: float = time.monotonic()
+
+        with self._lock:
+            self._sweep(now)
+            prefetch: _Prefetch | None = self._prefetches.get(parcel_id)
+
+            if prefetch is not None:
+                metrics.increment("prefetch.skipped")
+                return None
+
+            ready: List[str] = [
+                key for key, entry in self._prefetches.items() if entry.future.done()
+            ]
+
+            if len(self._prefetches) - len(ready) >= config.PREFETCH_MAX_IN_FLIGHT:
+                metrics.increment("prefetch.skipped")
+                return None
+
+            if len(self._prefetches) >= config.PREFETCH_MAX_ENTRIES and ready:
+                self._drop(
+                    min(ready, key=lambda key: self._prefetches[key].started_at)
+                )
+
+            prefetch = _Prefetch(question)
+            self._prefetches[parcel_id] = prefetch
+
+        metrics.increment("prefetch.started")
+
+        return prefetch.future
+
+    def start(self, parcel_id: str, future: Future) -> bool:
+        """
+        Mark a queued prefetch as running, unless a request already took it over.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+            future (Future): The future returned by `begin`.
+
+        Returns:
+            bool: True if the context must be gathered, False if the prefetch was
+                cancelled.
+        """
+
+        with self._lock:
+            prefetch: _Prefetch | None = self._prefetches.get(parcel_id)
+
+            if prefetch is None or prefetch.future is not future:
+                return False
+
+            return future.set_running_or_notify_cancel()
+
+    def complete(
+        self,
+        parcel_id: str,
+        future: Future,
+        context: RecommendationContext | None,
+        elapsed_ms: float,
+    ) -> None:
+        """
+        Publish the outcome of a prefetch and wake the requests waiting for it.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+            future (Future): The future returned by `begin`.
+            context (RecommendationContext | None): The gathered context, None if the
+                gathering failed (the prefetch is then forgotten).
+            elapsed_ms (float): How long gathering the context took.
+        """
+
+        with self._lock:
+            prefetch: _Prefetch | None = self._prefetches.get(parcel_id)
+
+            if prefetch is not None and prefetch.future is future:
+                if context is None:
+                    del self._prefetches[parcel_id]
+                else:
+                    prefetch.elapsed_ms = elapsed_ms
+                    prefetch.expires_at = time.monotonic() + config.PREFETCH_TTL_SECONDS
+
+        metrics.observe("prefetch.gather_ms", elapsed_ms)
+        future.set_result(context)
+
+    def take(self, parcel_id: str) -> Tuple[RecommendationContext, str] | None:
+        """
+        Retrieve the prefetched context of a parcel, waiting for it if it is running.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+
+        Returns:
+            Tuple[RecommendationContext, str] | None: The context and the normalized
+                question it was gathered for, or None if no live prefetch exists.
+        """
+
+        with self._lock:
+            self._sweep(time.monotonic())
+            prefetch: _Prefetch | None = self._prefetches.get(parcel_id)
+
+            # A prefetch still queued behind others would be slower than gathering
+            # the context right away: cancel it and let the request gather.
+            if prefetch is not None and prefetch.future.cancel():
+                del self._prefetches[parcel_id]
+                metrics.increment("prefetch.cancelled")
+                prefetch = None
+
+        if prefetch is None:
+            metrics.increment("prefetch.misses")
+            return None
+
+        joined: bool = not prefetch.future.done()
+        context: RecommendationContext | None = prefetch.future.result()
+
+        if context is None:
+            metrics.increment("prefetch.misses")
+            return None
+
+        with self._lock:
+            prefetch.hits += 1
+
+        metrics.increment("prefetch.joined" if joined else "prefetch.hits")
+
+        return context, prefetch.question
+
+    def sweep(self) -> None:
+        """
+        Drop the expired prefetches, counting the unused ones as wasted.
+
+        Expired prefetches are also dropped on every `begin` and `take`.
+        """
+
+        with self._lock:
+            self._sweep(time.monotonic())
+
+    def _sweep(self, now: float) -> None:
+        expired: List[str] = [
+            parcel_id
+            for parcel_id, prefetch in self._prefetches.items()
+            if prefetch.expires_at is not None and prefetch.expires_at <= now
+        ]
+
+        for parcel_id in expired:
+            self._drop(parcel_id)
+
+    def _drop(self, parcel_id: str) -> None:
+        prefetch: _Prefetch = self._prefetches.pop(parcel_id)
+
+        if prefetch.hits == 0 and prefetch.future.done():
+            metrics.increment("prefetch.wasted")
+            metrics.increment("prefetch.wasted_ms", prefetch.elapsed_ms)
+
+
+prefetched_contexts: PrefetchedContextStore = PrefetchedContextStore()
@@ -2,7 +2,19 @@ from pydantic import BaseModel
 import datetime as dt
 import random as rand
 
+from app.config.conf import config
+from app.core.simulation import (
+    cyclic_value,
+    is_seeded,
+    simulation_random,
+    slot_start,
+    time_slot,
+)
 from app.models.process import ProcessInformation
+from app.models.telemetry import TelemetrySource
+from app.services.telemetry_monitor import telemetry_monitor
+
+DAY_SECONDS: int = 24 * 60 * 60
 
 
 class ProcessInformationService(BaseModel):
@@ -11,8 +23,9 @@ class ProcessInformationService(BaseModel):
 
     This service simulates sensor data for agricultural monitoring by generating
     random values within realistic ranges for various environmental parameters.
-    The service includes a 30% chance of returning None to simulate sensor failures
-    or missing data scenarios.
+    The service returns None with a configurable probability (30% by default) to
+    simulate sensor failures or missing data scenarios, and is reproducible when
+    `SIMULATION_SEED` is set.
 
     Attributes:
         Inherits from Pydantic BaseModel for data validation and serialization.
@@ -22,10 +35,12 @@ class ProcessInformationService(BaseModel):
         """
         Retrieves simulated process information for a specific agricultural parcel.
 
-        This method generates random sensor readings for various environmental parameters
-        including soil moisture, temperatures, and conductivity measurements. There is a
-        30% chance that the method will return None to simulate sensor failures or missing
-        data scenarios.
+        This method generates sensor readings for various environmental parameters
+        including soil moisture, temperatures, and conductivity measurements. With
+        probability `1 - SIMULATION_PROCESS_AVAILABILITY` (30% by default) the method
+        returns None to simulate sensor failures or missing data scenarios. Every
+        reading is fed to the streaming anomaly detector of the parcel as a simulated
+        source, apart from the readings pushed by the field gateways.
 
         Args:
             parcel_id (str): The unique identifier of the agricultural parcel.
@@ -42,22 +57,85 @@ class ProcessInformationService(BaseModel):
             - Air temperature: 20-30°C
             - Conductivity: 1.0-2.5 mS/cm
         """
-        if rand.randint(0, 9) >= 7:
+
+        reading: ProcessInformation | None = self.simulate_process_information(
+            parcel_id=parcel_id, at=dt.datetime.now()
+        )
+
+        if reading is not None and config.ANOMALY_DETECTION_ENABLED:
+            telemetry_monitor.observe(reading, source=TelemetrySource.SIMULATED)
+
+        return reading
+
+    def simulate_process_information(
+        self, parcel_id: str, at: dt.datetime
+    ) -> ProcessInformation | None:
+        """
+        Simulates the sensor readings of a parcel at a point in time.
+
+        With `SIMULATION_SEED` set, the reading is a deterministic function of the parcel
+        and the time slot of `at`: each parcel has its own baseline, temperatures follow
+        a daily cycle and soil moisture drifts over a multi-day cycle, so consecutive
+        readings change gradually. Without a seed, every value is drawn uniformly.
+
+        Args:
+            parcel_id (str): The unique identifier of the agricultural parcel.
+            at (datetime): The time of the reading.
+
+        Returns:
+            ProcessInformation | None: The reading, or None if the sensors are unavailable.
+        """
+
+        slot: int = time_slot(at)
+        rng: rand.Random = simulation_random("process", parcel_id, slot)
+
+        if rng.random() >= config.SIMULATION_PROCESS_AVAILABILITY:
             return None
 
-        timestamp: dt.datetime = dt.datetime.now()
-        soil_moisture_percent: float = rand.uniform(35.0, 65.0)
-        soil_temperature_c: float = rand.uniform(18.0, 26.0)
-        air_temperature_c: float = rand.uniform(20.0, 30.0)
-        conductivity_ms_cm: float = rand.uniform(1.0, 2.5)
-        conductivity_ec_ms_cm: float = rand.uniform(1.0, 2.5)
+        if not is_seeded():
+            return ProcessInformation(
+                parcel_id=parcel_id,
+                timestamp=at,
+                soil_moisture_percent=rng.uniform(35.0, 65.0),
+                soil_temperature_c=rng.uniform(18.0, 26.0),
+                air_temperature_c=rng.uniform(20.0, 30.0),
+                conductivity_ms_cm=rng.uniform(1.0, 2.5),
+                conductivity_ec_ms_cm=rng.uniform(1.0, 2.5),
+            )
+
+        profile: rand.Random = simulation_random("process", parcel_id)
+        moisture_phase: float = profile.random()
+        temperature_phase: float = profile.uniform(-0.05, 0.05)
+        conductivity: float = profile.uniform(1.0, 2.5)
+        timestamp: dt.datetime = slot_start(slot)
 
         return ProcessInformation(
             parcel_id=parcel_id,
             timestamp=timestamp,
-            soil_moisture_percent=soil_moisture_percent,
-            soil_temperature_c=soil_temperature_c,
-            air_temperature_c=air_temperature_c,
-            conductivity_ms_cm=conductivity_ms_cm,
-            conductivity_ec_ms_cm=conductivity_ec_ms_cm,
+            soil_moisture_percent=cyclic_value(
+                low=35.0,
+                high=65.0,
+                at=timestamp,
+                period_seconds=5 * DAY_SECONDS,
+                phase=moisture_phase,
+                noise=rng.uniform(-0.02, 0.02),
+            ),
+            soil_temperature_c=cyclic_value(
+                low=18.0,
+                high=26.0,
+                at=timestamp,
+                period_seconds=DAY_SECONDS,
+                phase=temperature_phase,
+                noise=rng.uniform(-0.03, 0.03),
+            ),
+            air_temperature_c=cyclic_value(
+                low=20.0,
+                high=30.0,
+                at=timestamp,
+                period_seconds=DAY_SECONDS,
+                phase=temperature_phase,
+                noise=rng.uniform(-0.05, 0.05),
+            ),
+            conductivity_ms_cm=conductivity + rng.uniform(-0.05, 0.05),
+            conductivity_ec_ms_cm=conductivity + rng.uniform(-0.05, 0.05),
         )
@@ -0,0 +1,71 @@
+import threading
+from collections import deque
+from typing import Deque, List
+
+from app.config.conf import config
+from app.core.cache import TieredCache, get_cache
+from app.core.metrics import metrics
+from app.models.profiling import ProfileSummary, RequestProfile
+
+RECENT_PROFILES: int = 100
+
+
+class ProfileStore:
+    """
+    Keeps request profiles for download.
+
+    Profiles are stored in the shared cache for `PROFILING_RETENTION_SECONDS`, so any
+    worker can serve a profile recorded by another one. The list of recent profiles is
+    kept by each worker for the requests it served.
+
+    Attributes:
+        cache (TieredCache): The cache holding the profiles.
+    """
+
+    def __init__(self) -> None:
+        self.cache: TieredCache = get_cache(
+            namespace="profiles", ttl_seconds=config.PROFILING_RETENTION_SECONDS
+        )
+        self._lock: threading.Lock = threading.Lock()
+        self._recent: Deque[ProfileSummary] = deque(maxlen=RECENT_PROFILES)
+
+    def save(self, profile: RequestProfile) -> None:
+        """
+        Store a profile.
+
+        Args:
+            profile (RequestProfile): The profile.
+        """
+
+        self.cache.set(profile.profile_id, profile)
+        metrics.increment(f"profiling.{profile.trigger}")
+
+        with self._lock:
+            self._recent.append(profile.summary())
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        """
+        Retrieve a stored profile.
+
+        Args:
+            profile_id (str): The ID of the profile.
+
+        Returns:
+            RequestProfile | None: The profile, or None if unknown or expired.
+        """
+
+        return self.cache.get(profile_id)
+
+    def recent(self) -> List[ProfileSummary]:
+        """
+        List the profiles recorded by this worker, newest first.
+
+        Returns:
+            List[ProfileSummary]: The summaries of the profiles.
+        """
+
+        with self._lock:
+            return list(reversed(self._recent))
+
+
+profile_store: ProfileStore = ProfileStore()
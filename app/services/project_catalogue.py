@@ -0,0 +1,380 @@
+import calendar
+import csv
+import datetime as dt
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+from app.config.conf import config
+from app.core.bitmap_index import BitmapIndex, bitmap_count, bitmap_page
+from app.core.spatial_grid import SpatialGrid
+from app.models.project import ProjectDetails
+
+FACET_FIELDS: List[str] = ["crop_type", "current_phase"]
+
+
+def location_components(location: str) -> List[str]:
+    """
+    Split a location into its normalized comma-separated components.
+
+    Args:
+        location (str): A location such as "Hispania, Antioquia, Colombia".
+
+    Returns:
+        List[str]: The lower-cased components (e.g. ["hispania", "antioquia", "colombia"]).
+    """
+
+    return [
+        component.strip().lower()
+        for component in location.split(",")
+        if component.strip()
+    ]
+
+
+def index_keys(project: ProjectDetails) -> List[Hashable]:
+    """
+    Return the secondary index keys of a project.
+
+    Args:
+        project (ProjectDetails): The indexed project.
+
+    Returns:
+        List[Hashable]: The keys of its crop, variety, phase, location components and
+            planting day and month.
+    """
+
+    keys: List[Hashable] = [
+        ("crop_type", project.crop_type.lower()),
+        ("variety", project.variety.lower()),
+        ("current_phase", project.current_phase.lower()),
+    ]
+    keys.extend(
+        ("location", component) for component in location_components(project.location)
+    )
+
+    try:
+        planting_date: dt.date = dt.date.fromisoformat(project.planting_date)
+    except ValueError:
+        return keys
+
+    month: int = planting_date.year * 12 + planting_date.month - 1
+
+    keys.append(("planting_day", planting_date.toordinal()))
+    keys.append(("planting_dekad", month, min((planting_date.day - 1) // 10, 2)))
+    keys.append(("planting_month", month))
+
+    return keys
+
+
+class ProjectCatalogue:
+    """
+    An in-memory catalogue of projects indexed by project and parcel identifier.
+
+    The catalogue is shared by every service instance of the worker process, so it is
+    loaded once, and lookups are dictionary accesses regardless of the fleet size.
+    Secondary bitmap indexes over crop type, variety, phase, location components and
+    planting day/month are maintained as projects are added, and serve filtered
+    searches with cursor pagination. Projects with coordinates are also kept in a
+    spatial grid answering nearest-neighbour queries.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._projects: List[ProjectDetails] = []
+        self._positions: Dict[str, int] = {}
+        self._by_project_id: Dict[str, ProjectDetails] = {}
+        self._by_parcel_id: Dict[str, ProjectDetails] = {}
+        self._index: BitmapIndex = BitmapIndex()
+        self._grid: SpatialGrid = SpatialGrid(config.SPATIAL_INDEX_CELL_DEGREES)
+
+    def __len__(self) -> int:
+        return len(self._projects)
+
+    def add_many(self, projects: Iterable[ProjectDetails]) -> int:
+        """
+        Add projects to the catalogue, replacing projects with the same identifier.
+
+        Args:
+            projects (Iterable[ProjectDetails]): The projects to add.
+
+        Returns:
+            int: The number of projects added.
+        """
+
+        added: int = 0
+        postings: Dict[Hashable, List[int]] = defaultdict(list)
+
+        with self._lock:
+            for project in projects:
+                position: int | None = self._positions.get(project.project_id)
+
+                if position is not None:
+                    previous: ProjectDetails = self._projects[position]
+                    self._by_parcel_id.pop(previous.parcel_id, None)
+                    for key in index_keys(previous):
+                        self._index.discard(key, position)
+                    self._projects[position] = project
+                else:
+                    position = len(self._projects)
+                    self._positions[project.project_id] = position
+                    self._projects.append(project)
+
+                self._by_project_id[project.project_id] = project
+                self._by_parcel_id[project.parcel_id] = project
+                for key in index_keys(project):
+                    postings[key].append(position)
+                if project.latitude is not None and project.longitude is not None:
+                    self._grid.add(position, project.latitude, project.longitude)
+                else:
+                    self._grid.remove(position)
+                added += 1
+
+            # Index keys are set in one vectorized pass per key for the whole batch.
+            for key, positions in postings.items():
+                self._index.add(key, positions)
+
+        return added
+
+    def ingest_file(self, path: str) -> int:
+        """
+        Ingest projects from a CSV or JSONL file.
+
+        CSV files must have a header with the ProjectDetails field names; empty cells
+        of optional fields (e.g. coordinates) are left unset.
+
+        Args:
+            path (str): The path of a `.csv` or `.jsonl` file.
+
+        Returns:
+            int: The number of projects ingested.
+
+        Raises:
+            ValueError: If the file extension is not supported.
+        """
+
+        with open(path, encoding="utf-8", newline="") as file:
+            if path.endswith(".csv"):
+                return self.add_many(
+                    ProjectDetails(**{key: value for key, value in row.items() if value})
+                    for row in csv.DictReader(file)
+                )
+
+            if path.endswith(".jsonl"):
+                return self.add_many(
+                    ProjectDetails.model_validate_json(line)
+                    for line in file
+                    if line.strip()
+                )
+
+        raise ValueError(f"Unsupported project catalogue file: {path}")
+
+    def _planting_date_bitmap(
+        self, planted_from: dt.date | None, planted_to: dt.date | None
+    ) -> np.ndarray:
+        """
+        Build the bitmap of projects planted within an inclusive date range.
+
+        Whole months inside the range use the month bitmaps, whole dekads of the
+        partially covered months use dekad bitmaps and only the remaining days at both
+        ends use day bitmaps, so a range never needs more than a few dozen unions.
+        """
+
+        start: dt.date = planted_from or dt.date.min
+        end: dt.date = planted_to or dt.date.max
+        months: List[int] = sorted(
+            key[1] for key in self._index.keys() if key[0] == "planting_month"
+        )
+        keys: List[Hashable] = []
+
+        for month in months:
+            year, month_index = divmod(month, 12)
+            first_day: dt.date = dt.date(year, month_index + 1, 1)
+            last_day: dt.date = first_day.replace(
+                day=calendar.monthrange(year, month_index + 1)[1]
+            )
+
+            if last_day < start or first_day > end:
+                continue
+
+            if start <= first_day and last_day <= end:
+                keys.append(("planting_month", month))
+                continue
+
+            for dekad in range(3):
+                dekad_first: dt.date = first_day.replace(day=1 + 10 * dekad)
+                dekad_last: dt.date = (
+                    last_day if dekad == 2 else first_day.replace(day=10 + 10 * dekad)
+                )
+
+                if dekad_last < start or dekad_first > end:
+                    continue
+
+                if start <= dekad_first and dekad_last <= end:
+                    keys.append(("planting_dekad", month, dekad))
+                    continue
+
+                day: dt.date = max(dekad_first, start)
+                while day <= min(dekad_last, end):
+                    keys.append(("planting_day", day.toordinal()))
+                    day += dt.timedelta(days=1)
+
+        return self._index.union(keys)
+
+    def search(
+        self,
+        crop_type: str | None = None,
+        variety: str | None = None,
+        current_phase: str | None = None,
+        location: str | None = None,
+        planted_from: dt.date | None = None,
+        planted_to: dt.date | None = None,
+        cursor: int = 0,
+        limit: int = 50,
+        facets: bool = False,
+    ) -> Tuple[List[ProjectDetails], int, int | None, Dict[str, Dict[str, int]]]:
+        """
+        Search projects by attribute, location and planting date range.
+
+        Text filters are case-insensitive exact matches; the location filter matches
+        projects having every comma-separated component of it (e.g. "Antioquia" or
+        "Hispania, Antioquia"). Results are ordered by catalogue position.
+
+        Args:
+            crop_type (str | None): The crop type.
+            variety (str | None): The crop variety.
+            current_phase (str | None): The growth phase.
+            location (str | None): The location components.
+            planted_from (date | None): The earliest planting date, inclusive.
+            planted_to (date | None): The latest planting date, inclusive.
+            cursor (int): The position to resume from, as returned by a previous page.
+            limit (int): The maximum number of projects to return.
+            facets (bool): Whether to count the matches per crop type and phase.
+
+        Returns:
+            Tuple: The page of projects, the total number of matches, the cursor of the
+                next page (None on the last page) and the facet counts.
+        """
+
+        keys: List[Hashable] = []
+        for field, value in [
+            ("crop_type", crop_type),
+            ("variety", variety),
+            ("current_phase", current_phase),
+        ]:
+            if value:
+                keys.append((field, value.strip().lower()))
+
+        if location:
+            keys.extend(
+                ("location", component) for component in location_components(location)
+            )
+
+        with self._lock:
+            words: np.ndarray = self._index.intersect(self._index.all(), keys)
+
+            if planted_from or planted_to:
+                np.bitwise_and(
+                    words,
+                    self._planting_date_bitmap(planted_from, planted_to),
+                    out=words,
+                )
+
+            positions, has_more = bitmap_page(words, start=cursor, limit=limit)
+            page: List[ProjectDetails] = [self._projects[int(p)] for p in positions]
+            counts: Dict[str, Dict[str, int]] = {}
+
+            if facets:
+                for key in self._index.keys():
+                    if key[0] in FACET_FIELDS:
+                        count: int = self._index.count(words, key)
+                        if count:
+                            counts.setdefault(key[0], {})[key[1]] = count
+
+            total: int = bitmap_count(words)
+
+        next_cursor: int | None = int(positions[-1]) + 1 if has_more else None
+
+        return page, total, next_cursor, counts
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_distance_km: float | None = None,
+    ) -> List[Tuple[ProjectDetails, float]]:
+        """
+        Find the projects closest to a location.
+
+        Args:
+            latitude (float): The latitude of the location, in degrees.
+            longitude (float): The longitude of the location, in degrees.
+            k (int): The maximum number of projects to return.
+            max_distance_km (float | None): Ignore projects farther than this distance.
+
+        Returns:
+            List[Tuple[ProjectDetails, float]]: The projects and their distances in
+                kilometres, nearest first. Projects without coordinates are ignored.
+        """
+
+        return [
+            (self._projects[position], distance)
+            for position, distance in self._grid.nearest(
+                latitude, longitude, k=k, max_distance_km=max_distance_km
+            )
+        ]
+
+    def get_projects(self) -> List[ProjectDetails]:
+        return self._projects
+
+    def get_project(self, project_id: str) -> ProjectDetails | None:
+        return self._by_project_id.get(project_id)
+
+    def get_project_by_parcel_id(self, parcel_id: str) -> ProjectDetails | None:
+        return self._by_parcel_id.get(parcel_id)
+
+
+project_catalogue: ProjectCatalogue = ProjectCatalogue()
+
+if config.PROJECTS_DATA_PATH:
+    project_catalogue.ingest_file(config.PROJECTS_DATA_PATH)
+else:
+    project_catalogue.add_many(
+        [
+            ProjectDetails(
+                project_id="PROJ_RICE_20240101_P1233",
+                parcel_id="P1233",
+                location="Ciudad Bolivar, Antioquia, Colombia",
+                crop_type="rice",
+                variety="jasmine",
+                planting_date="2024-01-01",
+                current_phase="vegetative",
+                latitude=5.8499,
+                longitude=-76.0247,
+            ),
+            ProjectDetails(
+                project_id="PROJ_COTTON_20240116_P1234",
+                parcel_id="P1234",
+                location="Hispania, Antioquia, Colombia",
+                crop_type="cotton",
+                variety="upland",
+                planting_date="2024-01-16",
+                current_phase="flowering",
+                latitude=5.7998,
+                longitude=-75.9067,
+            ),
+            ProjectDetails(
+                project_id="PROJ_BARLEY_20240202_P1235",
+                parcel_id="P1235",
+                location="Jardín, Antioquia, Colombia",
+                crop_type="barley",
+                variety="winter",
+                planting_date="2024-02-02",
+                current_phase="maturity",
+                latitude=5.5986,
+                longitude=-75.8197,
+            ),
+        ]
+    )
@@ -1,51 +1,24 @@
 from pydantic import BaseModel
+import datetime as dt
 from typing import List
 
-from app.models.project import ProjectDetails
+from app.models.project import NearbyProject, ProjectDetails, ProjectSearchResult
+from app.services.project_catalogue import project_catalogue
 
 
 class ProjectInfoService(BaseModel):
     """
     A service class for managing project information and details.
 
-    This class maintains a list of project details and provides methods to retrieve
-    project information. It serves as a data store for project-related information
-    including crop types, planting dates, and current growth phases.
+    This class provides methods to retrieve project information from the process-wide
+    project catalogue, which holds project-related information including crop types,
+    planting dates, and current growth phases. The catalogue is loaded from
+    `PROJECTS_DATA_PATH` when set and lookups by project or parcel are indexed.
 
     Attributes:
         Inherits from Pydantic BaseModel for data validation and serialization.
     """
 
-    projects: List[ProjectDetails] = [
-        ProjectDetails(
-            project_id="PROJ_RICE_20240101_P1233",
-            parcel_id="P1233",
-            location="Ciudad Bolivar, Antioquia, Colombia",
-            crop_type="rice",
-            variety="jasmine",
-            planting_date="2024-01-01",
-            current_phase="vegetative",
-        ),
-        ProjectDetails(
-            project_id="PROJ_COTTON_20240116_P1234",
-            parcel_id="P1234",
-            location="Hispania, Antioquia, Colombia",
-            crop_type="cotton",
-            variety="upland",
-            planting_date="2024-01-16",
-            current_phase="flowering",
-        ),
-        ProjectDetails(
-            project_id="PROJ_BARLEY_20240202_P1235",
-            parcel_id="P1235",
-            location="Jardín, Antioquia, Colombia",
-            crop_type="barley",
-            variety="winter",
-            planting_date="2024-02-02",
-            current_phase="maturity",
-        ),
-    ]
-
     def get_projects(self) -> List[ProjectDetails]:
         """
         Retrieve all projects stored in the service.
@@ -54,7 +27,7 @@ class ProjectInfoService(BaseModel):
             List[ProjectDetails]: A list containing all project details.
         """
 
-        return self.projects
+        return project_catalogue.get_projects()
 
     def get_project(self, project_id: str) -> ProjectDetails | None:
         """
@@ -67,10 +40,7 @@ class ProjectInfoService(BaseModel):
             ProjectDetails | None: The project details if found, None otherwise.
         """
 
-        for project in self.projects:
-            if project.project_id == project_id:
-                return project
-        return None
+        return project_catalogue.get_project(project_id)
 
     def get_project_by_parcel_id(self, parcel_id: str) -> ProjectDetails | None:
         """
@@ -83,7 +53,127 @@ class ProjectInfoService(BaseModel):
             ProjectDetails | None: The project details if found, None otherwise.
         """
 
-        for project in self.projects:
-            if project.parcel_id == parcel_id:
-                return project
-        return None
+        return project_catalogue.get_project_by_parcel_id(parcel_id)
+
+    def search_projects(
+        self,
+        crop_type: str | None = None,
+        variety: str | None = None,
+        current_phase: str | None = None,
+        location: str | None = None,
+        planted_from: dt.date | None = None,
+        planted_to: dt.date | None = None,
+        cursor: str | None = None,
+        limit: int = 50,
+        facets: bool = False,
+    ) -> ProjectSearchResult:
+        """
+        Search projects through the secondary indexes of the project catalogue.
+
+        Args:
+            crop_type (str | None): The crop type.
+            variety (str | None): The crop variety.
+            current_phase (str | None): The growth phase.
+            location (str | None): The location components (e.g. "Antioquia").
+            planted_from (date | None): The earliest planting date, inclusive.
+            planted_to (date | None): The latest planting date, inclusive.
+            cursor (str | None): The cursor returned with the previous page.
+            limit (int): The maximum number of projects to return.
+            facets (bool): Whether to count the matches per crop type and phase.
+
+        Returns:
+            ProjectSearchResult: The page of matching projects and the total count.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+
+        position: int = int(cursor) if cursor else 0
+        if position < 0:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+        projects, total, next_cursor, counts = project_catalogue.search(
+            crop_type=crop_type,
+            variety=variety,
+            current_phase=current_phase,
+            location=location,
+            planted_from=planted_from,
+            planted_to=planted_to,
+            cursor=position,
+            limit=limit,
+            facets=facets,
+        )
+
+        return ProjectSearchResult(
+            total=total,
+            count=len(projects),
+            next_cursor=str(next_cursor) if next_cursor is not None else None,
+            facets=counts,
+            projects=projects,
+        )
+
+    def nearest_projects(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 10,
+        radius_km: float | None = None,
+    ) -> List[NearbyProject]:
+        """
+        Find the projects closest to a location through the catalogue's spatial grid.
+
+        Args:
+            latitude (float): The latitude of the location, in degrees.
+            longitude (float): The longitude of the location, in degrees.
+            k (int): The maximum number of projects to return.
+            radius_km (float | None): Ignore projects farther than this distance.
+
+        Returns:
+            List[NearbyProject]: The closest projects with coordinates, nearest first.
+        """
+
+        return [
+            NearbyProject(distance_km=distance, project=project)
+            for project, distance in project_catalogue.nearest(
+                latitude, longitude, k=k, max_distance_km=radius_km
+            )
+        ]
+
+    def nearby_projects(
+        self, parcel_id: str, k: int = 10, radius_km: float | None = None
+    ) -> List[NearbyProject] | None:
+        """
+        Find the projects closest to a parcel, excluding the parcel itself.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+            k (int): The maximum number of projects to return.
+            radius_km (float | None): Ignore projects farther than this distance.
+
+        Returns:
+            List[NearbyProject] | None: The closest projects, nearest first, or None if
+                the parcel does not exist.
+
+        Raises:
+            ValueError: If the parcel has no coordinates.
+        """
+
+        project: ProjectDetails | None = project_catalogue.get_project_by_parcel_id(
+            parcel_id
+        )
+
+        if project is None:
+            return None
+
+        if project.latitude is None or project.longitude is None:
+            raise ValueError(f"Parcel {parcel_id} has no coordinates")
+
+        neighbours: List[NearbyProject] = self.nearest_projects(
+            project.latitude, project.longitude, k=k + 1, radius_km=radius_km
+        )
+
+        return [
+            neighbour
+            for neighbour in neighbours
+            if neighbour.project.parcel_id != parcel_id
+        ][:k]
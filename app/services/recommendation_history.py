@@ -0,0 +1,372 @@
+import datetime as dt
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Tuple
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.models.recommendations import (
+    ContextFingerprint,
+    RecommendationHistoryEntry,
+    RecommendationHistoryPage,
+    RecommendationResponse,
+)
+
+# Bodies are compressed with a preset dictionary of the strings every recommendation
+# repeats (JSON keys and section headings), which matters for documents of a few
+# hundred bytes. Changing the dictionary requires a new codec id, as rows keep theirs.
+_ZDICT: bytes = (
+    b'{"response": {"model": "google/flan-t5-large", "project_id": "PROJ_", '
+    b'"parcel_id": "P", "user_question": "What actions should I take on my crop over '
+    b'the next 5-7 days?", "details": "Actions:\\n- ", "generated_at": "20", '
+    b'"served_from": "live", "regenerated": true, "regeneration_reason": "No stored '
+    b'recommendation for this parcel and question", "question_type": "plan", '
+    b'"sections": {"actions": ["Day 1: "], "warnings": [], "justifications": []}, '
+    b'"routing_reason": null, "latency_ms": }, "fingerprint": {"crop_type": "", '
+    b'"variety": "", "current_phase": "", "soil_moisture_percent": , '
+    b'"rain_probability": , "satellite_status": "", "detected_issue": null, '
+    b'"satellite_coverage_percent": }}'
+    b"Warnings:\\n- Justifications:\\n- Based on the sensor readings, weather forecast "
+    b"soil moisture irrigate rain fungal pests harvest fertilizer"
+)
+_CODEC_ZLIB_DICT_V1: int = 1
+
+_HISTORY_QUEUE_GAUGE: str = "recommendation_history.queued"
+
+
+def compress_body(body: Dict) -> bytes:
+    compressor = zlib.compressobj(level=6, zdict=_ZDICT)
+    return compressor.compress(json.dumps(body).encode()) + compressor.flush()
+
+
+def decompress_body(payload: bytes) -> Dict:
+    decompressor = zlib.decompressobj(zdict=_ZDICT)
+    return json.loads(decompressor.decompress(payload) + decompressor.flush())
+
+
+def fingerprint_hash(fingerprint: ContextFingerprint) -> str:
+    return hashlib.sha256(fingerprint.model_dump_json().encode()).hexdigest()[:16]
+
+
+class RecommendationHistoryStore:
+    """
+    An append-only history of generated recommendations in a SQLite database.
+
+    Every generated recommendation is stored with its model, LLM latency, origin and
+    the context fingerprint it was based on, in a database in WAL mode shared by every
+    worker of the host. The response and fingerprint are kept as one zlib-compressed
+    JSON body, while the columns used by queries (parcel, project, time) are indexed.
+
+    Writes never happen on the request path: `record` only enqueues the row, and a
+    background thread writes the queued rows in batches of one transaction each. When
+    the queue is full the row is dropped (and counted) rather than slowing requests
+    down, so reads are eventually consistent with the served recommendations.
+
+    Attributes:
+        path (str): The path of the SQLite database file.
+        queue_size (int): The maximum number of rows waiting to be written.
+        batch_size (int): The maximum number of rows written per transaction.
+    """
+
+    def __init__(self, path: str, queue_size: int, batch_size: int) -> None:
+        self.path: str = path
+        self.queue_size: int = queue_size
+        self.batch_size: int = batch_size
+        self._local: threading.local = threading.local()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        self._thread_lock: threading.Lock = threading.Lock()
+        self._schema_ready: bool = False
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return the SQLite connection of the current thread, creating the schema once.
+
+        Returns:
+            sqlite3.Connection: A connection configured for concurrent access (WAL).
+        """
+
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            directory: str = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        if not self._schema_ready:
+            with connection:
+                connection.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS recommendations (
+                        id INTEGER PRIMARY KEY,
+                        parcel_id TEXT NOT NULL,
+                        project_id TEXT NOT NULL,
+                        generated_at REAL NOT NULL,
+                        model TEXT NOT NULL,
+                        question_type TEXT,
+                        origin TEXT NOT NULL,
+                        latency_ms REAL,
+                        fingerprint_hash TEXT NOT NULL,
+                        codec INTEGER NOT NULL,
+                        body BLOB NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS recommendations_parcel
+                        ON recommendations (parcel_id, generated_at);
+                    CREATE INDEX IF NOT EXISTS recommendations_project
+                        ON recommendations (project_id, generated_at);
+                    CREATE INDEX IF NOT EXISTS recommendations_time
+                        ON recommendations (generated_at);
+                    """
+                )
+            self._schema_ready = True
+
+        return connection
+
+    def _ensure_writer(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="recommendation-history-writer", daemon=True
+                )
+                self._thread.start()
+
+    def record(
+        self,
+        response: RecommendationResponse,
+        fingerprint: ContextFingerprint,
+        origin: str,
+    ) -> None:
+        """
+        Queue a generated recommendation to be written to the history.
+
+        Args:
+            response (RecommendationResponse): The generated recommendation.
+            fingerprint (ContextFingerprint): The context it was generated from.
+            origin (str): "live", "pregeneration" or "bulk".
+        """
+
+        generated_at: dt.datetime = response.generated_at or dt.datetime.now(
+            dt.timezone.utc
+        )
+
+        try:
+            self._queue.put_nowait(
+                (response, fingerprint, origin, generated_at.timestamp())
+            )
+        except queue.Full:
+            metrics.increment("recommendation_history.dropped")
+            return
+
+        metrics.adjust_gauge(_HISTORY_QUEUE_GAUGE, 1)
+        self._ensure_writer()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Tuple] = [self._queue.get()]
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.write(batch)
+            except sqlite3.Error:
+                metrics.increment("recommendation_history.write_errors")
+            finally:
+                metrics.adjust_gauge(_HISTORY_QUEUE_GAUGE, -len(batch))
+                for _ in batch:
+                    self._queue.task_done()
+
+    def write(self, batch: List[Tuple]) -> None:
+        """
+        Write rows to the history in a single transaction.
+
+        Args:
+            batch (List[Tuple]): (response, fingerprint, origin, generated_at epoch)
+                tuples, as queued by `record`.
+        """
+
+        rows: List[Tuple] = [
+            (
+                response.parcel_id,
+                response.project_id,
+                generated_at,
+                response.model.value,
+                response.question_type,
+                origin,
+                response.latency_ms,
+                fingerprint_hash(fingerprint),
+                _CODEC_ZLIB_DICT_V1,
+                compress_body(
+                    {
+                        "response": response.model_dump(mode="json"),
+                        "fingerprint": fingerprint.model_dump(mode="json"),
+                    }
+                ),
+            )
+            for response, fingerprint, origin, generated_at in batch
+        ]
+
+        connection: sqlite3.Connection = self._connection()
+
+        with connection:
+            connection.executemany(
+                "INSERT INTO recommendations (parcel_id, project_id, generated_at, "
+                "model, question_type, origin, latency_ms, fingerprint_hash, codec, "
+                "body) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+        metrics.increment("recommendation_history.written", len(rows))
+
+    def flush(self) -> None:
+        """
+        Block until every queued row is written.
+        """
+
+        self._queue.join()
+
+    def _entry(self, row: Tuple) -> RecommendationHistoryEntry:
+        entry_id, generated_at, origin, fingerprint, codec, body = row
+
+        if codec != _CODEC_ZLIB_DICT_V1:
+            raise ValueError(f"Unknown history codec {codec}")
+
+        payload: Dict = decompress_body(body)
+
+        return RecommendationHistoryEntry(
+            id=entry_id,
+            generated_at=dt.datetime.fromtimestamp(generated_at, dt.timezone.utc),
+            origin=origin,
+            fingerprint_hash=fingerprint,
+            fingerprint=payload["fingerprint"],
+            response=payload["response"],
+        )
+
+    def latest(self, parcel_id: str) -> RecommendationHistoryEntry | None:
+        """
+        Retrieve the most recent recommendation generated for a parcel.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+
+        Returns:
+            RecommendationHistoryEntry | None: The latest entry, or None if the parcel
+                has no recommendation in the history.
+        """
+
+        row: Tuple | None = (
+            self._connection()
+            .execute(
+                "SELECT id, generated_at, origin, fingerprint_hash, codec, body "
+                "FROM recommendations WHERE parcel_id = ? "
+                "ORDER BY generated_at DESC, id DESC LIMIT 1",
+                (parcel_id,),
+            )
+            .fetchone()
+        )
+
+        return self._entry(row) if row else None
+
+    def query(
+        self,
+        parcel_id: str | None = None,
+        project_id: str | None = None,
+        since: dt.datetime | None = None,
+        until: dt.datetime | None = None,
+        cursor: str | None = None,
+        limit: int = 50,
+    ) -> RecommendationHistoryPage:
+        """
+        List the recommendations of a parcel, a project or all parcels in a time range.
+
+        Entries come newest first; pages are keyed on (generation time, id), so rows
+        written while paging do not shift the following pages.
+
+        Args:
+            parcel_id (str | None): Only entries of this parcel.
+            project_id (str | None): Only entries of this project.
+            since (datetime | None): Only entries generated at or after this time.
+            until (datetime | None): Only entries generated before this time.
+            cursor (str | None): The cursor returned with the previous page.
+            limit (int): The maximum number of entries to return.
+
+        Returns:
+            RecommendationHistoryPage: The page of entries and the cursor of the next one.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+
+        conditions: List[str] = []
+        parameters: List[object] = []
+
+        if parcel_id is not None:
+            conditions.append("parcel_id = ?")
+            parameters.append(parcel_id)
+
+        if project_id is not None:
+            conditions.append("project_id = ?")
+            parameters.append(project_id)
+
+        if since is not None:
+            conditions.append("generated_at >= ?")
+            parameters.append(since.timestamp())
+
+        if until is not None:
+            conditions.append("generated_at < ?")
+            parameters.append(until.timestamp())
+
+        if cursor:
+            try:
+                cursor_time, cursor_id = cursor.split(":")
+                position: Tuple[float, int] = (float(cursor_time), int(cursor_id))
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor}")
+
+            conditions.append("(generated_at, id) < (?, ?)")
+            parameters.extend(position)
+
+        rows: List[Tuple] = (
+            self._connection()
+            .execute(
+                "SELECT id, generated_at, origin, fingerprint_hash, codec, body "
+                "FROM recommendations"
+                + (" WHERE " + " AND ".join(conditions) if conditions else "")
+                + " ORDER BY generated_at DESC, id DESC LIMIT ?",
+                (*parameters, limit + 1),
+            )
+            .fetchall()
+        )
+
+        page: List[Tuple] = rows[:limit]
+        next_cursor: str | None = (
+            f"{page[-1][1]!r}:{page[-1][0]}" if len(rows) > limit else None
+        )
+
+        return RecommendationHistoryPage(
+            count=len(page),
+            next_cursor=next_cursor,
+            entries=[self._entry(row) for row in page],
+        )
+
+
+recommendation_history: RecommendationHistoryStore = RecommendationHistoryStore(
+    path=config.RECOMMENDATION_HISTORY_PATH
+    or os.path.join(config.CACHE_DIR, "recommendation_history.sqlite3"),
+    queue_size=config.RECOMMENDATION_HISTORY_QUEUE_SIZE,
+    batch_size=config.RECOMMENDATION_HISTORY_BATCH_SIZE,
+)
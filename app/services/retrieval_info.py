@@ -2,7 +2,11 @@ from pydantic import BaseModel
 from typing import List
 
 from app.models.best_practices import BestIrrigationPractices, BestAgriculturalPractices
-from app.models.project import HistoricalInformation
+from app.models.project import HistoricalInformation, ParcelHistorySummary
+from app.models.knowledge import KnowledgeChunk
+from app.services.history_store import history_store
+from app.services.hybrid_retrieval import hybrid_retriever
+from app.services.knowledge_pack import knowledge_pack_loader
 
 
 class RetrievalInfoService(BaseModel):
@@ -21,15 +25,7 @@ class RetrievalInfoService(BaseModel):
             irrigation practices for optimal crop growth and water efficiency.
         """
 
-        return BestIrrigationPractices(
-            practices=[
-                "Drip irrigation is the most efficient for most horticultural crops",
-                "Measuring soil moisture (with sensors or manual methods) is key to adjusting dosages",
-                "Consider evapotranspiration (ETo) and crop coefficient (Kc) to calculate water needs",
-                "Avoid watering leaves during daylight hours to prevent sunburn and fungal diseases",
-                "Controlled water stress in the final stages of some fruits (tomatoes, grapes) can improve quality, but is risky",
-            ],
-        )
+        return knowledge_pack_loader.pack.irrigation_practices
 
     def get_best_agricultural_practices(
         self,
@@ -38,6 +34,10 @@ class RetrievalInfoService(BaseModel):
     ) -> BestAgriculturalPractices | None:
         """Retrieves best agricultural practices for a specific crop and growth phase.
 
+        Practices come from the preloaded knowledge pack. When there is no entry for the
+        exact crop and phase, the crop-level practices and then the generic practices are
+        returned instead.
+
         Args:
             crop_type (str): The type of crop (e.g., 'rice', 'cotton', 'barley').
             current_phase (str): The current growth phase of the crop (e.g., 'vegetative', 'flowering', 'maturity').
@@ -47,44 +47,10 @@ class RetrievalInfoService(BaseModel):
             crop and phase, or None if no matching practices are found.
         """
 
-        practices: List[BestAgriculturalPractices] = [
-            BestAgriculturalPractices(
-                crop_type="rice",
-                current_phase="vegetative",
-                practices=[
-                    "Maintain optimal water depth of 5-10 cm during vegetative phase",
-                    "Apply nitrogen fertilizer in split doses to support leaf growth",
-                    "Monitor and control weeds to prevent nutrient competition",
-                ],
-            ),
-            BestAgriculturalPractices(
-                crop_type="cotton",
-                current_phase="flowering",
-                practices=[
-                    "Ensure adequate water supply to prevent stress",
-                    "Apply balanced fertilizers to support growth and yield",
-                    "Control pests and diseases to maintain healthy plants",
-                ],
-            ),
-            BestAgriculturalPractices(
-                crop_type="barley",
-                current_phase="maturity",
-                practices=[
-                    "Maintain optimal soil moisture levels",
-                    "Apply balanced fertilizers to support growth and yield",
-                    "Monitor and control pests and diseases",
-                ],
-            ),
-        ]
-
-        for practice in practices:
-            if (
-                practice.crop_type == crop_type
-                and practice.current_phase == current_phase
-            ):
-                return practice
-
-        return None
+        return knowledge_pack_loader.pack.get_agricultural_practices(
+            crop_type=crop_type,
+            current_phase=current_phase,
+        )
 
     def get_historical_information_by_parcel_id(
         self, parcel_id: str
@@ -99,31 +65,66 @@ class RetrievalInfoService(BaseModel):
             including details about crops grown, planting dates, issues encountered, and notes.
         """
 
-        historical_information: List[HistoricalInformation] = [
-            HistoricalInformation(
-                year=2023,
-                parcel_id="P1233",
-                crop_type="cotton",
-                planting_date="2023-04-12",
-                issues="Drought and pests",
-                notes="The crop was affected by pests and drought, resulting in a lower yield.",
-            ),
-            HistoricalInformation(
-                year=2023,
-                parcel_id="P1234",
-                crop_type="rice",
-                planting_date="2023-02-23",
-                issues="None",
-                notes="Excellent growing season with optimal conditions throughout. Achieved higher than expected yield.",
-            ),
-            HistoricalInformation(
-                year=2023,
-                parcel_id="P1235",
-                crop_type="barley",
-                planting_date="2023-05-19",
-                issues="Drought and pests",
-                notes="The crop was affected by pests and drought, resulting in a lower yield.",
-            ),
-        ]
-
-        return [info for info in historical_information if info.parcel_id == parcel_id]
+        return history_store.get_records(parcel_id)
+
+    def get_relevant_historical_information(
+        self, parcel_id: str, crop_type: str, limit: int
+    ) -> List[HistoricalInformation]:
+        """Retrieves the historical seasons of a parcel most relevant to its current crop.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+            crop_type (str): The crop currently cultivated in the parcel.
+            limit (int): The maximum number of seasons to return.
+
+        Returns:
+            List[HistoricalInformation]: Up to `limit` records, same-crop and recent seasons first.
+        """
+
+        return history_store.get_relevant_records(
+            parcel_id=parcel_id, crop_type=crop_type, limit=limit
+        )
+
+    def get_parcel_history_summary(self, parcel_id: str) -> ParcelHistorySummary | None:
+        """Retrieves the incrementally maintained summary of a parcel's history.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+
+        Returns:
+            ParcelHistorySummary | None: The summary of every recorded season of the parcel,
+            or None if the parcel has no history.
+        """
+
+        return history_store.get_summary(parcel_id)
+
+    def search_agronomic_knowledge(
+        self,
+        question: str,
+        crop_type: str,
+        current_phase: str,
+        limit: int,
+    ) -> List[KnowledgeChunk]:
+        """Retrieves the manual passages most relevant to a question for a crop and phase.
+
+        Passages are ranked by hybrid retrieval: BM25 keyword search and vector search,
+        both restricted to the crop and phase, fused with reciprocal rank fusion and
+        reranked by exact-term coverage.
+
+        Args:
+            question (str): The user's question.
+            crop_type (str): The crop type the passages must apply to.
+            current_phase (str): The crop phase the passages must apply to.
+            limit (int): The maximum number of passages to return.
+
+        Returns:
+            List[KnowledgeChunk]: The most relevant passages, or an empty list if no manuals
+            have been ingested.
+        """
+
+        return hybrid_retriever.search(
+            query=question,
+            crop_type=crop_type,
+            current_phase=current_phase,
+            limit=limit,
+        )
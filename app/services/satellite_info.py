@@ -2,12 +2,27 @@ from pydantic import BaseModel
 import datetime as dt
 import random as rand
 
+from typing import Tuple
+
+from app.config.conf import config
+from app.core.cache import TieredCache, get_cache
+from app.core.metrics import metrics
+from app.core.simulation import is_seeded, simulation_random, slot_start, time_slot
+from app.core.spatial_grid import grid_cell
+from app.models.project import ProjectDetails
 from app.models.satellite import (
     SatelliteImageAnalysis,
     SatelliteImageAnalysisStatus,
+    SatelliteTile,
     Anomality,
 )
 
+DAY_SECONDS: int = 24 * 60 * 60
+
+satellite_tile_cache: TieredCache = get_cache(
+    namespace="satellite_tiles", ttl_seconds=config.SATELLITE_CACHE_TTL_SECONDS
+)
+
 
 class SatelliteInfoService(BaseModel):
     """
@@ -24,9 +39,10 @@ class SatelliteInfoService(BaseModel):
         """
         Retrieves satellite image analysis information for a specific agricultural parcel.
 
-        This method simulates satellite data retrieval with a 30% chance of returning no data
-        (simulating cloud cover or other data unavailability). When data is available, it returns
-        analysis including vegetation coverage percentage and potential issues.
+        This method simulates satellite data retrieval with a configurable chance of
+        returning no data (`1 - SIMULATION_SATELLITE_AVAILABILITY`, 30% by default),
+        simulating cloud cover or other data unavailability. When data is available, it
+        returns analysis including vegetation coverage percentage and potential issues.
 
         Args:
             parcel_id (str): The unique identifier of the agricultural parcel to analyze.
@@ -37,27 +53,149 @@ class SatelliteInfoService(BaseModel):
                     - timestamp: Current time of analysis
                     - status: Current status of the parcel (NORMAL by default)
                     - detected_issue: Any issues detected (None by default)
-                    - coverage_percent: Random vegetation coverage between 70% and 95%
-                - If no data is available: Returns None (30% chance)
+                    - coverage_percent: Random vegetation coverage between 10% and 95%
+                - If no data is available: Returns None
+        """
+
+        return self.simulate_satellite_info(parcel_id=parcel_id, at=dt.datetime.now())
+
+    def simulate_satellite_info(
+        self, parcel_id: str, at: dt.datetime
+    ) -> SatelliteImageAnalysis | None:
         """
-        if rand.randint(0, 9) >= 7:
+        Simulates the satellite analysis of a parcel at a point in time.
+
+        With `SIMULATION_SEED` set, a parcel gets one image per day: its status and
+        detected issue are fixed for the day and its coverage stays close to the
+        parcel's own baseline. Without a seed, every value is drawn at random.
+
+        Args:
+            parcel_id (str): The unique identifier of the agricultural parcel.
+            at (datetime): The time of the analysis.
+
+        Returns:
+            SatelliteImageAnalysis | None: The analysis, or None if no image is available.
+        """
+
+        metrics.increment("upstream.satellite.calls")
+        day: int = time_slot(at, DAY_SECONDS)
+        rng: rand.Random = simulation_random("satellite", parcel_id, day)
+
+        if rng.random() >= config.SIMULATION_SATELLITE_AVAILABILITY:
             return None
 
-        status: SatelliteImageAnalysisStatus = rand.choice(
+        status: SatelliteImageAnalysisStatus = rng.choice(
             list(SatelliteImageAnalysisStatus)
         )
 
         detected_issue: Anomality | None = None
         if status != SatelliteImageAnalysisStatus.NORMAL:
-            detected_issue = rand.choice(list(Anomality))
+            detected_issue = rng.choice(list(Anomality))
+
+        if not is_seeded():
+            return SatelliteImageAnalysis(
+                parcel_id=parcel_id,
+                timestamp=at,
+                status=status,
+                detected_issue=detected_issue,
+                coverage_percent=rng.uniform(10.0, 95.0),
+            )
 
-        timestamp: dt.datetime = dt.datetime.now()
-        coverage_percent: float = rand.uniform(10.0, 95.0)
+        coverage_baseline: float = simulation_random("satellite", parcel_id).uniform(
+            40.0, 90.0
+        )
 
         return SatelliteImageAnalysis(
             parcel_id=parcel_id,
-            timestamp=timestamp,
+            timestamp=slot_start(day, DAY_SECONDS),
+            status=status,
+            detected_issue=detected_issue,
+            coverage_percent=min(95.0, max(10.0, coverage_baseline + rng.uniform(-5, 5))),
+        )
+
+    def get_satellite_info_for_project(
+        self, project: ProjectDetails
+    ) -> SatelliteImageAnalysis | None:
+        """
+        Retrieves the satellite analysis of a project's parcel.
+
+        Parcels with coordinates share the daily image of their tile (cells of
+        `SATELLITE_TILE_DEGREES`): the tile is fetched once and cached, and the parcel
+        analysis is derived locally from it, so upstream calls scale with the number of
+        distinct tiles instead of parcels. Parcels without coordinates fall back to
+        `get_satellite_info`.
+
+        Args:
+            project (ProjectDetails): The project whose parcel needs an analysis.
+
+        Returns:
+            SatelliteImageAnalysis | None: The analysis, or None if the tile is covered
+                by clouds or missing.
+        """
+
+        if project.latitude is None or project.longitude is None:
+            return self.get_satellite_info(parcel_id=project.parcel_id)
+
+        now: dt.datetime = dt.datetime.now()
+        day: int = time_slot(now, DAY_SECONDS)
+        tile: Tuple[int, int] = grid_cell(
+            project.latitude, project.longitude, config.SATELLITE_TILE_DEGREES
+        )
+        image: SatelliteTile = satellite_tile_cache.get_or_set(
+            key=f"{tile[0]}:{tile[1]}:{day}",
+            loader=lambda: self.simulate_satellite_tile(tile=tile, at=now),
+        )
+
+        if not image.available:
+            return None
+
+        rng: rand.Random = simulation_random("satellite", project.parcel_id, day)
+        coverage_baseline: float = simulation_random(
+            "satellite", project.parcel_id
+        ).uniform(40.0, 90.0)
+
+        return SatelliteImageAnalysis(
+            parcel_id=project.parcel_id,
+            timestamp=image.captured_at,
+            status=image.status,
+            detected_issue=image.detected_issue,
+            coverage_percent=min(95.0, max(10.0, coverage_baseline + rng.uniform(-5, 5))),
+        )
+
+    def simulate_satellite_tile(
+        self, tile: Tuple[int, int], at: dt.datetime
+    ) -> SatelliteTile:
+        """
+        Simulates the daily satellite image of a tile.
+
+        Clouds hide the whole tile with probability
+        `1 - SIMULATION_SATELLITE_AVAILABILITY`; otherwise the status and detected issue
+        apply to every parcel inside it.
+
+        Args:
+            tile (Tuple[int, int]): The row and column of the tile.
+            at (datetime): The time of the image.
+
+        Returns:
+            SatelliteTile: The image of the tile.
+        """
+
+        metrics.increment("upstream.satellite.tile_calls")
+        day: int = time_slot(at, DAY_SECONDS)
+        rng: rand.Random = simulation_random("satellite-tile", tile[0], tile[1], day)
+        available: bool = rng.random() < config.SIMULATION_SATELLITE_AVAILABILITY
+        status: SatelliteImageAnalysisStatus = rng.choice(
+            list(SatelliteImageAnalysisStatus)
+        )
+
+        detected_issue: Anomality | None = None
+        if status != SatelliteImageAnalysisStatus.NORMAL:
+            detected_issue = rng.choice(list(Anomality))
+
+        return SatelliteTile(
+            tile_id=f"{tile[0]}:{tile[1]}",
+            captured_at=slot_start(day, DAY_SECONDS) if is_seeded() else at,
+            available=available,
             status=status,
             detected_issue=detected_issue,
-            coverage_percent=coverage_percent,
         )
@@ -0,0 +1,364 @@
+import datetime as dt
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Set, Tuple
+
+from app.config.conf import config
+from app.core.anomaly_detection import StreamingDetector, StreamState
+from app.core.metrics import metrics
+from app.models.process import ProcessInformation
+from app.models.subscriptions import ParcelEventType
+from app.models.telemetry import (
+    AlertKind,
+    ParcelAlerts,
+    TelemetryAlert,
+    TelemetrySignalSpec,
+    TelemetrySource,
+)
+from app.services.parcel_events import parcel_events
+
+# Agronomic safe ranges; the simulated sensors stay well inside them.
+SIGNALS: List[TelemetrySignalSpec] = [
+    TelemetrySignalSpec(
+        field="soil_moisture_percent",
+        label="soil moisture",
+        unit="%",
+        low=20.0,
+        high=85.0,
+        resolution=0.5,
+    ),
+    TelemetrySignalSpec(
+        field="soil_temperature_c",
+        label="soil temperature",
+        unit="°C",
+        low=8.0,
+        high=32.0,
+        resolution=0.2,
+    ),
+    TelemetrySignalSpec(
+        field="air_temperature_c",
+        label="air temperature",
+        unit="°C",
+        low=2.0,
+        high=38.0,
+        resolution=0.3,
+    ),
+    TelemetrySignalSpec(
+        field="conductivity_ms_cm",
+        label="soil conductivity",
+        unit="mS/cm",
+        low=None,
+        high=3.5,
+        resolution=0.05,
+    ),
+]
+
+
+def alert_urgency(kind: AlertKind, excess: float) -> float:
+    """
+    Score how urgent an alert is.
+
+    Readings outside the safe range are the most urgent, spikes grow with their
+    z-score and shifts get a fixed medium urgency.
+
+    Args:
+        kind (AlertKind): The detector that raised the alert.
+        excess (float): How far the reading is beyond the limit, as a fraction of the
+            safe range for out-of-range alerts, or in standard deviations beyond the
+            threshold for spikes.
+
+    Returns:
+        float: The urgency, from 0 to 1.
+    """
+
+    if kind == AlertKind.OUT_OF_RANGE:
+        return round(min(1.0, 0.7 + 1.2 * excess), 2)
+
+    if kind == AlertKind.SPIKE:
+        return round(min(0.9, 0.4 + 0.1 * excess), 2)
+
+    return 0.5
+
+
+class _SourceTelemetry:
+    def __init__(self) -> None:
+        self.last_timestamp: dt.datetime | None = None
+        self.streams: Dict[str, StreamState] = {
+            signal.field: StreamState() for signal in SIGNALS
+        }
+
+
+class _ParcelTelemetry:
+    def __init__(self, max_alerts: int) -> None:
+        self.sources: Dict[TelemetrySource, _SourceTelemetry] = {}
+        # (epoch of the last detection, alert), oldest first.
+        self.alerts: Deque[Tuple[float, TelemetryAlert]] = deque(maxlen=max_alerts)
+
+    def active(self, now: float) -> List[TelemetryAlert]:
+        return [
+            alert
+            for seen_at, alert in self.alerts
+            if now - seen_at < config.ANOMALY_ALERT_TTL_SECONDS
+        ]
+
+
+class TelemetryMonitor:
+    """
+    Streaming anomaly detection over the sensor readings of every parcel.
+
+    Every incoming `ProcessInformation` reading updates, per parcel and signal, the
+    O(1) statistics of a `StreamingDetector` and is checked for:
+
+    - out-of-range excursions beyond the agronomic limits of `SIGNALS`;
+    - spikes, whose rolling z-score exceeds `ANOMALY_Z_THRESHOLD`;
+    - level shifts, detected by a two-sided CUSUM.
+
+    Memory is fixed per parcel: the statistics of each signal and at most
+    `ANOMALY_MAX_ALERTS_PER_PARCEL` alerts. Repeated detections refresh the existing
+    alert, and alerts expire `ANOMALY_ALERT_TTL_SECONDS` after their last detection.
+    Readings not newer than the last one of the parcel are ignored, so re-reading the
+    same sensor sample does not skew the statistics. Statistics and timestamps are kept
+    per `TelemetrySource`, so readings simulated at request time neither mix with nor
+    shadow older gateway readings posted afterwards; alerts are shared by the parcel.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._parcels: Dict[str, _ParcelTelemetry] = {}
+        self._alerted: Set[str] = set()
+        self._detector: StreamingDetector = StreamingDetector(
+            alpha=config.ANOMALY_EWMA_ALPHA,
+            beta=config.ANOMALY_TREND_BETA,
+            warmup=config.ANOMALY_WARMUP_READINGS,
+            z_threshold=config.ANOMALY_Z_THRESHOLD,
+            cusum_drift=config.ANOMALY_CUSUM_DRIFT,
+            cusum_threshold=config.ANOMALY_CUSUM_THRESHOLD,
+        )
+
+    def observe(
+        self,
+        reading: ProcessInformation,
+        source: TelemetrySource = TelemetrySource.GATEWAY,
+    ) -> List[TelemetryAlert]:
+        """
+        Update the statistics of a parcel with a reading and raise its alerts.
+
+        Args:
+            reading (ProcessInformation): The sensor reading.
+            source (TelemetrySource): Where the reading comes from.
+
+        Returns:
+            List[TelemetryAlert]: The alerts raised or refreshed by the reading.
+        """
+
+        raised: List[TelemetryAlert] = []
+
+        with self._lock:
+            parcel: _ParcelTelemetry | None = self._parcels.get(reading.parcel_id)
+
+            if parcel is None:
+                parcel = _ParcelTelemetry(config.ANOMALY_MAX_ALERTS_PER_PARCEL)
+                self._parcels[reading.parcel_id] = parcel
+
+            stream: _SourceTelemetry | None = parcel.sources.get(source)
+
+            if stream is None:
+                stream = _SourceTelemetry()
+                parcel.sources[source] = stream
+
+            if (
+                stream.last_timestamp is not None
+                and reading.timestamp <= stream.last_timestamp
+            ):
+                return raised
+
+            stream.last_timestamp = reading.timestamp
+            metrics.increment("telemetry.readings")
+
+            for signal in SIGNALS:
+                value: float = getattr(reading, signal.field)
+                state: StreamState = stream.streams[signal.field]
+                level: float = self._detector.forecast(state)
+                z_score, shift = self._detector.update(
+                    state, value, min_std=signal.resolution
+                )
+
+                excursion: Tuple[str, float, float] | None = None
+                if signal.low is not None and value < signal.low:
+                    excursion = ("low", signal.low, signal.low - value)
+                elif signal.high is not None and value > signal.high:
+                    excursion = ("high", signal.high, value - signal.high)
+
+                if excursion is not None:
+                    direction, limit, beyond = excursion
+                    raised.append(
+                        self._raise(
+                            parcel,
+                            reading,
+                            signal,
+                            kind=AlertKind.OUT_OF_RANGE,
+                            direction=direction,
+                            expected=limit,
+                            z_score=z_score,
+                            urgency=alert_urgency(
+                                AlertKind.OUT_OF_RANGE, beyond / self._span(signal)
+                            ),
+                        )
+                    )
+
+                if z_score is not None and abs(z_score) >= config.ANOMALY_Z_THRESHOLD:
+                    raised.append(
+                        self._raise(
+                            parcel,
+                            reading,
+                            signal,
+                            kind=AlertKind.SPIKE,
+                            direction="high" if z_score > 0 else "low",
+                            expected=level,
+                            z_score=z_score,
+                            urgency=alert_urgency(
+                                AlertKind.SPIKE,
+                                abs(z_score) - config.ANOMALY_Z_THRESHOLD,
+                            ),
+                        )
+                    )
+
+                if shift:
+                    raised.append(
+                        self._raise(
+                            parcel,
+                            reading,
+                            signal,
+                            kind=AlertKind.SHIFT,
+                            direction="high" if shift > 0 else "low",
+                            expected=level,
+                            z_score=z_score,
+                            urgency=alert_urgency(AlertKind.SHIFT, 0.0),
+                        )
+                    )
+
+            if raised:
+                self._alerted.add(reading.parcel_id)
+
+        for alert in raised:
+            if alert.occurrences == 1:
+                parcel_events.publish(reading.parcel_id, ParcelEventType.ALERT, alert)
+
+        return raised
+
+    def _span(self, signal: TelemetrySignalSpec) -> float:
+        # The safe range, or the limit itself for signals bounded on one side only.
+        if signal.low is not None and signal.high is not None:
+            return signal.high - signal.low
+
+        return abs(signal.high or signal.low or 1.0)
+
+    def _raise(
+        self,
+        parcel: _ParcelTelemetry,
+        reading: ProcessInformation,
+        signal: TelemetrySignalSpec,
+        kind: AlertKind,
+        direction: str,
+        expected: float,
+        z_score: float | None,
+        urgency: float,
+    ) -> TelemetryAlert:
+        value: float = getattr(reading, signal.field)
+        now: float = time.time()
+        alert: TelemetryAlert | None = None
+
+        for index, (seen_at, active) in enumerate(parcel.alerts):
+            if (
+                active.signal == signal.label
+                and active.kind == kind
+                and active.direction == direction
+                and now - seen_at < config.ANOMALY_ALERT_TTL_SECONDS
+            ):
+                alert = active.model_copy(
+                    update={
+                        "value": value,
+                        "expected": expected,
+                        "z_score": z_score,
+                        "urgency": max(active.urgency, urgency),
+                        "last_seen_at": reading.timestamp,
+                        "occurrences": active.occurrences + 1,
+                    }
+                )
+                del parcel.alerts[index]
+                break
+
+        if alert is None:
+            alert = TelemetryAlert(
+                parcel_id=reading.parcel_id,
+                signal=signal.label,
+                kind=kind,
+                direction=direction,
+                value=value,
+                expected=expected,
+                z_score=z_score,
+                urgency=urgency,
+                detected_at=reading.timestamp,
+                last_seen_at=reading.timestamp,
+            )
+            metrics.increment(f"telemetry.alerts.{kind.value}")
+
+        parcel.alerts.append((now, alert))
+
+        return alert
+
+    def alerts(self, parcel_id: str) -> ParcelAlerts:
+        """
+        Retrieve the active alerts of a parcel.
+
+        Args:
+            parcel_id (str): The unique identifier of the parcel.
+
+        Returns:
+            ParcelAlerts: The active alerts, most urgent first, and the parcel urgency.
+        """
+
+        now: float = time.time()
+
+        with self._lock:
+            parcel: _ParcelTelemetry | None = self._parcels.get(parcel_id)
+            active: List[TelemetryAlert] = parcel.active(now) if parcel else []
+
+            if not active:
+                self._alerted.discard(parcel_id)
+
+        active.sort(key=lambda alert: alert.urgency, reverse=True)
+
+        return ParcelAlerts(
+            parcel_id=parcel_id,
+            urgency=active[0].urgency if active else 0.0,
+            alerts=active,
+        )
+
+    def most_urgent(self, min_urgency: float = 0.0, limit: int = 50) -> List[ParcelAlerts]:
+        """
+        Rank the parcels with active alerts by urgency.
+
+        Args:
+            min_urgency (float): Only parcels at least this urgent.
+            limit (int): The maximum number of parcels to return.
+
+        Returns:
+            List[ParcelAlerts]: The parcels and their alerts, most urgent first.
+        """
+
+        with self._lock:
+            parcel_ids: List[str] = list(self._alerted)
+
+        ranked: List[ParcelAlerts] = [
+            parcel_alerts
+            for parcel_alerts in map(self.alerts, parcel_ids)
+            if parcel_alerts.alerts and parcel_alerts.urgency >= min_urgency
+        ]
+        ranked.sort(key=lambda parcel_alerts: parcel_alerts.urgency, reverse=True)
+
+        return ranked[:limit]
+
+
+telemetry_monitor: TelemetryMonitor = TelemetryMonitor()
@@ -0,0 +1,333 @@
+import contextvars
+import datetime as dt
+import hashlib
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import IO, Iterator, List
+
+from fastapi import HTTPException
+
+from app.config.conf import config
+from app.core.metrics import metrics
+from app.models.recommendations import (
+    ContextFingerprint,
+    RecommendationRequest,
+    RecommendationResponse,
+)
+from app.models.scheduling import ClientContext, QueueTicket
+from app.models.traffic import CapturedRequest
+
+MAX_QUESTION_CHARS: int = 500
+
+_EMAIL: re.Pattern = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_URL: re.Pattern = re.compile(r"https?://\S+|www\.\S+")
+# Phone, ID and account numbers: seven or more digits, possibly separated.
+_NUMBER: re.Pattern = re.compile(r"\+?\d(?:[\s().-]?\d){6,}")
+
+_CAPTURE_QUEUE_GAUGE: str = "traffic_capture.queued"
+
+_current: contextvars.ContextVar["_Capture | None"] = contextvars.ContextVar(
+    "traffic_capture", default=None
+)
+_resolution: contextvars.ContextVar["Resolution | None"] = contextvars.ContextVar(
+    "traffic_capture_resolution", default=None
+)
+
+
+def sanitize_question(question: str) -> str:
+    """
+    Remove contact details and long numbers from a user question.
+
+    Args:
+        question (str): The question as asked.
+
+    Returns:
+        str: The question with e-mails, URLs and numbers of seven or more digits
+            replaced by placeholders, cut to `MAX_QUESTION_CHARS`.
+    """
+
+    question = _EMAIL.sub("<email>", question)
+    question = _URL.sub("<url>", question)
+    question = _NUMBER.sub("<number>", question)
+
+    return question[:MAX_QUESTION_CHARS]
+
+
+def pseudonymize_client(client_id: str) -> str:
+    """
+    Replace a client ID by a stable pseudonym, unless it is a configured tenant.
+
+    Tenants of `FAIR_SHARE_CLIENT_KEYS` and clients named in `FAIR_SHARE_CLIENT_WEIGHTS`
+    are kept, so a replay applies the same weights; anonymous callers (identified by
+    their address) keep their share of the traffic under a name that does not
+    identify them and still marks them as anonymous.
+
+    Args:
+        client_id (str): The client ID of the request.
+
+    Returns:
+        str: The ID to record.
+    """
+
+    if (
+        client_id in config.FAIR_SHARE_CLIENT_KEYS
+        or client_id in config.FAIR_SHARE_CLIENT_WEIGHTS
+    ):
+        return client_id
+
+    digest: str = hashlib.sha256(client_id.encode()).hexdigest()[:12]
+
+    if client_id.startswith(f"{config.FAIR_SHARE_DEFAULT_CLIENT}:"):
+        return f"{config.FAIR_SHARE_DEFAULT_CLIENT}-{digest}"
+
+    return f"client-{digest}"
+
+
+class _Capture:
+    __slots__ = ("arrived_at", "started", "request", "client", "fingerprint", "served")
+
+    def __init__(self, request: RecommendationRequest, client: ClientContext) -> None:
+        self.arrived_at: dt.datetime = dt.datetime.now(dt.timezone.utc)
+        self.started: float = time.perf_counter()
+        self.request: RecommendationRequest = request
+        self.client: ClientContext = client
+        self.fingerprint: ContextFingerprint | None = None
+        self.served: RecommendationResponse | None = None
+
+
+class Resolution:
+    """
+    The context resolved by work shared between requests (see `TrafficRecorder`).
+
+    Attributes:
+        fingerprint (ContextFingerprint | None): The fingerprint of the context, None
+            until it is resolved.
+    """
+
+    __slots__ = ("fingerprint",)
+
+    def __init__(self) -> None:
+        self.fingerprint: ContextFingerprint | None = None
+
+
+class TrafficRecorder:
+    """
+    Records sanitized recommendation requests for replay (see app.cli.replay_traffic).
+
+    Each captured request is written with its arrival time, client and priority, the
+    context fingerprint it resolved to and how it was served, as one JSON line in a
+    file per worker and day (`traffic-YYYYMMDD-<pid>.jsonl`), so workers never share a
+    file. Lines are written in completion order; readers reorder them by arrival.
+
+    Like the recommendation history, writes never happen on the request path: records
+    are queued and appended by a background thread, and dropped (and counted) when the
+    queue is full.
+
+    Attributes:
+        directory (str): The directory of the capture files.
+        sample_rate (float): The share of requests captured.
+        queue_size (int): The maximum number of records waiting to be written.
+    """
+
+    def __init__(self, directory: str, sample_rate: float, queue_size: int) -> None:
+        self.directory: str = directory
+        self.sample_rate: float = sample_rate
+        self.queue_size: int = queue_size
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        self._thread_lock: threading.Lock = threading.Lock()
+        self._file: IO[str] | None = None
+        self._file_path: str | None = None
+
+    def capture(
+        self, request: RecommendationRequest, client: ClientContext, ticket: QueueTicket
+    ) -> AbstractContextManager:
+        """
+        Capture the request handled in this block, if capture is enabled and sampled.
+
+        The record is queued when the block exits, with the status of the exception
+        raised, if any. The context resolved within the block is recorded through
+        `resolved`, including from the threads the request hands work to.
+
+        Args:
+            request (RecommendationRequest): The request.
+            client (ClientContext): The client and priority of the request.
+            ticket (QueueTicket): The queue ticket of the request.
+
+        Returns:
+            AbstractContextManager: The context manager capturing the request. It yields
+                the capture, whose `served` is set to the response by the caller, or
+                None when the request is not captured.
+        """
+
+        if not config.TRAFFIC_CAPTURE_ENABLED or random.random() >= self.sample_rate:
+            return nullcontext()
+
+        return self._capturing(_Capture(request, client), ticket)
+
+    @contextmanager
+    def _capturing(self, capture: _Capture, ticket: QueueTicket) -> Iterator[_Capture]:
+        token: contextvars.Token = _current.set(capture)
+        status_code: int = 200
+
+        try:
+            yield capture
+
+        except HTTPException as e:
+            status_code = e.status_code
+            raise
+
+        except Exception:
+            status_code = 500
+            raise
+
+        finally:
+            _current.reset(token)
+            self.record(
+                CapturedRequest(
+                    arrived_at=capture.arrived_at,
+                    request=capture.request.model_copy(
+                        update={
+                            "user_question": sanitize_question(
+                                capture.request.user_question
+                            )
+                        }
+                    ),
+                    client_id=pseudonymize_client(capture.client.client_id),
+                    priority=capture.client.priority,
+                    fingerprint=capture.fingerprint,
+                    status_code=status_code,
+                    served_from=capture.served.served_from if capture.served else None,
+                    latency_ms=round((time.perf_counter() - capture.started) * 1000, 1),
+                    queue_wait_ms=round(ticket.waited_ms, 1),
+                )
+            )
+
+    @contextmanager
+    def resolving(self) -> Iterator[Resolution]:
+        """
+        Collect the context resolved in this block, whether or not it is captured.
+
+        Requests coalesced with an identical one never resolve their own context;
+        the work they share runs in this block, and each of them records the
+        collected fingerprint with `resolved`.
+
+        Yields:
+            Resolution: The resolution, whose fingerprint is set by `resolved`.
+        """
+
+        resolution: Resolution = Resolution()
+        token: contextvars.Token = _resolution.set(resolution)
+
+        try:
+            yield resolution
+        finally:
+            _resolution.reset(token)
+
+    def resolved(self, fingerprint: ContextFingerprint) -> None:
+        """
+        Attach the resolved context to the request being captured, if any.
+
+        Args:
+            fingerprint (ContextFingerprint): The fingerprint of the request's context.
+        """
+
+        capture: _Capture | None = _current.get()
+
+        if capture is not None:
+            capture.fingerprint = fingerprint
+
+        resolution: Resolution | None = _resolution.get()
+
+        if resolution is not None:
+            resolution.fingerprint = fingerprint
+
+    def record(self, captured: CapturedRequest) -> None:
+        """
+        Queue a captured request to be written.
+
+        Args:
+            captured (CapturedRequest): The captured request.
+        """
+
+        try:
+            self._queue.put_nowait(captured)
+        except queue.Full:
+            metrics.increment("traffic_capture.dropped")
+            return
+
+        metrics.adjust_gauge(_CAPTURE_QUEUE_GAUGE, 1)
+
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="traffic-capture-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[CapturedRequest] = [self._queue.get()]
+
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.write(batch)
+            except OSError:
+                metrics.increment("traffic_capture.write_errors")
+            finally:
+                metrics.adjust_gauge(_CAPTURE_QUEUE_GAUGE, -len(batch))
+                for _ in batch:
+                    self._queue.task_done()
+
+    def write(self, batch: List[CapturedRequest]) -> None:
+        """
+        Append captured requests to the capture file of their arrival day.
+
+        Args:
+            batch (List[CapturedRequest]): The captured requests.
+        """
+
+        for captured in batch:
+            path: str = os.path.join(
+                self.directory,
+                f"traffic-{captured.arrived_at:%Y%m%d}-{os.getpid()}.jsonl",
+            )
+
+            if path != self._file_path or self._file is None:
+                if self._file is not None:
+                    self._file.close()
+
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = open(path, "a", encoding="utf-8")
+                self._file_path = path
+
+            self._file.write(captured.model_dump_json() + "\n")
+
+        if self._file is not None:
+            self._file.flush()
+
+        metrics.increment("traffic_capture.written", len(batch))
+
+    def flush(self) -> None:
+        """
+        Block until every queued record is written.
+        """
+
+        self._queue.join()
+
+
+traffic_recorder: TrafficRecorder = TrafficRecorder(
+    directory=config.TRAFFIC_CAPTURE_DIR or os.path.join(config.CACHE_DIR, "traffic"),
+    sample_rate=config.TRAFFIC_CAPTURE_SAMPLE_RATE,
+    queue_size=config.TRAFFIC_CAPTURE_QUEUE_SIZE,
+)
@@ -1,9 +1,24 @@
 from pydantic import BaseModel
 import datetime as dt
-from typing import List
+from typing import List, Tuple
 import random as rand
 
+from app.models.project import ProjectDetails
 from app.models.weather import WeatherForecast, WeatherDailyForecast
+from app.config.conf import config
+from app.core.cache import TieredCache, get_cache
+from app.core.metrics import metrics
+from app.core.simulation import is_seeded, simulation_random, time_slot
+from app.core.spatial_grid import cell_center, grid_cell
+
+weather_cache: TieredCache = get_cache(
+    namespace="weather", ttl_seconds=config.WEATHER_CACHE_TTL_SECONDS
+)
+labelled_weather_cache: TieredCache = get_cache(
+    namespace="weather-labelled",
+    ttl_seconds=config.WEATHER_CACHE_TTL_SECONDS,
+    local_only=True,
+)
 
 
 class WeatherInformationService(BaseModel):
@@ -22,12 +37,86 @@ class WeatherInformationService(BaseModel):
     total_forecast_days: int = 7
 
     def get_weather_forecast(self, location: str) -> WeatherForecast | None:
+        """
+        Retrieves the weather forecast for the specified location.
+
+        Forecasts are served from the shared weather cache when a live entry exists for
+        the location, so every worker reuses the same forecast until it expires.
+
+        Args:
+            location (str): The location for which to retrieve the weather forecast.
+
+        Returns:
+            WeatherForecast | None: The cached or freshly generated forecast, or None if
+                the upstream service is unavailable.
+        """
+
+        return weather_cache.get_or_set(
+            key=f"{self.total_forecast_days}:{location.strip().lower()}",
+            loader=lambda: self.generate_weather_forecast(location=location),
+        )
+
+    def get_weather_forecast_for_project(
+        self, project: ProjectDetails
+    ) -> WeatherForecast | None:
+        """
+        Retrieves the weather forecast of a project's parcel.
+
+        Parcels with coordinates are snapped to the weather grid (cells of
+        `WEATHER_GRID_CELL_DEGREES`) and share the forecast of their cell, so upstream
+        calls scale with the number of distinct cells instead of parcels. Parcels
+        without coordinates fall back to the forecast of their location.
+
+        The cell only keys the cache: the returned forecast is labelled with the
+        parcel's location, not the cell centre. Labelled copies are cached in process
+        only, per cell forecast and location, so parcels of a place keep sharing one
+        object (and its rendered prompt fragment) without filling the shared tier.
+
+        Args:
+            project (ProjectDetails): The project whose parcel needs a forecast.
+
+        Returns:
+            WeatherForecast | None: The forecast of the parcel's cell or location, or
+                None if the upstream service is unavailable.
+        """
+
+        if project.latitude is None or project.longitude is None:
+            return self.get_weather_forecast(location=project.location)
+
+        cell: Tuple[int, int] = grid_cell(
+            project.latitude, project.longitude, config.WEATHER_GRID_CELL_DEGREES
+        )
+        latitude, longitude = cell_center(cell, config.WEATHER_GRID_CELL_DEGREES)
+        cell_key: str = f"{self.total_forecast_days}:cell:{cell[0]}:{cell[1]}"
+
+        forecast: WeatherForecast | None = weather_cache.get_or_set(
+            key=cell_key,
+            loader=lambda: self.generate_weather_forecast(
+                location=f"{latitude:.3f}, {longitude:.3f}"
+            ),
+        )
+
+        if forecast is None or forecast.location == project.location:
+            return forecast
+
+        return labelled_weather_cache.get_or_set(
+            key=(
+                f"{cell_key}:{forecast.created_at.isoformat()}:"
+                f"{project.location.strip().lower()}"
+            ),
+            loader=lambda: forecast.model_copy(update={"location": project.location}),
+        )
+
+    def generate_weather_forecast(self, location: str) -> WeatherForecast | None:
         """
         Generates a weather forecast for the specified location.
 
         This method creates a simulated weather forecast with random but realistic
         weather data for each day in the forecast period. The data includes
         temperature ranges, precipitation amounts, humidity levels, and wind speeds.
+        With `SIMULATION_SEED` set, the forecast of a location for a given date is
+        reproducible; the service is unavailable with probability
+        `1 - SIMULATION_WEATHER_AVAILABILITY`.
 
         Args:
             location (str): The location for which to generate the weather forecast.
@@ -46,23 +135,34 @@ class WeatherInformationService(BaseModel):
                     - wind_speed_kmh: Wind speed in kilometers per hour
         """
 
-        if rand.randint(0, 9) >= 7:
-            return None
-
+        metrics.increment("upstream.weather.calls")
         created_at: dt.datetime = dt.datetime.now()
+        location_key: str = location.strip().lower()
+        rng: rand.Random = simulation_random(
+            "weather", location_key, time_slot(created_at)
+        )
+
+        if rng.random() >= config.SIMULATION_WEATHER_AVAILABILITY:
+            return None
 
         daily_forecasts: List[WeatherDailyForecast] = []
 
         for i in range(self.total_forecast_days):
             date: dt.date = (created_at + dt.timedelta(days=i)).date()
-            max_temperature_c: float = rand.uniform(22.0, 32.0)
-            min_temperature_c: float = rand.uniform(10.0, 18.0)
+            # Seeded simulations forecast the same weather for a date all day long.
+            day_rng: rand.Random = (
+                simulation_random("weather", location_key, date.isoformat())
+                if is_seeded()
+                else rng
+            )
+            max_temperature_c: float = day_rng.uniform(22.0, 32.0)
+            min_temperature_c: float = day_rng.uniform(10.0, 18.0)
             precipitation_mm: float = (
-                rand.uniform(0.0, 15.0) if rand.random() < 0.4 else 0.0
+                day_rng.uniform(0.0, 15.0) if day_rng.random() < 0.4 else 0.0
             )
-            precipitation_prob: float = rand.random()
-            humidity_relative_avg: float = rand.uniform(50.0, 90.0)
-            wind_speed_kmh: float = rand.uniform(5.0, 25.0)
+            precipitation_prob: float = day_rng.random()
+            humidity_relative_avg: float = day_rng.uniform(50.0, 90.0)
+            wind_speed_kmh: float = day_rng.uniform(5.0, 25.0)
 
             daily_forecast: WeatherDailyForecast = WeatherDailyForecast(
                 date=date,
@@ -0,0 +1,113 @@
+"""
+Hit rate and latency of the cache layer with several worker processes.
+
+Each worker process replays the same skewed (Zipf-like) stream of lookups against
+its own in-process LRU tier, optionally backed by the shared on-disk tier, and pays a
+simulated upstream cost on every miss. Run it from the repository root:
+
+    python -m benchmarks.cache_workers --requests 2000 --keys 500
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random as rand
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+
+from app.core.cache import LRUCache, SharedDiskCache, TieredCache  # noqa: E402
+
+
+def run_worker(
+    worker_id: int,
+    backend: str,
+    path: str,
+    requests: int,
+    keys: int,
+    upstream_ms: float,
+    results: "mp.Queue[Dict]",
+) -> None:
+    shared: SharedDiskCache | None = (
+        SharedDiskCache(path=path, max_bytes=64 * 1024 * 1024)
+        if backend == "tiered"
+        else None
+    )
+    cache: TieredCache = TieredCache(
+        namespace="bench",
+        memory=LRUCache(max_entries=keys),
+        shared=shared,
+        ttl_seconds=600,
+    )
+
+    rng: rand.Random = rand.Random(worker_id)
+    weights: List[float] = [1.0 / (rank + 1) for rank in range(keys)]
+    stream: List[int] = rng.choices(range(keys), weights=weights, k=requests)
+
+    hits: int = 0
+    latencies: List[float] = []
+
+    for key in stream:
+        start: float = time.perf_counter()
+        value: bytes | None = cache.get(str(key))
+
+        if value is None:
+            time.sleep(upstream_ms / 1000)
+            cache.set(str(key), os.urandom(2048))
+        else:
+            hits += 1
+
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    results.put({"hits": hits, "latencies": latencies})
+
+
+def run(backend: str, workers: int, requests: int, keys: int, upstream_ms: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "cache.sqlite3")
+
+        if backend == "tiered":
+            SharedDiskCache(path=path, max_bytes=64 * 1024 * 1024)
+
+        results: "mp.Queue[Dict]" = mp.Queue()
+        processes: List[mp.Process] = [
+            mp.Process(
+                target=run_worker,
+                args=(i, backend, path, requests, keys, upstream_ms, results),
+            )
+            for i in range(workers)
+        ]
+
+        for process in processes:
+            process.start()
+
+        collected: List[Dict] = [results.get() for _ in processes]
+
+        for process in processes:
+            process.join()
+
+    latencies: List[float] = sorted(
+        latency for result in collected for latency in result["latencies"]
+    )
+    hit_rate: float = sum(result["hits"] for result in collected) / len(latencies)
+    p99: float = latencies[int(len(latencies) * 0.99) - 1]
+
+    print(
+        f"{backend:>7} | workers={workers} | hit rate={hit_rate:6.1%} | "
+        f"p50={statistics.median(latencies):7.3f} ms | p99={p99:7.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=500)
+    parser.add_argument("--upstream-ms", type=float, default=5.0)
+    args: argparse.Namespace = parser.parse_args()
+
+    for backend in ("memory", "tiered"):
+        for workers in (1, 4, 8):
+            run(backend, workers, args.requests, args.keys, args.upstream_ms)
@@ -0,0 +1,193 @@
+"""
+Recommendation latency with and without speculative context prefetch.
+
+The application runs in-process behind an ASGI transport with the simulated LLM backend.
+Each simulated user opens a parcel (`GET /projects/parcel/{id}`), reads it for a few
+seconds and, with probability `--ask-ratio`, asks for a recommendation; a share
+`--custom-ratio` of them ask their own question instead of the default one. The context
+services are local simulations, so every upstream call (sensor gateway, weather,
+satellite, history and knowledge search) is slowed down by `--upstream-ms` to stand for
+the remote calls of a deployment. Every user has its own generated parcel and client
+ID, so neither reuse nor rate limiting interferes. Run it from the repository root:
+
+    python -m benchmarks.context_prefetch --users 60 --upstream-ms 150
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime as dt
+import functools
+import io
+import os
+import random
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+os.environ.setdefault("LLM_BACKEND", "simulated")
+os.environ.setdefault("LLM_SIMULATED_LATENCY_SECONDS", "1.0")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="evergreen-bench-"))
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+os.environ.setdefault("RECOMMENDATION_HISTORY_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from app.cli.generate_fleet import generate_parcel  # noqa: E402
+from app.config.conf import config  # noqa: E402
+from app.core.metrics import metrics  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.project import ProjectDetails  # noqa: E402
+from app.services.prefetched_contexts import prefetched_contexts  # noqa: E402
+from app.services.process_info import ProcessInformationService  # noqa: E402
+from app.services.project_catalogue import project_catalogue  # noqa: E402
+from app.services.retrieval_info import RetrievalInfoService  # noqa: E402
+from app.services.satellite_info import SatelliteInfoService  # noqa: E402
+from app.services.weather_info import WeatherInformationService  # noqa: E402
+
+UPSTREAM_CALLS: Dict[type, List[str]] = {
+    ProcessInformationService: ["get_process_information"],
+    WeatherInformationService: ["get_weather_forecast_for_project"],
+    SatelliteInfoService: ["get_satellite_info_for_project"],
+    RetrievalInfoService: [
+        "get_relevant_historical_information",
+        "search_agronomic_knowledge",
+    ],
+}
+
+
+def slowed(function: Callable[..., Any], seconds: float) -> Callable[..., Any]:
+    @functools.wraps(function)
+    def call(*args: Any, **kwargs: Any) -> Any:
+        time.sleep(seconds)
+        return function(*args, **kwargs)
+
+    return call
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def user(
+    client: httpx.AsyncClient,
+    parcel_id: str,
+    rng: random.Random,
+    ask_ratio: float,
+    custom_ratio: float,
+    latencies: List[float],
+) -> None:
+    await asyncio.sleep(rng.uniform(0, 5))
+    response: httpx.Response = await client.get(
+        f"/evergreen/pro/projects/parcel/{parcel_id}"
+    )
+    response.raise_for_status()
+
+    await asyncio.sleep(rng.uniform(1, 4))
+    if rng.random() >= ask_ratio:
+        return
+
+    body: Dict[str, str] = {"parcel_id": parcel_id}
+    if rng.random() < custom_ratio:
+        body["user_question"] = f"Should I prune parcel {parcel_id} this week?"
+
+    started_at: float = time.perf_counter()
+    response = await client.post(
+        "/evergreen/pro/recomendations/",
+        json=body,
+        headers={"X-Client-Id": parcel_id},
+        timeout=None,
+    )
+    response.raise_for_status()
+    latencies.append((time.perf_counter() - started_at) * 1000)
+
+
+async def run(
+    parcel_ids: List[str], ask_ratio: float, custom_ratio: float
+) -> List[float]:
+    rng: random.Random = random.Random(42)
+    latencies: List[float] = []
+    transport: httpx.ASGITransport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(
+            *(
+                user(client, parcel_id, rng, ask_ratio, custom_ratio, latencies)
+                for parcel_id in parcel_ids
+            )
+        )
+
+    # Let the prefetches of users who never asked expire, to count them as wasted.
+    await asyncio.sleep(config.PREFETCH_TTL_SECONDS)
+    prefetched_contexts.sweep()
+
+    return latencies
+
+
+def main(users: int, upstream_ms: float, ask_ratio: float, custom_ratio: float) -> None:
+    for service, names in UPSTREAM_CALLS.items():
+        for name in names:
+            setattr(service, name, slowed(getattr(service, name), upstream_ms / 1000))
+
+    config.PREFETCH_TTL_SECONDS = 10.0
+    projects: List[ProjectDetails] = [
+        ProjectDetails.model_validate_json(
+            generate_parcel(index, dt.date.today(), seasons=0, readings=0)[0]
+        )
+        for index in range(2 * users)
+    ]
+    project_catalogue.add_many(projects)
+    parcel_ids: List[str] = [project.parcel_id for project in projects]
+
+    print(
+        f"{users} users, ask ratio {ask_ratio:.0%} ({custom_ratio:.0%} custom "
+        f"questions), upstream calls {upstream_ms:.0f} ms, "
+        f"LLM {config.LLM_SIMULATED_LATENCY_SECONDS:.1f} s"
+    )
+
+    for enabled, parcels in [
+        (False, parcel_ids[:users]),
+        (True, parcel_ids[users : 2 * users]),
+    ]:
+        config.PREFETCH_ENABLED = enabled
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies: List[float] = asyncio.run(run(parcels, ask_ratio, custom_ratio))
+
+        print(
+            f"prefetch {'on ' if enabled else 'off'}: recommendation latency "
+            f"p50 {percentile(latencies, 0.5):.0f} ms, "
+            f"p95 {percentile(latencies, 0.95):.0f} ms ({len(latencies)} requests)"
+        )
+
+    counters: Dict[str, float] = metrics.snapshot()["counters"]
+    hits: float = counters.get("prefetch.hits", 0) + counters.get("prefetch.joined", 0)
+    misses: float = counters.get("prefetch.misses", 0)
+    print(
+        f"prefetch: {counters.get('prefetch.started', 0):.0f} started, "
+        f"hit rate {hits / max(1, hits + misses):.0%} "
+        f"({counters.get('prefetch.joined', 0):.0f} joined while running), "
+        f"{counters.get('prefetch.wasted', 0):.0f} wasted "
+        f"({counters.get('prefetch.wasted_ms', 0) / 1000:.1f} s of gathering)"
+    )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=60)
+    parser.add_argument("--upstream-ms", type=float, default=150.0)
+    parser.add_argument("--ask-ratio", type=float, default=0.7)
+    parser.add_argument("--custom-ratio", type=float, default=0.2)
+    args: argparse.Namespace = parser.parse_args()
+
+    main(
+        users=args.users,
+        upstream_ms=args.upstream_ms,
+        ask_ratio=args.ask_ratio,
+        custom_ratio=args.custom_ratio,
+    )
@@ -0,0 +1,141 @@
+"""
+Latency of the cheap endpoints while the recommendation endpoint is saturated.
+
+The application runs in-process behind an ASGI transport with the simulated LLM backend
+(`LLM_BACKEND=simulated`). Health and catalogue endpoints are probed at a fixed rate,
+first on an idle server and then while many clients keep the recommendation endpoint
+saturated with distinct questions (so neither coalescing nor reuse applies). Run it from
+the repository root:
+
+    python -m benchmarks.endpoint_isolation --clients 128 --llm-latency 1.0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+os.environ.setdefault("LLM_BACKEND", "simulated")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="evergreen-bench-"))
+os.environ.setdefault("RECOMMENDATION_REUSE_ENABLED", "false")
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+
+import httpx  # noqa: E402
+
+from app.config.conf import config  # noqa: E402
+from app.core.metrics import metrics  # noqa: E402
+from app.main import app  # noqa: E402
+
+PROBES: Dict[str, str] = {
+    "health": "/evergreen/pro/server/status",
+    "catalogue": "/evergreen/pro/projects/",
+    "project": "/evergreen/pro/projects/parcel/P1234",
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def probe(
+    client: httpx.AsyncClient, seconds: float, interval: float
+) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = {name: [] for name in PROBES}
+    deadline: float = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        for name, path in PROBES.items():
+            started_at: float = time.perf_counter()
+            response: httpx.Response = await client.get(path)
+            response.raise_for_status()
+            latencies[name].append((time.perf_counter() - started_at) * 1000)
+
+        await asyncio.sleep(interval)
+
+    return latencies
+
+
+async def recommendation_client(
+    client: httpx.AsyncClient, client_id: int, stop: asyncio.Event, completed: List[int]
+) -> None:
+    request_id: int = 0
+
+    while not stop.is_set():
+        request_id += 1
+        response: httpx.Response = await client.post(
+            "/evergreen/pro/recomendations/",
+            json={
+                "parcel_id": "P1233",
+                "user_question": f"Client {client_id} question {request_id}?",
+            },
+            timeout=None,
+        )
+        response.raise_for_status()
+        completed[0] += 1
+
+
+def report(phase: str, latencies: Dict[str, List[float]]) -> None:
+    for name, values in latencies.items():
+        print(
+            f"{phase:<10} {name:<10} n={len(values):>5}  "
+            f"p50={statistics.median(values):7.2f} ms  "
+            f"p99={percentile(values, 0.99):7.2f} ms  "
+            f"max={max(values):7.2f} ms"
+        )
+
+
+async def main(clients: int, seconds: float, interval: float) -> None:
+    transport: httpx.ASGITransport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up lazy initialization (knowledge pack, retrieval index, caches).
+        await client.post(
+            "/evergreen/pro/recomendations/", json={"parcel_id": "P1233"}, timeout=None
+        )
+
+        report("idle", await probe(client, seconds, interval))
+
+        stop: asyncio.Event = asyncio.Event()
+        completed: List[int] = [0]
+        workers: List[asyncio.Task] = [
+            asyncio.create_task(recommendation_client(client, index, stop, completed))
+            for index in range(clients)
+        ]
+
+        await asyncio.sleep(config.LLM_SIMULATED_LATENCY_SECONDS)
+        saturated: Dict[str, List[float]] = await probe(client, seconds, interval)
+        queued: float = metrics.gauge("llm_executor.queued")
+        in_flight: float = metrics.gauge("llm.in_flight")
+
+        stop.set()
+        await asyncio.gather(*workers)
+
+        report("saturated", saturated)
+        print(
+            f"Recommendations: {clients} clients, {completed[0]} completed, "
+            f"{in_flight:.0f} LLM calls in flight and {queued:.0f} queued during the "
+            f"probe (LLM_MAX_CONCURRENCY={config.LLM_MAX_CONCURRENCY}, "
+            f"latency {config.LLM_SIMULATED_LATENCY_SECONDS}s)"
+        )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--clients", type=int, default=128)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=None)
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.llm_latency is not None:
+        config.LLM_SIMULATED_LATENCY_SECONDS = args.llm_latency
+
+    asyncio.run(main(clients=args.clients, seconds=args.seconds, interval=args.interval))
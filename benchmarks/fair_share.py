@@ -0,0 +1,184 @@
+"""
+Fairness and throughput of the fair-share LLM scheduler under a multi-tenant load.
+
+Simulates LLM calls of a fixed duration on `--capacity` slots, without the API:
+
+1. A large cooperative keeps `--flood` scripted requests in flight while smallholders
+   send interactive requests one at a time with some think time. The smallholders'
+   waits are compared between a FIFO semaphore and the fair-share scheduler.
+2. Three backlogged cooperatives with weights 1, 1 and 2 share the slots; their
+   throughput should split 25% / 25% / 50%.
+
+Run it from the repository root:
+
+    python -m benchmarks.fair_share --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+
+from app.core.fair_scheduler import FairShareScheduler  # noqa: E402
+from app.models.scheduling import (  # noqa: E402
+    ClientContext,
+    QueueTicket,
+    RequestPriority,
+)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def jain_index(values: List[float]) -> float:
+    return sum(values) ** 2 / (len(values) * sum(value**2 for value in values))
+
+
+async def run_load(
+    mode: str,
+    clients: List[ClientContext],
+    concurrency: Dict[str, int],
+    think_seconds: Dict[str, float],
+    capacity: int,
+    service_seconds: float,
+    duration: float,
+) -> Dict[str, List[float]]:
+    """
+    Run closed-loop clients against a FIFO semaphore or the fair-share scheduler.
+
+    Returns:
+        Dict[str, List[float]]: The queue waits in milliseconds of every completed
+            request, per client.
+    """
+
+    scheduler: FairShareScheduler = FairShareScheduler(
+        capacity=capacity, rate=1e9, burst=10**9
+    )
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(capacity)
+    waits: Dict[str, List[float]] = defaultdict(list)
+    deadline: float = time.perf_counter() + duration
+
+    async def worker(client: ClientContext) -> None:
+        while time.perf_counter() < deadline:
+            started_at: float = time.perf_counter()
+
+            if mode == "fifo":
+                async with semaphore:
+                    waited_ms: float = (time.perf_counter() - started_at) * 1000
+                    await asyncio.sleep(service_seconds)
+            else:
+                ticket: QueueTicket = QueueTicket()
+                async with scheduler.slot(client, ticket):
+                    waited_ms = ticket.waited_ms
+                    await asyncio.sleep(service_seconds)
+
+            if time.perf_counter() < deadline:
+                waits[client.client_id].append(waited_ms)
+
+            await asyncio.sleep(think_seconds.get(client.client_id, 0.0))
+
+    await asyncio.gather(
+        *[
+            worker(client)
+            for client in clients
+            for _ in range(concurrency.get(client.client_id, 1))
+        ]
+    )
+
+    return waits
+
+
+async def main(
+    capacity: int, service_ms: float, duration: float, flood: int, smallholders: int
+) -> None:
+    service_seconds: float = service_ms / 1000
+    total_slots: float = capacity * duration / service_seconds
+
+    print(
+        f"1. Flooding cooperative ({flood} requests in flight) vs {smallholders} "
+        f"interactive smallholders, {capacity} slots of {service_ms:.0f} ms"
+    )
+    clients: List[ClientContext] = [ClientContext(client_id="big-coop")] + [
+        ClientContext(client_id=f"smallholder-{index}") for index in range(smallholders)
+    ]
+
+    for mode in ["fifo", "fair"]:
+        waits: Dict[str, List[float]] = await run_load(
+            mode=mode,
+            clients=clients,
+            concurrency={"big-coop": flood},
+            think_seconds={client.client_id: 0.2 for client in clients[1:]},
+            capacity=capacity,
+            service_seconds=service_seconds,
+            duration=duration,
+        )
+        small_waits: List[float] = [
+            wait for client in clients[1:] for wait in waits[client.client_id]
+        ]
+        completed: int = sum(len(values) for values in waits.values())
+
+        print(
+            f"   {mode:<5} smallholders: {len(small_waits):>5} requests, wait "
+            f"p50={statistics.median(small_waits):7.1f} ms "
+            f"p95={percentile(small_waits, 0.95):7.1f} ms | big-coop: "
+            f"{len(waits['big-coop']):>5} requests | utilization "
+            f"{100 * completed / total_slots:5.1f}%"
+        )
+
+    print("2. Three backlogged cooperatives with weights 1, 1 and 2")
+    weighted: List[ClientContext] = [
+        ClientContext(client_id="coop-a", weight=1.0, priority=RequestPriority.BATCH),
+        ClientContext(client_id="coop-b", weight=1.0, priority=RequestPriority.BATCH),
+        ClientContext(client_id="coop-c", weight=2.0, priority=RequestPriority.BATCH),
+    ]
+    waits = await run_load(
+        mode="fair",
+        clients=weighted,
+        concurrency={client.client_id: flood for client in weighted},
+        think_seconds={},
+        capacity=capacity,
+        service_seconds=service_seconds,
+        duration=duration,
+    )
+    completed = sum(len(values) for values in waits.values())
+
+    for client in weighted:
+        print(
+            f"   {client.client_id} (weight {client.weight:g}): "
+            f"{100 * len(waits[client.client_id]) / completed:5.1f}% of "
+            f"{completed} requests"
+        )
+
+    print(
+        "   Jain index of weight-normalized throughput: "
+        f"{jain_index([len(waits[c.client_id]) / c.weight for c in weighted]):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--service-ms", type=float, default=50.0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--flood", type=int, default=64)
+    parser.add_argument("--smallholders", type=int, default=10)
+    args: argparse.Namespace = parser.parse_args()
+
+    asyncio.run(
+        main(
+            capacity=args.capacity,
+            service_ms=args.service_ms,
+            duration=args.duration,
+            flood=args.flood,
+            smallholders=args.smallholders,
+        )
+    )
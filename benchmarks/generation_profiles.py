@@ -0,0 +1,107 @@
+"""
+Generated tokens and latency with and without question-aware generation profiles.
+
+Builds the prompt of a mix of typical questions for one parcel and generates each
+completion with the simulated LLM, first with the former fixed 250-token budget and
+then with the profile chosen by the question classifier. Run it from the repository
+root:
+
+    python -m benchmarks.generation_profiles --latency 1.0
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+from collections import defaultdict
+from typing import Dict, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="generation-profiles-"))
+os.environ["LLM_BACKEND"] = "simulated"
+
+from app.config.conf import config  # noqa: E402
+from app.domain.recommendations import RecommendationDomain  # noqa: E402
+from app.models.llms import (  # noqa: E402
+    GenerationProfile,
+    GenerationResult,
+    ImplementedModels,
+)
+from app.models.recommendations import RecommendationContext  # noqa: E402
+
+QUESTIONS: List[str] = [
+    "Should I irrigate tomorrow?",
+    "Is it safe to apply fertilizer today?",
+    "¿Debo regar hoy?",
+    "When should I harvest?",
+    "How much water does the crop need per day?",
+    "Why are the leaves turning yellow?",
+    "¿Por qué hay manchas en las hojas?",
+    "What actions should I take on my crop over the next 5-7 days?",
+    "Give me a plan for this week",
+    "¿Qué debo hacer esta semana?",
+]
+
+
+def main(parcel_id: str, latency: float) -> None:
+    config.LLM_SIMULATED_LATENCY_SECONDS = latency
+    domain: RecommendationDomain = RecommendationDomain()
+    tokens: Dict[str, List[int]] = defaultdict(list)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+
+    for question in QUESTIONS:
+        context: RecommendationContext = domain.gather_context(
+            parcel_id=parcel_id, user_question=question
+        )
+        profile: GenerationProfile = domain.profile_service.profile_for(question)
+
+        for mode, mode_profile in [("fixed", None), ("profiled", profile)]:
+            prompt: str = domain.build_prompt(
+                user_question=question,
+                project_details=context.project_details,
+                process_info=context.process_info,
+                lunar_analysis=context.lunar_analysis,
+                satellite_analysis=context.satellite_analysis,
+                weather_forecast=context.weather_forecast,
+                best_irrigation_practices=context.best_irrigation_practices,
+                best_agricultural_practices=context.best_agricultural_practices,
+                historical_information=context.historical_information,
+                history_summary=context.history_summary,
+                knowledge_chunks=context.knowledge_chunks,
+                answer_format=mode_profile.instructions if mode_profile else None,
+            )
+            result: GenerationResult = domain.llms_service.generate_text(
+                model=ImplementedModels.FLAN_T5_LARGE,
+                prompt=prompt,
+                profile=mode_profile,
+            )
+            tokens[mode].append(result.generated_tokens)
+            latencies[mode].append(result.latency_ms)
+
+        print(
+            f"{profile.question_type.value:<10} budget={profile.max_new_tokens:>3}  "
+            f"tokens {tokens['fixed'][-1]:>3} -> {tokens['profiled'][-1]:>3}  "
+            f"{question}"
+        )
+
+    for mode in ["fixed", "profiled"]:
+        print(
+            f"{mode:<9} avg tokens={statistics.mean(tokens[mode]):6.1f}  "
+            f"avg latency={statistics.mean(latencies[mode]):7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--parcel-id", default="P1233")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=1.0,
+        help="Simulated latency of a full completion, in seconds",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    main(parcel_id=args.parcel_id, latency=args.latency)
@@ -0,0 +1,116 @@
+"""
+Latency of hybrid (BM25 + vector) retrieval over a synthetic corpus.
+
+Builds a temporary chromadb index with synthetic agronomic chunks spread over several
+crops and phases (embedded with the offline hashing backend), then times the BM25
+search alone and the full hybrid search with metadata filters and reranking. Run it
+from the repository root:
+
+    python -m benchmarks.hybrid_retrieval --chunks 100000 --budget-ms 50
+"""
+
+import argparse
+import os
+import random as rand
+import statistics
+import tempfile
+import time
+from typing import List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+os.environ["EMBEDDING_BACKEND"] = "hashing"
+os.environ.setdefault("EMBEDDING_DIMENSION", "64")
+os.environ["KNOWLEDGE_INDEX_DIR"] = tempfile.mkdtemp(prefix="hybrid-bench-")
+
+from app.models.knowledge import KnowledgeChunk  # noqa: E402
+from app.services.embeddings import compute_embeddings  # noqa: E402
+from app.services.hybrid_retrieval import hybrid_retriever  # noqa: E402
+from app.services.knowledge_index import knowledge_index  # noqa: E402
+
+CROPS: List[str] = ["rice", "cotton", "barley", "maize", "coffee", "cocoa", "*"]
+PHASES: List[str] = ["vegetative", "flowering", "maturity", "germination", "*"]
+VOCABULARY: List[str] = (
+    "water irrigation nitrogen potassium phosphorus drainage weeds fertilizer soil "
+    "moisture canopy leaf root stem panicle tillering boll flowering harvest yield "
+    "drought flood rain temperature humidity scouting trap spray fungicide "
+    "insecticide herbicide dose hectare split application monitor threshold"
+).split()
+RARE_TERMS: List[str] = (
+    "jasmine upland basmati arabica criollo bollworm whitefly blast rust borer "
+    "mancozeb glyphosate chlorpyrifos azoxystrobin"
+).split()
+
+
+def synthetic_text(rng: rand.Random) -> str:
+    words: List[str] = rng.choices(VOCABULARY, k=120)
+    words.extend(rng.sample(RARE_TERMS, k=2))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+def main(total_chunks: int, queries: int, budget_ms: float) -> None:
+    rng: rand.Random = rand.Random(7)
+
+    started_at: float = time.perf_counter()
+    for start in range(0, total_chunks, 5000):
+        chunks: List[KnowledgeChunk] = [
+            KnowledgeChunk(
+                chunk_id=f"chunk-{index}",
+                source=f"manual-{index // 40}.md",
+                crop_type=rng.choice(CROPS),
+                current_phase=rng.choice(PHASES),
+                text=synthetic_text(rng),
+            )
+            for index in range(start, min(start + 5000, total_chunks))
+        ]
+        knowledge_index.upsert(
+            chunks, compute_embeddings([chunk.text for chunk in chunks])
+        )
+    print(f"Indexed {total_chunks} chunks in {time.perf_counter() - started_at:.1f} s")
+
+    started_at = time.perf_counter()
+    bm25, _ = hybrid_retriever.snapshot()
+    print(f"Built BM25 index in {time.perf_counter() - started_at:.1f} s")
+
+    bm25_latencies: List[float] = []
+    hybrid_latencies: List[float] = []
+
+    for _ in range(queries):
+        query: str = " ".join(
+            rng.sample(VOCABULARY, k=4) + rng.sample(RARE_TERMS, k=1)
+        )
+        crop_type: str = rng.choice(CROPS[:-1])
+        current_phase: str = rng.choice(PHASES[:-1])
+
+        started_at = time.perf_counter()
+        bm25.search(query, crop_type, current_phase, limit=50)
+        bm25_latencies.append((time.perf_counter() - started_at) * 1000)
+
+        started_at = time.perf_counter()
+        hybrid_retriever.search(query, crop_type, current_phase, limit=4)
+        hybrid_latencies.append((time.perf_counter() - started_at) * 1000)
+
+    for name, latencies in (("bm25", bm25_latencies), ("hybrid", hybrid_latencies)):
+        print(
+            f"{name:>6} | p50={statistics.median(latencies):7.2f} ms | "
+            f"p99={percentile(latencies, 0.99):7.2f} ms"
+        )
+
+    p99: float = percentile(hybrid_latencies, 0.99)
+    verdict: str = "within" if p99 <= budget_ms else "OVER"
+    print(f"Hybrid p99 {p99:.2f} ms is {verdict} the {budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args: argparse.Namespace = parser.parse_args()
+
+    main(args.chunks, args.queries, args.budget_ms)
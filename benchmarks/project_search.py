@@ -0,0 +1,121 @@
+"""
+Latency of filtered project searches over a large catalogue.
+
+Builds a synthetic catalogue (1M parcels by default) in a fresh `ProjectCatalogue`,
+then times representative dashboard queries, first page and deep pages. Run it from
+the repository root:
+
+    python -m benchmarks.project_search --parcels 1000000
+"""
+
+import argparse
+import datetime as dt
+import os
+import random as rand
+import statistics
+import time
+from typing import Dict, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+
+from app.cli.generate_fleet import CROPS, LOCATIONS, PHASES  # noqa: E402
+from app.models.project import ProjectDetails  # noqa: E402
+from app.services.project_catalogue import ProjectCatalogue  # noqa: E402
+
+QUERIES: Dict[str, Dict] = {
+    "cotton/flowering/Antioquia": {
+        "crop_type": "cotton",
+        "current_phase": "flowering",
+        "location": "Antioquia",
+    },
+    "rice/jasmine": {"crop_type": "rice", "variety": "jasmine"},
+    "location Jardín, Antioquia": {"location": "Jardín, Antioquia"},
+    "planted in 45 days": {
+        "planted_from": dt.date(2024, 3, 10),
+        "planted_to": dt.date(2024, 4, 24),
+    },
+    "maize/maturity/Tolima/Q2": {
+        "crop_type": "maize",
+        "current_phase": "maturity",
+        "location": "Tolima",
+        "planted_from": dt.date(2024, 4, 1),
+        "planted_to": dt.date(2024, 6, 30),
+    },
+    "everything": {},
+}
+
+
+def build_catalogue(parcels: int, seed: int) -> ProjectCatalogue:
+    rng: rand.Random = rand.Random(seed)
+    start: dt.date = dt.date(2024, 1, 1)
+    projects: List[ProjectDetails] = []
+
+    for index in range(parcels):
+        crop_type: str = rng.choice(list(CROPS))
+        planting_date: dt.date = start + dt.timedelta(days=rng.randrange(365))
+        projects.append(
+            ProjectDetails.model_construct(
+                project_id=f"PROJ_{index}",
+                parcel_id=f"P{index:07d}",
+                location=f"{rng.choice(list(LOCATIONS))}, Colombia",
+                crop_type=crop_type,
+                variety=rng.choice(CROPS[crop_type]["varieties"]),
+                planting_date=planting_date.isoformat(),
+                current_phase=rng.choice(PHASES),
+            )
+        )
+
+    catalogue: ProjectCatalogue = ProjectCatalogue()
+    started_at: float = time.perf_counter()
+    catalogue.add_many(projects)
+    print(
+        f"Indexed {parcels} projects in {time.perf_counter() - started_at:.2f} s "
+        f"({len(catalogue._index.keys())} index keys)"
+    )
+
+    return catalogue
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(parcels: int, repeats: int, limit: int, seed: int) -> None:
+    catalogue: ProjectCatalogue = build_catalogue(parcels, seed)
+
+    for name, filters in QUERIES.items():
+        for page in ["first", "deep"]:
+            cursor: int = 0
+            if page == "deep":
+                _, total, _, _ = catalogue.search(**filters, limit=1)
+                # Resume from the middle of the result set.
+                projects, _, _, _ = catalogue.search(**filters, limit=max(1, total // 2))
+                cursor = int(projects[-1].parcel_id[1:]) + 1 if projects else 0
+
+            latencies: List[float] = []
+            for _ in range(repeats):
+                started_at: float = time.perf_counter()
+                projects, total, _, _ = catalogue.search(
+                    **filters, cursor=cursor, limit=limit
+                )
+                latencies.append((time.perf_counter() - started_at) * 1000)
+
+            print(
+                f"{name:<28} {page:<5} matches={total:>8}  "
+                f"p50={statistics.median(latencies):6.3f} ms  "
+                f"p99={percentile(latencies, 0.99):6.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--parcels", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args: argparse.Namespace = parser.parse_args()
+
+    main(parcels=args.parcels, repeats=args.repeats, limit=args.limit, seed=args.seed)
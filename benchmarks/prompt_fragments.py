@@ -0,0 +1,132 @@
+"""
+CPU time of prompt building with and without the prompt fragment cache.
+
+Generates a fleet of parcels with past seasons, gathers the context of each parcel
+once and builds the prompts of random requests over the fleet, measuring the CPU time
+of `build_prompt` per request, first rendering every fragment and then with the
+fragments of static and slowly changing context (project details, best practices,
+parcel history and weather forecasts) served from the cache. Forecasts are shared by
+the parcels of a weather grid cell, as in the service. The first pass over the fleet,
+which fills the cache, is reported separately. Run it from the repository root:
+
+    python -m benchmarks.prompt_fragments --parcels 500 --requests 20000
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="evergreen-bench-"))
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+
+from app.cli.generate_fleet import generate_parcel  # noqa: E402
+from app.config.conf import config  # noqa: E402
+from app.core.prompt_fragments import prompt_fragments  # noqa: E402
+from app.domain.recommendations import RecommendationDomain  # noqa: E402
+from app.models.project import HistoricalInformation, ProjectDetails  # noqa: E402
+from app.models.recommendations import RecommendationContext  # noqa: E402
+from app.services.history_store import history_store  # noqa: E402
+from app.services.project_catalogue import project_catalogue  # noqa: E402
+
+QUESTION: str = "What actions should I take on my crop over the next 5-7 days?"
+
+
+def build(domain: RecommendationDomain, context: RecommendationContext) -> str:
+    return domain.build_prompt(
+        user_question=QUESTION,
+        project_details=context.project_details,
+        process_info=context.process_info,
+        lunar_analysis=context.lunar_analysis,
+        satellite_analysis=context.satellite_analysis,
+        weather_forecast=context.weather_forecast,
+        best_irrigation_practices=context.best_irrigation_practices,
+        best_agricultural_practices=context.best_agricultural_practices,
+        historical_information=context.historical_information,
+        history_summary=context.history_summary,
+        knowledge_chunks=context.knowledge_chunks,
+        telemetry_alerts=context.telemetry_alerts,
+    )
+
+
+def cpu_us_per_call(calls: List[Callable[[], object]]) -> float:
+    started_at: float = time.thread_time()
+
+    for call in calls:
+        call()
+
+    return (time.thread_time() - started_at) / len(calls) * 1e6
+
+
+def main(parcels: int, requests: int, seasons: int) -> None:
+    today: dt.date = dt.date.today()
+    projects: List[ProjectDetails] = []
+
+    for index in range(parcels):
+        project, history, _ = generate_parcel(index, today, seasons=seasons, readings=0)
+        projects.append(ProjectDetails.model_validate_json(project))
+        history_store.add_many(
+            HistoricalInformation.model_validate_json(line) for line in history
+        )
+
+    project_catalogue.add_many(projects)
+    domain: RecommendationDomain = RecommendationDomain()
+
+    # build_prompt prints every prompt.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        contexts: List[RecommendationContext] = [
+            domain.gather_context(parcel_id=project.parcel_id, user_question=QUESTION)
+            for project in projects
+        ]
+
+        rng: random.Random = random.Random(42)
+        picks: List[RecommendationContext] = [
+            rng.choice(contexts) for _ in range(requests)
+        ]
+
+        config.PROMPT_FRAGMENT_CACHE_ENABLED = False
+        expected: List[str] = [build(domain, context) for context in contexts]
+        uncached: float = cpu_us_per_call(
+            [lambda context=context: build(domain, context) for context in picks]
+        )
+
+        config.PROMPT_FRAGMENT_CACHE_ENABLED = True
+        prompt_fragments.clear()
+        first_pass: float = cpu_us_per_call(
+            [lambda context=context: build(domain, context) for context in contexts]
+        )
+        cached: float = cpu_us_per_call(
+            [lambda context=context: build(domain, context) for context in picks]
+        )
+
+        if [build(domain, context) for context in contexts] != expected:
+            raise AssertionError("Cached fragments changed the prompts")
+
+    print(
+        f"{parcels} parcels with {seasons} past seasons, {requests} requests "
+        f"(up to {config.HISTORY_PROMPT_MAX_SEASONS} seasons per prompt)"
+    )
+    print(f"build_prompt, every fragment rendered: {uncached:6.1f} us CPU per request")
+    print(
+        f"build_prompt, cached fragments:        {cached:6.1f} us CPU per request "
+        f"({uncached - cached:.1f} us, {(uncached - cached) / uncached:.0%} saved)"
+    )
+    print(f"build_prompt, first request per parcel: {first_pass:6.1f} us CPU")
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--parcels", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--seasons", type=int, default=4)
+    args: argparse.Namespace = parser.parse_args()
+
+    main(parcels=args.parcels, requests=args.requests, seasons=args.seasons)
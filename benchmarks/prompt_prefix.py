@@ -0,0 +1,251 @@
+"""
+Share of prompt tokens a prefix-caching inference server can reuse, per prompt layout.
+
+Generates a fleet of parcels with past seasons and a stream of requests over it, where
+a few parcels are asked about far more often than the rest and the questions mix the
+default one with typical specific ones. Each request gathers its context as the API
+does, and its prompt is built with the "classic" and the "prefix_stable" layouts and
+tokenized with a tiktoken encoding. tiktoken downloads its encodings on first use, so
+offline runs pass `--encoding bytes`, a byte-level encoding built in memory (one token
+per UTF-8 byte, no merges): token counts are then byte counts, which inflates the
+totals but keeps which blocks two prompts share.
+
+Reuse is simulated like the automatic prefix caching of vLLM: prompts are split into
+blocks of `--block-tokens` tokens, each identified by the hash of the whole prompt up
+to its end, and the leading blocks already seen (kept in an LRU of `--cache-blocks`
+blocks, unbounded by default) need no prefill. Run it from the repository root:
+
+    python -m benchmarks.prompt_prefix --parcels 200 --requests 3000
+    python -m benchmarks.prompt_prefix --encoding bytes --block-tokens 64
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import hashlib
+import os
+import random
+import tempfile
+from collections import OrderedDict
+from typing import Dict, List, Set
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="evergreen-bench-"))
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+
+import tiktoken  # noqa: E402
+
+from app.cli.generate_fleet import generate_parcel  # noqa: E402
+from app.config.conf import config  # noqa: E402
+from app.domain.recommendations import (  # noqa: E402
+    PROMPT_LAYOUT_PREFIX_STABLE,
+    PROMPT_PREFIX_END,
+    RecommendationDomain,
+    prompt_prefix_hash,
+)
+from app.models.llms import GenerationProfile  # noqa: E402
+from app.models.project import HistoricalInformation, ProjectDetails  # noqa: E402
+from app.models.recommendations import RecommendationContext  # noqa: E402
+from app.services.history_store import history_store  # noqa: E402
+from app.services.project_catalogue import project_catalogue  # noqa: E402
+
+LAYOUTS: List[str] = ["classic", PROMPT_LAYOUT_PREFIX_STABLE]
+BYTES_ENCODING: str = "bytes"
+DEFAULT_QUESTION: str = "What actions should I take on my crop over the next 5-7 days?"
+QUESTIONS: List[str] = [
+    "Should I irrigate tomorrow?",
+    "Is it safe to apply fertilizer today?",
+    "When should I harvest?",
+    "Why are the leaves turning yellow?",
+    "¿Debo regar hoy?",
+    "Give me a plan for this week",
+]
+
+
+class PrefixCache:
+    """
+    The blocks of prompt tokens whose KV state a prefix-caching server holds.
+
+    Attributes:
+        block_tokens (int): The number of tokens per block.
+        capacity (int | None): The maximum number of blocks kept, None for no limit.
+    """
+
+    def __init__(self, block_tokens: int, capacity: int | None) -> None:
+        self.block_tokens: int = block_tokens
+        self.capacity: int | None = capacity
+        self._blocks: OrderedDict[bytes, None] = OrderedDict()
+
+    def prefill(self, tokens: List[int]) -> int:
+        """
+        Serve a prompt, caching its blocks.
+
+        Args:
+            tokens (List[int]): The tokens of the prompt.
+
+        Returns:
+            int: The number of leading tokens found in the cache.
+        """
+
+        digest = hashlib.blake2b(digest_size=16)
+        reused: int = 0
+        hit: bool = True
+
+        for start in range(0, len(tokens) - self.block_tokens + 1, self.block_tokens):
+            block: List[int] = tokens[start : start + self.block_tokens]
+            digest.update(b"".join(token.to_bytes(4, "little") for token in block))
+            key: bytes = digest.digest()
+
+            if hit and key in self._blocks:
+                reused += self.block_tokens
+                self._blocks.move_to_end(key)
+                continue
+
+            hit = False
+            self._blocks[key] = None
+
+            if self.capacity is not None and len(self._blocks) > self.capacity:
+                self._blocks.popitem(last=False)
+
+        return reused
+
+
+def load_encoding(name: str) -> tiktoken.Encoding:
+    """
+    Return a tiktoken encoding by name, or the offline byte-level one.
+
+    Args:
+        name (str): A tiktoken encoding name, or `BYTES_ENCODING`.
+
+    Returns:
+        tiktoken.Encoding: The encoding.
+    """
+
+    if name != BYTES_ENCODING:
+        return tiktoken.get_encoding(name)
+
+    return tiktoken.Encoding(
+        name=BYTES_ENCODING,
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([byte]): byte for byte in range(256)},
+        special_tokens={},
+    )
+
+
+def main(
+    parcels: int,
+    requests: int,
+    seasons: int,
+    encoding_name: str,
+    block_tokens: int,
+    cache_blocks: int | None,
+) -> None:
+    today: dt.date = dt.date.today()
+    projects: List[ProjectDetails] = []
+
+    for index in range(parcels):
+        project, history, _ = generate_parcel(index, today, seasons=seasons, readings=0)
+        projects.append(ProjectDetails.model_validate_json(project))
+        history_store.add_many(
+            HistoricalInformation.model_validate_json(line) for line in history
+        )
+
+    project_catalogue.add_many(projects)
+    domain: RecommendationDomain = RecommendationDomain()
+    encoding: tiktoken.Encoding = load_encoding(encoding_name)
+    rng: random.Random = random.Random(42)
+    # Zipf-like popularity: a few parcels are asked about far more often.
+    weights: List[float] = [1 / (rank + 1) for rank in range(parcels)]
+
+    caches: Dict[str, PrefixCache] = {
+        layout: PrefixCache(block_tokens, cache_blocks) for layout in LAYOUTS
+    }
+    prompt_tokens: Dict[str, int] = {layout: 0 for layout in LAYOUTS}
+    reused_tokens: Dict[str, int] = {layout: 0 for layout in LAYOUTS}
+    prefix_hashes: Set[str] = set()
+    prefix_tokens: int = 0
+
+    # build_prompt prints every prompt.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(requests):
+            project: ProjectDetails = rng.choices(projects, weights=weights)[0]
+            question: str = (
+                DEFAULT_QUESTION if rng.random() < 0.5 else rng.choice(QUESTIONS)
+            )
+            profile: GenerationProfile = domain.profile_service.profile_for(question)
+            context: RecommendationContext = domain.gather_context(
+                parcel_id=project.parcel_id, user_question=question
+            )
+
+            for layout in LAYOUTS:
+                config.PROMPT_LAYOUT = layout
+                prompt: str = domain.build_prompt(
+                    user_question=question,
+                    project_details=context.project_details,
+                    process_info=context.process_info,
+                    lunar_analysis=context.lunar_analysis,
+                    satellite_analysis=context.satellite_analysis,
+                    weather_forecast=context.weather_forecast,
+                    best_irrigation_practices=context.best_irrigation_practices,
+                    best_agricultural_practices=context.best_agricultural_practices,
+                    historical_information=context.historical_information,
+                    history_summary=context.history_summary,
+                    knowledge_chunks=context.knowledge_chunks,
+                    answer_format=profile.instructions,
+                    telemetry_alerts=context.telemetry_alerts,
+                )
+                tokens: List[int] = encoding.encode(prompt)
+                prompt_tokens[layout] += len(tokens)
+                reused_tokens[layout] += caches[layout].prefill(tokens)
+
+                prefix_hash: str | None = prompt_prefix_hash(prompt)
+                if prefix_hash is not None:
+                    prefix_hashes.add(prefix_hash)
+                    prefix_tokens += len(
+                        encoding.encode(prompt[: prompt.find(PROMPT_PREFIX_END)])
+                    )
+
+    print(
+        f"{requests} requests over {parcels} parcels ({seasons} past seasons), "
+        f"{encoding_name} tokens, {block_tokens}-token blocks, "
+        f"{'unbounded' if cache_blocks is None else cache_blocks} cached blocks"
+    )
+
+    for layout in LAYOUTS:
+        print(
+            f"{layout:<14} {prompt_tokens[layout] / requests:7.0f} tokens per prompt, "
+            f"{reused_tokens[layout] / requests:7.0f} reused "
+            f"({reused_tokens[layout] / prompt_tokens[layout]:.1%} of prefill)"
+        )
+
+    print(
+        f"prefix_stable: {prefix_tokens / requests:.0f} tokens of stable prefix per "
+        f"prompt, {len(prefix_hashes)} distinct prefix hashes"
+    )
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--parcels", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=3_000)
+    parser.add_argument("--seasons", type=int, default=4)
+    parser.add_argument(
+        "--encoding",
+        default="cl100k_base",
+        help=f'A tiktoken encoding, or "{BYTES_ENCODING}" to run offline',
+    )
+    parser.add_argument("--block-tokens", type=int, default=16)
+    parser.add_argument("--cache-blocks", type=int)
+    args: argparse.Namespace = parser.parse_args()
+
+    main(
+        parcels=args.parcels,
+        requests=args.requests,
+        seasons=args.seasons,
+        encoding_name=args.encoding,
+        block_tokens=args.block_tokens,
+        cache_blocks=args.cache_blocks,
+    )
@@ -0,0 +1,223 @@
+"""
+Storage cost, write throughput and query latency of the recommendation history.
+
+Writes `--rows` synthetic recommendations (spread over `--parcels` parcels and 90 days,
+with varied wording) to a fresh history database through the background writer, then
+reports:
+
+1. the bytes per row of the JSON bodies raw, compressed with plain zlib and with the
+   preset dictionary, and of the whole database (indexes and WAL checkpointed), with
+   the extrapolated cost per million responses;
+2. the time `record` adds to a request and the write throughput of the writer;
+3. the latency of "latest" and time-range queries.
+
+Run it from the repository root:
+
+    python -m benchmarks.recommendation_history --rows 20000
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import zlib
+from typing import List, Tuple
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+
+from app.models.llms import ImplementedModels  # noqa: E402
+from app.models.recommendations import (  # noqa: E402
+    ContextFingerprint,
+    RecommendationResponse,
+    RecommendationSections,
+)
+from app.services.recommendation_history import (  # noqa: E402
+    RecommendationHistoryStore,
+    compress_body,
+)
+
+ACTIONS: List[str] = [
+    "check soil moisture in the morning and irrigate only below the target range",
+    "apply the second nitrogen split before the forecast rain",
+    "scout the borders for armyworm and treat hotspots only",
+    "postpone fertilization until the soil drains",
+    "clean the drainage channels of the lower terraces",
+    "prune the shade trees to improve airflow",
+    "harvest the ripe lots before the rain on Thursday",
+    "calibrate the sprayer and renew the copper application",
+    "record the flowering percentage per lot",
+    "reduce irrigation by a third while humidity stays high",
+]
+WARNINGS: List[str] = [
+    "Rain in the forecast may delay field work and raise fungal risk.",
+    "Leaf rust risk is high with the current humidity.",
+    "Low soil moisture may stress the crop during flowering.",
+    "Strong winds may damage the young plants.",
+    "The satellite image shows water stress in the north lot.",
+]
+CROPS: List[str] = ["rice", "coffee", "cocoa", "corn", "cotton", "avocado"]
+PHASES: List[str] = ["sowing", "vegetative", "flowering", "fruiting", "harvest"]
+
+
+def synthetic_response(
+    rng: random.Random, parcel: int, generated_at: dt.datetime
+) -> RecommendationResponse:
+    actions: List[str] = [
+        f"Day {day}: {rng.choice(ACTIONS)}" for day in range(1, rng.randint(2, 8))
+    ]
+    warnings: List[str] = rng.sample(WARNINGS, rng.randint(0, 3))
+    details: str = (
+        "Actions:\n"
+        + "".join(f"- {action}\n" for action in actions)
+        + "Warnings:\n"
+        + "".join(f"- {warning}\n" for warning in warnings)
+        + "Justifications:\n"
+        + f"- Soil moisture at {rng.uniform(10, 45):.1f}% and "
+        + f"{rng.randint(0, 100)}% chance of rain.\n"
+    )
+
+    return RecommendationResponse(
+        model=rng.choice([m for m in ImplementedModels if m != ImplementedModels.AUTO]),
+        project_id=f"PROJ_{parcel % 200:04d}",
+        parcel_id=f"P{parcel:07d}",
+        user_question="What actions should I take on my crop over the next 5-7 days?",
+        details=details,
+        generated_at=generated_at,
+        regeneration_reason="No stored recommendation for this parcel and question",
+        question_type="plan",
+        sections=RecommendationSections(
+            actions=actions,
+            warnings=warnings,
+            justifications=[details.rsplit("- ", 1)[-1].strip()],
+        ),
+        latency_ms=round(rng.uniform(800, 4000), 1),
+    )
+
+
+def synthetic_fingerprint(rng: random.Random) -> ContextFingerprint:
+    return ContextFingerprint(
+        crop_type=rng.choice(CROPS),
+        variety="regional",
+        current_phase=rng.choice(PHASES),
+        soil_moisture_percent=round(rng.uniform(10, 45), 1),
+        rain_probability=round(rng.random(), 2),
+        satellite_status=rng.choice(["healthy", "warning", "critical"]),
+        detected_issue=None,
+        satellite_coverage_percent=round(rng.uniform(40, 100), 1),
+    )
+
+
+def database_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(path + suffix)
+        for suffix in ["", "-wal"]
+        if os.path.exists(path + suffix)
+    )
+
+
+def main(rows: int, parcels: int, queries: int, seed: int) -> None:
+    rng: random.Random = random.Random(seed)
+    path: str = os.path.join(tempfile.mkdtemp(prefix="history-"), "history.sqlite3")
+    store: RecommendationHistoryStore = RecommendationHistoryStore(
+        path=path, queue_size=rows, batch_size=500
+    )
+    start: dt.datetime = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    span_seconds: float = 90 * 24 * 3600
+
+    records: List[Tuple[RecommendationResponse, ContextFingerprint]] = [
+        (
+            synthetic_response(
+                rng,
+                rng.randrange(parcels),
+                start + dt.timedelta(seconds=span_seconds * index / rows),
+            ),
+            synthetic_fingerprint(rng),
+        )
+        for index in range(rows)
+    ]
+
+    raw: int = 0
+    plain: int = 0
+    dictionary: int = 0
+    for response, fingerprint in records[:2000]:
+        body: bytes = json.dumps(
+            {
+                "response": response.model_dump(mode="json"),
+                "fingerprint": fingerprint.model_dump(mode="json"),
+            }
+        ).encode()
+        raw += len(body)
+        plain += len(zlib.compress(body, 6))
+        dictionary += len(compress_body(json.loads(body)))
+    sampled: int = min(rows, 2000)
+
+    started_at: float = time.perf_counter()
+    for response, fingerprint in records:
+        store.record(response, fingerprint, origin="live")
+    enqueue_seconds: float = time.perf_counter() - started_at
+    store.flush()
+    total_seconds: float = time.perf_counter() - started_at
+
+    store._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    per_row: float = database_bytes(path) / rows
+
+    print(f"1. Storage ({rows} rows, {parcels} parcels)")
+    print(f"   body raw JSON        {raw / sampled:7.0f} B/row")
+    print(f"   body zlib            {plain / sampled:7.0f} B/row")
+    print(f"   body zlib+dictionary {dictionary / sampled:7.0f} B/row")
+    print(
+        f"   database on disk     {per_row:7.0f} B/row -> "
+        f"{per_row * 1_000_000 / 1024**3:.2f} GiB per million responses "
+        f"(raw JSON alone: {raw / sampled * 1_000_000 / 1024**3:.2f} GiB)"
+    )
+
+    print("2. Writes")
+    print(
+        f"   record() on the request path: {enqueue_seconds / rows * 1e6:.1f} µs/row"
+    )
+    print(f"   background writer: {rows / total_seconds:,.0f} rows/s")
+
+    print(f"3. Queries ({queries} each)")
+    parcel_ids: List[str] = [f"P{rng.randrange(parcels):07d}" for _ in range(queries)]
+
+    latencies: List[float] = []
+    for parcel_id in parcel_ids:
+        started_at = time.perf_counter()
+        store.latest(parcel_id)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    print(f"   latest(parcel)              p50={statistics.median(latencies):.3f} ms")
+
+    latencies = []
+    for parcel_id in parcel_ids:
+        since: dt.datetime = start + dt.timedelta(days=rng.randint(0, 60))
+        started_at = time.perf_counter()
+        store.query(
+            parcel_id=parcel_id, since=since, until=since + dt.timedelta(days=30)
+        )
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    print(f"   query(parcel, 30 days)      p50={statistics.median(latencies):.3f} ms")
+
+    latencies = []
+    for _ in range(queries):
+        since = start + dt.timedelta(days=rng.randint(0, 89))
+        started_at = time.perf_counter()
+        store.query(since=since, until=since + dt.timedelta(days=1), limit=50)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    print(f"   query(all, 1 day, 50 rows)  p50={statistics.median(latencies):.3f} ms")
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--parcels", type=int, default=1_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args: argparse.Namespace = parser.parse_args()
+
+    main(rows=args.rows, parcels=args.parcels, queries=args.queries, seed=args.seed)
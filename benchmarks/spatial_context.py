@@ -0,0 +1,211 @@
+"""
+Upstream calls and nearest-neighbour latency of the spatial context.
+
+Builds a synthetic fleet with coordinates (100k parcels by default) scattered around
+the generator's towns, then:
+
+- fetches the weather forecast and satellite analysis of every parcel and compares the
+  upstream calls with the number of parcels and of distinct grid cells / tiles;
+- times k-nearest-neighbour queries against the spatial grid and checks them against a
+  brute-force haversine scan;
+- checks queries around the antimeridian, where the grid's columns do not wrap, against
+  the same scan on fleets spanning ±180° longitude.
+
+The caches live in a temporary directory, so the run starts cold. Run it from the
+repository root:
+
+    python -m benchmarks.spatial_context --parcels 100000
+"""
+
+import argparse
+import os
+import random as rand
+import statistics
+import tempfile
+import time
+from typing import List, Set, Tuple
+
+import numpy as np
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="spatial-context-"))
+
+from app.cli.generate_fleet import (  # noqa: E402
+    CROPS,
+    LOCATION_RADIUS_DEGREES,
+    LOCATIONS,
+    PHASES,
+)
+from app.config.conf import config  # noqa: E402
+from app.core.metrics import metrics  # noqa: E402
+from app.core.spatial_grid import SpatialGrid, grid_cell, haversine_km  # noqa: E402
+from app.models.project import ProjectDetails  # noqa: E402
+from app.services.project_catalogue import ProjectCatalogue  # noqa: E402
+from app.services.satellite_info import SatelliteInfoService  # noqa: E402
+from app.services.weather_info import WeatherInformationService  # noqa: E402
+
+
+def build_projects(parcels: int, seed: int) -> List[ProjectDetails]:
+    rng: rand.Random = rand.Random(seed)
+    projects: List[ProjectDetails] = []
+
+    for index in range(parcels):
+        location: str = rng.choice(list(LOCATIONS))
+        latitude, longitude = LOCATIONS[location]
+        crop_type: str = rng.choice(list(CROPS))
+        projects.append(
+            ProjectDetails.model_construct(
+                project_id=f"PROJ_{index}",
+                parcel_id=f"P{index:07d}",
+                location=f"{location}, Colombia",
+                crop_type=crop_type,
+                variety=rng.choice(CROPS[crop_type]["varieties"]),
+                planting_date="2024-01-01",
+                current_phase=rng.choice(PHASES),
+                latitude=latitude
+                + rng.uniform(-LOCATION_RADIUS_DEGREES, LOCATION_RADIUS_DEGREES),
+                longitude=longitude
+                + rng.uniform(-LOCATION_RADIUS_DEGREES, LOCATION_RADIUS_DEGREES),
+            )
+        )
+
+    return projects
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def upstream_calls(projects: List[ProjectDetails]) -> None:
+    weather_service: WeatherInformationService = WeatherInformationService()
+    satellite_service: SatelliteInfoService = SatelliteInfoService()
+    cells: Set[Tuple[int, int]] = set()
+    tiles: Set[Tuple[int, int]] = set()
+
+    started_at: float = time.perf_counter()
+    for project in projects:
+        cells.add(
+            grid_cell(project.latitude, project.longitude, config.WEATHER_GRID_CELL_DEGREES)
+        )
+        tiles.add(
+            grid_cell(project.latitude, project.longitude, config.SATELLITE_TILE_DEGREES)
+        )
+        weather_service.get_weather_forecast_for_project(project)
+        satellite_service.get_satellite_info_for_project(project)
+    elapsed: float = time.perf_counter() - started_at
+
+    counters = metrics.snapshot()["counters"]
+    print(
+        f"Context of {len(projects)} parcels fetched in {elapsed:.1f} s\n"
+        f"  weather:   {counters.get('upstream.weather.calls', 0):>8.0f} upstream calls "
+        f"for {len(cells)} cells of {config.WEATHER_GRID_CELL_DEGREES}° "
+        "(unavailable forecasts are retried)\n"
+        f"  satellite: {counters.get('upstream.satellite.tile_calls', 0):>8.0f} upstream "
+        f"calls for {len(tiles)} tiles of {config.SATELLITE_TILE_DEGREES}°"
+    )
+
+
+def nearest_neighbours(
+    projects: List[ProjectDetails], repeats: int, k: int, seed: int
+) -> None:
+    catalogue: ProjectCatalogue = ProjectCatalogue()
+    started_at: float = time.perf_counter()
+    catalogue.add_many(projects)
+    print(f"Indexed {len(projects)} parcels in {time.perf_counter() - started_at:.2f} s")
+
+    latitudes: np.ndarray = np.array([project.latitude for project in projects])
+    longitudes: np.ndarray = np.array([project.longitude for project in projects])
+    rng: rand.Random = rand.Random(seed)
+    grid_latencies: List[float] = []
+    scan_latencies: List[float] = []
+
+    for _ in range(repeats):
+        origin: ProjectDetails = rng.choice(projects)
+        latitude: float = origin.latitude + rng.uniform(-0.05, 0.05)
+        longitude: float = origin.longitude + rng.uniform(-0.05, 0.05)
+
+        started_at = time.perf_counter()
+        found: List[Tuple[ProjectDetails, float]] = catalogue.nearest(
+            latitude, longitude, k=k
+        )
+        grid_latencies.append((time.perf_counter() - started_at) * 1000)
+
+        started_at = time.perf_counter()
+        distances: np.ndarray = haversine_km(latitude, longitude, latitudes, longitudes)
+        expected: np.ndarray = np.sort(distances)[:k]
+        scan_latencies.append((time.perf_counter() - started_at) * 1000)
+
+        assert np.allclose([distance for _, distance in found], expected)
+
+    for name, latencies in [("grid", grid_latencies), ("full scan", scan_latencies)]:
+        print(
+            f"  k={k} {name:<10} p50={statistics.median(latencies):7.3f} ms  "
+            f"p99={percentile(latencies, 0.99):7.3f} ms"
+        )
+
+
+def antimeridian(repeats: int, k: int, seed: int) -> None:
+    rng: rand.Random = rand.Random(seed)
+    # Enough populated cells west of the antimeridian that rings are scanned.
+    grid: SpatialGrid = SpatialGrid(config.SPATIAL_INDEX_CELL_DEGREES)
+    for position in range(1, 2_000):
+        grid.add(position, rng.uniform(0, 10), rng.uniform(-179.9, -170))
+    grid.add(0, 5.0, 179.95)
+    found: List[Tuple[int, float]] = grid.nearest(5.0, -179.95, k=1)
+    assert found[0][0] == 0 and found[0][1] < 12, found
+
+    mismatches: int = 0
+
+    for _ in range(repeats):
+        grid = SpatialGrid(config.SPATIAL_INDEX_CELL_DEGREES)
+        latitudes: np.ndarray = np.array([rng.uniform(-5, 5) for _ in range(2_000)])
+        longitudes: np.ndarray = np.array(
+            [rng.choice([-1, 1]) * rng.uniform(178, 180) for _ in range(2_000)]
+        )
+        for position, (latitude, longitude) in enumerate(zip(latitudes, longitudes)):
+            grid.add(position, latitude, longitude)
+
+        latitude: float = rng.uniform(-5, 5)
+        longitude: float = rng.choice([-1, 1]) * rng.uniform(179, 180)
+        expected: np.ndarray = np.sort(
+            haversine_km(latitude, longitude, latitudes, longitudes)
+        )[:k]
+        found = grid.nearest(latitude, longitude, k=k)
+        mismatches += not np.allclose([distance for _, distance in found], expected)
+
+    print(f"Antimeridian: {mismatches} mismatches in {repeats} queries")
+    assert mismatches == 0
+
+
+def main(parcels: int, context_parcels: int, repeats: int, k: int, seed: int) -> None:
+    projects: List[ProjectDetails] = build_projects(parcels, seed)
+
+    upstream_calls(projects[:context_parcels])
+    nearest_neighbours(projects, repeats=repeats, k=k, seed=seed)
+    antimeridian(repeats=repeats, k=k, seed=seed)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--parcels", type=int, default=100_000)
+    parser.add_argument(
+        "--context-parcels",
+        type=int,
+        default=20_000,
+        help="Parcels whose weather and satellite context is fetched",
+    )
+    parser.add_argument("--repeats", type=int, default=500)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args: argparse.Namespace = parser.parse_args()
+
+    main(
+        parcels=args.parcels,
+        context_parcels=args.context_parcels,
+        repeats=args.repeats,
+        k=args.k,
+        seed=args.seed,
+    )
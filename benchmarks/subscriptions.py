@@ -0,0 +1,139 @@
+"""
+Memory per idle subscription and fan-out latency of the parcel event bus.
+
+Opens `--subscriptions` subscriptions on one event loop, each following `--parcels`
+random parcels of a catalogue of `--catalogue` parcels and drained by a task shaped
+like the SSE stream (waiting with a heartbeat timeout), then:
+
+1. measures the memory held per idle subscription (bus entry, pending deque, wake-up
+   event and the suspended consumer task);
+2. publishes `--events` encoded events from a worker thread, as the LLM executor and
+   the background generator do, and reports the delay until every subscriber of the
+   parcel has received the event;
+3. publishes to parcels nobody follows, the cost producers pay on every change.
+
+Run it from the repository root:
+
+    python -m benchmarks.subscriptions --subscriptions 10000 --parcels 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from typing import Dict, List
+
+os.environ.setdefault("HF_TOKEN", "benchmark")
+
+from app.core.event_bus import EventBus, Subscription  # noqa: E402
+
+HEARTBEAT_SECONDS: float = 25.0
+
+
+async def consume(
+    subscription: Subscription, received_at: Dict[str, List[float]]
+) -> None:
+    while True:
+        for _, encoded in await subscription.next(timeout=HEARTBEAT_SECONDS):
+            received_at.setdefault(encoded, []).append(time.perf_counter())
+
+
+async def main(
+    subscriptions: int, parcels: int, catalogue: int, events: int
+) -> None:
+    rng: random.Random = random.Random(42)
+    bus: EventBus = EventBus(
+        name="benchmark", queue_size=32, max_subscriptions=subscriptions
+    )
+    received_at: Dict[str, List[float]] = {}
+    followers: Dict[str, int] = {}
+    tasks: List[asyncio.Task] = []
+
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+
+    for _ in range(subscriptions):
+        subscription: Subscription = bus.open()
+        keys: List[str] = [f"P{rng.randrange(catalogue)}" for _ in range(parcels)]
+        bus.follow(subscription, keys)
+        for key in subscription.keys:
+            followers[key] = followers.get(key, 0) + 1
+        tasks.append(asyncio.ensure_future(consume(subscription, received_at)))
+
+    await asyncio.sleep(0.1)
+    after: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(
+        f"1. {subscriptions} idle subscriptions, {parcels} parcels each: "
+        f"{(after - before) / subscriptions:,.0f} B per subscription"
+    )
+
+    published_at: Dict[str, float] = {}
+    keys: List[str] = list(followers)
+    payload: str = "x" * 1500
+
+    def produce() -> None:
+        for index in range(events):
+            key: str = rng.choice(keys)
+            encoded: str = f'{{"id": {index}, "parcel_id": "{key}", "data": "{payload}"}}'
+            published_at[encoded] = time.perf_counter()
+            bus.publish(key, "recommendation", encoded)
+            time.sleep(0.002)
+
+    producer: threading.Thread = threading.Thread(target=produce)
+    producer.start()
+    while producer.is_alive():
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.5)
+
+    delays: List[float] = []
+    deliveries: int = 0
+    for encoded, started_at in published_at.items():
+        times: List[float] = received_at.get(encoded, [])
+        deliveries += len(times)
+        if times:
+            delays.append((max(times) - started_at) * 1000)
+
+    delays.sort()
+    print(
+        f"2. {events} events from a thread, "
+        f"{statistics.mean(followers.values()):.1f} subscribers per parcel on average: "
+        f"{deliveries} deliveries, last subscriber after "
+        f"p50 {delays[len(delays) // 2]:.2f} ms, "
+        f"p99 {delays[int(len(delays) * 0.99)]:.2f} ms"
+    )
+
+    started_at: float = time.perf_counter()
+    for index in range(100_000):
+        bus.publish(f"unfollowed-{index}", "alert", "{}")
+    elapsed: float = time.perf_counter() - started_at
+    print(f"3. publish to a parcel nobody follows: {elapsed / 100_000 * 1e9:.0f} ns")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--subscriptions", type=int, default=10_000)
+    parser.add_argument("--parcels", type=int, default=5)
+    parser.add_argument("--catalogue", type=int, default=5_000)
+    parser.add_argument("--events", type=int, default=500)
+    args: argparse.Namespace = parser.parse_args()
+
+    asyncio.run(
+        main(
+            subscriptions=args.subscriptions,
+            parcels=args.parcels,
+            catalogue=args.catalogue,
+            events=args.events,
+        )
+    )